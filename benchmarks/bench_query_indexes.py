@@ -0,0 +1,202 @@
+"""Query plans and latencies for the hot query shapes before and after 0002.
+
+Seeds a database at migration 0001 (single-column indexes only), measures the
+hot repository queries, upgrades to head and measures again.
+
+    python benchmarks/bench_query_indexes.py --messages 1000000
+    python benchmarks/bench_query_indexes.py --url postgresql://... --messages 1000000
+
+The default target is a throwaway SQLite file. PostgreSQL URLs are used with
+psycopg2 for seeding and asyncpg for Alembic, so both drivers must be present.
+"""
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, desc, func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+
+from therapeutic_agent.storage.models import (
+    ConversationMessage,
+    SafetyEvent,
+    SessionStatus,
+    TherapeuticSession,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+BATCH_SIZE = 10_000
+
+
+def alembic_config(async_url: str) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", async_url.replace("%", "%%"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def seed(conn: Connection, users: int, sessions: int, messages: int) -> dict:
+    rng = random.Random(42)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    user_ids = [f"user_{i:06d}" for i in range(users)]
+    statuses = [SessionStatus.ACTIVE, SessionStatus.COMPLETED, SessionStatus.ARCHIVED]
+
+    session_rows = [
+        {
+            "id": uuid.uuid4(),
+            # Skewed so that some users own many sessions
+            "user_id": user_ids[int(users * rng.random() ** 3)],
+            "status": rng.choice(statuses).value,
+            "safety_score": 1.0,
+            "message_count": 0,
+            "last_activity": base + timedelta(minutes=rng.randrange(500_000)),
+        }
+        for _ in range(sessions)
+    ]
+    for start in range(0, len(session_rows), BATCH_SIZE):
+        conn.execute(
+            insert(TherapeuticSession), session_rows[start : start + BATCH_SIZE]
+        )
+
+    session_ids = [row["id"] for row in session_rows]
+    batch: list[dict[str, Any]] = []
+    events: list[dict[str, Any]] = []
+    for i in range(messages):
+        # Skewed so that long-running sessions accumulate thousands of messages
+        session_id = session_ids[int(sessions * rng.random() ** 3)]
+        batch.append(
+            {
+                "id": uuid.uuid4(),
+                "session_id": session_id,
+                "created_at": base + timedelta(seconds=i),
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": f"Seeded message {i} about how the week has been going.",
+            }
+        )
+        if i % 50 == 0:
+            events.append(
+                {
+                    "id": uuid.uuid4(),
+                    "session_id": session_id,
+                    "flag_type": "crisis",
+                    "severity_score": rng.random(),
+                    "description": "Seeded safety event",
+                    "resolved": rng.random() < 0.8,
+                }
+            )
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(insert(ConversationMessage), batch)
+            batch.clear()
+    if batch:
+        conn.execute(insert(ConversationMessage), batch)
+    for start in range(0, len(events), BATCH_SIZE):
+        conn.execute(insert(SafetyEvent), events[start : start + BATCH_SIZE])
+
+    return {"user_ids": user_ids, "session_ids": session_ids}
+
+
+def hot_queries(ids: dict, rng: random.Random) -> dict[str, Callable[[], Select]]:
+    # Sample the heavy end of the skew, which is where unindexed sorts hurt
+    session_ids = ids["session_ids"][: max(1, len(ids["session_ids"]) // 100)]
+    user_ids = ids["user_ids"][: max(1, len(ids["user_ids"]) // 100)]
+    ids = {"session_ids": session_ids, "user_ids": user_ids}
+    return {
+        "recent_messages": lambda: select(ConversationMessage)
+        .where(ConversationMessage.session_id == rng.choice(ids["session_ids"]))
+        .order_by(desc(ConversationMessage.created_at))
+        .limit(20),
+        "active_session_count": lambda: select(func.count(TherapeuticSession.id)).where(
+            TherapeuticSession.user_id == rng.choice(ids["user_ids"]),
+            TherapeuticSession.status == SessionStatus.ACTIVE,
+        ),
+        "user_sessions": lambda: select(TherapeuticSession)
+        .where(TherapeuticSession.user_id == rng.choice(ids["user_ids"]))
+        .order_by(desc(TherapeuticSession.last_activity))
+        .limit(50),
+        "unresolved_safety_events": lambda: select(SafetyEvent)
+        .where(
+            SafetyEvent.session_id == rng.choice(ids["session_ids"]),
+            SafetyEvent.resolved.is_(False),
+        )
+        .order_by(desc(SafetyEvent.severity_score)),
+    }
+
+
+def explain(conn: Connection, stmt: Select) -> list[str]:
+    compiled = stmt.compile(conn, compile_kwargs={"literal_binds": True})
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+        return [row[-1] for row in rows]
+    rows = conn.execute(text(f"EXPLAIN {compiled}"))
+    return [row[0] for row in rows]
+
+
+def measure(engine: Engine, ids: dict, runs: int, label: str) -> dict[str, float]:
+    rng = random.Random(7)
+    results = {}
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        print(f"\n== {label} ==")
+        for name, build in hot_queries(ids, rng).items():
+            print(f"-- {name}")
+            for line in explain(conn, build()):
+                print(f"   {line}")
+            timings = []
+            for _ in range(runs):
+                stmt = build()
+                started = time.perf_counter()
+                conn.execute(stmt).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+            print(f"   median {results[name]:.3f} ms over {runs} runs")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="sqlite:///bench_indexes.db")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.url.startswith("sqlite:///"):
+        Path(args.url.removeprefix("sqlite:///")).unlink(missing_ok=True)
+        async_url = args.url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    else:
+        async_url = args.url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    config = alembic_config(async_url)
+    command.upgrade(config, "0001")
+
+    engine = create_engine(args.url)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        ids = seed(conn, args.users, args.sessions, args.messages)
+    print(
+        f"Seeded {args.messages} messages across {args.sessions} sessions "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    before = measure(engine, ids, args.runs, "0001: single-column indexes")
+    command.upgrade(config, "head")
+    after = measure(engine, ids, args.runs, "head: composite and partial indexes")
+
+    print("\nquery                       before ms   after ms   speedup")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<26} {before[name]:>10.3f} {after[name]:>10.3f} {speedup:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
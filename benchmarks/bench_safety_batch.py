@@ -0,0 +1,67 @@
+"""Throughput of SafetyEngine.validate_batch against one call per message.
+
+python benchmarks/bench_safety_batch.py --messages 100000
+"""
+
+import argparse
+import asyncio
+import time
+from functools import partial
+
+from bench_safety_matcher import build_corpus
+
+from therapeutic_agent.safety.backends import get_backend
+from therapeutic_agent.safety.engine import SafetyEngine, build_rule_set
+from therapeutic_agent.safety.executor import ScanExecutor
+
+
+def make_engine(mode: str, workers: int) -> SafetyEngine:
+    backend = get_backend()
+    return SafetyEngine(
+        backend,
+        ScanExecutor(
+            mode=mode,
+            max_workers=workers,
+            build_rule_set=partial(build_rule_set, backend.name),
+        ),
+    )
+
+
+async def per_message(engine: SafetyEngine, corpus: list[str]) -> None:
+    for content in corpus:
+        await engine.validate_content(content)
+
+
+async def batch(engine: SafetyEngine, corpus: list[str]) -> None:
+    await engine.validate_batch(corpus)
+
+
+async def run(size: int, flagged_ratio: float, workers: int) -> None:
+    corpus = build_corpus(size, flagged_ratio)
+    cases = [
+        ("per-message", "inline", per_message),
+        ("batch inline", "inline", batch),
+        (f"batch {workers} procs", "process", batch),
+    ]
+    for name, mode, runner in cases:
+        engine = make_engine(mode, workers)
+        if mode == "process":
+            await engine.validate_batch(corpus[: workers * 64])  # Start the workers
+        started = time.perf_counter()
+        await runner(engine, corpus)
+        elapsed = time.perf_counter() - started
+        engine.shutdown()
+        print(f"{name:<16} {size / elapsed:>12,.0f} msg/s  ({elapsed:.2f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--flagged-ratio", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.flagged_ratio, args.workers))
+
+
+if __name__ == "__main__":
+    main()
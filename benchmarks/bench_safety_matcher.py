@@ -0,0 +1,73 @@
+"""Throughput of the combined safety matcher against per-validator scanning.
+
+python benchmarks/bench_safety_matcher.py --messages 20000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from therapeutic_agent.safety.engine import SafetyEngine
+
+BENIGN = [
+    "I feel anxious",
+    "thank you",
+    "ok",
+    "I've been feeling anxious lately about work stress.",
+    "My sister and I had an argument and I keep replaying it in my head.",
+    "Sleep has been difficult this week, I wake up around 4am most nights.",
+    "I tried the breathing exercise you suggested and it helped a little.",
+    "Work has been overwhelming and I don't know how to set boundaries.",
+]
+FLAGGED = [
+    "I want to kill myself and end this pain",
+    "What medication should I take for my depression?",
+    "Can we meet outside of therapy and be friends?",
+    "I've been cutting myself with a razor",
+]
+
+
+def build_corpus(size: int, flagged_ratio: float) -> list[str]:
+    rng = random.Random(0)
+    return [
+        rng.choice(FLAGGED if rng.random() < flagged_ratio else BENIGN)
+        for _ in range(size)
+    ]
+
+
+async def per_validator(engine: SafetyEngine, corpus: list[str]) -> None:
+    """The previous engine path: every validator scans the message itself."""
+    for content in corpus:
+        results = await asyncio.gather(
+            *(validator.validate(content) for validator in engine._validators)
+        )
+        engine._aggregate_results(list(results))
+
+
+async def combined(engine: SafetyEngine, corpus: list[str]) -> None:
+    for content in corpus:
+        await engine.validate_content(content)
+
+
+async def run(size: int, flagged_ratio: float) -> None:
+    engine = SafetyEngine()
+    corpus = build_corpus(size, flagged_ratio)
+
+    for name, runner in (("per-validator", per_validator), ("combined", combined)):
+        started = time.perf_counter()
+        await runner(engine, corpus)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<14} {size / elapsed:>12,.0f} msg/s  ({elapsed:.2f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--flagged-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.flagged_ratio))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Safety validation throughput with and without the trigger-word prefilter.
+
+The corpus is built from everyday therapy-conversation sentences with a small
+share of flagged messages mixed in, which is the traffic the prefilter is
+designed for. The result cache is disabled so every message is evaluated.
+
+python benchmarks/bench_safety_prefilter.py --messages 50000 --flagged-ratio 0.03
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from bench_safety_matcher import FLAGGED
+
+from therapeutic_agent.safety.cache import SafetyResultCache
+from therapeutic_agent.safety.engine import SafetyEngine
+
+OPENERS = [
+    "Honestly,",
+    "This week",
+    "Lately",
+    "I guess",
+    "Since we last talked,",
+    "At work",
+    "With my family",
+    "Most mornings",
+]
+BODIES = [
+    "I've been feeling anxious about the presentation",
+    "my sister and I had another argument about our parents",
+    "I managed to go for a walk three times",
+    "sleep has been difficult and I wake up around four",
+    "I noticed I was replaying the conversation over and over",
+    "the breathing exercise helped a little when I felt overwhelmed",
+    "I keep comparing myself to my coworkers",
+    "I felt proud that I said no to an extra project",
+    "I've been avoiding my friends because I feel tired",
+    "my partner and I are trying to communicate more openly",
+    "I got frustrated in traffic and snapped at my kids",
+    "it was hard to focus on anything for long",
+]
+CLOSERS = [
+    ".",
+    " and I'm not sure why.",
+    ", which surprised me.",
+    ". I want to understand it better.",
+    ". Any thoughts?",
+    " but it's getting easier.",
+]
+
+
+def build_corpus(size: int, flagged_ratio: float) -> list[str]:
+    rng = random.Random(0)
+    corpus = []
+    for _ in range(size):
+        if rng.random() < flagged_ratio:
+            corpus.append(rng.choice(FLAGGED))
+        else:
+            corpus.append(
+                f"{rng.choice(OPENERS)} {rng.choice(BODIES)}{rng.choice(CLOSERS)}"
+            )
+    return corpus
+
+
+async def run(size: int, flagged_ratio: float) -> None:
+    corpus = build_corpus(size, flagged_ratio)
+    no_cache = SafetyResultCache(max_entries=0)
+    baseline = SafetyEngine(cache=no_cache, prefilter=False)
+    filtered = SafetyEngine(cache=no_cache)
+
+    passed = sum(filtered._rule_set.may_match(content) for content in corpus)
+    print(
+        f"triggers: {len(filtered._rule_set._triggers.triggers)}, "
+        f"{passed / size:.1%} of messages need the full scan"
+    )
+
+    timings = {}
+    for name, engine in (("full scan", baseline), ("prefilter", filtered)):
+        started = time.perf_counter()
+        for content in corpus:
+            await engine.validate_content(content)
+        timings[name] = time.perf_counter() - started
+        elapsed = timings[name]
+        print(f"{name:<10} {size / elapsed:>12,.0f} msg/s  ({elapsed:.2f}s)")
+
+    print(f"speedup    {timings['full scan'] / timings['prefilter']:>12.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--flagged-ratio", type=float, default=0.03)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.flagged_ratio))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Turn throughput and latency of the whole API against the mock Anthropic API.
+
+Starts the mock server in-process with the chosen profile, points the
+application at it and drives ``POST /sessions/{id}/messages`` through the ASGI
+app with concurrent simulated users, each sending its turns one after another.
+
+    python benchmarks/bench_send_message.py --users 50 --turns 10
+    python benchmarks/bench_send_message.py --profile overloaded --users 200
+
+The default database is a throwaway SQLite file; pass ``--database-url`` to
+use another. Turns that fell back to the canned reply are counted separately.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+import structlog
+
+from therapeutic_agent.mock import MOCK_PROFILES, serve_mock
+
+MESSAGES = [
+    "I've been feeling anxious lately about work stress.",
+    "Most evenings I just can't switch off from it.",
+    "My manager keeps adding deadlines without asking.",
+    "I tried going for walks, which helped a little.",
+]
+
+
+async def user(
+    client: httpx.AsyncClient, index: int, turns: int, results: dict[str, Any]
+) -> None:
+    user_id = f"bench_user_{index:05d}"
+    response = await client.post("/sessions", json={"user_id": user_id})
+    response.raise_for_status()
+    session_id = response.json()["session_id"]
+
+    for turn in range(turns):
+        start = time.perf_counter()
+        response = await client.post(
+            f"/sessions/{session_id}/messages",
+            json={"message": MESSAGES[turn % len(MESSAGES)], "user_id": user_id},
+        )
+        results["latencies"].append(time.perf_counter() - start)
+        if response.status_code != 200:
+            results["errors"][response.status_code] = (
+                results["errors"].get(response.status_code, 0) + 1
+            )
+        else:
+            body = response.json()
+            # Only generated replies carry metadata; fallbacks and safety
+            # interventions do not
+            if body["metadata"] is None and not body["safety_intervention"]:
+                results["fallbacks"] += 1
+
+
+async def run(args: argparse.Namespace) -> None:
+    profile = MOCK_PROFILES[args.profile]
+    if args.seed is not None:
+        profile = profile.model_copy(update={"seed": args.seed})
+
+    async with serve_mock(profile) as url:
+        # Settings are read once, on first use, so configure them first
+        os.environ["ANTHROPIC_BASE_URL"] = url
+        os.environ.setdefault("ANTHROPIC_API_KEY", "mock")
+        os.environ["DATABASE_URL"] = args.database_url
+        os.environ.setdefault("ENVIRONMENT", "production")
+        from therapeutic_agent.api.main import app
+
+        results: dict[str, Any] = {"latencies": [], "errors": {}, "fallbacks": 0}
+        transport = httpx.ASGITransport(app=app)
+        async with (
+            app.router.lifespan_context(app),
+            httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=None
+            ) as client,
+        ):
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(user(client, i, args.turns, results) for i in range(args.users))
+            )
+            elapsed = time.perf_counter() - start
+
+        async with httpx.AsyncClient() as http:
+            stats = (await http.get(f"{url}/mock/stats")).json()
+
+    latencies = sorted(results["latencies"]) or [0.0]
+    quantiles = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else []
+    )
+
+    def percentile(p: int) -> float:
+        return (quantiles[p - 1] if quantiles else latencies[0]) * 1000
+
+    turns = len(results["latencies"])
+    print(f"profile={args.profile} users={args.users} turns/user={args.turns}")
+    print(f"{turns} turns in {elapsed:.2f}s: {turns / elapsed:,.1f} turns/s")
+    print(
+        f"latency ms: p50 {percentile(50):.0f}  p95 {percentile(95):.0f}  "
+        f"p99 {percentile(99):.0f}  max {latencies[-1] * 1000:.0f}"
+    )
+    print(f"fallback replies: {results['fallbacks']}  http errors: {results['errors']}")
+    print(f"mock: {stats['outcomes']}  peak in flight {stats['peak_in_flight']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--profile", choices=sorted(MOCK_PROFILES), default="realistic")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.database_url is None:
+            args.database_url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Turns/sec of concurrent turns on one session, per-write against per-turn UPDATEs.
+
+``--concurrency`` workers persist ``--turns`` turns between them, all on the
+same session, so every transaction contends for that session's row. A turn
+is two transactions, as in ``send_message``: the user message with the
+carried safety state before the reply is generated, then the reply.
+
+- ``per-write`` goes through the repositories, which update the session row
+  once per message and once more for the safety state and the last activity
+- ``unit-of-work`` records each transaction's writes in a ``TurnUnitOfWork``,
+  which updates the session row once per transaction
+
+    python benchmarks/bench_turn_contention.py --concurrency 32 --turns 2000
+    python benchmarks/bench_turn_contention.py --database-url postgresql+asyncpg://...
+
+Latency is per turn, both transactions included. The default database is a
+throwaway SQLite file; pass ``--database-url`` to use another.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+from uuid import UUID
+
+import structlog
+
+from therapeutic_agent.storage.database import get_database_manager
+from therapeutic_agent.storage.models import MessageRole
+from therapeutic_agent.storage.repository import (
+    MessageRepository,
+    SessionRepository,
+    TurnUnitOfWork,
+)
+
+MODES = ("per-write", "unit-of-work")
+USER = "I've been feeling anxious lately about work stress."
+REPLY = "Thank you for sharing. How are you feeling about that?"
+SAFETY_STATE = {"matches": []}
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> None:
+    db_manager = await get_database_manager()
+    async with db_manager.get_session() as db_session:
+        session_id = (await SessionRepository(db_session).create_session("bench")).id
+
+    async def per_write(session_id: UUID) -> None:
+        async with db_manager.get_session() as db_session:
+            await SessionRepository(db_session).update_safety_state(
+                session_id, SAFETY_STATE
+            )
+            await MessageRepository(db_session).add_message(
+                session_id, MessageRole.USER, USER
+            )
+        async with db_manager.get_session() as db_session:
+            await MessageRepository(db_session).add_message(
+                session_id, MessageRole.ASSISTANT, REPLY
+            )
+            await SessionRepository(db_session).update_session_activity(session_id)
+
+    async def unit_of_work(session_id: UUID) -> None:
+        async with db_manager.get_session() as db_session:
+            turn = TurnUnitOfWork()
+            turn.update_safety_state(session_id, SAFETY_STATE)
+            await turn.add_message(session_id, MessageRole.USER, USER)
+            await turn.apply(db_session)
+        async with db_manager.get_session() as db_session:
+            turn = TurnUnitOfWork()
+            await turn.add_message(session_id, MessageRole.ASSISTANT, REPLY)
+            await turn.apply(db_session)
+
+    persist: Callable[[UUID], Awaitable[None]] = (
+        per_write if mode == "per-write" else unit_of_work
+    )
+    remaining = args.turns
+    latencies: list[float] = []
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await persist(session_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    async with db_manager.get_session() as db_session:
+        session = await SessionRepository(db_session).get_session(session_id)
+    assert session is not None and session.message_count == 2 * args.turns
+
+    turns = len(latencies)
+    quantiles = statistics.quantiles(sorted(latencies), n=100, method="inclusive")
+    print(
+        f"{mode:12} {turns:>7,} turns in {elapsed:6.2f}s: "
+        f"{turns / elapsed:>8,.0f} turns/s"
+        f"  ms p50 {quantiles[49] * 1000:7.2f}  p99 {quantiles[98] * 1000:7.2f}"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(f"concurrency={args.concurrency} turns={args.turns}")
+    try:
+        for mode in args.modes:
+            await run_mode(mode, args)
+    finally:
+        await (await get_database_manager()).close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read once, on first use, so configure them first
+        os.environ["DATABASE_URL"] = args.database_url or (
+            f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        )
+        os.environ.setdefault("ENVIRONMENT", "production")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Rows/sec of turn persistence with and without write-behind batching.
+
+Each of ``--sessions`` sessions persists ``--turns`` turns one after another,
+all sessions at once. A turn is a user message and a reply, as in
+``send_message``:
+
+- ``direct`` writes each message in a transaction of its own through
+  ``MessageRepository``, as turns do without write-behind
+- ``flush`` and ``enqueue`` submit each turn to a ``WriteBehindQueue`` with
+  that durability
+
+    python benchmarks/bench_write_behind.py --sessions 200 --turns 20
+    python benchmarks/bench_write_behind.py --modes flush --batch-rows 500
+
+Throughput counts until every row is committed, including the final flush;
+acknowledgement latency is how long a turn waited to be answered. The default
+database is a throwaway SQLite file; pass ``--database-url`` to use another.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+from uuid import UUID
+
+import structlog
+
+from therapeutic_agent.core.config import Durability
+from therapeutic_agent.storage.database import get_database_manager
+from therapeutic_agent.storage.models import MessageRole
+from therapeutic_agent.storage.repository import (
+    MessageRepository,
+    SessionRepository,
+    TurnUnitOfWork,
+)
+from therapeutic_agent.storage.write_behind import WriteBehindQueue
+
+MODES = ("direct", "flush", "enqueue")
+TURN = (
+    (MessageRole.USER, "I've been feeling anxious lately about work stress."),
+    (MessageRole.ASSISTANT, "Thank you for sharing. How are you feeling about that?"),
+)
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> None:
+    db_manager = await get_database_manager()
+    async with db_manager.get_session() as db_session:
+        repo = SessionRepository(db_session)
+        session_ids = [
+            (await repo.create_session(f"bench_user_{i:05d}")).id
+            for i in range(args.sessions)
+        ]
+
+    durability: Durability = "enqueue" if mode == "enqueue" else "flush"
+    queue = WriteBehindQueue(
+        get_database_manager,
+        durability=durability,
+        flush_interval_ms=args.flush_interval_ms,
+        batch_rows=args.batch_rows,
+    )
+
+    async def direct(session_id: UUID) -> None:
+        for role, content in TURN:
+            async with db_manager.get_session() as db_session:
+                await MessageRepository(db_session).add_message(
+                    session_id, role, content
+                )
+
+    async def write_behind(session_id: UUID) -> None:
+        writes = TurnUnitOfWork()
+        for role, content in TURN:
+            await writes.add_message(session_id, role, content)
+        await queue.submit(writes)
+
+    persist: Callable[[UUID], Awaitable[None]] = (
+        direct if mode == "direct" else write_behind
+    )
+    latencies: list[float] = []
+
+    async def session(session_id: UUID) -> None:
+        for _ in range(args.turns):
+            start = time.perf_counter()
+            await persist(session_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(session_id) for session_id in session_ids))
+    await queue.close()
+    elapsed = time.perf_counter() - start
+
+    rows = len(latencies) * len(TURN)
+    quantiles = statistics.quantiles(sorted(latencies), n=100, method="inclusive")
+    print(
+        f"{mode:8} {rows:>8,} rows in {elapsed:6.2f}s: {rows / elapsed:>10,.0f} rows/s"
+        f"  ack ms p50 {quantiles[49] * 1000:7.2f}  p99 {quantiles[98] * 1000:7.2f}"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(
+        f"sessions={args.sessions} turns/session={args.turns} "
+        f"flush_interval_ms={args.flush_interval_ms} batch_rows={args.batch_rows}"
+    )
+    try:
+        for mode in args.modes:
+            await run_mode(mode, args)
+    finally:
+        await (await get_database_manager()).close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--flush-interval-ms", type=float, default=5.0)
+    parser.add_argument("--batch-rows", type=int, default=200)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read once, on first use, so configure them first
+        os.environ["DATABASE_URL"] = args.database_url or (
+            f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        )
+        os.environ.setdefault("ENVIRONMENT", "production")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
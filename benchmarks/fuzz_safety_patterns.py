@@ -0,0 +1,164 @@
+"""Worst-case scan time per safety rule, per regex backend, on adversarial input.
+
+Every rule of every validator is run against inputs built to provoke
+backtracking (its own literals repeated with no closing match, long whitespace
+runs, single-character floods, newline-separated fragments) plus random word
+soup, all at the API's maximum message length. Each backend's result is also
+checked against the stdlib ``re`` reading of the rule.
+
+    python benchmarks/fuzz_safety_patterns.py
+    python benchmarks/fuzz_safety_patterns.py --length 4000 --random 500 --budget-ms 2
+
+Exits non-zero when a linear-time backend exceeds the budget on any rule or
+disagrees with ``re`` on any input, so it can run as a CI gate whenever rules
+change.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from typing import Callable, Iterator
+
+from therapeutic_agent.safety.backends import BACKENDS, RegexBackend, re2_available
+from therapeutic_agent.safety.matcher import CompiledRuleSet
+from therapeutic_agent.safety.validators import (
+    BaseValidator,
+    CrisisValidator,
+    MedicalAdviceValidator,
+    SelfHarmValidator,
+    TherapeuticBoundaryValidator,
+)
+
+VALIDATORS: list[Callable[[RegexBackend], BaseValidator]] = [
+    CrisisValidator,
+    SelfHarmValidator,
+    MedicalAdviceValidator,
+    TherapeuticBoundaryValidator,
+]
+FILLER = "the and i you my really so much about this feel".split()
+
+
+def literals(source: str) -> list[str]:
+    """Words that appear literally in a rule's source."""
+    stripped = re.sub(r"\\[a-zA-Z]", " ", source)
+    return sorted({word for word in re.findall(r"[a-z']{2,}", stripped.lower())})
+
+
+def adversarial_inputs(
+    source: str, length: int, rng: random.Random
+) -> Iterator[tuple[str, str]]:
+    words = literals(source) or FILLER
+
+    def fill(unit: str) -> str:
+        return (unit * (length // max(1, len(unit)) + 1))[:length]
+
+    for word in words:
+        yield f"repeat {word!r}", fill(f"{word} ")
+        yield f"repeat {word!r} + spaces", fill(f"{word}{' ' * 40}")
+        yield f"repeat {word!r} per line", fill(f"{word} x\n")
+    yield "all literals", fill(" ".join(words) + " ")
+    yield "spaces", " " * length
+    yield "letters", "a" * length
+    yield "word chars", fill("ab_12 ")
+    for i in range(3):
+        soup = " ".join(rng.choice(words + FILLER) for _ in range(length // 4))
+        yield f"literal soup {i}", soup[:length]
+
+
+def random_inputs(
+    sources: list[str], count: int, length: int, rng: random.Random
+) -> Iterator[tuple[str, str]]:
+    vocabulary = sorted({word for source in sources for word in literals(source)})
+    vocabulary += FILLER + ["\n", ",", "."]
+    for i in range(count):
+        size = rng.randint(1, max(1, length // 5))
+        text = " ".join(rng.choice(vocabulary) for _ in range(size))
+        yield f"random {i}", text[:length]
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def fuzz_backend(
+    backend: RegexBackend, args: argparse.Namespace
+) -> tuple[list[tuple[str, float, str, int]], float]:
+    validators = [factory(backend) for factory in VALIDATORS]
+    sources = [pattern.source for v in validators for pattern in v.patterns]
+    rng = random.Random(args.seed)
+    shared = list(random_inputs(sources, args.random, args.length, rng))
+
+    rows = []
+    worst_inputs: list[str] = []
+    for validator in validators:
+        for index, pattern in enumerate(validator.patterns):
+            reference = re.compile(pattern.source, re.IGNORECASE)
+            worst_ms, worst_kind, worst_text, mismatches = 0.0, "", "", 0
+            inputs = [*adversarial_inputs(pattern.source, args.length, rng), *shared]
+            for kind, text in inputs:
+                if pattern.search(text) != (reference.search(text) is not None):
+                    mismatches += 1
+                elapsed = best_time(lambda: pattern.search(text), args.repeat)
+                if elapsed > worst_ms:
+                    worst_ms, worst_kind, worst_text = elapsed, kind, text
+            worst_inputs.append(worst_text)
+            name = f"{validator.__class__.__name__}[{index}]"
+            rows.append((name, worst_ms, worst_kind, mismatches))
+
+    rule_set = CompiledRuleSet(validators, backend)
+    scan_worst = max(
+        best_time(lambda: rule_set.scan(text), args.repeat) for text in worst_inputs
+    )
+    return rows, scan_worst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=4000)
+    parser.add_argument("--random", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=5.0,
+        help="worst-case time allowed per rule for linear-time backends",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=sorted(BACKENDS),
+        help="backend to fuzz (repeatable); default is every installed backend",
+    )
+    args = parser.parse_args()
+
+    names = args.backend or [
+        name for name in BACKENDS if name != "re2" or re2_available()
+    ]
+    failed = False
+    for name in names:
+        backend = BACKENDS[name]()
+        rows, scan_worst = fuzz_backend(backend, args)
+        guarded = name != "stdlib"
+
+        print(f"\n== {name} ==")
+        print(f"{'rule':<34} {'worst ms':>9} {'mismatch':>8}  worst input")
+        for rule, worst_ms, kind, mismatches in rows:
+            over = guarded and worst_ms > args.budget_ms
+            failed = failed or over or mismatches > 0
+            flag = "  OVER BUDGET" if over else ""
+            print(f"{rule:<34} {worst_ms:>9.3f} {mismatches:>8}  {kind}{flag}")
+        print(f"{'combined rule set scan':<34} {scan_worst:>9.3f}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
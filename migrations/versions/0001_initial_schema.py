@@ -0,0 +1,112 @@
+"""Initial schema as created by Base.metadata.create_all.
+
+Databases that were bootstrapped by the application at startup already match
+this revision and should be marked with ``alembic stamp 0001`` before running
+``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-06-01 00:00:00
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _base_columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "therapeutic_sessions",
+        *_base_columns(),
+        sa.Column("user_id", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("title", sa.String(255), nullable=True),
+        sa.Column("summary", sa.Text(), nullable=True),
+        sa.Column("session_notes", sa.JSON(), nullable=True),
+        sa.Column("safety_score", sa.Float(), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("last_activity", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_therapeutic_sessions_user_id", "therapeutic_sessions", ["user_id"]
+    )
+    op.create_index(
+        "ix_therapeutic_sessions_status", "therapeutic_sessions", ["status"]
+    )
+
+    op.create_table(
+        "conversation_messages",
+        *_base_columns(),
+        sa.Column(
+            "session_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("therapeutic_sessions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("role", sa.String(50), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("metadata", sa.JSON(), nullable=True),
+        sa.Column("safety_score", sa.Float(), nullable=True),
+        sa.Column("token_count", sa.Integer(), nullable=True),
+        sa.Column("processing_time_ms", sa.Integer(), nullable=True),
+    )
+    op.create_index(
+        "ix_conversation_messages_session_id",
+        "conversation_messages",
+        ["session_id"],
+    )
+
+    op.create_table(
+        "safety_events",
+        *_base_columns(),
+        sa.Column(
+            "session_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("therapeutic_sessions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("flag_type", sa.String(50), nullable=False),
+        sa.Column("severity_score", sa.Float(), nullable=False),
+        sa.Column(
+            "triggered_by_message_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("conversation_messages.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column("intervention_taken", sa.Text(), nullable=True),
+        sa.Column("resolved", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_safety_events_session_id", "safety_events", ["session_id"])
+    op.create_index("ix_safety_events_flag_type", "safety_events", ["flag_type"])
+
+
+def downgrade() -> None:
+    op.drop_table("safety_events")
+    op.drop_table("conversation_messages")
+    op.drop_table("therapeutic_sessions")
@@ -0,0 +1,91 @@
+"""Composite and partial indexes for the hot query shapes.
+
+* conversation_messages (session_id, created_at): history and tail reads.
+  Supersedes the single-column session_id index.
+* therapeutic_sessions (user_id, status): active-session count.
+* therapeutic_sessions (user_id, last_activity): get_user_sessions ordering.
+  Together these supersede the single-column user_id index.
+* safety_events (session_id, severity_score) WHERE NOT resolved: unresolved
+  events per session ordered by severity.
+
+Indexes are built with CONCURRENTLY on PostgreSQL so the upgrade does not
+block writes on a live database.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-06-01 00:00:01
+"""
+
+from typing import Any, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_UNRESOLVED = sa.column("resolved", sa.Boolean()).is_(False)
+
+
+def _create_index(name: str, table: str, columns: list[str], **kw: Any) -> None:
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, table, columns, **kw)
+
+
+def _drop_index(name: str, table: str) -> None:
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    _create_index(
+        "ix_conversation_messages_session_id_created_at",
+        "conversation_messages",
+        ["session_id", "created_at"],
+    )
+    _create_index(
+        "ix_therapeutic_sessions_user_id_status",
+        "therapeutic_sessions",
+        ["user_id", "status"],
+    )
+    _create_index(
+        "ix_therapeutic_sessions_user_id_last_activity",
+        "therapeutic_sessions",
+        ["user_id", "last_activity"],
+    )
+    _create_index(
+        "ix_safety_events_session_id_unresolved",
+        "safety_events",
+        ["session_id", "severity_score"],
+        postgresql_where=_UNRESOLVED,
+        sqlite_where=_UNRESOLVED,
+    )
+
+    _drop_index("ix_conversation_messages_session_id", "conversation_messages")
+    _drop_index("ix_therapeutic_sessions_user_id", "therapeutic_sessions")
+
+
+def downgrade() -> None:
+    _create_index(
+        "ix_therapeutic_sessions_user_id", "therapeutic_sessions", ["user_id"]
+    )
+    _create_index(
+        "ix_conversation_messages_session_id",
+        "conversation_messages",
+        ["session_id"],
+    )
+
+    _drop_index("ix_safety_events_session_id_unresolved", "safety_events")
+    _drop_index("ix_therapeutic_sessions_user_id_last_activity", "therapeutic_sessions")
+    _drop_index("ix_therapeutic_sessions_user_id_status", "therapeutic_sessions")
+    _drop_index(
+        "ix_conversation_messages_session_id_created_at", "conversation_messages"
+    )
@@ -0,0 +1,31 @@
+"""Per-session conversation safety state.
+
+* therapeutic_sessions.safety_state: the serialized ConversationSafetyState,
+  so each message is checked against the session's rolling match state
+  instead of rescanning the recent history.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-06-01 00:00:02
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "therapeutic_sessions", sa.Column("safety_state", sa.JSON(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("therapeutic_sessions") as batch_op:
+        batch_op.drop_column("safety_state")
@@ -0,0 +1,31 @@
+"""Time to first token of streamed assistant messages.
+
+* conversation_messages.time_to_first_token_ms: recorded next to
+  processing_time_ms when a response is streamed.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-06-01 00:00:03
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "conversation_messages",
+        sa.Column("time_to_first_token_ms", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("conversation_messages") as batch_op:
+        batch_op.drop_column("time_to_first_token_ms")
@@ -0,0 +1,37 @@
+"""Rolling session summaries.
+
+* therapeutic_sessions.summarized_message_count: how many of the session's
+  first messages the summary covers; prompts send the summary followed by
+  the messages after them.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-06-01 00:00:04
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "therapeutic_sessions",
+        sa.Column(
+            "summarized_message_count",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+        ),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("therapeutic_sessions") as batch_op:
+        batch_op.drop_column("summarized_message_count")
@@ -0,0 +1,61 @@
+"""Keyset pagination of conversation history.
+
+* conversation_messages (session_id, created_at, id): history pages are
+  ordered by (created_at, id), so cursors stay total when messages share a
+  timestamp. Supersedes the (session_id, created_at) index, which tail
+  reads use as a prefix.
+
+Indexes are built with CONCURRENTLY on PostgreSQL so the upgrade does not
+block writes on a live database.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-06-01 00:00:06
+"""
+
+from typing import Sequence
+
+from alembic import op
+
+revision: str = "0007"
+down_revision: str | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _create_index(name: str, table: str, columns: list[str]) -> None:
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+    else:
+        op.create_index(name, table, columns)
+
+
+def _drop_index(name: str, table: str) -> None:
+    if op.get_context().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    _create_index(
+        "ix_conversation_messages_session_id_created_at_id",
+        "conversation_messages",
+        ["session_id", "created_at", "id"],
+    )
+    _drop_index(
+        "ix_conversation_messages_session_id_created_at", "conversation_messages"
+    )
+
+
+def downgrade() -> None:
+    _create_index(
+        "ix_conversation_messages_session_id_created_at",
+        "conversation_messages",
+        ["session_id", "created_at"],
+    )
+    _drop_index(
+        "ix_conversation_messages_session_id_created_at_id", "conversation_messages"
+    )
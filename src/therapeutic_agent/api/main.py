@@ -1,26 +1,40 @@
 """FastAPI application with therapeutic endpoints and middleware."""
 
+import asyncio
+import json
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator
+from datetime import datetime
+from typing import Annotated, Any, AsyncGenerator
 from uuid import UUID
 
 import structlog
 import uvicorn
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import FastAPI, HTTPException, Query, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel, Field
 
+from therapeutic_agent.core.anthropic_client import (
+    close_anthropic_client,
+    get_anthropic_client,
+)
 from therapeutic_agent.core.config import get_settings
 from therapeutic_agent.core.exceptions import (
     AnthropicAPIError,
+    JobNotFoundError,
+    RateLimitExceededError,
     SafetyViolationError,
     SessionLimitExceededError,
     SessionNotFoundError,
     TherapeuticAgentException,
 )
+from therapeutic_agent.core.jobs import JobWorkerPool
+from therapeutic_agent.core.metrics import LoopLagMonitor
 from therapeutic_agent.core.session_manager import TherapeuticSessionManager
 from therapeutic_agent.storage.database import get_database_manager
+from therapeutic_agent.storage.redis_pool import close_redis
 
 logger = structlog.get_logger()
 
@@ -61,13 +75,48 @@ class MessageResponse(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class BatchValidateRequest(BaseModel):
+    """Request model for validating many messages at once."""
+
+    texts: list[Annotated[str, Field(max_length=4000)]] = Field(
+        ..., min_length=1, max_length=1000
+    )
+    contexts: list[dict[str, Any] | None] | None = None
+
+
+class SafetyResultResponse(BaseModel):
+    """Response model for a single safety assessment."""
+
+    is_safe: bool
+    level: str
+    category: str | None
+    confidence: float
+    explanation: str
+    suggested_response: str | None = None
+
+
+class BatchValidateResponse(BaseModel):
+    """Response model for batch safety validation."""
+
+    results: list[SafetyResultResponse]
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Manage application lifespan with database initialization."""
     logger.info("Starting therapeutic agent API")
-    await get_database_manager()
+    await asyncio.gather(get_database_manager(), get_anthropic_client().warm())
+    loop_lag_monitor.start()
+    if get_settings().jobs.run_in_api:
+        job_workers.start()
     yield
     logger.info("Shutting down therapeutic agent API")
+    await job_workers.stop()
+    await loop_lag_monitor.stop()
+    await session_manager.flush_writes()
+    session_manager.close()
+    await close_anthropic_client()
+    await close_redis()
 
 
 app = FastAPI(
@@ -86,6 +135,8 @@ app.add_middleware(
 )
 
 session_manager = TherapeuticSessionManager()
+loop_lag_monitor = LoopLagMonitor()
+job_workers = JobWorkerPool(session_manager.job_handlers())
 
 
 @app.exception_handler(TherapeuticAgentException)
@@ -95,9 +146,9 @@ async def therapeutic_exception_handler(
     """Handle therapeutic agent specific exceptions."""
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
 
-    if isinstance(exc, SessionNotFoundError):
+    if isinstance(exc, (SessionNotFoundError, JobNotFoundError)):
         status_code = status.HTTP_404_NOT_FOUND
-    elif isinstance(exc, SessionLimitExceededError):
+    elif isinstance(exc, (SessionLimitExceededError, RateLimitExceededError)):
         status_code = status.HTTP_429_TOO_MANY_REQUESTS
     elif isinstance(exc, SafetyViolationError):
         status_code = status.HTTP_400_BAD_REQUEST
@@ -148,9 +199,48 @@ async def send_message(session_id: UUID, request: SendMessageRequest) -> dict[st
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@app.post("/sessions/{session_id}/messages:stream")
+async def stream_message(
+    session_id: UUID, request: SendMessageRequest
+) -> StreamingResponse:
+    """Send a message and stream the response as Server-Sent Events.
+
+    ``text`` events carry ``{"text": ...}`` deltas as the reply is generated.
+    The stream ends with a ``done`` event whose data has the same shape as the
+    response of ``POST /sessions/{session_id}/messages``.
+    """
+    try:
+        events = await session_manager.stream_message(
+            session_id=session_id, user_message=request.message, user_id=request.user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def event_stream() -> AsyncGenerator[str, None]:
+        async for event in events:
+            if event["type"] == "text":
+                yield _sse("text", {"text": event["text"]})
+            else:
+                yield _sse("done", event["response"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
 @app.get("/sessions/{session_id}")
 async def get_session(session_id: UUID, user_id: str | None = None) -> dict[str, Any]:
-    """Get session details with conversation history."""
+    """Get session details with the latest page of its conversation history.
+
+    Pass ``previous_cursor`` as ``before`` to ``GET /sessions/{id}/messages``
+    for earlier messages.
+    """
     try:
         session_data = await session_manager.get_session(session_id, user_id)
         return session_data
@@ -160,9 +250,42 @@ async def get_session(session_id: UUID, user_id: str | None = None) -> dict[str,
         )
 
 
+@app.get("/sessions/{session_id}/messages")
+async def get_messages(
+    session_id: UUID,
+    user_id: str | None = None,
+    after: str | None = None,
+    before: str | None = None,
+    since: datetime | None = None,
+    limit: Annotated[int | None, Query(ge=1, le=200)] = None,
+) -> dict[str, Any]:
+    """Get a page of a session's conversation history, oldest message first.
+
+    ``after`` and ``before`` take the opaque ``next_cursor`` and
+    ``previous_cursor`` of earlier pages; ``since`` takes a timestamp and
+    returns the messages created after it. Polling with ``after`` set to the
+    last ``next_cursor`` returns only new messages.
+    """
+    try:
+        return await session_manager.get_messages(
+            session_id, user_id, after=after, before=before, since=since, limit=limit
+        )
+    except SessionNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @app.post("/sessions/{session_id}/end")
 async def end_session(session_id: UUID, user_id: str | None = None) -> dict[str, Any]:
-    """End a therapeutic session."""
+    """End a therapeutic session.
+
+    Returns at once with the current rolling summary. When a final summary
+    update is still needed, ``summary_job`` carries the handle of the job
+    doing it, to poll with ``GET /jobs/{job_id}``.
+    """
     try:
         result = await session_manager.end_session(session_id, user_id)
         return result
@@ -170,12 +293,49 @@ async def end_session(session_id: UUID, user_id: str | None = None) -> dict[str,
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: UUID, user_id: str | None = None) -> dict[str, Any]:
+    """Get the status of a background job."""
+    return await session_manager.get_job(job_id, user_id)
+
+
+@app.post("/safety/validate:batch", response_model=BatchValidateResponse)
+async def validate_batch(request: BatchValidateRequest) -> dict[str, Any]:
+    """Run the safety validators over a batch of messages."""
+    try:
+        results = await session_manager.safety_engine.validate_batch(
+            request.texts, request.contexts
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return {
+        "results": [
+            {
+                "is_safe": result.is_safe,
+                "level": result.level.value,
+                "category": result.category.value if result.category else None,
+                "confidence": result.confidence,
+                "explanation": result.explanation,
+                "suggested_response": result.suggested_response,
+            }
+            for result in results
+        ]
+    }
+
+
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "healthy", "service": "therapeutic-agent"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics endpoint."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     settings = get_settings()
     uvicorn.run(
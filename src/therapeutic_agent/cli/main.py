@@ -5,13 +5,19 @@ from datetime import datetime
 from uuid import UUID
 
 import typer
+import uvicorn
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.table import Table
 
+from therapeutic_agent.core.anthropic_client import close_anthropic_client
+from therapeutic_agent.core.config import get_settings
 from therapeutic_agent.core.exceptions import TherapeuticAgentException
+from therapeutic_agent.core.jobs import JobWorkerPool
 from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.mock import MOCK_PROFILES, MockProfile, create_mock_app
+from therapeutic_agent.storage.redis_pool import close_redis
 
 app = typer.Typer(help="Therapeutic Agent CLI - Interactive therapeutic sessions")
 console = Console()
@@ -40,9 +46,97 @@ def list_sessions(
 def session_info(
     session_id: str = typer.Argument(..., help="Session ID"),
     user_id: str = typer.Option(None, "--user", "-u", help="User identifier"),
+    messages: int = typer.Option(
+        10, "--messages", "-n", help="Latest messages to show; 0 shows all"
+    ),
 ) -> None:
     """Display information about a specific session."""
-    asyncio.run(_show_session_info(UUID(session_id), user_id))
+    asyncio.run(_show_session_info(UUID(session_id), user_id, messages))
+
+
+@app.command()
+def worker(
+    concurrency: int = typer.Option(
+        None, "--concurrency", "-c", help="Concurrent jobs (default: JOB_WORKERS)"
+    ),
+) -> None:
+    """Run background job workers until interrupted."""
+    try:
+        asyncio.run(_run_workers(concurrency))
+    except KeyboardInterrupt:
+        console.print("[yellow]Job workers stopped[/yellow]")
+
+
+@app.command()
+def mock_anthropic(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind"),
+    port: int = typer.Option(8100, "--port", "-p", help="Port to listen on"),
+    profile: str = typer.Option(
+        "realistic",
+        "--profile",
+        help=f"Base behaviour: {', '.join(MOCK_PROFILES)}",
+    ),
+    latency_ms: float = typer.Option(None, help="Median time to first token"),
+    output_tokens: int = typer.Option(None, help="Tokens per reply"),
+    rate_limit_ratio: float = typer.Option(None, help="Share of requests given 429"),
+    overload_ratio: float = typer.Option(None, help="Share of requests given 529"),
+    capacity: int = typer.Option(None, help="Requests in flight before 429s"),
+    slow_stream_ratio: float = typer.Option(None, help="Share of slow streams"),
+    seed: int = typer.Option(None, help="Random seed for repeatable runs"),
+) -> None:
+    """Serve a local stand-in for the Anthropic Messages API.
+
+    Point the agent at it with ANTHROPIC_BASE_URL=http://HOST:PORT.
+    """
+    if profile not in MOCK_PROFILES:
+        console.print(f"[red]Unknown profile: {profile}[/red]")
+        raise typer.Exit(code=1)
+    overrides = {
+        "latency_ms": latency_ms,
+        "output_tokens": output_tokens,
+        "rate_limit_ratio": rate_limit_ratio,
+        "overload_ratio": overload_ratio,
+        "capacity": capacity,
+        "slow_stream_ratio": slow_stream_ratio,
+        "seed": seed,
+    }
+    mock_profile = MockProfile.model_validate(
+        {
+            **MOCK_PROFILES[profile].model_dump(),
+            **{key: value for key, value in overrides.items() if value is not None},
+        }
+    )
+
+    console.print(
+        f"[bold green]Mock Anthropic API on http://{host}:{port}[/bold green] "
+        f"[dim]({profile} profile)[/dim]"
+    )
+    uvicorn.run(
+        create_mock_app(mock_profile),
+        host=host,
+        port=port,
+        log_level="warning",
+    )
+
+
+async def _run_workers(concurrency: int | None) -> None:
+    """Run the job worker pool for the session manager's jobs."""
+    session_manager = TherapeuticSessionManager()
+    config = get_settings().jobs
+    if concurrency:
+        config = config.model_copy(update={"workers": concurrency})
+
+    console.print(
+        f"[bold green]Running {config.workers} job workers[/bold green] "
+        "[dim](Ctrl+C to stop)[/dim]"
+    )
+    try:
+        await JobWorkerPool(session_manager.job_handlers(), config).run()
+    finally:
+        await session_manager.flush_writes()
+        session_manager.close()
+        await close_anthropic_client()
+        await close_redis()
 
 
 async def _interactive_session(user_id: str, title: str | None) -> None:
@@ -144,10 +238,17 @@ async def _interactive_session(user_id: str, title: str | None) -> None:
         console.print(f"[red]Error: {e.message}[/red]")
     except Exception as e:
         console.print(f"[red]Unexpected error: {str(e)}[/red]")
+    finally:
+        await session_manager.flush_writes()
+        session_manager.close()
+        await close_anthropic_client()
+        await close_redis()
 
 
-async def _show_session_info(session_id: UUID, user_id: str | None) -> None:
-    """Show detailed session information."""
+async def _show_session_info(
+    session_id: UUID, user_id: str | None, message_limit: int
+) -> None:
+    """Show detailed session information and the latest messages."""
     session_manager = TherapeuticSessionManager()
 
     try:
@@ -177,13 +278,31 @@ async def _show_session_info(session_id: UUID, user_id: str | None) -> None:
                 )
             )
 
-        if session_data.get("messages"):
-            msg_count = len(session_data["messages"])
-            console.print(
-                f"\n[bold]Conversation History ({msg_count} messages)[/bold]\n"
+        # get_session returns the latest page; earlier pages are read back
+        # from its previous_cursor until enough messages are shown
+        messages = session_data["messages"]
+        page = session_data
+        while page["has_more"] and (not message_limit or len(messages) < message_limit):
+            page = await session_manager.get_messages(
+                session_id,
+                user_id,
+                before=page["previous_cursor"],
+                limit=min(message_limit - len(messages), 200) if message_limit else 200,
+            )
+            messages = page["messages"] + messages
+        if message_limit:
+            messages = messages[-message_limit:]
+
+        if messages:
+            msg_count = session_data["message_count"]
+            shown = (
+                f"{msg_count} messages"
+                if len(messages) >= msg_count
+                else f"showing last {len(messages)} of {msg_count} messages"
             )
+            console.print(f"\n[bold]Conversation History ({shown})[/bold]\n")
 
-            for msg in session_data["messages"][-10:]:  # Show last 10 messages
+            for msg in messages:
                 timestamp = datetime.fromisoformat(
                     msg["timestamp"].replace("Z", "+00:00")
                 )
@@ -202,6 +321,11 @@ async def _show_session_info(session_id: UUID, user_id: str | None) -> None:
         console.print(f"[red]Error: {e.message}[/red]")
     except Exception as e:
         console.print(f"[red]Unexpected error: {str(e)}[/red]")
+    finally:
+        await session_manager.flush_writes()
+        session_manager.close()
+        await close_anthropic_client()
+        await close_redis()
 
 
 if __name__ == "__main__":
@@ -1,17 +1,73 @@
 """Anthropic API client with therapeutic-focused prompting and error handling."""
 
+import asyncio
 import time
-from typing import Any
+from typing import Any, AsyncIterator
 
 import structlog
-from anthropic import AsyncAnthropic
+from anthropic import APIConnectionError, APIStatusError, AsyncAnthropic
 from anthropic.types import Message
 
 from therapeutic_agent.core.config import get_settings
-from therapeutic_agent.core.exceptions import AnthropicAPIError
+from therapeutic_agent.core.exceptions import (
+    AnthropicAPIError,
+    CircuitOpenError,
+    RateLimitExceededError,
+)
+from therapeutic_agent.core.limiter import AdaptiveLimiter, Priority
+from therapeutic_agent.core.metrics import (
+    LLM_RETRIES_TOTAL,
+    LLM_TIME_TO_FIRST_TOKEN_SECONDS,
+)
+from therapeutic_agent.core.resilience import CircuitBreaker, RetryPolicy
+
+try:
+    # The SDK's HTTP client must come from the library it is built on:
+    # httpx2 in recent releases, httpx before that
+    import httpx2 as httpx
+except ImportError:  # pragma: no cover - exercised with older SDK releases
+    import httpx  # type: ignore[no-redef]
+
+try:
+    import h2
+except ImportError:  # pragma: no cover - exercised when h2 is absent
+    h2 = None
 
 logger = structlog.get_logger()
 
+# Rate limited, unavailable and overloaded
+OVERLOAD_STATUS_CODES = frozenset({429, 503, 529})
+# Worth trying again: timeouts, conflicts, overloads and server errors
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+# Raised by the client itself rather than the API; passed through unwrapped
+LOCAL_ERRORS = (RateLimitExceededError, CircuitOpenError)
+
+
+def is_overload(error: BaseException) -> bool:
+    """Whether an API error asks for fewer concurrent calls."""
+    return (
+        isinstance(error, APIStatusError) and error.status_code in OVERLOAD_STATUS_CODES
+    )
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an API error is transient, so the call may succeed if retried."""
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    # Includes timeouts
+    return isinstance(error, APIConnectionError)
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """The delay the API asked for in a ``Retry-After`` header, if any."""
+    if not isinstance(error, APIStatusError):
+        return None
+    try:
+        return float(error.response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
 
 class TherapeuticPromptBuilder:
     """Builds therapeutic context-aware prompts for Anthropic Claude."""
@@ -39,28 +95,83 @@ class TherapeuticPromptBuilder:
         "human professional therapy."
     )
 
+    SUMMARY_SYSTEM_PROMPT = (
+        "You maintain the running summary of a therapeutic conversation. "
+        "Merge the new messages into the existing summary and reply with the "
+        "updated summary only. Keep the client's main concerns, emotions, "
+        "goals, coping strategies discussed, any safety concerns, and "
+        "anything the therapist should follow up on. Be concise and factual; "
+        "write in the third person and do not add interpretation."
+    )
+
+    # Marks the end of a prompt prefix that the API may cache between requests
+    CACHE_CONTROL = {"type": "ephemeral"}
+
     @classmethod
     def build_conversation_prompt(
-        self,
+        cls,
         user_message: str,
         conversation_history: list[dict[str, str]] | None = None,
         session_context: dict[str, Any] | None = None,
-    ) -> list[dict[str, str]]:
-        """Build a complete conversation prompt with therapeutic context."""
-        messages = [{"role": "system", "content": self.THERAPEUTIC_SYSTEM_PROMPT}]
-
-        if session_context:
-            context_summary = self._build_context_summary(session_context)
-            if context_summary:
-                messages.append(
-                    {"role": "system", "content": f"Session context: {context_summary}"}
-                )
+        session_summary: str | None = None,
+    ) -> dict[str, Any]:
+        """Build the ``system`` and ``messages`` arguments for a therapeutic turn.
+
+        The system prompt and the history form a prefix that is marked for
+        prompt caching, so it must be byte-identical from one turn to the
+        next. Session context changes every turn and is therefore sent with
+        the new user message, after the cached prefix. The history is used
+        as given; callers fit it to a token budget with ``ContextWindow``.
+
+        ``session_summary`` covers the conversation before the history. It
+        follows the system prompt, after that prompt's own cache breakpoint,
+        so the system prompt stays cached when the summary is updated.
+        """
+        messages: list[dict[str, Any]] = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in conversation_history or []
+        ]
+        if messages:
+            messages[-1]["content"] = [
+                {
+                    "type": "text",
+                    "text": messages[-1]["content"],
+                    "cache_control": cls.CACHE_CONTROL,
+                }
+            ]
 
-        if conversation_history:
-            messages.extend(conversation_history[-10:])  # Last 10 messages for context
+        context_summary = (
+            cls._build_context_summary(session_context) if session_context else ""
+        )
+        if context_summary:
+            messages.append(
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": f"Session context: {context_summary}"},
+                        {"type": "text", "text": user_message},
+                    ],
+                }
+            )
+        else:
+            messages.append({"role": "user", "content": user_message})
+
+        system = [
+            {
+                "type": "text",
+                "text": cls.THERAPEUTIC_SYSTEM_PROMPT,
+                "cache_control": cls.CACHE_CONTROL,
+            }
+        ]
+        if session_summary:
+            system.append(
+                {
+                    "type": "text",
+                    "text": f"Summary of the session so far:\n{session_summary}",
+                }
+            )
 
-        messages.append({"role": "user", "content": user_message})
-        return messages
+        return {"system": system, "messages": messages}
 
     @classmethod
     def _build_context_summary(cls, context: dict[str, Any]) -> str:
@@ -82,14 +193,109 @@ class TherapeuticPromptBuilder:
 
 
 class AnthropicTherapeuticClient:
-    """Enhanced Anthropic client optimized for therapeutic interactions."""
+    """Enhanced Anthropic client optimized for therapeutic interactions.
+
+    Temperature is sent in the request body directly because recent SDK
+    releases no longer accept it as a keyword argument.
+
+    Every call takes a slot from an ``AdaptiveLimiter`` at the given
+    ``priority``; calls the limiter rejects raise ``RateLimitExceededError``.
+
+    Transient errors are retried by the client's ``RetryPolicy`` (the SDK's
+    own retries are disabled) within a deadline shared by all attempts. A
+    ``CircuitBreaker`` counts calls that still fail, and while it is open
+    calls raise ``CircuitOpenError`` immediately. Streams are only retried
+    until their first text is yielded.
+
+    Each instance owns a connection pool, so the application shares one
+    through ``get_anthropic_client``.
+    """
 
     def __init__(self) -> None:
         settings = get_settings()
-        self._client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        config = settings.anthropic
+        self._config = config
+        self._timeout = httpx.Timeout(
+            config.read_timeout_seconds,
+            connect=config.connect_timeout_seconds,
+            pool=config.pool_timeout_seconds,
+        )
+        self._http = httpx.AsyncClient(
+            http2=config.http2 and h2 is not None,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry_seconds,
+            ),
+            timeout=self._timeout,
+            follow_redirects=True,
+        )
+        self._client = AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            base_url=config.base_url,
+            max_retries=0,
+            timeout=self._timeout,
+            http_client=self._http,
+        )
+        self._retry = RetryPolicy(
+            is_retryable,
+            max_attempts=config.max_attempts,
+            base_seconds=config.retry_base_seconds,
+            max_seconds=config.retry_max_seconds,
+        )
+        self._breaker = CircuitBreaker(
+            is_retryable,
+            failure_threshold=config.breaker_failure_threshold,
+            reset_seconds=config.breaker_reset_seconds,
+            half_open_probes=config.breaker_half_open_probes,
+        )
+        self._deadline_seconds = config.request_deadline_seconds
+        self._limiter = AdaptiveLimiter(
+            is_overload,
+            initial_limit=config.concurrency_initial,
+            min_limit=config.concurrency_min,
+            max_limit=config.concurrency_max,
+            max_queue=config.queue_max,
+            queue_timeout=config.queue_timeout_seconds,
+        )
         self._prompt_builder = TherapeuticPromptBuilder()
         self._model = "claude-3-sonnet-20240229"
         self._max_tokens = 1000
+        self._summary_max_tokens = 400
+
+    async def warm(self, connections: int | None = None) -> int:
+        """Open pooled connections before the first call needs them.
+
+        Sends ``connections`` concurrent requests (``warm_connections`` by
+        default) to the API root, so each pays for DNS, TCP and TLS now. Over
+        HTTP/2 they share one connection. Any HTTP response counts; failures
+        are logged and left to the first real call. Returns how many
+        succeeded.
+        """
+        count = self._config.warm_connections if connections is None else connections
+        if count <= 0:
+            return 0
+
+        url = str(self._client.base_url)
+        results = await asyncio.gather(
+            *(self._http.head(url) for _ in range(count)), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        warmed = count - len(errors)
+        if errors:
+            logger.warning(
+                "Failed to warm Anthropic connections",
+                warmed=warmed,
+                failed=len(errors),
+                error=str(errors[0]),
+            )
+        else:
+            logger.info("Warmed Anthropic connections", warmed=warmed)
+        return warmed
+
+    async def close(self) -> None:
+        """Close the client's pooled connections."""
+        await self._client.close()
 
     async def generate_therapeutic_response(
         self,
@@ -97,15 +303,18 @@ class AnthropicTherapeuticClient:
         conversation_history: list[dict[str, str]] | None = None,
         session_context: dict[str, Any] | None = None,
         temperature: float = 0.7,
+        session_summary: str | None = None,
+        priority: Priority = Priority.INTERACTIVE,
     ) -> dict[str, Any]:
         """Generate therapeutic response with error handling and metrics."""
         start_time = time.time()
 
         try:
-            messages = self._prompt_builder.build_conversation_prompt(
+            prompt = self._prompt_builder.build_conversation_prompt(
                 user_message=user_message,
                 conversation_history=conversation_history,
                 session_context=session_context,
+                session_summary=session_summary,
             )
 
             logger.info(
@@ -113,19 +322,24 @@ class AnthropicTherapeuticClient:
                 user_message_length=len(user_message),
                 history_length=len(conversation_history) if conversation_history else 0,
                 has_context=bool(session_context),
+                has_summary=bool(session_summary),
             )
 
-            response = await self._client.messages.create(
+            response = await self._create(
+                priority,
                 model=self._model,
                 max_tokens=self._max_tokens,
-                temperature=temperature,
-                messages=messages,  # type: ignore[arg-type]
+                extra_body={"temperature": temperature},
+                system=prompt["system"],
+                messages=prompt["messages"],
             )
 
             processing_time = int((time.time() - start_time) * 1000)
 
             return self._format_response(response, processing_time)
 
+        except LOCAL_ERRORS:
+            raise
         except Exception as e:
             processing_time = int((time.time() - start_time) * 1000)
             logger.error(
@@ -143,6 +357,159 @@ class AnthropicTherapeuticClient:
                 },
             )
 
+    async def stream_therapeutic_response(
+        self,
+        user_message: str,
+        conversation_history: list[dict[str, str]] | None = None,
+        session_context: dict[str, Any] | None = None,
+        temperature: float = 0.7,
+        session_summary: str | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream a therapeutic response as it is generated.
+
+        Yields ``{"type": "text", "text": ...}`` for each text delta and ends
+        with ``{"type": "done", "response": ...}``, where the response has the
+        same shape as ``generate_therapeutic_response`` plus
+        ``time_to_first_token_ms``.
+        """
+        start_time = time.time()
+        first_token_time: float | None = None
+
+        try:
+            prompt = self._prompt_builder.build_conversation_prompt(
+                user_message=user_message,
+                conversation_history=conversation_history,
+                session_context=session_context,
+                session_summary=session_summary,
+            )
+
+            logger.info(
+                "Streaming therapeutic response",
+                user_message_length=len(user_message),
+                history_length=len(conversation_history) if conversation_history else 0,
+                has_context=bool(session_context),
+                has_summary=bool(session_summary),
+            )
+
+            deadline = time.monotonic() + self._deadline_seconds
+            attempts = 0
+            # The breaker judges the call, not each of its attempts
+            async with self._breaker.guard():
+                while True:
+                    attempts += 1
+                    try:
+                        async with (
+                            self._limiter.slot(priority),
+                            self._client.messages.stream(
+                                model=self._model,
+                                max_tokens=self._max_tokens,
+                                extra_body={"temperature": temperature},
+                                system=prompt["system"],
+                                messages=prompt["messages"],
+                                timeout=self._attempt_timeout(deadline),
+                            ) as stream,
+                        ):
+                            async for text in stream.text_stream:
+                                if first_token_time is None:
+                                    first_token_time = time.time()
+                                    LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(
+                                        first_token_time - start_time
+                                    )
+                                yield {"type": "text", "text": text}
+
+                            final_message = await stream.get_final_message()
+                        break
+                    except Exception as e:
+                        # Text already yielded cannot be taken back
+                        if first_token_time is not None:
+                            raise
+                        await self._before_retry(e, attempts, deadline)
+
+        except LOCAL_ERRORS:
+            raise
+        except Exception as e:
+            processing_time = int((time.time() - start_time) * 1000)
+            logger.error(
+                "Anthropic API error",
+                error=str(e),
+                processing_time_ms=processing_time,
+                user_message_length=len(user_message),
+                streamed=True,
+            )
+            raise AnthropicAPIError(
+                message="Failed to stream therapeutic response",
+                details={
+                    "original_error": str(e),
+                    "processing_time_ms": processing_time,
+                    "model": self._model,
+                },
+            )
+
+        processing_time = int((time.time() - start_time) * 1000)
+        response = self._format_response(final_message, processing_time)
+        response["time_to_first_token_ms"] = (
+            int((first_token_time - start_time) * 1000)
+            if first_token_time is not None
+            else None
+        )
+        yield {"type": "done", "response": response}
+
+    async def _create(self, priority: Priority, **kwargs: Any) -> Message:
+        """Create a message, retrying transient errors within the deadline.
+
+        The circuit breaker sees the call once, however many attempts it
+        takes: it counts as failed only when the last attempt fails.
+        """
+        deadline = time.monotonic() + self._deadline_seconds
+        attempts = 0
+        async with self._breaker.guard():
+            while True:
+                attempts += 1
+                try:
+                    async with self._limiter.slot(priority):
+                        return await self._client.messages.create(
+                            timeout=self._attempt_timeout(deadline), **kwargs
+                        )
+                except Exception as e:
+                    await self._before_retry(e, attempts, deadline)
+
+    def _attempt_timeout(self, deadline: float) -> httpx.Timeout:
+        """The transport timeouts, cut short by what is left of the deadline."""
+        remaining = max(0.0, deadline - time.monotonic())
+        return httpx.Timeout(
+            connect=min(self._timeout.connect or remaining, remaining),
+            read=min(self._timeout.read or remaining, remaining),
+            write=min(self._timeout.write or remaining, remaining),
+            pool=min(self._timeout.pool or remaining, remaining),
+        )
+
+    async def _before_retry(
+        self, error: Exception, attempts: int, deadline: float
+    ) -> None:
+        """Wait out the backoff before another attempt, or re-raise ``error``."""
+        delay = self._retry.delay(
+            error,
+            attempts,
+            remaining=deadline - time.monotonic(),
+            retry_after=retry_after_seconds(error),
+        )
+        if delay is None:
+            raise error
+        reason = (
+            str(error.status_code)
+            if isinstance(error, APIStatusError)
+            else error.__class__.__name__
+        )
+        LLM_RETRIES_TOTAL.labels(error=reason).inc()
+        logger.warning(
+            "Retrying Anthropic API call",
+            error=str(error),
+            attempt=attempts,
+            delay=round(delay, 3),
+        )
+        await asyncio.sleep(delay)
+
     def _format_response(
         self, response: Message, processing_time_ms: int
     ) -> dict[str, Any]:
@@ -162,93 +529,80 @@ class AnthropicTherapeuticClient:
             "usage": {
                 "input_tokens": response.usage.input_tokens if response.usage else 0,
                 "output_tokens": response.usage.output_tokens if response.usage else 0,
+                "cache_read_input_tokens": (
+                    (response.usage.cache_read_input_tokens or 0)
+                    if response.usage
+                    else 0
+                ),
+                "cache_creation_input_tokens": (
+                    (response.usage.cache_creation_input_tokens or 0)
+                    if response.usage
+                    else 0
+                ),
             },
             "processing_time_ms": processing_time_ms,
             "stop_reason": response.stop_reason,
         }
 
-    async def analyze_conversation_patterns(
+    async def summarize_conversation(
         self,
-        conversation_history: list[dict[str, str]],
-        analysis_type: str = "therapeutic_progress",
+        previous_summary: str | None,
+        new_messages: list[dict[str, str]],
     ) -> dict[str, Any]:
-        """Analyze conversation patterns for therapeutic insights."""
-        if not conversation_history:
-            return {"analysis": "No conversation history available", "insights": []}
-
-        analysis_prompts = {
-            "therapeutic_progress": """Analyze this therapeutic conversation for:
-1. Key themes and concerns expressed
-2. Emotional patterns and progress indicators
-3. Therapeutic alliance quality
-4. Areas needing focus in future sessions
-Provide concise, professional insights.""",
-            "safety_assessment": """Review this conversation for:
-1. Any safety concerns or risk factors
-2. Crisis indicators or escalation patterns
-3. Protective factors mentioned
-4. Recommended safety interventions
-Focus on clinical safety assessment.""",
-        }
-
-        prompt = analysis_prompts.get(
-            analysis_type, analysis_prompts["therapeutic_progress"]
+        """Fold ``new_messages`` into the running session summary."""
+        transcript = "\n".join(
+            f"{msg['role']}: {msg['content']}" for msg in new_messages
+        )
+        content = (
+            f"Current summary:\n{previous_summary or '(none yet)'}\n\n"
+            f"New messages:\n{transcript}"
         )
 
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a clinical supervisor analyzing "
-                        "therapeutic conversations."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": f"{prompt}\n\nConversation:\n"
-                    + "\n".join(
-                        [
-                            f"{msg['role']}: {msg['content']}"
-                            for msg in conversation_history[-15:]
-                        ]
-                    ),
-                },
-            ]
-
-            response = await self._client.messages.create(
+            response = await self._create(
+                Priority.BACKGROUND,
                 model=self._model,
-                max_tokens=500,
-                temperature=0.3,
-                messages=messages,  # type: ignore[arg-type]
-            )
-
-            content = ""
-            if response.content and len(response.content) > 0:
-                content = (
-                    response.content[0].text
-                    if hasattr(response.content[0], "text")
-                    else str(response.content[0])
-                )
-
-            return {
-                "analysis_type": analysis_type,
-                "analysis": content,
-                "conversation_length": len(conversation_history),
-                "tokens_used": (
-                    response.usage.input_tokens + response.usage.output_tokens
-                    if response.usage
-                    else 0
-                ),
-            }
-
+                max_tokens=self._summary_max_tokens,
+                extra_body={"temperature": 0.3},
+                system=self._prompt_builder.SUMMARY_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": content}],
+            )
+        except LOCAL_ERRORS:
+            raise
         except Exception as e:
             logger.error(
-                "Conversation analysis failed",
+                "Conversation summary failed",
                 error=str(e),
-                analysis_type=analysis_type,
+                new_messages=len(new_messages),
             )
             raise AnthropicAPIError(
-                message="Failed to analyze conversation patterns",
-                details={"original_error": str(e), "analysis_type": analysis_type},
+                message="Failed to summarize conversation",
+                details={"original_error": str(e), "model": self._model},
             )
+
+        formatted = self._format_response(response, 0)
+        return {
+            "summary": formatted["content"],
+            "tokens_used": (
+                formatted["usage"]["input_tokens"] + formatted["usage"]["output_tokens"]
+            ),
+        }
+
+
+_anthropic_client: AnthropicTherapeuticClient | None = None
+
+
+def get_anthropic_client() -> AnthropicTherapeuticClient:
+    """Get the process-wide client, creating it on first use."""
+    global _anthropic_client
+    if _anthropic_client is None:
+        _anthropic_client = AnthropicTherapeuticClient()
+    return _anthropic_client
+
+
+async def close_anthropic_client() -> None:
+    """Close the process-wide client; the next ``get`` creates a new one."""
+    global _anthropic_client
+    client, _anthropic_client = _anthropic_client, None
+    if client is not None:
+        await client.close()
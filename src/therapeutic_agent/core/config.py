@@ -2,11 +2,14 @@
 
 import os
 from functools import lru_cache
-from typing import Any
+from typing import Any, Literal, cast
 
 from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+SessionCacheBackend = Literal["off", "memory", "redis"]
+Durability = Literal["flush", "enqueue"]
+
 
 class DatabaseConfig(BaseModel):
     """Database configuration settings."""
@@ -15,6 +18,10 @@ class DatabaseConfig(BaseModel):
     pool_size: int = Field(default=10, ge=1, le=50)
     max_overflow: int = Field(default=20, ge=0, le=100)
     pool_timeout: int = Field(default=30, ge=1, le=300)
+    auto_create_schema: bool = Field(
+        default=True,
+        description="Create missing tables at startup instead of using migrations",
+    )
 
 
 class RedisConfig(BaseModel):
@@ -39,7 +46,186 @@ class TherapyConfig(BaseModel):
 
     safety_threshold: float = Field(default=0.8, ge=0.0, le=1.0)
     max_conversation_length: int = Field(default=50, ge=5, le=200)
-    session_summary_interval: int = Field(default=10, ge=5, le=30)
+    session_summary_interval: int = Field(
+        default=10,
+        ge=5,
+        le=30,
+        description="Messages folded into the rolling session summary at a time",
+    )
+    context_budget_tokens: int = Field(
+        default=3000,
+        ge=100,
+        le=150_000,
+        description="Estimated history tokens sent with each therapeutic turn",
+    )
+    analysis_budget_tokens: int = Field(
+        default=6000,
+        ge=100,
+        le=150_000,
+        description="Estimated message tokens folded into one summary update",
+    )
+    context_max_messages: int = Field(
+        default=200,
+        ge=1,
+        le=1000,
+        description="Most recent messages read when packing history",
+    )
+    history_page_size: int = Field(
+        default=50,
+        ge=1,
+        le=200,
+        description="Messages per page of session history returned by the API",
+    )
+    speculative_generation: bool = Field(
+        default=False,
+        description="Start generating the reply while the message is validated",
+    )
+
+
+class SafetyConfig(BaseModel):
+    """Safety rule matching configuration."""
+
+    regex_backend: str = Field(
+        default="auto",
+        pattern="^(auto|re2|safe|stdlib)$",
+        description="Regex engine for safety rules; auto prefers re2 when installed",
+    )
+    executor: str = Field(
+        default="thread",
+        pattern="^(inline|thread|process)$",
+        description="Where long messages and batches are scanned",
+    )
+    executor_workers: int = Field(default=2, ge=1, le=64)
+    offload_min_chars: int = Field(
+        default=1000,
+        ge=0,
+        description="Single messages at least this long are scanned off the loop",
+    )
+    cache_max_entries: int = Field(
+        default=10_000, ge=0, description="Cached safety results; 0 disables"
+    )
+    cache_ttl_seconds: float = Field(default=600.0, gt=0)
+
+
+class SessionCacheConfig(BaseModel):
+    """Cache of active sessions and their recent messages."""
+
+    max_sessions: int = Field(
+        default=256, ge=0, description="Sessions cached per process; 0 disables"
+    )
+    idle_ttl_seconds: float = Field(
+        default=900.0,
+        gt=0,
+        description="Sessions neither read nor written for this long are dropped",
+    )
+    backend: SessionCacheBackend = Field(
+        default="off",
+        description="memory caches per process, so only one process may write "
+        "sessions; redis shares one cache between processes",
+    )
+    redis_retry_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        description="How long to use the database alone after a Redis error",
+    )
+
+
+class WriteBehindConfig(BaseModel):
+    """Batched persistence of turns' messages and safety events."""
+
+    enabled: bool = Field(default=False)
+    durability: Durability = Field(
+        default="flush",
+        description="flush acknowledges a turn once its rows are committed; "
+        "enqueue once they are queued, losing queued rows if the process dies",
+    )
+    flush_interval_ms: float = Field(default=5.0, gt=0, le=1000)
+    batch_rows: int = Field(default=200, ge=1, le=10000)
+    max_pending: int = Field(
+        default=10000, ge=1, description="Queued turns before turns wait to queue"
+    )
+
+
+class JobsConfig(BaseModel):
+    """Background job queue configuration."""
+
+    workers: int = Field(default=2, ge=1, le=64)
+    run_in_api: bool = Field(
+        default=True,
+        description="Run workers inside the API process; disable when workers "
+        "run as a separate `therapeutic-agent worker` process",
+    )
+    poll_interval_seconds: float = Field(default=1.0, gt=0, le=60)
+    max_attempts: int = Field(default=5, ge=1, le=20)
+    backoff_base_seconds: float = Field(default=2.0, gt=0)
+    backoff_max_seconds: float = Field(default=300.0, gt=0)
+    lease_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="A running job not finished within this time is retried",
+    )
+
+
+class AnthropicConfig(BaseModel):
+    """Outbound Anthropic API call configuration."""
+
+    base_url: str | None = Field(
+        default=None,
+        description="API endpoint, e.g. a `therapeutic-agent mock-anthropic` "
+        "server; the SDK default when unset",
+    )
+    concurrency_initial: int = Field(default=8, ge=1, le=1000)
+    concurrency_min: int = Field(default=1, ge=1, le=1000)
+    concurrency_max: int = Field(
+        default=64,
+        ge=1,
+        le=1000,
+        description="Ceiling for the adaptive limit on concurrent model calls",
+    )
+    queue_max: int = Field(
+        default=256,
+        ge=0,
+        description="Model calls allowed to wait for a slot before rejecting",
+    )
+    queue_timeout_seconds: float = Field(default=30.0, gt=0)
+    max_attempts: int = Field(
+        default=3, ge=1, le=10, description="Attempts per call, including retries"
+    )
+    retry_base_seconds: float = Field(default=0.5, gt=0)
+    retry_max_seconds: float = Field(default=8.0, gt=0)
+    request_deadline_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description="Time budget for a call, shared by all its attempts",
+    )
+    breaker_failure_threshold: int = Field(
+        default=5,
+        ge=1,
+        description="Consecutive failed calls that open the circuit",
+    )
+    breaker_reset_seconds: float = Field(
+        default=30.0, gt=0, description="How long the circuit stays open"
+    )
+    breaker_half_open_probes: int = Field(default=1, ge=1)
+    http2: bool = Field(
+        default=True, description="Use HTTP/2 when the h2 package is installed"
+    )
+    max_connections: int = Field(default=100, ge=1, le=1000)
+    max_keepalive_connections: int = Field(default=20, ge=0, le=1000)
+    keepalive_expiry_seconds: float = Field(default=30.0, gt=0)
+    connect_timeout_seconds: float = Field(default=5.0, gt=0)
+    read_timeout_seconds: float = Field(
+        default=60.0, gt=0, description="Longest wait for response data"
+    )
+    pool_timeout_seconds: float = Field(
+        default=10.0, gt=0, description="Longest wait for a free connection"
+    )
+    warm_connections: int = Field(
+        default=2,
+        ge=0,
+        le=100,
+        description="Connections opened at API startup; 0 disables warming",
+    )
 
 
 class Settings(BaseSettings):
@@ -60,6 +246,11 @@ class Settings(BaseSettings):
     redis: RedisConfig = Field(default=None)  # type: ignore[assignment]
     security: SecurityConfig = Field(default=None)  # type: ignore[assignment]
     therapy: TherapyConfig = Field(default=None)  # type: ignore[assignment]
+    safety: SafetyConfig = Field(default=None)  # type: ignore[assignment]
+    session_cache: SessionCacheConfig = Field(default=None)  # type: ignore[assignment]
+    write_behind: WriteBehindConfig = Field(default=None)  # type: ignore[assignment]
+    jobs: JobsConfig = Field(default=None)  # type: ignore[assignment]
+    anthropic: AnthropicConfig = Field(default=None)  # type: ignore[assignment]
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -73,7 +264,13 @@ class Settings(BaseSettings):
             database_url = os.getenv(
                 "DATABASE_URL", "sqlite+aiosqlite:///:memory:"
             )  # Default to in-memory SQLite for testing
-            return DatabaseConfig(url=database_url)
+            return DatabaseConfig(
+                url=database_url,
+                auto_create_schema=os.getenv(
+                    "DATABASE_AUTO_CREATE_SCHEMA", "true"
+                ).lower()
+                in ("1", "true", "yes"),
+            )
         if isinstance(v, dict):
             return DatabaseConfig(**v)
         return v
@@ -118,11 +315,153 @@ class Settings(BaseSettings):
                 session_summary_interval=int(
                     os.getenv("SESSION_SUMMARY_INTERVAL", "10")
                 ),
+                context_budget_tokens=int(os.getenv("CONTEXT_BUDGET_TOKENS", "3000")),
+                analysis_budget_tokens=int(os.getenv("ANALYSIS_BUDGET_TOKENS", "6000")),
+                context_max_messages=int(os.getenv("CONTEXT_MAX_MESSAGES", "200")),
+                history_page_size=int(os.getenv("HISTORY_PAGE_SIZE", "50")),
+                speculative_generation=os.getenv(
+                    "SPECULATIVE_GENERATION", "false"
+                ).lower()
+                in ("1", "true", "yes"),
             )
         if isinstance(v, dict):
             return TherapyConfig(**v)
         return v
 
+    @field_validator("safety", mode="before")
+    @classmethod
+    def parse_safety_config(cls, v: Any) -> SafetyConfig:
+        if v is None:
+            return SafetyConfig(
+                regex_backend=os.getenv("SAFETY_REGEX_BACKEND", "auto"),
+                executor=os.getenv("SAFETY_EXECUTOR", "thread"),
+                executor_workers=int(os.getenv("SAFETY_EXECUTOR_WORKERS", "2")),
+                offload_min_chars=int(os.getenv("SAFETY_OFFLOAD_MIN_CHARS", "1000")),
+                cache_max_entries=int(os.getenv("SAFETY_CACHE_MAX_ENTRIES", "10000")),
+                cache_ttl_seconds=float(os.getenv("SAFETY_CACHE_TTL_SECONDS", "600")),
+            )
+        if isinstance(v, dict):
+            return SafetyConfig(**v)
+        return v
+
+    @field_validator("session_cache", mode="before")
+    @classmethod
+    def parse_session_cache_config(cls, v: Any) -> SessionCacheConfig:
+        if v is None:
+            return SessionCacheConfig(
+                max_sessions=int(os.getenv("SESSION_CACHE_MAX_SESSIONS", "256")),
+                idle_ttl_seconds=float(
+                    os.getenv("SESSION_CACHE_IDLE_TTL_SECONDS", "900")
+                ),
+                # Checked against the Literal when the model is validated
+                backend=cast(
+                    SessionCacheBackend,
+                    os.getenv("SESSION_CACHE_BACKEND", "off").lower(),
+                ),
+                redis_retry_seconds=float(
+                    os.getenv("SESSION_CACHE_REDIS_RETRY_SECONDS", "5")
+                ),
+            )
+        if isinstance(v, dict):
+            return SessionCacheConfig(**v)
+        return v
+
+    @field_validator("write_behind", mode="before")
+    @classmethod
+    def parse_write_behind_config(cls, v: Any) -> WriteBehindConfig:
+        if v is None:
+            return WriteBehindConfig(
+                enabled=os.getenv("WRITE_BEHIND_ENABLED", "false").lower()
+                in ("1", "true", "yes"),
+                durability=cast(
+                    Durability, os.getenv("WRITE_BEHIND_DURABILITY", "flush").lower()
+                ),
+                flush_interval_ms=float(
+                    os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_MS", "5")
+                ),
+                batch_rows=int(os.getenv("WRITE_BEHIND_BATCH_ROWS", "200")),
+                max_pending=int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000")),
+            )
+        if isinstance(v, dict):
+            return WriteBehindConfig(**v)
+        return v
+
+    @field_validator("jobs", mode="before")
+    @classmethod
+    def parse_jobs_config(cls, v: Any) -> JobsConfig:
+        if v is None:
+            return JobsConfig(
+                workers=int(os.getenv("JOB_WORKERS", "2")),
+                run_in_api=os.getenv("JOB_WORKERS_IN_API", "true").lower()
+                in ("1", "true", "yes"),
+                poll_interval_seconds=float(
+                    os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0")
+                ),
+                max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "5")),
+                backoff_base_seconds=float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "2")),
+                backoff_max_seconds=float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "300")),
+                lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "300")),
+            )
+        if isinstance(v, dict):
+            return JobsConfig(**v)
+        return v
+
+    @field_validator("anthropic", mode="before")
+    @classmethod
+    def parse_anthropic_config(cls, v: Any) -> AnthropicConfig:
+        if v is None:
+            return AnthropicConfig(
+                base_url=os.getenv("ANTHROPIC_BASE_URL") or None,
+                concurrency_initial=int(
+                    os.getenv("ANTHROPIC_CONCURRENCY_INITIAL", "8")
+                ),
+                concurrency_min=int(os.getenv("ANTHROPIC_CONCURRENCY_MIN", "1")),
+                concurrency_max=int(os.getenv("ANTHROPIC_CONCURRENCY_MAX", "64")),
+                queue_max=int(os.getenv("ANTHROPIC_QUEUE_MAX", "256")),
+                queue_timeout_seconds=float(
+                    os.getenv("ANTHROPIC_QUEUE_TIMEOUT_SECONDS", "30")
+                ),
+                max_attempts=int(os.getenv("ANTHROPIC_MAX_ATTEMPTS", "3")),
+                retry_base_seconds=float(
+                    os.getenv("ANTHROPIC_RETRY_BASE_SECONDS", "0.5")
+                ),
+                retry_max_seconds=float(os.getenv("ANTHROPIC_RETRY_MAX_SECONDS", "8")),
+                request_deadline_seconds=float(
+                    os.getenv("ANTHROPIC_REQUEST_DEADLINE_SECONDS", "60")
+                ),
+                breaker_failure_threshold=int(
+                    os.getenv("ANTHROPIC_BREAKER_FAILURE_THRESHOLD", "5")
+                ),
+                breaker_reset_seconds=float(
+                    os.getenv("ANTHROPIC_BREAKER_RESET_SECONDS", "30")
+                ),
+                breaker_half_open_probes=int(
+                    os.getenv("ANTHROPIC_BREAKER_HALF_OPEN_PROBES", "1")
+                ),
+                http2=os.getenv("ANTHROPIC_HTTP2", "true").lower()
+                in ("1", "true", "yes"),
+                max_connections=int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(
+                    os.getenv("ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS", "20")
+                ),
+                keepalive_expiry_seconds=float(
+                    os.getenv("ANTHROPIC_KEEPALIVE_EXPIRY_SECONDS", "30")
+                ),
+                connect_timeout_seconds=float(
+                    os.getenv("ANTHROPIC_CONNECT_TIMEOUT_SECONDS", "5")
+                ),
+                read_timeout_seconds=float(
+                    os.getenv("ANTHROPIC_READ_TIMEOUT_SECONDS", "60")
+                ),
+                pool_timeout_seconds=float(
+                    os.getenv("ANTHROPIC_POOL_TIMEOUT_SECONDS", "10")
+                ),
+                warm_connections=int(os.getenv("ANTHROPIC_WARM_CONNECTIONS", "2")),
+            )
+        if isinstance(v, dict):
+            return AnthropicConfig(**v)
+        return v
+
 
 @lru_cache()
 def get_settings() -> Settings:
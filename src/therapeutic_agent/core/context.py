@@ -0,0 +1,95 @@
+"""Token-budgeted selection of conversation history for prompts."""
+
+import math
+import re
+from typing import Protocol, Sequence, TypeVar
+
+# Role and turn framing the API adds around each message's text
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``, computed locally.
+
+    English prose averages about four characters per token. Every word and
+    punctuation mark is counted at least once so that short, dense text is
+    not undercounted.
+    """
+    return max(math.ceil(len(text) / 4), len(_PIECES.findall(text)))
+
+
+class HistoryMessage(Protocol):
+    """What the context window needs from a stored message."""
+
+    @property
+    def role(self) -> str: ...
+
+    @property
+    def content(self) -> str: ...
+
+    token_count: int | None
+
+
+M = TypeVar("M", bound=HistoryMessage)
+
+
+class ContextWindow:
+    """Packs the most recent history that fits a token budget.
+
+    Messages are costed by their stored ``token_count``. A message without
+    one is estimated once and the estimate is written back to the message,
+    so ORM rows keep it when their transaction commits.
+
+    With ``block_messages`` above one, the oldest retained message is moved
+    forward to a multiple of ``block_messages`` counted from the start of
+    the session. The retained history then keeps the same first message
+    while the conversation grows, so a prompt prefix built from it stays
+    cacheable. Alignment is skipped when it would keep less than half of the
+    messages that fit, or drop any of the last exchange, so long messages
+    trade cacheability for history rather than losing it.
+    """
+
+    def __init__(self, budget_tokens: int, block_messages: int = 1) -> None:
+        self.budget_tokens = budget_tokens
+        self.block_messages = block_messages
+
+    @staticmethod
+    def message_tokens(message: HistoryMessage) -> int:
+        if message.token_count is None:
+            message.token_count = estimate_tokens(message.content)
+        return message.token_count + MESSAGE_OVERHEAD_TOKENS
+
+    def take(self, messages: Sequence[M]) -> list[M]:
+        """The oldest messages that fit the budget, and always the first."""
+        used = 0
+        end = 0
+        while end < len(messages):
+            used += self.message_tokens(messages[end])
+            if end and used > self.budget_tokens:
+                break
+            end += 1
+        return list(messages[:end])
+
+    def select(self, messages: Sequence[M], offset: int = 0) -> list[M]:
+        """The newest messages that fit the budget, oldest first.
+
+        ``messages`` are the most recent messages of a session, oldest first,
+        and ``offset`` is the session position of the first of them.
+        """
+        used = 0
+        start = len(messages)
+        while start > 0:
+            cost = self.message_tokens(messages[start - 1])
+            if used + cost > self.budget_tokens:
+                break
+            used += cost
+            start -= 1
+
+        if self.block_messages > 1:
+            fits = len(messages) - start
+            kept = fits - (-(offset + start) % self.block_messages)
+            if 2 * kept >= fits and kept >= min(fits, 2):
+                start = len(messages) - kept
+        return list(messages[start:])
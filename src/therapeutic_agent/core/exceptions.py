@@ -30,12 +30,24 @@ class SessionLimitExceededError(TherapeuticAgentException):
     pass
 
 
+class JobNotFoundError(TherapeuticAgentException):
+    """Raised when requested background job cannot be found."""
+
+    pass
+
+
 class AnthropicAPIError(TherapeuticAgentException):
     """Raised when Anthropic API calls fail."""
 
     pass
 
 
+class CircuitOpenError(AnthropicAPIError):
+    """Raised when Anthropic API calls are skipped because the circuit is open."""
+
+    pass
+
+
 class ConfigurationError(TherapeuticAgentException):
     """Raised when application configuration is invalid."""
 
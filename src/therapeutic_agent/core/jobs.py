@@ -0,0 +1,157 @@
+"""Asyncio worker pool running durable background jobs."""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Mapping
+
+import structlog
+
+from therapeutic_agent.core.config import JobsConfig, get_settings
+from therapeutic_agent.core.metrics import BACKGROUND_JOB_SECONDS, BACKGROUND_JOBS_TOTAL
+from therapeutic_agent.storage.database import get_database_manager
+from therapeutic_agent.storage.models import BackgroundJob
+from therapeutic_agent.storage.repository import JobRepository
+
+logger = structlog.get_logger()
+
+JobHandler = Callable[[BackgroundJob], Awaitable[dict[str, Any] | None]]
+
+
+class JobWorkerPool:
+    """Claims jobs from the job table and runs them on asyncio workers.
+
+    Each job kind is run by its handler, whose return value is stored as the
+    job's result. A handler that raises is retried after an exponential
+    backoff with jitter until the job's ``max_attempts`` are used up. Jobs
+    are claimed under a lease: one still running when its lease expires,
+    because its worker died or stalled, is claimed again by any worker.
+
+    Workers poll the table, so any number of pools in any number of
+    processes can share it. The handler runs outside the transaction that
+    claimed the job, so no connection is held while it waits on the model.
+    """
+
+    def __init__(
+        self, handlers: Mapping[str, JobHandler], config: JobsConfig | None = None
+    ) -> None:
+        self._handlers = dict(handlers)
+        self._config = config or get_settings().jobs
+        self._stopping = asyncio.Event()
+        self._workers: list[asyncio.Task[None]] = []
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """Delay before retrying a job that has failed ``attempts`` times."""
+        ceiling = min(
+            self._config.backoff_max_seconds,
+            self._config.backoff_base_seconds * 2 ** (attempts - 1),
+        )
+        return random.uniform(ceiling / 2, ceiling)
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        if self._workers:
+            return
+        self._stopping.clear()
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self._config.workers)
+        ]
+        logger.info("Started job workers", workers=self._config.workers)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming jobs and wait for running ones to finish.
+
+        Jobs still running after ``timeout`` are cancelled; they are retried
+        once their lease expires.
+        """
+        self._stopping.set()
+        workers, self._workers = self._workers, []
+        if not workers:
+            return
+        _, pending = await asyncio.wait(workers, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        logger.info("Stopped job workers", cancelled=len(pending))
+
+    async def run(self) -> None:
+        """Run the workers until cancelled, for a dedicated worker process."""
+        self.start()
+        try:
+            await asyncio.gather(*self._workers)
+        finally:
+            await self.stop()
+
+    async def run_once(self) -> bool:
+        """Claim and run one due job. Returns whether there was one."""
+        db_manager = await get_database_manager()
+        async with db_manager.get_session() as db_session:
+            job = await JobRepository(db_session).claim_next(
+                self._handlers, self._config.lease_seconds
+            )
+        if job is None:
+            return False
+
+        log = logger.bind(job_id=str(job.id), kind=job.kind, attempt=job.attempts)
+        if job.attempts > job.max_attempts:
+            # Claimed again after its last attempt's lease expired
+            await self._record(job, "failed", error="Lease expired on last attempt")
+            log.error("Background job abandoned")
+            return True
+
+        started = time.perf_counter()
+        try:
+            result = await self._handlers[job.kind](job)
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+            if job.attempts < job.max_attempts:
+                delay = self.backoff_seconds(job.attempts)
+                await self._record(job, "retried", error=error, delay=delay)
+                log.warning("Background job failed, retrying", error=error, delay=delay)
+            else:
+                await self._record(job, "failed", error=error)
+                log.error("Background job failed", error=error)
+            return True
+        finally:
+            BACKGROUND_JOB_SECONDS.labels(kind=job.kind).observe(
+                time.perf_counter() - started
+            )
+
+        await self._record(job, "succeeded", result=result)
+        log.info("Background job succeeded")
+        return True
+
+    async def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                ran = await self.run_once()
+            except Exception as e:
+                logger.error("Job worker error", error=str(e))
+                ran = False
+            if not ran:
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(), self._config.poll_interval_seconds
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _record(
+        self,
+        job: BackgroundJob,
+        outcome: str,
+        result: dict[str, Any] | None = None,
+        error: str = "",
+        delay: float = 0.0,
+    ) -> None:
+        db_manager = await get_database_manager()
+        async with db_manager.get_session() as db_session:
+            jobs = JobRepository(db_session)
+            if outcome == "succeeded":
+                await jobs.complete(job.id, job.attempts, result)
+            elif outcome == "retried":
+                await jobs.retry(job.id, job.attempts, error, delay)
+            else:
+                await jobs.fail(job.id, job.attempts, error)
+        BACKGROUND_JOBS_TOTAL.labels(kind=job.kind, outcome=outcome).inc()
@@ -0,0 +1,205 @@
+"""Adaptive concurrency limit with a priority queue for outbound model calls."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Callable, NoReturn
+
+from therapeutic_agent.core.exceptions import RateLimitExceededError
+from therapeutic_agent.core.metrics import (
+    LLM_CONCURRENCY_LIMIT,
+    LLM_IN_FLIGHT,
+    LLM_QUEUE_DEPTH,
+    LLM_QUEUE_REJECTIONS_TOTAL,
+    LLM_QUEUE_WAIT_SECONDS,
+)
+
+
+class Priority(IntEnum):
+    """Order in which queued calls get a slot; lower goes first."""
+
+    SAFETY = 0  # Sessions with recent safety flags
+    INTERACTIVE = 1
+    BACKGROUND = 2
+
+
+class _Waiter:
+    __slots__ = ("priority", "future", "queued_at")
+
+    def __init__(self, priority: Priority, future: asyncio.Future[None]) -> None:
+        self.priority = priority
+        self.future = future
+        self.queued_at = time.perf_counter()
+
+
+class AdaptiveLimiter:
+    """Caps concurrent calls at a limit adjusted by AIMD.
+
+    Each call that succeeds raises the limit by ``1 / limit``, so it grows by
+    about one per limit's worth of successful calls. A call that fails with
+    an overload (as judged by ``is_overload``) multiplies it by
+    ``decrease_factor``. Calls already in flight when the
+    limit was cut report overloads from the same burst, so they do not cut
+    it again.
+
+    Calls over the limit wait in a priority queue, first by ``Priority`` and
+    then in arrival order. A full queue rejects the newcomer, unless a
+    lower-priority call is waiting, in which case that call is rejected
+    instead. Calls that wait longer than ``queue_timeout`` are rejected too.
+    Rejections raise ``RateLimitExceededError``.
+    """
+
+    def __init__(
+        self,
+        is_overload: Callable[[BaseException], bool],
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        decrease_factor: float = 0.5,
+        max_queue: int = 256,
+        queue_timeout: float = 30.0,
+    ) -> None:
+        self._is_overload = is_overload
+        self._limit = float(initial_limit)
+        self._min_limit = float(min_limit)
+        self._max_limit = float(max_limit)
+        self._decrease_factor = decrease_factor
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+
+        self._in_flight = 0
+        self._epoch = 0
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        LLM_CONCURRENCY_LIMIT.set(self._limit)
+
+    @property
+    def limit(self) -> float:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queue_depth(self, priority: Priority | None = None) -> int:
+        return sum(
+            1
+            for _, _, waiter in self._queue
+            if not waiter.future.done()
+            and (priority is None or waiter.priority == priority)
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[None]:
+        """Hold one of the limited slots for the duration of a call."""
+        await self._acquire(priority)
+        epoch = self._epoch
+        try:
+            yield
+        except BaseException as e:
+            self._release(epoch, "overload" if self._is_overload(e) else "error")
+            raise
+        else:
+            self._release(epoch, "success")
+
+    async def _acquire(self, priority: Priority) -> None:
+        if self._in_flight < int(self._limit) and not self.queue_depth():
+            self._in_flight += 1
+            LLM_IN_FLIGHT.set(self._in_flight)
+            LLM_QUEUE_WAIT_SECONDS.labels(priority=priority.name.lower()).observe(0)
+            return
+
+        if self.queue_depth() >= self._max_queue:
+            self._evict_for(priority)
+
+        waiter = _Waiter(priority, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        self._update_depth()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self._queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self._reject(priority, "timeout")
+            elif not waiter.future.cancelled() and waiter.future.exception() is None:
+                # Granted a slot just as the wait timed out
+                self._release(self._epoch, "error")
+                self._reject(priority, "timeout")
+            else:
+                await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                if waiter.future.exception() is None:
+                    self._release(self._epoch, "error")
+            else:
+                waiter.future.cancel()
+            raise
+        finally:
+            self._update_depth()
+        LLM_QUEUE_WAIT_SECONDS.labels(priority=priority.name.lower()).observe(
+            time.perf_counter() - waiter.queued_at
+        )
+
+    def _evict_for(self, priority: Priority) -> None:
+        """Make room in a full queue, rejecting the newcomer if it ranks last."""
+        waiting = [entry for entry in self._queue if not entry[2].future.done()]
+        worst = max(waiting, key=lambda entry: (entry[0], entry[1]), default=None)
+        if worst is None or worst[0] <= priority:
+            self._reject(priority, "queue_full")
+
+        victim = worst[2]
+        victim.future.set_exception(
+            RateLimitExceededError(
+                "Model call displaced from the queue by higher-priority work",
+                details={"priority": victim.priority.name.lower()},
+            )
+        )
+        LLM_QUEUE_REJECTIONS_TOTAL.labels(
+            priority=victim.priority.name.lower(), reason="evicted"
+        ).inc()
+
+    def _reject(self, priority: Priority, reason: str) -> NoReturn:
+        LLM_QUEUE_REJECTIONS_TOTAL.labels(
+            priority=priority.name.lower(), reason=reason
+        ).inc()
+        raise RateLimitExceededError(
+            "Too many model calls are waiting",
+            details={"priority": priority.name.lower(), "reason": reason},
+        )
+
+    def _release(self, epoch: int, outcome: str) -> None:
+        """Free a slot taken at ``epoch`` and adjust the limit by ``outcome``.
+
+        Other errors, including cancellation, say nothing about capacity and
+        leave the limit as it is.
+        """
+        self._in_flight -= 1
+        if outcome == "success":
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+        elif outcome == "overload" and epoch == self._epoch:
+            self._limit = max(self._min_limit, self._limit * self._decrease_factor)
+            self._epoch += 1
+        LLM_CONCURRENCY_LIMIT.set(self._limit)
+
+        while self._queue and self._in_flight < int(self._limit):
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.future.done():
+                continue
+            self._in_flight += 1
+            waiter.future.set_result(None)
+        LLM_IN_FLIGHT.set(self._in_flight)
+        self._update_depth()
+
+    def _update_depth(self) -> None:
+        # Drop waiters that gave up or were evicted
+        while self._queue and self._queue[0][2].future.done():
+            heapq.heappop(self._queue)
+        for priority in Priority:
+            LLM_QUEUE_DEPTH.labels(priority=priority.name.lower()).set(
+                self.queue_depth(priority)
+            )
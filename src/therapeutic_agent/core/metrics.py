@@ -0,0 +1,161 @@
+"""Prometheus metrics and event loop health monitoring."""
+
+import asyncio
+import math
+from collections import deque
+
+import structlog
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = structlog.get_logger()
+
+SAFETY_SCAN_SECONDS = Histogram(
+    "therapeutic_safety_scan_seconds",
+    "Time spent scanning content against safety rules",
+    ["mode"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "therapeutic_llm_time_to_first_token_seconds",
+    "Time from sending a streamed generation request to its first text token",
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
+SPECULATIVE_GENERATIONS_TOTAL = Counter(
+    "therapeutic_speculative_generations_total",
+    "Replies generated during safety validation, by whether they were used",
+    ["outcome"],
+)
+SPECULATIVE_WASTED_TOKENS_TOTAL = Counter(
+    "therapeutic_speculative_wasted_tokens_total",
+    "Tokens spent on discarded speculative replies; estimated for requests "
+    "cancelled in flight",
+    ["kind"],
+)
+SPECULATIVE_LATENCY_SAVED_SECONDS = Histogram(
+    "therapeutic_speculative_latency_saved_seconds",
+    "How much sooner a used speculative reply produced output than a reply "
+    "started after validation would have",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+BACKGROUND_JOBS_TOTAL = Counter(
+    "therapeutic_background_jobs_total",
+    "Background job attempts by kind and outcome (succeeded, retried, failed)",
+    ["kind", "outcome"],
+)
+BACKGROUND_JOB_SECONDS = Histogram(
+    "therapeutic_background_job_seconds",
+    "Time spent running one attempt of a background job",
+    ["kind"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "therapeutic_llm_concurrency_limit",
+    "Current adaptive limit on concurrent model calls",
+)
+LLM_IN_FLIGHT = Gauge(
+    "therapeutic_llm_in_flight",
+    "Model calls currently holding a concurrency slot",
+)
+LLM_QUEUE_DEPTH = Gauge(
+    "therapeutic_llm_queue_depth",
+    "Model calls waiting for a concurrency slot, by priority",
+    ["priority"],
+)
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "therapeutic_llm_queue_wait_seconds",
+    "Time model calls waited for a concurrency slot, by priority",
+    ["priority"],
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+LLM_QUEUE_REJECTIONS_TOTAL = Counter(
+    "therapeutic_llm_queue_rejections_total",
+    "Model calls rejected by the limiter, by priority and reason (queue_full, "
+    "evicted, timeout)",
+    ["priority", "reason"],
+)
+
+LLM_RETRIES_TOTAL = Counter(
+    "therapeutic_llm_retries_total",
+    "Model calls retried, by the error that failed the previous attempt",
+    ["error"],
+)
+LLM_CIRCUIT_STATE = Gauge(
+    "therapeutic_llm_circuit_state",
+    "Anthropic API circuit breaker state: 0 closed, 1 half open, 2 open",
+)
+LLM_CIRCUIT_REJECTIONS_TOTAL = Counter(
+    "therapeutic_llm_circuit_rejections_total",
+    "Model calls failed fast because the circuit breaker was open",
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "therapeutic_event_loop_lag_seconds",
+    "Delay between when the event loop should wake a task and when it does",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+EVENT_LOOP_LAG_P50_SECONDS = Gauge(
+    "therapeutic_event_loop_lag_p50_seconds",
+    "Median event loop lag over the monitor's recent window",
+)
+EVENT_LOOP_LAG_P99_SECONDS = Gauge(
+    "therapeutic_event_loop_lag_p99_seconds",
+    "99th percentile event loop lag over the monitor's recent window",
+)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs a periodic timer.
+
+    Any callback that holds the loop (CPU-bound work, blocking I/O) delays
+    every other request on the worker by the same amount, which shows up here
+    as lag. Percentiles cover the last ``window`` samples and are computed
+    when the gauges are scraped.
+    """
+
+    def __init__(self, interval: float = 0.05, window: int = 1200) -> None:
+        self._interval = interval
+        self._samples: deque[float] = deque(maxlen=window)
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            EVENT_LOOP_LAG_P50_SECONDS.set_function(lambda: self.percentile(0.5))
+            EVENT_LOOP_LAG_P99_SECONDS.set_function(lambda: self.percentile(0.99))
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        self._samples.append(lag)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+
+    def percentile(self, quantile: float) -> float:
+        """Nearest-rank percentile of the recent samples, or 0 without samples."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(quantile * len(ordered)))
+        return ordered[rank - 1]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self._interval
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, loop.time() - expected)
+            self.record(lag)
+            if lag > 0.1:
+                logger.warning("Event loop lag", lag_ms=round(lag * 1000, 1))
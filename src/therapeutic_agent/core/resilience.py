@@ -0,0 +1,141 @@
+"""Retries and a circuit breaker for outbound model calls."""
+
+import random
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Callable
+
+from therapeutic_agent.core.exceptions import CircuitOpenError
+from therapeutic_agent.core.metrics import (
+    LLM_CIRCUIT_REJECTIONS_TOTAL,
+    LLM_CIRCUIT_STATE,
+)
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter, bounded by attempts and a deadline.
+
+    The delay before retry ``n`` is drawn uniformly between half and all of
+    ``base_seconds * 2 ** (n - 1)``, capped at ``max_seconds``, and is at
+    least what the server asked for in ``Retry-After``. A retry is only made
+    if the error is retryable and the delay leaves time before the deadline.
+    """
+
+    def __init__(
+        self,
+        is_retryable: Callable[[BaseException], bool],
+        max_attempts: int = 3,
+        base_seconds: float = 0.5,
+        max_seconds: float = 8.0,
+    ) -> None:
+        self._is_retryable = is_retryable
+        self._max_attempts = max_attempts
+        self._base_seconds = base_seconds
+        self._max_seconds = max_seconds
+
+    def delay(
+        self,
+        error: BaseException,
+        attempts: int,
+        remaining: float,
+        retry_after: float | None = None,
+    ) -> float | None:
+        """Seconds to wait before retrying, or None to give up.
+
+        ``attempts`` is how many calls have been made so far and
+        ``remaining`` how long is left of the request's deadline.
+        """
+        if attempts >= self._max_attempts or not self._is_retryable(error):
+            return None
+        ceiling = min(self._max_seconds, self._base_seconds * 2 ** (attempts - 1))
+        delay = random.uniform(ceiling / 2, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        # Leave the retry some time to run
+        if delay >= remaining / 2:
+            return None
+        return delay
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreaker:
+    """Fails calls fast while the upstream keeps failing.
+
+    The circuit opens after ``failure_threshold`` consecutive failed calls,
+    as judged by ``is_failure``. While open, calls raise ``CircuitOpenError``
+    without being made. After ``reset_seconds`` it half-opens and lets up to
+    ``half_open_probes`` calls through at a time: the first that succeeds
+    closes the circuit, and any that fails opens it again.
+
+    Errors that are not failures, such as invalid requests or cancellation,
+    neither open nor close it.
+    """
+
+    def __init__(
+        self,
+        is_failure: Callable[[BaseException], bool],
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ) -> None:
+        self._is_failure = is_failure
+        self._failure_threshold = failure_threshold
+        self._reset_seconds = reset_seconds
+        self._half_open_probes = half_open_probes
+
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probes = 0
+        LLM_CIRCUIT_STATE.set_function(lambda: self.state)
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if time.monotonic() - self._opened_at < self._reset_seconds:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Run one call through the breaker, or raise if it is open."""
+        state = self.state
+        if state == CircuitState.OPEN or (
+            state == CircuitState.HALF_OPEN and self._probes >= self._half_open_probes
+        ):
+            LLM_CIRCUIT_REJECTIONS_TOTAL.inc()
+            raise CircuitOpenError(
+                "Anthropic API circuit is open",
+                details={"state": state.name.lower(), "failures": self._failures},
+            )
+
+        probe = state == CircuitState.HALF_OPEN
+        if probe:
+            self._probes += 1
+        try:
+            yield
+        except BaseException as e:
+            if self._is_failure(e):
+                self._record_failure()
+            raise
+        else:
+            self._record_success()
+        finally:
+            if probe:
+                self._probes -= 1
+
+    def _record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def _record_failure(self) -> None:
+        self._failures += 1
+        if self._opened_at is not None or self._failures >= self._failure_threshold:
+            # Opens, or reopens after a failed probe
+            self._opened_at = time.monotonic()
@@ -1,26 +1,54 @@
 """High-level session management orchestrating database, safety, and AI components."""
 
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator, Callable, Sequence
 from uuid import UUID
 
 import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from therapeutic_agent.core.anthropic_client import AnthropicTherapeuticClient
+from therapeutic_agent.core.anthropic_client import (
+    TherapeuticPromptBuilder,
+    get_anthropic_client,
+)
 from therapeutic_agent.core.config import get_settings
+from therapeutic_agent.core.context import (
+    ContextWindow,
+    HistoryMessage,
+    estimate_tokens,
+)
 from therapeutic_agent.core.exceptions import (
+    JobNotFoundError,
     SessionLimitExceededError,
     SessionNotFoundError,
 )
+from therapeutic_agent.core.jobs import JobHandler
+from therapeutic_agent.core.limiter import Priority
+from therapeutic_agent.core.speculation import Speculation
+from therapeutic_agent.safety.conversation import ConversationSafetyState
 from therapeutic_agent.safety.engine import SafetyEngine
 from therapeutic_agent.safety.validators import SafetyLevel, SafetyResult
 from therapeutic_agent.storage.database import get_database_manager
-from therapeutic_agent.storage.models import MessageRole, SafetyFlag, SessionStatus
+from therapeutic_agent.storage.models import (
+    BackgroundJob,
+    ConversationMessage,
+    JobKind,
+    MessageRole,
+    SafetyFlag,
+    SessionStatus,
+    TherapeuticSession,
+)
 from therapeutic_agent.storage.repository import (
+    JobRepository,
+    MessageCursor,
     MessageRepository,
-    SafetyRepository,
     SessionRepository,
+    TurnUnitOfWork,
 )
+from therapeutic_agent.storage.session_cache import CachedSession, create_session_cache
+from therapeutic_agent.storage.write_behind import WriteBehindQueue
 
 logger = structlog.get_logger()
 
@@ -28,10 +56,67 @@ logger = structlog.get_logger()
 class TherapeuticSessionManager:
     """Orchestrates therapeutic sessions with safety validation and AI integration."""
 
+    # Response history starts at a multiple of this many messages so the
+    # cached prompt prefix survives several turns
+    CACHE_BLOCK_MESSAGES = 10
+    SUMMARY_MAX_CHARS = 2000
+    # Summary updates that lose to another writer this many times in a row
+    # give up until the next turn or job
+    SUMMARY_MAX_CONFLICTS = 3
+
     def __init__(self) -> None:
-        self._anthropic_client = AnthropicTherapeuticClient()
+        self._anthropic_client = get_anthropic_client()
         self._safety_engine = SafetyEngine()
         self._settings = get_settings()
+        self._context_window = ContextWindow(
+            self._settings.therapy.context_budget_tokens,
+            block_messages=self.CACHE_BLOCK_MESSAGES,
+        )
+        self._summary_window = ContextWindow(
+            self._settings.therapy.analysis_budget_tokens
+        )
+        self._summary_interval = self._settings.therapy.session_summary_interval
+        self._summary_tasks: dict[UUID, asyncio.Task[None]] = {}
+        self._speculative = self._settings.therapy.speculative_generation
+        self._session_cache = create_session_cache(self._settings)
+        write_behind = self._settings.write_behind
+        self._write_behind = (
+            WriteBehindQueue(
+                get_database_manager,
+                self._session_cache,
+                durability=write_behind.durability,
+                flush_interval_ms=write_behind.flush_interval_ms,
+                batch_rows=write_behind.batch_rows,
+                max_pending=write_behind.max_pending,
+            )
+            if write_behind.enabled
+            else None
+        )
+
+    @property
+    def safety_engine(self) -> SafetyEngine:
+        return self._safety_engine
+
+    def close(self) -> None:
+        """Release worker pools held by the session manager.
+
+        Summary updates still running are cancelled; they are picked up again
+        by the next turn of their session.
+        """
+        for task in self._summary_tasks.values():
+            task.cancel()
+        if self._write_behind is not None:
+            self._write_behind.cancel()
+        self._safety_engine.shutdown()
+
+    async def flush_writes(self) -> None:
+        """Write the turns still queued for write-behind; call before ``close``."""
+        if self._write_behind is not None:
+            await self._write_behind.close()
+
+    async def wait_for_summaries(self) -> None:
+        """Wait until the summary updates scheduled so far have finished."""
+        await asyncio.gather(*self._summary_tasks.values(), return_exceptions=True)
 
     async def create_session(
         self, user_id: str, title: str | None = None
@@ -40,7 +125,7 @@ class TherapeuticSessionManager:
         db_manager = await get_database_manager()
 
         async with db_manager.get_session() as db_session:
-            session_repo = SessionRepository(db_session)
+            session_repo = SessionRepository(db_session, self._session_cache)
 
             active_count = await session_repo.get_active_session_count(user_id)
             max_sessions = self._settings.security.max_sessions_per_user
@@ -70,188 +155,558 @@ class TherapeuticSessionManager:
     async def send_message(
         self, session_id: UUID, user_message: str, user_id: str | None = None
     ) -> dict[str, Any]:
-        """Process message with safety validation and generate response."""
-        if not user_message.strip():
-            raise ValueError("Message content cannot be empty")
+        """Process message with safety validation and generate response.
+
+        The turn runs in short database phases so that no pooled connection is
+        held while the Anthropic request is in flight: the session is read,
+        validated and the user message persisted in one transaction, the
+        response is generated without a connection, and the reply is persisted
+        in a second transaction.
+
+        With ``speculative_generation`` enabled, the response is requested as
+        soon as the history is read, while the message is still validated and
+        persisted. An unsafe message cancels that request.
+        """
+        intervention, generation_args, speculation = await self._begin_turn(
+            session_id,
+            user_message,
+            user_id,
+            speculate=self._speculate_response if self._speculative else None,
+        )
+        if intervention is not None:
+            return intervention
+
+        try:
+            ai_response = None
+            if speculation is not None:
+                ai_response = await speculation.result()
+            if ai_response is None:
+                # Also when a speculation ended without producing a reply
+                ai_response = (
+                    await self._anthropic_client.generate_therapeutic_response(
+                        **generation_args
+                    )
+                )
+            return await self._complete_turn(session_id, ai_response)
+        except Exception as e:
+            logger.error(
+                "Failed to generate AI response",
+                session_id=str(session_id),
+                error=str(e),
+            )
+            return await self._fallback_turn(session_id, e)
 
-        db_manager = await get_database_manager()
+    async def stream_message(
+        self, session_id: UUID, user_message: str, user_id: str | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Like ``send_message``, but stream the response as it is generated.
+
+        The session is checked, the message validated and persisted before
+        this returns, so those errors are raised here rather than mid-stream.
+        The returned iterator yields ``{"type": "text", "text": ...}`` deltas
+        and always ends with ``{"type": "done", "response": ...}`` carrying
+        what ``send_message`` would return. The reply is persisted once the
+        stream completes; if generation fails part way, the done event
+        carries the fallback response, which replaces any streamed text.
+
+        A speculative stream buffers its deltas until the message has passed
+        validation, and they are yielded from there.
+        """
+        intervention, generation_args, speculation = await self._begin_turn(
+            session_id,
+            user_message,
+            user_id,
+            speculate=self._speculate_stream if self._speculative else None,
+        )
+        return self._stream_reply(
+            session_id, intervention, generation_args, speculation
+        )
 
-        async with db_manager.get_session() as db_session:
-            session_repo = SessionRepository(db_session)
-            message_repo = MessageRepository(db_session)
-            safety_repo = SafetyRepository(db_session)
+    async def _stream_reply(
+        self,
+        session_id: UUID,
+        intervention: dict[str, Any] | None,
+        generation_args: dict[str, Any],
+        speculation: Speculation | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        if intervention is not None:
+            yield {"type": "done", "response": intervention}
+            return
+
+        try:
+            ai_response = None
+            events = (
+                speculation.stream()
+                if speculation is not None
+                else self._anthropic_client.stream_therapeutic_response(
+                    **generation_args
+                )
+            )
+            async for event in events:
+                if event["type"] == "text":
+                    yield event
+                else:
+                    ai_response = event["response"]
+            if ai_response is None:
+                raise RuntimeError("Response stream ended without a final message")
+            response = await self._complete_turn(session_id, ai_response)
+        except Exception as e:
+            logger.error(
+                "Failed to stream AI response",
+                session_id=str(session_id),
+                error=str(e),
+            )
+            response = await self._fallback_turn(session_id, e)
 
-            session = await session_repo.get_session(session_id)
-            if not session:
-                raise SessionNotFoundError(f"Session {session_id} not found")
+        yield {"type": "done", "response": response}
 
-            if user_id and session.user_id != user_id:
-                raise SessionNotFoundError("Session not found for this user")
+    def _speculate_response(
+        self, generation_args: dict[str, Any], estimated_input_tokens: int
+    ) -> Speculation:
+        return Speculation(
+            lambda _: self._anthropic_client.generate_therapeutic_response(
+                **generation_args
+            ),
+            estimated_input_tokens,
+        )
 
-            if session.status != SessionStatus.ACTIVE:
-                raise ValueError(f"Session is {session.status}, cannot send messages")
+    def _speculate_stream(
+        self, generation_args: dict[str, Any], estimated_input_tokens: int
+    ) -> Speculation:
+        async def buffer(speculation: Speculation) -> dict[str, Any] | None:
+            async for event in self._anthropic_client.stream_therapeutic_response(
+                **generation_args
+            ):
+                if event["type"] == "text":
+                    speculation.record_output(event["text"])
+                speculation.events.put_nowait(event)
+                if event["type"] == "done":
+                    return event["response"]
+            return None
+
+        return Speculation(buffer, estimated_input_tokens)
+
+    async def _begin_turn(
+        self,
+        session_id: UUID,
+        user_message: str,
+        user_id: str | None,
+        speculate: Callable[[dict[str, Any], int], Speculation] | None = None,
+    ) -> tuple[dict[str, Any] | None, dict[str, Any], Speculation | None]:
+        """Validate and persist the user message in one transaction.
+
+        Returns the safety intervention response when the message is unsafe,
+        otherwise the arguments for generating the reply. Given ``speculate``,
+        generation is started with those arguments before validation; the
+        speculation is returned once the message is accepted and discarded
+        in every other case.
+        """
+        if not user_message.strip():
+            raise ValueError("Message content cannot be empty")
+
+        speculation = None
+        try:
+            await self._wait_for_writes(session_id)
+            # The turn's writes, with one update of the session row
+            turn = TurnUnitOfWork()
+            db_manager = await get_database_manager()
+            async with db_manager.get_session() as db_session:
+                session_repo = SessionRepository(db_session, self._session_cache)
+
+                session, recent_messages = (
+                    await session_repo.get_session_with_recent_messages(
+                        session_id, self._settings.therapy.context_max_messages
+                    )
+                )
+                if not session:
+                    raise SessionNotFoundError(f"Session {session_id} not found")
+
+                if user_id and session.user_id != user_id:
+                    raise SessionNotFoundError("Session not found for this user")
 
-            conversation_history = [
-                {"role": msg.role, "content": msg.content}
-                for msg in session.messages[-20:]  # Last 20 messages for context
-            ]
+                if session.status != SessionStatus.ACTIVE:
+                    raise ValueError(
+                        f"Session is {session.status}, cannot send messages"
+                    )
+
+                # Earlier messages are covered by the rolling summary
+                unsummarized = session.message_count - session.summarized_message_count
+                unsummarized_messages = recent_messages[
+                    max(0, len(recent_messages) - unsummarized) :
+                ]
+                session_summary = (
+                    session.summary if session.summarized_message_count else None
+                )
+                # Token estimates filled in here are saved with this
+                # transaction; cached messages already carry them. Blocks are
+                # counted from the end of the summary, which only moves when
+                # the summary is updated.
+                history = self._context_window.select(
+                    unsummarized_messages,
+                    offset=max(0, unsummarized - len(unsummarized_messages)),
+                )
+                conversation_history = [
+                    {"role": msg.role, "content": msg.content} for msg in history
+                ]
+                # Captured here so nothing below touches ORM state after release
+                generation_args = {
+                    "user_message": user_message,
+                    "conversation_history": conversation_history,
+                    "session_context": {
+                        "session_length": session.message_count + 1,
+                        "safety_score": session.safety_score,
+                        "last_activity": session.last_activity.isoformat(),
+                    },
+                    "session_summary": session_summary,
+                    "priority": self._generation_priority(session.safety_state),
+                }
+                if speculate is not None:
+                    speculation = speculate(
+                        generation_args,
+                        self._estimate_prompt_tokens(history, generation_args),
+                    )
 
-            safety_result = await self._safety_engine.validate_content(
-                user_message,
-                context={
+                safety_context = {
                     "session_id": str(session_id),
                     "conversation_history": conversation_history,
                     "session_metadata": {
                         "message_count": session.message_count,
                         "safety_score": session.safety_score,
                     },
-                },
-            )
-
-            await message_repo.add_message(
-                session_id=session_id,
-                role=MessageRole.USER,
-                content=user_message,
-                safety_score=(
-                    safety_result.confidence if not safety_result.is_safe else None
-                ),
-                metadata={"safety_validated": True},
-            )
-
-            if not safety_result.is_safe:
-                await self._handle_safety_violation(
-                    safety_repo, session_id, safety_result, user_message
+                }
+                safety_result = await self._safety_engine.validate_content(
+                    user_message, context=safety_context
                 )
 
-                response_content = (
-                    safety_result.suggested_response
-                    or self._get_default_safety_response(safety_result.level)
+                # Indicators split across this and earlier messages
+                safety_state = ConversationSafetyState.from_dict(session.safety_state)
+                across_result = await self._safety_engine.validate_conversation_turn(
+                    safety_state, user_message, context=safety_context
+                )
+                new_safety_state = safety_state.to_dict()
+                if safety_result.is_safe and not across_result.is_safe:
+                    safety_result = across_result
+                generation_args["priority"] = self._generation_priority(
+                    new_safety_state
                 )
 
-                assistant_message = await message_repo.add_message(
+                intervention = None
+                if not safety_result.is_safe and speculation is not None:
+                    speculation.discard()
+                    speculation = None
+
+                turn.update_safety_state(session_id, new_safety_state)
+
+                await turn.add_message(
                     session_id=session_id,
-                    role=MessageRole.ASSISTANT,
-                    content=response_content,
-                    metadata={
-                        "safety_intervention": True,
-                        "original_safety_level": safety_result.level,
-                    },
+                    role=MessageRole.USER,
+                    content=user_message,
+                    safety_score=(
+                        safety_result.confidence if not safety_result.is_safe else None
+                    ),
+                    metadata={"safety_validated": True},
                 )
 
-                return {
-                    "message_id": str(assistant_message.id),
-                    "content": response_content,
-                    "role": "assistant",
-                    "safety_intervention": True,
-                    "safety_level": safety_result.level,
-                    "timestamp": assistant_message.created_at.isoformat(),
-                }
+                if not safety_result.is_safe:
+                    await self._handle_safety_violation(
+                        turn, session_id, safety_result, user_message
+                    )
 
-            try:
-                ai_response = (
-                    await self._anthropic_client.generate_therapeutic_response(
-                        user_message=user_message,
-                        conversation_history=conversation_history,
-                        session_context={
-                            "session_length": session.message_count + 1,
-                            "safety_score": session.safety_score,
-                            "last_activity": session.last_activity.isoformat(),
+                    response_content = (
+                        safety_result.suggested_response
+                        or self._get_default_safety_response(safety_result.level)
+                    )
+
+                    assistant_message = await turn.add_message(
+                        session_id=session_id,
+                        role=MessageRole.ASSISTANT,
+                        content=response_content,
+                        metadata={
+                            "safety_intervention": True,
+                            "original_safety_level": safety_result.level,
                         },
                     )
+
+                    intervention = {
+                        "message_id": str(assistant_message.id),
+                        "content": response_content,
+                        "role": "assistant",
+                        "safety_intervention": True,
+                        "safety_level": safety_result.level,
+                        "timestamp": assistant_message.created_at.isoformat(),
+                    }
+
+                if self._write_behind is None:
+                    await turn.apply(db_session, self._session_cache)
+            if self._write_behind is not None:
+                await self._write_behind.submit(turn)
+        except BaseException:
+            if speculation is not None:
+                speculation.discard()
+            raise
+
+        if speculation is not None:
+            speculation.accept()
+
+        # Scheduled once the new messages are committed
+        self._schedule_summary(session_id, unsummarized)
+        if intervention is not None:
+            return intervention, {}, None
+        return None, generation_args, speculation
+
+    @staticmethod
+    def _generation_priority(safety_state: Any) -> Priority:
+        """Replies to sessions with recent safety matches go first."""
+        if ConversationSafetyState.from_dict(safety_state).matches():
+            return Priority.SAFETY
+        return Priority.INTERACTIVE
+
+    @staticmethod
+    def _estimate_prompt_tokens(
+        history: Sequence[HistoryMessage], generation_args: dict[str, Any]
+    ) -> int:
+        """Rough input size of a reply request, for speculation accounting."""
+        return (
+            estimate_tokens(TherapeuticPromptBuilder.THERAPEUTIC_SYSTEM_PROMPT)
+            + estimate_tokens(generation_args["session_summary"] or "")
+            + sum(ContextWindow.message_tokens(msg) for msg in history)
+            + estimate_tokens(generation_args["user_message"])
+        )
+
+    def _schedule_summary(self, session_id: UUID, unsummarized: int) -> None:
+        """Start a background summary update if the session has fallen behind.
+
+        While a session is active its last ``session_summary_interval``
+        messages stay out of the summary, and it is updated once twice that
+        many are waiting. Prompts therefore carry between one and two
+        intervals of raw history after the summary. Ended sessions are caught
+        up by a ``session_summary`` job instead.
+        """
+        if session_id in self._summary_tasks:
+            return
+        if unsummarized < 2 * self._summary_interval:
+            return
+
+        task = asyncio.create_task(self._rolling_summary(session_id))
+        self._summary_tasks[session_id] = task
+        task.add_done_callback(lambda _: self._summary_tasks.pop(session_id, None))
+
+    async def _rolling_summary(self, session_id: UUID) -> None:
+        try:
+            await self._update_summary(session_id)
+        except Exception as e:
+            logger.error(
+                "Failed to update session summary",
+                session_id=str(session_id),
+                error=str(e),
+            )
+
+    def job_handlers(self) -> dict[str, JobHandler]:
+        """Handlers for the background jobs the session manager enqueues."""
+        return {JobKind.SESSION_SUMMARY: self._run_summary_job}
+
+    async def _run_summary_job(self, job: BackgroundJob) -> dict[str, Any]:
+        if job.session_id is None:
+            raise ValueError("Summary job has no session")
+        return {"summarized_message_count": await self._update_summary(job.session_id)}
+
+    async def _update_summary(self, session_id: UUID) -> int:
+        """Fold unsummarized messages into the session summary.
+
+        Runs outside any request. Like a turn, it reads in one transaction,
+        calls the model without holding a connection and writes in another.
+        Messages are folded in batches that fit the summary token budget,
+        each read from where the summary ends, until the session is caught
+        up, which for an ended session means every message. Returns how many
+        messages the summary covers.
+        """
+        await self._wait_for_writes(session_id)
+        db_manager = await get_database_manager()
+        conflicts = 0
+        while True:
+            async with db_manager.get_session() as db_session:
+                session, _ = await SessionRepository(
+                    db_session, self._session_cache
+                ).get_session_with_recent_messages(session_id, 0)
+                if session is None:
+                    raise SessionNotFoundError(f"Session {session_id} not found")
+
+                keep = (
+                    self._summary_interval
+                    if session.status == SessionStatus.ACTIVE
+                    else 0
+                )
+                unsummarized = session.message_count - session.summarized_message_count
+                if unsummarized - keep < (self._summary_interval if keep else 1):
+                    return session.summarized_message_count
+
+                expected = session.summarized_message_count
+                pending = await MessageRepository(db_session).get_session_messages(
+                    session_id,
+                    limit=min(
+                        unsummarized - keep,
+                        self._settings.therapy.context_max_messages,
+                    ),
+                    offset=expected,
                 )
+                batch = self._summary_window.take(pending)
+                if not batch:
+                    return expected
+                covered = expected + len(batch)
+                previous_summary = session.summary if expected else None
+                new_messages = [
+                    {"role": msg.role, "content": msg.content} for msg in batch
+                ]
+
+            result = await self._anthropic_client.summarize_conversation(
+                previous_summary, new_messages
+            )
 
-                assistant_message = await message_repo.add_message(
-                    session_id=session_id,
-                    role=MessageRole.ASSISTANT,
-                    content=ai_response["content"],
-                    token_count=ai_response["usage"]["output_tokens"],
-                    processing_time_ms=ai_response["processing_time_ms"],
-                    metadata={
-                        "model": ai_response["model"],
-                        "input_tokens": ai_response["usage"]["input_tokens"],
-                        "stop_reason": ai_response["stop_reason"],
-                    },
+            async with db_manager.get_session() as db_session:
+                updated = await SessionRepository(
+                    db_session, self._session_cache
+                ).update_session_summary(
+                    session_id,
+                    result["summary"][: self.SUMMARY_MAX_CHARS],
+                    summarized_message_count=covered,
+                    expected_message_count=expected,
                 )
+            if not updated:
+                conflicts += 1
+                if conflicts >= self.SUMMARY_MAX_CONFLICTS:
+                    logger.warning(
+                        "Gave up updating session summary",
+                        session_id=str(session_id),
+                        conflicts=conflicts,
+                    )
+                    return expected
+                # Another update landed first; continue from where it ended
+                continue
 
-                await session_repo.update_session_activity(session_id)
+            logger.info(
+                "Updated session summary",
+                session_id=str(session_id),
+                summarized_message_count=covered,
+                tokens_used=result["tokens_used"],
+            )
 
-                logger.info(
-                    "Generated therapeutic response",
-                    session_id=str(session_id),
-                    response_length=len(ai_response["content"]),
-                    processing_time_ms=ai_response["processing_time_ms"],
-                    tokens_used=ai_response["usage"]["input_tokens"]
-                    + ai_response["usage"]["output_tokens"],
-                )
+    async def _complete_turn(
+        self, session_id: UUID, ai_response: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Persist a generated reply in its own transaction."""
+        async with self._reply_turn() as turn:
+            assistant_message = await turn.add_message(
+                session_id=session_id,
+                role=MessageRole.ASSISTANT,
+                content=ai_response["content"],
+                token_count=ai_response["usage"]["output_tokens"],
+                processing_time_ms=ai_response["processing_time_ms"],
+                time_to_first_token_ms=ai_response.get("time_to_first_token_ms"),
+                metadata={
+                    "model": ai_response["model"],
+                    "input_tokens": ai_response["usage"]["input_tokens"],
+                    "cache_read_input_tokens": ai_response["usage"].get(
+                        "cache_read_input_tokens", 0
+                    ),
+                    "cache_creation_input_tokens": ai_response["usage"].get(
+                        "cache_creation_input_tokens", 0
+                    ),
+                    "stop_reason": ai_response["stop_reason"],
+                },
+            )
 
-                return {
-                    "message_id": str(assistant_message.id),
-                    "content": ai_response["content"],
-                    "role": "assistant",
-                    "safety_intervention": False,
-                    "timestamp": assistant_message.created_at.isoformat(),
-                    "metadata": {
-                        "processing_time_ms": ai_response["processing_time_ms"],
-                        "tokens_used": ai_response["usage"]["input_tokens"]
-                        + ai_response["usage"]["output_tokens"],
-                    },
-                }
+        tokens_used = (
+            ai_response["usage"]["input_tokens"] + ai_response["usage"]["output_tokens"]
+        )
+        logger.info(
+            "Generated therapeutic response",
+            session_id=str(session_id),
+            response_length=len(ai_response["content"]),
+            processing_time_ms=ai_response["processing_time_ms"],
+            time_to_first_token_ms=ai_response.get("time_to_first_token_ms"),
+            tokens_used=tokens_used,
+        )
 
-            except Exception as e:
-                logger.error(
-                    "Failed to generate AI response",
-                    session_id=str(session_id),
-                    error=str(e),
-                )
+        metadata = {
+            "processing_time_ms": ai_response["processing_time_ms"],
+            "tokens_used": tokens_used,
+        }
+        if ai_response.get("time_to_first_token_ms") is not None:
+            metadata["time_to_first_token_ms"] = ai_response["time_to_first_token_ms"]
+
+        return {
+            "message_id": str(assistant_message.id),
+            "content": ai_response["content"],
+            "role": "assistant",
+            "safety_intervention": False,
+            "timestamp": assistant_message.created_at.isoformat(),
+            "metadata": metadata,
+        }
 
-                fallback_response = (
-                    "I apologize, but I'm having difficulty processing "
-                    "your message right now. Could you please try "
-                    "rephrasing your question or concern?"
-                )
+    @asynccontextmanager
+    async def _reply_turn(self) -> AsyncIterator[TurnUnitOfWork]:
+        """Record a reply's writes, applied when the block exits.
+
+        Without write-behind they are applied in a transaction of their own;
+        with it, they are submitted to the write-behind queue.
+        """
+        turn = TurnUnitOfWork()
+        yield turn
+        if self._write_behind is not None:
+            await self._write_behind.submit(turn)
+            return
+        db_manager = await get_database_manager()
+        async with db_manager.get_session() as db_session:
+            await turn.apply(db_session, self._session_cache)
 
-                assistant_message = await message_repo.add_message(
-                    session_id=session_id,
-                    role=MessageRole.ASSISTANT,
-                    content=fallback_response,
-                    metadata={"fallback_response": True, "error": str(e)},
-                )
+    async def _wait_for_writes(self, session_id: UUID) -> None:
+        """Wait for the session's queued write-behind rows, to read them back."""
+        if self._write_behind is not None:
+            await self._write_behind.wait(session_id)
 
-                return {
-                    "message_id": str(assistant_message.id),
-                    "content": fallback_response,
-                    "role": "assistant",
-                    "safety_intervention": False,
-                    "error": "AI response generation failed",
-                    "timestamp": assistant_message.created_at.isoformat(),
-                }
+    async def _fallback_turn(
+        self, session_id: UUID, error: Exception
+    ) -> dict[str, Any]:
+        """Persist and return the fallback reply after generation failed."""
+        fallback_response = (
+            "I apologize, but I'm having difficulty processing "
+            "your message right now. Could you please try "
+            "rephrasing your question or concern?"
+        )
+
+        async with self._reply_turn() as turn:
+            assistant_message = await turn.add_message(
+                session_id=session_id,
+                role=MessageRole.ASSISTANT,
+                content=fallback_response,
+                metadata={"fallback_response": True, "error": str(error)},
+            )
+
+        return {
+            "message_id": str(assistant_message.id),
+            "content": fallback_response,
+            "role": "assistant",
+            "safety_intervention": False,
+            "error": "AI response generation failed",
+            "timestamp": assistant_message.created_at.isoformat(),
+        }
 
     async def get_session(
         self, session_id: UUID, user_id: str | None = None
     ) -> dict[str, Any]:
-        """Retrieve session details with conversation history."""
+        """Retrieve session details with the latest page of its history.
+
+        Earlier messages are read with ``get_messages``, passing
+        ``previous_cursor`` as ``before``.
+        """
+        await self._wait_for_writes(session_id)
         db_manager = await get_database_manager()
 
         async with db_manager.get_session() as db_session:
-            session_repo = SessionRepository(db_session)
-            session = await session_repo.get_session(session_id)
-
-            if not session:
-                raise SessionNotFoundError(f"Session {session_id} not found")
-
-            if user_id and session.user_id != user_id:
-                raise SessionNotFoundError("Session not found for this user")
-
-            messages = [
-                {
-                    "id": str(msg.id),
-                    "role": msg.role,
-                    "content": msg.content,
-                    "timestamp": msg.created_at.isoformat(),
-                    "metadata": msg.message_metadata,
-                }
-                for msg in session.messages
-            ]
+            session = await self._get_user_session(db_session, session_id, user_id)
+            messages, has_more = await MessageRepository(db_session).get_message_page(
+                session_id, self._settings.therapy.history_page_size
+            )
 
             return {
                 "session_id": str(session.id),
@@ -263,18 +718,112 @@ class TherapeuticSessionManager:
                 "message_count": session.message_count,
                 "created_at": session.created_at.isoformat(),
                 "last_activity": session.last_activity.isoformat(),
-                "messages": messages,
+                **self._message_page(messages, has_more),
             }
 
+    async def get_messages(
+        self,
+        session_id: UUID,
+        user_id: str | None = None,
+        after: str | None = None,
+        before: str | None = None,
+        since: datetime | None = None,
+        limit: int | None = None,
+    ) -> dict[str, Any]:
+        """Retrieve a page of a session's history, oldest message first.
+
+        ``after`` and ``before`` take cursors from earlier pages; ``since``
+        returns the messages created after a time. At most one of them may
+        be given; with none, the latest page is returned. ``has_more`` tells
+        whether more messages exist beyond the page in the direction read.
+        Polling with ``next_cursor`` as ``after`` fetches only new messages.
+        Raises ValueError for an invalid cursor or combination.
+        """
+        if sum(arg is not None for arg in (after, before, since)) > 1:
+            raise ValueError("Pass at most one of after, before and since")
+        after_cursor = MessageCursor.decode(after) if after is not None else None
+        before_cursor = MessageCursor.decode(before) if before is not None else None
+        if since is not None:
+            after_cursor = MessageCursor.since(since)
+
+        await self._wait_for_writes(session_id)
+        db_manager = await get_database_manager()
+
+        async with db_manager.get_session() as db_session:
+            await self._get_user_session(db_session, session_id, user_id)
+            messages, has_more = await MessageRepository(db_session).get_message_page(
+                session_id,
+                limit or self._settings.therapy.history_page_size,
+                after=after_cursor,
+                before=before_cursor,
+            )
+
+            return {
+                "session_id": str(session_id),
+                **self._message_page(messages, has_more, after_cursor),
+            }
+
+    async def _get_user_session(
+        self, db_session: AsyncSession, session_id: UUID, user_id: str | None
+    ) -> TherapeuticSession | CachedSession:
+        """Read a session's header, checking that it belongs to ``user_id``."""
+        session, _ = await SessionRepository(
+            db_session, self._session_cache
+        ).get_session_with_recent_messages(session_id, 0)
+
+        if not session:
+            raise SessionNotFoundError(f"Session {session_id} not found")
+
+        if user_id and session.user_id != user_id:
+            raise SessionNotFoundError("Session not found for this user")
+
+        return session
+
+    @staticmethod
+    def _message_page(
+        messages: list[ConversationMessage],
+        has_more: bool,
+        after: MessageCursor | None = None,
+    ) -> dict[str, Any]:
+        """Serialize a history page and the cursors on either side of it."""
+        if messages:
+            after = MessageCursor.of(messages[-1])
+        return {
+            "messages": [
+                {
+                    "id": str(msg.id),
+                    "role": msg.role,
+                    "content": msg.content,
+                    "timestamp": msg.created_at.isoformat(),
+                    "metadata": msg.message_metadata,
+                }
+                for msg in messages
+            ],
+            "has_more": has_more,
+            "previous_cursor": (
+                MessageCursor.of(messages[0]).encode() if messages else None
+            ),
+            "next_cursor": after.encode() if after is not None else None,
+        }
+
     async def end_session(
         self, session_id: UUID, user_id: str | None = None
     ) -> dict[str, Any]:
-        """End therapeutic session and generate summary."""
+        """End therapeutic session.
+
+        The rolling summary is returned as it stands, so no model call is
+        made here. When messages remain that it does not cover, a
+        ``session_summary`` job is enqueued in the same transaction to fold
+        them in, and its handle is returned for polling with ``get_job``.
+        """
+        await self._wait_for_writes(session_id)
         db_manager = await get_database_manager()
 
         async with db_manager.get_session() as db_session:
-            session_repo = SessionRepository(db_session)
-            session = await session_repo.get_session(session_id)
+            session_repo = SessionRepository(db_session, self._session_cache)
+            session, _ = await session_repo.get_session_with_recent_messages(
+                session_id, 0
+            )
 
             if not session:
                 raise SessionNotFoundError(f"Session {session_id} not found")
@@ -285,34 +834,19 @@ class TherapeuticSessionManager:
             if session.status != SessionStatus.ACTIVE:
                 raise ValueError("Session is not active")
 
-            if session.message_count > 5:
-                try:
-                    conversation_history = [
-                        {"role": msg.role, "content": msg.content}
-                        for msg in session.messages
-                    ]
-
-                    analysis = (
-                        await self._anthropic_client.analyze_conversation_patterns(
-                            conversation_history, "therapeutic_progress"
-                        )
-                    )
-
-                    session.summary = analysis["analysis"][
-                        :1000
-                    ]  # Limit summary length
-
-                except Exception as e:
-                    logger.error(
-                        "Failed to generate session summary",
-                        session_id=str(session_id),
-                        error=str(e),
-                    )
-
             await session_repo.update_session_status(
                 session_id, SessionStatus.COMPLETED
             )
 
+            summary_job = None
+            unsummarized = session.message_count - session.summarized_message_count
+            if session.message_count > 5 and unsummarized > 0:
+                summary_job = await JobRepository(db_session).enqueue(
+                    JobKind.SESSION_SUMMARY,
+                    max_attempts=self._settings.jobs.max_attempts,
+                    session_id=session_id,
+                )
+
             logger.info(
                 "Ended therapeutic session",
                 session_id=str(session_id),
@@ -324,12 +858,49 @@ class TherapeuticSessionManager:
                 "status": SessionStatus.COMPLETED,
                 "message_count": session.message_count,
                 "summary": session.summary,
+                "summary_job": (
+                    {"job_id": str(summary_job.id), "status": summary_job.status}
+                    if summary_job
+                    else None
+                ),
                 "ended_at": datetime.now(timezone.utc).isoformat(),
             }
 
+    async def get_job(self, job_id: UUID, user_id: str | None = None) -> dict[str, Any]:
+        """Retrieve the status of a background job."""
+        db_manager = await get_database_manager()
+
+        async with db_manager.get_session() as db_session:
+            job = await JobRepository(db_session).get_job(job_id)
+            if not job:
+                raise JobNotFoundError(f"Job {job_id} not found")
+
+            if user_id and job.session_id:
+                session, _ = await SessionRepository(
+                    db_session, self._session_cache
+                ).get_session_with_recent_messages(job.session_id, 0)
+                if not session or session.user_id != user_id:
+                    raise JobNotFoundError("Job not found for this user")
+
+            return {
+                "job_id": str(job.id),
+                "kind": job.kind,
+                "status": job.status,
+                "session_id": str(job.session_id) if job.session_id else None,
+                "attempts": job.attempts,
+                "max_attempts": job.max_attempts,
+                "run_after": job.run_after.isoformat(),
+                "last_error": job.last_error,
+                "result": job.result,
+                "created_at": job.created_at.isoformat(),
+                "finished_at": (
+                    job.finished_at.isoformat() if job.finished_at else None
+                ),
+            }
+
     async def _handle_safety_violation(
         self,
-        safety_repo: SafetyRepository,
+        turn: TurnUnitOfWork,
         session_id: UUID,
         safety_result: SafetyResult,
         user_message: str,
@@ -352,7 +923,7 @@ class TherapeuticSessionManager:
             SafetyFlag.INAPPROPRIATE_REQUEST,
         )
 
-        await safety_repo.create_safety_event(
+        await turn.create_safety_event(
             session_id=session_id,
             flag_type=flag_type,
             severity_score=1.0 - safety_result.confidence,
@@ -0,0 +1,103 @@
+"""Reply generation started before the message it answers is validated."""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from therapeutic_agent.core.context import estimate_tokens
+from therapeutic_agent.core.metrics import (
+    SPECULATIVE_GENERATIONS_TOTAL,
+    SPECULATIVE_LATENCY_SAVED_SECONDS,
+    SPECULATIVE_WASTED_TOKENS_TOTAL,
+)
+
+
+class Speculation:
+    """A reply being generated while its user message is still validated.
+
+    The generation runs as a task from the moment the speculation is
+    created. Once the message passes validation, ``accept`` releases the
+    reply to the caller through ``result`` (or ``stream`` for streamed
+    generations, which report their events to ``events``). Otherwise
+    ``discard`` cancels the request; nothing it produced is ever returned.
+
+    Accepted speculations record how much sooner their output started than
+    it would have if generation had waited for validation. Discarded ones
+    record the tokens they spent: the API's counts if the reply had
+    finished, otherwise the estimated prompt and any streamed output.
+    """
+
+    def __init__(
+        self,
+        generation: Callable[["Speculation"], Awaitable[dict[str, Any] | None]],
+        estimated_input_tokens: int,
+    ) -> None:
+        self.events: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._estimated_input_tokens = estimated_input_tokens
+        self._output_tokens = 0
+        self._started = time.perf_counter()
+        self._output_at: float | None = None
+        self._task = asyncio.create_task(self._run(generation))
+
+    async def _run(
+        self, generation: Callable[["Speculation"], Awaitable[dict[str, Any] | None]]
+    ) -> dict[str, Any] | None:
+        try:
+            return await generation(self)
+        except Exception as e:
+            self.events.put_nowait({"type": "error", "error": e})
+            raise
+        finally:
+            self.output_started()
+
+    def output_started(self) -> None:
+        """Note that the generation has produced its first output."""
+        if self._output_at is None:
+            self._output_at = time.perf_counter()
+
+    def record_output(self, text: str) -> None:
+        """Count streamed output towards the tokens wasted if discarded."""
+        self.output_started()
+        self._output_tokens += estimate_tokens(text)
+
+    def accept(self) -> None:
+        """The message passed validation; the reply may be used."""
+        ready = time.perf_counter()
+        output_at = self._output_at if self._output_at is not None else ready
+        SPECULATIVE_LATENCY_SAVED_SECONDS.observe(min(ready, output_at) - self._started)
+        SPECULATIVE_GENERATIONS_TOTAL.labels(outcome="used").inc()
+
+    def discard(self) -> None:
+        """Cancel the generation and account for what it cost."""
+        if self._task.done() and not self._task.cancelled():
+            if self._task.exception() is None and (response := self._task.result()):
+                input_tokens = response["usage"]["input_tokens"]
+                output_tokens = response["usage"]["output_tokens"]
+            else:
+                input_tokens = output_tokens = 0
+        else:
+            self._task.cancel()
+            input_tokens = self._estimated_input_tokens
+            output_tokens = self._output_tokens
+
+        SPECULATIVE_WASTED_TOKENS_TOTAL.labels(kind="input").inc(input_tokens)
+        SPECULATIVE_WASTED_TOKENS_TOTAL.labels(kind="output").inc(output_tokens)
+        SPECULATIVE_GENERATIONS_TOTAL.labels(outcome="discarded").inc()
+
+    async def result(self) -> dict[str, Any] | None:
+        """The generated reply, once it is complete."""
+        return await self._task
+
+    async def stream(self) -> AsyncIterator[dict[str, Any]]:
+        """The events a streamed generation reported, including past ones."""
+        try:
+            while True:
+                event = await self.events.get()
+                if event["type"] == "error":
+                    await self._task
+                yield event
+                if event["type"] == "done":
+                    return
+        finally:
+            if not self._task.done():
+                self._task.cancel()
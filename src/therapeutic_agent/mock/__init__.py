@@ -0,0 +1,10 @@
+"""Local stand-ins for external services, for load tests and benchmarks."""
+
+from therapeutic_agent.mock.anthropic_server import (
+    MOCK_PROFILES,
+    MockProfile,
+    create_mock_app,
+    serve_mock,
+)
+
+__all__ = ["MOCK_PROFILES", "MockProfile", "create_mock_app", "serve_mock"]
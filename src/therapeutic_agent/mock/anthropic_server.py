@@ -0,0 +1,294 @@
+"""Stand-in for the Anthropic Messages API with configurable upstream behaviour.
+
+Implements ``POST /v1/messages``, streamed and not, closely enough for the
+SDK to parse its responses. Replies are filler text with the requested
+number of tokens, produced after a sampled time to first token and then at
+a fixed rate per token. Rate limit (429) and overload (529) errors can be
+injected at random or once more requests are in flight than the profile's
+``capacity``. Point the application at it with ``ANTHROPIC_BASE_URL``.
+"""
+
+import asyncio
+import json
+import random
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from therapeutic_agent.core.context import estimate_tokens
+
+FILLER = (
+    "Thank you for sharing that with me. It sounds like this week has asked a "
+    "lot of you, and it makes sense that you feel worn down. What has helped, "
+    "even a little, when things felt this heavy before?"
+).split(" ")
+
+
+class MockProfile(BaseModel):
+    """How the mock server behaves."""
+
+    latency_distribution: str = Field(
+        default="lognormal", pattern="^(fixed|uniform|lognormal)$"
+    )
+    latency_ms: float = Field(
+        default=400.0, ge=0, description="Median time to the first token"
+    )
+    latency_spread: float = Field(
+        default=0.5,
+        ge=0,
+        description="Lognormal sigma, or the uniform range as a fraction of "
+        "the median either side",
+    )
+    token_interval_ms: float = Field(default=10.0, ge=0)
+    output_tokens: int = Field(
+        default=60, ge=1, description="Tokens per reply, capped by max_tokens"
+    )
+    rate_limit_ratio: float = Field(default=0.0, ge=0, le=1)
+    overload_ratio: float = Field(default=0.0, ge=0, le=1)
+    retry_after_seconds: float | None = Field(
+        default=None, ge=0, description="Retry-After sent with 429 responses"
+    )
+    capacity: int | None = Field(
+        default=None,
+        ge=1,
+        description="Requests in flight beyond this are rate limited",
+    )
+    slow_stream_ratio: float = Field(
+        default=0.0, ge=0, le=1, description="Streams sent at the slow token rate"
+    )
+    slow_token_interval_ms: float = Field(default=500.0, ge=0)
+    seed: int | None = None
+
+
+MOCK_PROFILES: dict[str, MockProfile] = {
+    "instant": MockProfile(
+        latency_distribution="fixed", latency_ms=0, token_interval_ms=0
+    ),
+    "realistic": MockProfile(),
+    "overloaded": MockProfile(
+        rate_limit_ratio=0.05, overload_ratio=0.1, retry_after_seconds=1, capacity=16
+    ),
+    "slow-stream": MockProfile(slow_stream_ratio=0.25),
+}
+
+
+class MockState:
+    """Counts what the server has done, for ``GET /mock/stats``."""
+
+    def __init__(self) -> None:
+        self.outcomes: Counter[str] = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "outcomes": dict(self.outcomes),
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+def _text(content: Any) -> str:
+    """The text of a system prompt or message content, as sent by the SDK."""
+    if isinstance(content, str):
+        return content
+    return " ".join(
+        block.get("text", "") for block in content or [] if isinstance(block, dict)
+    )
+
+
+def input_tokens(body: dict[str, Any]) -> int:
+    """Estimated prompt size of a request."""
+    return estimate_tokens(_text(body.get("system"))) + sum(
+        estimate_tokens(_text(message.get("content")))
+        for message in body.get("messages", [])
+    )
+
+
+def _error(status_code: int, kind: str, message: str, **headers: str) -> JSONResponse:
+    return JSONResponse(
+        {"type": "error", "error": {"type": kind, "message": message}},
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def _sse(event: str, data: dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def create_mock_app(profile: MockProfile | None = None) -> FastAPI:
+    """Build the mock Messages API server for ``profile``."""
+    profile = profile or MOCK_PROFILES["realistic"]
+    rng = random.Random(profile.seed)
+    state = MockState()
+    app = FastAPI(title="Mock Anthropic API", docs_url=None, redoc_url=None)
+    app.state.profile = profile
+    app.state.mock = state
+
+    def first_token_seconds() -> float:
+        median = profile.latency_ms / 1000
+        if profile.latency_distribution == "uniform":
+            spread = median * profile.latency_spread
+            return max(0.0, rng.uniform(median - spread, median + spread))
+        if profile.latency_distribution == "lognormal" and median > 0:
+            return rng.lognormvariate(0, profile.latency_spread) * median
+        return median
+
+    def injected_error() -> JSONResponse | None:
+        roll = rng.random()
+        if (
+            profile.capacity is not None and state.in_flight > profile.capacity
+        ) or roll < profile.rate_limit_ratio:
+            state.outcomes["rate_limited"] += 1
+            headers = {}
+            if profile.retry_after_seconds is not None:
+                headers["retry-after"] = str(profile.retry_after_seconds)
+            return _error(
+                429, "rate_limit_error", "Number of requests exceeded", **headers
+            )
+        if roll < profile.rate_limit_ratio + profile.overload_ratio:
+            state.outcomes["overloaded"] += 1
+            return _error(529, "overloaded_error", "Overloaded")
+        return None
+
+    def message(body: dict[str, Any], tokens: int, truncated: bool) -> dict[str, Any]:
+        return {
+            "id": f"msg_mock_{sum(state.outcomes.values())}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "mock"),
+            "content": [],
+            "stop_reason": "max_tokens" if truncated else "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": input_tokens(body),
+                "output_tokens": tokens,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        }
+
+    async def stream(
+        body: dict[str, Any], words: list[str], truncated: bool
+    ) -> AsyncIterator[bytes]:
+        try:
+            interval = profile.token_interval_ms
+            if rng.random() < profile.slow_stream_ratio:
+                interval = profile.slow_token_interval_ms
+                state.outcomes["slow_stream"] += 1
+            start = message(body, 0, truncated)
+            start["stop_reason"] = None
+            yield _sse("message_start", {"type": "message_start", "message": start})
+            yield _sse(
+                "content_block_start",
+                {
+                    "type": "content_block_start",
+                    "index": 0,
+                    "content_block": {"type": "text", "text": ""},
+                },
+            )
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(interval / 1000)
+                yield _sse(
+                    "content_block_delta",
+                    {
+                        "type": "content_block_delta",
+                        "index": 0,
+                        "delta": {
+                            "type": "text_delta",
+                            "text": word if i == 0 else f" {word}",
+                        },
+                    },
+                )
+            yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield _sse(
+                "message_delta",
+                {
+                    "type": "message_delta",
+                    "delta": {
+                        "stop_reason": "max_tokens" if truncated else "end_turn",
+                        "stop_sequence": None,
+                    },
+                    "usage": {"output_tokens": len(words)},
+                },
+            )
+            yield _sse("message_stop", {"type": "message_stop"})
+            state.outcomes["streamed"] += 1
+        finally:
+            state.in_flight -= 1
+
+    @app.post("/v1/messages")
+    async def create_message(request: Request) -> Any:
+        body = await request.json()
+        state.in_flight += 1
+        state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+        streaming = False
+        try:
+            error = injected_error()
+            if error is not None:
+                return error
+
+            tokens = min(profile.output_tokens, body.get("max_tokens", 1024))
+            truncated = tokens < profile.output_tokens
+            words = [FILLER[i % len(FILLER)] for i in range(tokens)]
+            await asyncio.sleep(first_token_seconds())
+
+            if body.get("stream"):
+                streaming = True
+                return StreamingResponse(
+                    stream(body, words, truncated), media_type="text/event-stream"
+                )
+
+            await asyncio.sleep(profile.token_interval_ms * (tokens - 1) / 1000)
+            reply = message(body, tokens, truncated)
+            reply["content"] = [{"type": "text", "text": " ".join(words)}]
+            state.outcomes["completed"] += 1
+            return reply
+        finally:
+            # A streamed response is still in flight until its stream ends
+            if not streaming:
+                state.in_flight -= 1
+
+    @app.get("/mock/stats")
+    async def stats() -> dict[str, Any]:
+        return state.to_dict()
+
+    return app
+
+
+@asynccontextmanager
+async def serve_mock(
+    profile: MockProfile | None = None, host: str = "127.0.0.1", port: int = 0
+) -> AsyncIterator[str]:
+    """Run the mock server on the running event loop; yields its base URL.
+
+    With the default port of 0 the server listens on a free port.
+    """
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_mock_app(profile),
+            host=host,
+            port=port,
+            log_level="warning",
+            lifespan="off",
+        )
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            await task
+            raise RuntimeError("Mock Anthropic server failed to start")
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        await task
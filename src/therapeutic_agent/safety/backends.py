@@ -0,0 +1,305 @@
+"""Regular expression backends used to compile safety rules.
+
+Safety rules are scanned on the event loop for every incoming message, so a
+rule that backtracks on adversarial input stalls every request on the worker.
+Backends decide how rule sources are compiled:
+
+``re2``
+    Google RE2 via the ``google-re2`` package. Matching is guaranteed linear
+    in the input for every rule. RE2 treats ``\\b`` and ``\\w`` as ASCII only,
+    so word boundaries next to non-ASCII letters can differ from ``re``.
+``safe``
+    The stdlib ``re`` engine, with rules of the form ``HEAD.*TAIL`` split into
+    two independent searches so that the unbounded gap is never backtracked.
+``stdlib``
+    The stdlib ``re`` engine with rules compiled as written. Kept for
+    comparison; it offers no protection against catastrophic backtracking.
+
+``auto`` selects ``re2`` when it is installed and ``safe`` otherwise.
+"""
+
+import re
+import sys
+from abc import ABC, abstractmethod
+from typing import ClassVar, Iterable, Iterator, Protocol, Sequence
+
+try:
+    import re2
+except ImportError:  # pragma: no cover - exercised when google-re2 is absent
+    re2 = None
+
+
+class UnionMatch(Protocol):
+    """Match object produced by a compiled rule union."""
+
+    @property
+    def lastgroup(self) -> str | None: ...
+
+    def start(self, group: int | str = 0, /) -> int: ...
+
+
+class UnionPattern(Protocol):
+    """Compiled alternation of several rules, one named group per rule.
+
+    Satisfied by ``re.Pattern`` and by RE2's compiled patterns.
+    """
+
+    def finditer(
+        self, string: str, pos: int = 0, endpos: int = sys.maxsize
+    ) -> Iterator[UnionMatch]: ...
+
+
+class CompiledPattern(ABC):
+    """A single safety rule compiled by a backend."""
+
+    def __init__(self, source: str, ignore_case: bool) -> None:
+        self.source = source
+        self.ignore_case = ignore_case
+
+    @abstractmethod
+    def search(self, text: str, pos: int = 0) -> bool:
+        """Whether the rule matches anywhere in ``text`` from ``pos`` onwards."""
+        pass
+
+    @property
+    def union_source(self) -> str:
+        """Source used for this rule inside a combined alternation.
+
+        It must match wherever the rule matches and never later, so that the
+        combined scan can serve as a prefilter for the rule.
+        """
+        return self.source
+
+    @property
+    def exact_in_union(self) -> bool:
+        """Whether a hit on ``union_source`` proves that the rule matches."""
+        return True
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.source!r})"
+
+
+class _StdlibPattern(CompiledPattern):
+    def __init__(self, source: str, ignore_case: bool) -> None:
+        super().__init__(source, ignore_case)
+        self._pattern = re.compile(source, re.IGNORECASE if ignore_case else 0)
+
+    def search(self, text: str, pos: int = 0) -> bool:
+        return self._pattern.search(text, pos) is not None
+
+
+class _GapPattern(CompiledPattern):
+    """``HEAD.*TAIL`` matched as two searches instead of one backtracking scan.
+
+    The rule matches when some HEAD match is followed, on the same line, by
+    the start of a TAIL match. It is enough to try the first HEAD on each line
+    (later ones on that line end later and so leave less room for TAIL) and
+    to remember the leftmost TAIL start found so far, which stays valid until
+    a HEAD ends beyond it. Every search therefore resumes where an earlier one
+    stopped and the whole check is a constant number of linear passes.
+
+    This relies on HEAD matches not nesting inside one another, which holds
+    for word alternations delimited by ``\\b`` such as the built-in rules.
+    ``benchmarks/fuzz_safety_patterns.py`` checks the rewrite against ``re``.
+    """
+
+    def __init__(self, source: str, ignore_case: bool, head: str, tail: str) -> None:
+        super().__init__(source, ignore_case)
+        flags = re.IGNORECASE if ignore_case else 0
+        self.head = head
+        self.tail = tail
+        self._head = re.compile(head, flags)
+        self._tail = re.compile(tail, flags)
+
+    def search(self, text: str, pos: int = 0) -> bool:
+        tail_start: int | None = -1
+        while (head := self._head.search(text, pos)) is not None:
+            head_end = head.end()
+            if tail_start is not None and tail_start < head_end:
+                tail = self._tail.search(text, head_end)
+                tail_start = tail.start() if tail is not None else None
+            if tail_start is None:
+                return False
+
+            line_end = text.find("\n", head_end)
+            if line_end == -1 or tail_start <= line_end:
+                return True
+            pos = line_end + 1
+        return False
+
+    @property
+    def union_source(self) -> str:
+        return self.head
+
+    @property
+    def exact_in_union(self) -> bool:
+        return False
+
+
+class _Re2Pattern(CompiledPattern):
+    def __init__(self, source: str, ignore_case: bool) -> None:
+        super().__init__(source, ignore_case)
+        self._pattern = re2.compile(_scoped(source, ignore_case))
+
+    def search(self, text: str, pos: int = 0) -> bool:
+        return self._pattern.search(text, pos) is not None
+
+
+def _scoped(source: str, ignore_case: bool) -> str:
+    """Wrap a rule with its flags inlined so it can join a larger alternation."""
+    return f"(?i:{source})" if ignore_case else f"(?:{source})"
+
+
+def split_gap(source: str) -> tuple[str, str] | None:
+    """Split ``HEAD.*TAIL`` at its single top-level ``.*``, if it has one.
+
+    Rules with a top-level alternation, more than one top-level gap, a
+    possessive gap or flags that let ``.`` cross lines are left alone.
+    """
+    if re.compile(source).flags & re.DOTALL:
+        return None
+
+    depth = 0
+    in_class = False
+    gaps = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0 and char == "|":
+            return None
+        elif depth == 0 and source.startswith(".*", i):
+            gaps.append(i)
+            i += 2
+            continue
+        i += 1
+
+    if len(gaps) != 1:
+        return None
+    head, tail = source[: gaps[0]], source[gaps[0] + 2 :]
+    if tail.startswith("+"):
+        return None
+    # A lazy gap matches exactly when a greedy one does
+    tail = tail.removeprefix("?")
+    if not head or not tail:
+        return None
+    return head, tail
+
+
+class RegexBackend(ABC):
+    """Compiles safety rules and the combined alternation used to scan them."""
+
+    name: ClassVar[str]
+
+    @abstractmethod
+    def compile(self, source: str, ignore_case: bool = True) -> CompiledPattern:
+        """Compile a single rule."""
+        pass
+
+    @abstractmethod
+    def _compile_union_source(self, source: str) -> UnionPattern:
+        pass
+
+    def compile_many(
+        self, sources: Iterable[str], ignore_case: bool = True
+    ) -> list[CompiledPattern]:
+        return [self.compile(source, ignore_case) for source in sources]
+
+    def compile_union(self, patterns: Sequence[CompiledPattern]) -> UnionPattern | None:
+        """Combine rules into one alternation with a group named ``r<index>``."""
+        if not patterns:
+            return None
+
+        # A shared leading word boundary is hoisted out of the alternation so
+        # positions inside words are rejected before any alternative is tried.
+        boundary = r"\b"
+        sources = [pattern.union_source for pattern in patterns]
+        hoist = all(source.startswith(boundary) for source in sources)
+        alternatives = [
+            _scoped(
+                source.removeprefix(boundary) if hoist else source,
+                pattern.ignore_case,
+            )
+            for source, pattern in zip(sources, patterns)
+        ]
+        groups = "|".join(f"(?P<r{i}>{alt})" for i, alt in enumerate(alternatives))
+        return self._compile_union_source(
+            f"{boundary}(?:{groups})" if hoist else groups
+        )
+
+
+class StdlibBackend(RegexBackend):
+    """Rules compiled as written with ``re``; not safe against backtracking."""
+
+    name = "stdlib"
+
+    def compile(self, source: str, ignore_case: bool = True) -> CompiledPattern:
+        return _StdlibPattern(source, ignore_case)
+
+    def _compile_union_source(self, source: str) -> UnionPattern:
+        return re.compile(source)
+
+
+class SafeBackend(StdlibBackend):
+    """``re`` with unbounded ``.*`` gaps split into separate linear searches."""
+
+    name = "safe"
+
+    def compile(self, source: str, ignore_case: bool = True) -> CompiledPattern:
+        parts = split_gap(source)
+        if parts is None:
+            return _StdlibPattern(source, ignore_case)
+        head, tail = parts
+        return _GapPattern(source, ignore_case, head, tail)
+
+
+class Re2Backend(RegexBackend):
+    """Linear-time matching with RE2."""
+
+    name = "re2"
+
+    def __init__(self) -> None:
+        if re2 is None:
+            raise ValueError(
+                "The re2 regex backend requires the google-re2 package "
+                "(pip install 'therapeutic-agent[re2]')"
+            )
+
+    def compile(self, source: str, ignore_case: bool = True) -> CompiledPattern:
+        return _Re2Pattern(source, ignore_case)
+
+    def _compile_union_source(self, source: str) -> UnionPattern:
+        return re2.compile(source)  # type: ignore[no-any-return]
+
+
+BACKENDS: dict[str, type[RegexBackend]] = {
+    backend.name: backend for backend in (Re2Backend, SafeBackend, StdlibBackend)
+}
+
+
+def re2_available() -> bool:
+    return re2 is not None
+
+
+def get_backend(name: str = "auto") -> RegexBackend:
+    """Return the backend called ``name``, resolving ``auto`` to the safest one."""
+    if name == "auto":
+        name = Re2Backend.name if re2_available() else SafeBackend.name
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown regex backend {name!r}; expected one of "
+            f"{', '.join(['auto', *BACKENDS])}"
+        ) from None
+    return backend()
@@ -0,0 +1,109 @@
+"""Bounded cache of safety results for repeated messages."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from prometheus_client import Counter
+
+from therapeutic_agent.safety.validators import SafetyResult
+
+CACHE_REQUESTS = Counter(
+    "therapeutic_safety_cache_requests_total",
+    "Safety result cache lookups",
+    ["result"],
+)
+CACHE_EVICTIONS = Counter(
+    "therapeutic_safety_cache_evictions_total",
+    "Safety results dropped from the cache because it was full or they expired",
+)
+
+
+def normalize(content: str) -> str:
+    """Fold content that every rule treats identically onto one key.
+
+    Surrounding whitespace never decides a match and all rules ignore case,
+    so ``" OK "`` and ``"ok"`` share an entry. Case folding is limited to
+    ASCII text because ``str.lower`` can change the length of other scripts,
+    which would move word boundaries.
+    """
+    content = content.strip()
+    return content.lower() if content.isascii() else content
+
+
+class SafetyResultCache:
+    """LRU cache of ``SafetyResult`` keyed by normalized content and rule version.
+
+    Keys are digests, so the cache holds no message text. Entries older than
+    ``ttl_seconds`` are treated as misses and dropped. Results are shared
+    between callers and must not be modified.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float | None = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, SafetyResult]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(content: str, rules_version: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(rules_version.encode())
+        digest.update(b"\0")
+        digest.update(normalize(content).encode("utf-8", "surrogatepass"))
+        return digest.digest()
+
+    def get(self, key: bytes) -> SafetyResult | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at >= self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.labels(result="hit").inc()
+                return result
+            del self._entries[key]
+            self._count_eviction()
+
+        self.misses += 1
+        CACHE_REQUESTS.labels(result="miss").inc()
+        return None
+
+    def set(self, key: bytes, result: SafetyResult) -> None:
+        expires_at = (
+            self._clock() + self.ttl_seconds
+            if self.ttl_seconds is not None
+            else float("inf")
+        )
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._count_eviction()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _count_eviction(self) -> None:
+        self.evictions += 1
+        CACHE_EVICTIONS.inc()
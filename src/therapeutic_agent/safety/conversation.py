@@ -0,0 +1,88 @@
+"""Per-session safety state carried from one user message to the next."""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from therapeutic_agent.safety.matcher import RuleMatches
+
+# User messages whose matches make up the conversation-level assessment
+WINDOW_MESSAGES = 10
+# How much of the preceding text a new message is read together with. Every
+# built-in rule phrase is well under this many tokens.
+TAIL_TOKENS = 16
+TAIL_MAX_CHARS = 256
+
+
+@dataclass
+class ConversationSafetyState:
+    """Rolling match state of one conversation's user messages.
+
+    Rescanning the joined history on every message costs time quadratic in
+    the length of the session. Instead, the state keeps the matches of the
+    last ``WINDOW_MESSAGES`` messages and the last ``TAIL_TOKENS`` tokens of
+    text. A new message is scanned on its own and together with that tail,
+    so it costs time proportional to its own length while phrases split
+    across messages are still found.
+
+    Rule matches are stored by rule index, so they are only meaningful for
+    the rule set version in ``rules_version``. The state round-trips through
+    ``to_dict``/``from_dict`` to be stored with the session.
+    """
+
+    rules_version: str = ""
+    tail: str = ""
+    window: list[RuleMatches] = field(default_factory=list)
+
+    def matches(self) -> RuleMatches:
+        """Everything matched within the window."""
+        combined = RuleMatches()
+        for matches in self.window:
+            combined |= matches
+        return combined
+
+    def joined(self, message: str) -> str:
+        """The message read after the tail of the preceding ones."""
+        return f"{self.tail} {message}" if self.tail else message
+
+    def record(self, message: str, matches: RuleMatches) -> None:
+        """Add a message and everything it took part in matching."""
+        self.window.append(matches)
+        del self.window[:-WINDOW_MESSAGES]
+
+        tokens = self.joined(message).rsplit(maxsplit=TAIL_TOKENS)
+        self.tail = " ".join(tokens[-TAIL_TOKENS:])[-TAIL_MAX_CHARS:]
+
+    def reset(self, rules_version: str) -> None:
+        """Drop matches made with another rule set; the tail is kept."""
+        self.rules_version = rules_version
+        self.window.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "rules_version": self.rules_version,
+            "tail": self.tail,
+            "window": [
+                {"rules": sorted(matches.rules), "keywords": sorted(matches.keywords)}
+                for matches in self.window
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "ConversationSafetyState":
+        """Restore a stored state; anything unrecognised starts a fresh one."""
+        if not isinstance(data, dict):
+            return cls()
+        try:
+            return cls(
+                rules_version=str(data.get("rules_version", "")),
+                tail=str(data.get("tail", "")),
+                window=[
+                    RuleMatches(
+                        rules=frozenset(int(rule) for rule in entry["rules"]),
+                        keywords=frozenset(str(kw) for kw in entry["keywords"]),
+                    )
+                    for entry in data.get("window", [])
+                ],
+            )
+        except (KeyError, TypeError, ValueError):
+            return cls()
@@ -1,16 +1,23 @@
 """Core safety validation engine orchestrating multiple validators."""
 
-import asyncio
-from typing import Any
+from functools import partial
+from typing import Any, Sequence
 
 import structlog
 
+from therapeutic_agent.core.config import get_settings
+from therapeutic_agent.safety.backends import RegexBackend, get_backend
+from therapeutic_agent.safety.cache import SafetyResultCache
+from therapeutic_agent.safety.conversation import ConversationSafetyState
+from therapeutic_agent.safety.executor import ScanExecutor
+from therapeutic_agent.safety.matcher import CompiledRuleSet, RuleMatches
 from therapeutic_agent.safety.validators import (
     BaseValidator,
     CrisisValidator,
     MedicalAdviceValidator,
     SafetyLevel,
     SafetyResult,
+    ScanHits,
     SelfHarmValidator,
     TherapeuticBoundaryValidator,
 )
@@ -18,59 +25,238 @@ from therapeutic_agent.safety.validators import (
 logger = structlog.get_logger()
 
 
+def default_validators(backend: RegexBackend) -> list[BaseValidator]:
+    """The validators every engine runs, compiled with ``backend``."""
+    return [
+        CrisisValidator(backend),
+        SelfHarmValidator(backend),
+        MedicalAdviceValidator(backend),
+        TherapeuticBoundaryValidator(backend),
+    ]
+
+
+def build_rule_set(backend_name: str) -> CompiledRuleSet:
+    """Compile the default rule set; used to rebuild it in worker processes."""
+    backend = get_backend(backend_name)
+    return CompiledRuleSet(default_validators(backend), backend)
+
+
 class SafetyEngine:
     """Orchestrates multiple safety validators for comprehensive content analysis."""
 
-    def __init__(self) -> None:
-        self._validators: list[BaseValidator] = [
-            CrisisValidator(),
-            SelfHarmValidator(),
-            MedicalAdviceValidator(),
-            TherapeuticBoundaryValidator(),
-        ]
+    def __init__(
+        self,
+        backend: RegexBackend | None = None,
+        executor: ScanExecutor | None = None,
+        cache: SafetyResultCache | None = None,
+        prefilter: bool = True,
+    ) -> None:
+        safety_settings = get_settings().safety
+        self._backend = backend or get_backend(safety_settings.regex_backend)
+        self._prefilter = prefilter
+        self._compile_rules()
+        self._executor = executor or ScanExecutor(
+            mode=safety_settings.executor,
+            max_workers=safety_settings.executor_workers,
+            offload_min_chars=safety_settings.offload_min_chars,
+            build_rule_set=partial(build_rule_set, self._backend.name),
+        )
+        if cache is None:
+            cache = SafetyResultCache(
+                max_entries=safety_settings.cache_max_entries,
+                ttl_seconds=safety_settings.cache_ttl_seconds,
+            )
+        self._cache = cache if cache.max_entries > 0 else None
+
+    def _compile_rules(self) -> None:
+        self._validators = default_validators(self._backend)
+        self._rule_set = CompiledRuleSet(self._validators, self._backend)
+        self._uses_context = any(
+            validator.uses_context for validator in self._validators
+        )
+        # What every message without a trigger word is assessed as
+        self._no_hits = [ScanHits() for _ in self._validators]
+        self._no_hit_result, _ = self._assess(self._no_hits, None)
+
+    def reload_rules(self) -> None:
+        """Recompile every validator's rules, e.g. after their patterns change.
+
+        Cached results are keyed by the rule set version, so results from the
+        old rules can no longer be returned; the cache is also cleared to free
+        them. Worker processes are restarted so they rebuild their rules too.
+        """
+        previous_version = self._rule_set.version
+        self._compile_rules()
+        self._executor.shutdown()
+        if self._cache is not None and self._rule_set.version != previous_version:
+            self._cache.clear()
+        logger.info(
+            "Safety rules reloaded",
+            previous_version=previous_version,
+            version=self._rule_set.version,
+        )
+
+    def cache_stats(self) -> dict[str, int] | None:
+        """Result cache counters, or None when caching is disabled."""
+        return self._cache.stats() if self._cache is not None else None
+
+    def shutdown(self) -> None:
+        """Stop any worker pool used for scanning."""
+        self._executor.shutdown()
 
     async def validate_content(
         self, content: str, context: dict[str, Any] | None = None
     ) -> SafetyResult:
-        """Run content through all safety validators and return aggregated result."""
+        """Scan content once for all validators and return the aggregated result."""
         if not content.strip():
-            return SafetyResult(
-                is_safe=True,
-                level=SafetyLevel.SAFE,
-                category=None,
-                confidence=1.0,
-                explanation="Empty content is safe",
+            return self._empty_result()
+        if self._prefilter and not self._rule_set.may_match(content):
+            return self._no_hit_assessment(context)
+
+        key = self._cache_key(content, context)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            hits = (await self._executor.scan(self._rule_set, [content]))[0]
+        except Exception as e:
+            logger.error("Safety rule scan failed", error=str(e))
+            hits = []
+
+        result, complete = self._assess(hits, context)
+        if complete:
+            self._cache_set(key, result)
+        return result
+
+    async def validate_batch(
+        self,
+        texts: Sequence[str],
+        contexts: Sequence[dict[str, Any] | None] | None = None,
+    ) -> list[SafetyResult]:
+        """Validate many messages in one call, returning results in input order.
+
+        All non-empty texts that pass the prefilter and miss the result cache
+        are scanned together (on the worker pool, if one is configured).
+        Results are a function of the rule hits alone unless a validator uses
+        the context, so messages are grouped by their hit signature and each
+        distinct signature is assessed and aggregated once; in typical traffic
+        nearly every message shares the no-hit signature. Messages with the
+        same signature share one result object, which callers should treat as
+        read-only.
+        """
+        if contexts is None:
+            contexts = [None] * len(texts)
+        elif len(contexts) != len(texts):
+            raise ValueError("contexts must have one entry per text")
+
+        results: list[SafetyResult | None] = [None] * len(texts)
+        keys: list[bytes | None] = [None] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            if not text.strip():
+                results[index] = self._empty_result()
+                continue
+            if self._prefilter and not self._rule_set.may_match(text):
+                results[index] = self._no_hit_assessment(contexts[index])
+                continue
+            keys[index] = self._cache_key(text, contexts[index])
+            cached = self._cache_get(keys[index])
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append(index)
+
+        try:
+            hits = await self._executor.scan(
+                self._rule_set, [texts[index] for index in pending]
             )
+        except Exception as e:
+            logger.error("Safety rule scan failed", error=str(e), batch=len(pending))
+            hits = [[] for _ in pending]
 
-        validation_tasks = [
-            validator.validate(content, context) for validator in self._validators
-        ]
+        assessed: dict[tuple[Any, ...], tuple[SafetyResult, bool]] = {}
+        for index, message_hits in zip(pending, hits):
+            context = contexts[index]
+            if self._uses_context and context is not None:
+                result, complete = self._assess(message_hits, context)
+            else:
+                signature = tuple(message_hits)
+                if signature not in assessed:
+                    assessed[signature] = self._assess(message_hits, context)
+                result, complete = assessed[signature]
+
+            results[index] = result
+            if complete:
+                self._cache_set(keys[index], result)
+
+        return results  # type: ignore[return-value]
+
+    def _no_hit_assessment(self, context: dict[str, Any] | None) -> SafetyResult:
+        """Result for content that the prefilter proved has no rule hits."""
+        if self._uses_context and context is not None:
+            return self._assess(self._no_hits, context)[0]
+        return self._no_hit_result
+
+    def _cache_key(self, content: str, context: dict[str, Any] | None) -> bytes | None:
+        """Cache key for content, or None when its result must not be cached."""
+        if self._cache is None or (self._uses_context and context is not None):
+            return None
+        return self._cache.key(content, self._rule_set.version)
 
-        results = await asyncio.gather(*validation_tasks, return_exceptions=True)
+    def _cache_get(self, key: bytes | None) -> SafetyResult | None:
+        if key is None or self._cache is None:
+            return None
+        return self._cache.get(key)
 
-        # Filter out exceptions explicitly for typing
+    def _cache_set(self, key: bytes | None, result: SafetyResult) -> None:
+        if key is not None and self._cache is not None:
+            self._cache.set(key, result)
+
+    def _assess(
+        self, hits: Sequence[ScanHits], context: dict[str, Any] | None
+    ) -> tuple[SafetyResult, bool]:
+        """Score each validator's hits and aggregate them into one result.
+
+        Also reports whether every validator contributed, since a partial
+        assessment must not be cached.
+        """
         valid_results: list[SafetyResult] = []
-        for i, result in enumerate(results):
-            if isinstance(result, BaseException):
+        for validator, validator_hits in zip(self._validators, hits):
+            try:
+                valid_results.append(validator.assess(validator_hits, context))
+            except Exception as e:
                 logger.error(
                     "Validator failed",
-                    validator=self._validators[i].__class__.__name__,
-                    error=str(result),
+                    validator=validator.__class__.__name__,
+                    error=str(e),
                 )
-                continue
-            valid_results.append(result)
 
         if not valid_results:
             logger.warning("No validators succeeded, defaulting to unsafe")
-            return SafetyResult(
-                is_safe=False,
-                level=SafetyLevel.WARNING,
-                category=None,
-                confidence=0.1,
-                explanation="Safety validation failed - unable to assess content",
+            return (
+                SafetyResult(
+                    is_safe=False,
+                    level=SafetyLevel.WARNING,
+                    category=None,
+                    confidence=0.1,
+                    explanation="Safety validation failed - unable to assess content",
+                ),
+                False,
             )
 
-        return self._aggregate_results(valid_results)
+        complete = len(valid_results) == len(self._validators)
+        return self._aggregate_results(valid_results), complete
+
+    @staticmethod
+    def _empty_result() -> SafetyResult:
+        return SafetyResult(
+            is_safe=True,
+            level=SafetyLevel.SAFE,
+            category=None,
+            confidence=1.0,
+            explanation="Empty content is safe",
+        )
 
     def _aggregate_results(self, results: list[SafetyResult]) -> SafetyResult:
         """Aggregate multiple validation results into a single safety assessment."""
@@ -142,16 +328,78 @@ class SafetyEngine:
                 explanation="No conversation history to validate",
             )
 
-        combined_content = " ".join(
-            msg.get("content", "")
-            for msg in messages[-10:]  # Last 10 messages for context
-            if msg.get("role") == "user"
-        )
+        state = ConversationSafetyState()
+        for msg in messages[-10:]:  # Last 10 messages for context
+            if msg.get("role") == "user":
+                await self._advance_conversation(state, msg.get("content", ""))
 
-        return await self.validate_content(
-            combined_content,
+        return self.assess_conversation(
+            state,
             context={
                 "conversation_length": len(messages),
                 "session_metadata": session_metadata,
             },
         )
+
+    async def validate_conversation_turn(
+        self,
+        state: ConversationSafetyState,
+        message: str,
+        context: dict[str, Any] | None = None,
+    ) -> SafetyResult:
+        """Add a user message to ``state`` and check what it completes.
+
+        The result covers only indicators that appear when the message is
+        read after the previous ones but not in the message on its own, such
+        as a phrase split across two messages; ``validate_content`` covers
+        the message itself. It is the no-hit result when there are none.
+        ``state`` is updated in place.
+        """
+        across = await self._advance_conversation(state, message)
+        if not across:
+            return self._no_hit_assessment(context)
+        return self._assess(self._rule_set.hits(across), context)[0]
+
+    def assess_conversation(
+        self, state: ConversationSafetyState, context: dict[str, Any] | None = None
+    ) -> SafetyResult:
+        """Assess everything matched within the conversation's window."""
+        if state.rules_version != self._rule_set.version:
+            return self._no_hit_assessment(context)
+        return self._assess(self._rule_set.hits(state.matches()), context)[0]
+
+    async def _advance_conversation(
+        self, state: ConversationSafetyState, message: str
+    ) -> RuleMatches:
+        """Scan a message against the conversation state and record it.
+
+        The message is scanned alone, and the tail is scanned alone and
+        followed by the message. Whatever the joined text matches beyond the
+        other two spans the boundary and is returned.
+        """
+        if state.rules_version != self._rule_set.version:
+            if state.window:
+                logger.info(
+                    "Conversation safety state reset after rule change",
+                    previous_version=state.rules_version,
+                    version=self._rule_set.version,
+                )
+            state.reset(self._rule_set.version)
+        if not message.strip():
+            return RuleMatches()
+
+        joined = state.joined(message)
+        own = across = RuleMatches()
+        if not self._prefilter or self._rule_set.may_match(joined):
+            contents = [message, state.tail, joined] if state.tail else [message]
+            try:
+                results = await self._executor.match(self._rule_set, contents)
+            except Exception as e:
+                logger.error("Safety rule scan failed", error=str(e))
+                results = [RuleMatches()] * len(contents)
+            own = results[0]
+            if state.tail:
+                across = results[2] - results[1] - own
+
+        state.record(message, own | across)
+        return across
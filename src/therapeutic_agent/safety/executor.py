@@ -0,0 +1,160 @@
+"""Runs CPU-bound safety rule scans off the event loop."""
+
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from therapeutic_agent.core.metrics import SAFETY_SCAN_SECONDS
+from therapeutic_agent.safety.matcher import CompiledRuleSet, RuleMatches
+from therapeutic_agent.safety.validators import ScanHits
+
+# Rule set rebuilt once in each worker process, since compiled patterns from
+# some backends cannot be pickled
+_worker_rule_set: CompiledRuleSet | None = None
+
+# Smallest slice of a batch worth sending to a separate worker process
+_MIN_PROCESS_CHUNK = 64
+
+
+def _init_worker(build_rule_set: Callable[[], CompiledRuleSet]) -> None:
+    global _worker_rule_set
+    _worker_rule_set = build_rule_set()
+
+
+def _scan_in_worker(method: str, contents: list[str]) -> list[Any]:
+    assert _worker_rule_set is not None, "scan worker was not initialised"
+    return _scan_all(_worker_rule_set, method, contents)
+
+
+def _scan_all(rule_set: CompiledRuleSet, method: str, contents: list[str]) -> list[Any]:
+    scan = getattr(rule_set, method)
+    return [scan(content) for content in contents]
+
+
+class ScanExecutor:
+    """Decides where rule scans run: inline, on a thread pool or a process pool.
+
+    A single message shorter than ``offload_min_chars`` is scanned inline,
+    since handing it to a pool costs more than the scan itself. Longer
+    messages and every batch go to the pool so the event loop keeps serving
+    other sessions in the meantime.
+
+    The stdlib ``re`` engine holds the GIL while matching, so with threads the
+    loop still gets the interpreter every switch interval but scans do not run
+    in parallel. Processes give real parallelism at the cost of pickling the
+    content and the results; large batches are split across the workers.
+    """
+
+    MODES = ("inline", "thread", "process")
+
+    def __init__(
+        self,
+        mode: str = "inline",
+        max_workers: int | None = None,
+        offload_min_chars: int = 1000,
+        build_rule_set: Callable[[], CompiledRuleSet] | None = None,
+    ) -> None:
+        if mode not in self.MODES:
+            raise ValueError(
+                f"Unknown scan executor mode {mode!r}; "
+                f"expected one of {', '.join(self.MODES)}"
+            )
+        if mode == "process" and build_rule_set is None:
+            raise ValueError("Process scan executor requires build_rule_set")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.offload_min_chars = offload_min_chars
+        self._build_rule_set = build_rule_set
+        self._pool: Executor | None = None
+
+    def should_offload(self, contents: list[str]) -> bool:
+        if self.mode == "inline":
+            return False
+        return len(contents) > 1 or any(
+            len(content) >= self.offload_min_chars for content in contents
+        )
+
+    async def scan(
+        self, rule_set: CompiledRuleSet, contents: list[str]
+    ) -> list[list[ScanHits]]:
+        """Scan each content with ``rule_set`` and return hits in input order."""
+        return await self._run(
+            rule_set, "scan", contents, self.should_offload(contents)
+        )
+
+    async def match(
+        self, rule_set: CompiledRuleSet, contents: list[str]
+    ) -> list[RuleMatches]:
+        """Like ``scan``, but return which rules and keywords matched.
+
+        The contents are the few related strings of one conversation turn, so
+        they are offloaded on their combined length rather than as a batch.
+        """
+        offload = self.mode != "inline" and (
+            sum(map(len, contents)) >= self.offload_min_chars
+        )
+        return await self._run(rule_set, "match", contents, offload)
+
+    async def _run(
+        self,
+        rule_set: CompiledRuleSet,
+        method: str,
+        contents: list[str],
+        offload: bool,
+    ) -> list[Any]:
+        started = time.perf_counter()
+        if not offload:
+            mode = "inline"
+            results = _scan_all(rule_set, method, contents)
+        elif self.mode == "thread":
+            mode = "thread"
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), partial(_scan_all, rule_set, method, contents)
+            )
+        else:
+            mode = "process"
+            results = await self._scan_in_processes(method, contents)
+
+        SAFETY_SCAN_SECONDS.labels(mode=mode).observe(time.perf_counter() - started)
+        return results
+
+    async def _scan_in_processes(self, method: str, contents: list[str]) -> list[Any]:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        workers = self.max_workers or os.cpu_count() or 1
+        size = max(_MIN_PROCESS_CHUNK, math.ceil(len(contents) / workers))
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    pool, _scan_in_worker, method, contents[i : i + size]
+                )
+                for i in range(0, len(contents), size)
+            )
+        )
+        return [result for chunk in chunks for result in chunk]
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "thread":
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="safety-scan"
+                )
+            else:
+                # Checked in __init__: process mode requires build_rule_set
+                assert self._build_rule_set is not None
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=partial(_init_worker, self._build_rule_set),
+                )
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,158 @@
+"""Single-pass rule matching shared by all safety validators."""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+from therapeutic_agent.safety.backends import (
+    CompiledPattern,
+    RegexBackend,
+    UnionPattern,
+    get_backend,
+)
+from therapeutic_agent.safety.prefilter import TriggerIndex
+from therapeutic_agent.safety.validators import BaseValidator, ScanHits
+
+
+@dataclass(frozen=True)
+class RuleMatches:
+    """Which rules (by index in the rule set) and keywords matched some text."""
+
+    rules: frozenset[int] = frozenset()
+    keywords: frozenset[str] = frozenset()
+
+    def __bool__(self) -> bool:
+        return bool(self.rules or self.keywords)
+
+    def __or__(self, other: "RuleMatches") -> "RuleMatches":
+        return RuleMatches(self.rules | other.rules, self.keywords | other.keywords)
+
+    def __sub__(self, other: "RuleMatches") -> "RuleMatches":
+        return RuleMatches(self.rules - other.rules, self.keywords - other.keywords)
+
+
+class CompiledRuleSet:
+    """Every validator's rules compiled for a single scan of each message.
+
+    Patterns are combined into one alternation with a named group per rule.
+    ``finditer`` reports leftmost, non-overlapping matches, so a rule whose
+    only match overlaps an earlier match can be missed by the combined scan.
+    No rule can match before the first combined match, however, so when
+    nothing matches (the common case) the single scan is conclusive, and
+    otherwise only the rules not yet seen are re-checked from the first match
+    onwards. The result is identical to scanning every rule separately.
+
+    A rule may contribute only a prefix to the alternation (see
+    ``CompiledPattern.union_source``); a hit on such a prefix is confirmed by
+    the re-check instead of being counted directly.
+
+    Keywords are plain substrings of the lowercased content. They are looked
+    up in one shared lowercased copy with ``str`` containment, which uses a
+    C-level substring search and is considerably faster than a regex
+    alternation of the same literals.
+    """
+
+    def __init__(
+        self,
+        validators: Sequence[BaseValidator],
+        backend: RegexBackend | None = None,
+    ) -> None:
+        self._validators = list(validators)
+        self._backend = backend or get_backend()
+
+        self._patterns: list[CompiledPattern] = []
+        self._pattern_owner: list[int] = []
+        for index, validator in enumerate(self._validators):
+            for pattern in validator.patterns:
+                self._patterns.append(pattern)
+                self._pattern_owner.append(index)
+
+        self._validator_keywords = [
+            validator.keywords for validator in self._validators
+        ]
+        self._keywords = sorted(set().union(*self._validator_keywords))
+
+        self._exact = [pattern.exact_in_union for pattern in self._patterns]
+        self._pattern_union = self._backend.compile_union(self._patterns)
+        self._version = self._fingerprint()
+        self._triggers = TriggerIndex(self._patterns, self._keywords)
+
+    @property
+    def validators(self) -> list[BaseValidator]:
+        return self._validators
+
+    @property
+    def version(self) -> str:
+        """Fingerprint of the backend, validators, patterns and keywords."""
+        return self._version
+
+    def may_match(self, content: str) -> bool:
+        """Cheap check that is False only when ``scan`` would find no hits."""
+        return self._triggers.may_match(content)
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha256(self._backend.name.encode())
+        for validator in self._validators:
+            digest.update(b"\0" + validator.__class__.__qualname__.encode())
+            for pattern in validator.patterns:
+                digest.update(b"\1" + pattern.source.encode())
+            for keyword in sorted(validator.keywords):
+                digest.update(b"\2" + keyword.encode())
+        return digest.hexdigest()[:16]
+
+    def scan(self, content: str) -> list[ScanHits]:
+        """Scan content once and return hits for each validator, in order."""
+        return self.hits(self.match(content))
+
+    def match(self, content: str) -> RuleMatches:
+        """Scan content once and return the rules and keywords that matched."""
+        pattern_hits = self._match(
+            self._pattern_union,
+            content,
+            self._exact,
+            lambda i, pos: self._patterns[i].search(content, pos),
+        )
+
+        content_lower = content.lower()
+        return RuleMatches(
+            rules=frozenset(i for i, hit in enumerate(pattern_hits) if hit),
+            keywords=frozenset(
+                keyword for keyword in self._keywords if keyword in content_lower
+            ),
+        )
+
+    def hits(self, matches: RuleMatches) -> list[ScanHits]:
+        """Split rule matches into the hits of each validator, in order."""
+        pattern_counts = [0] * len(self._validators)
+        for rule in matches.rules:
+            pattern_counts[self._pattern_owner[rule]] += 1
+
+        return [
+            ScanHits(pattern_matches=count, keywords=matches.keywords & keywords)
+            for count, keywords in zip(pattern_counts, self._validator_keywords)
+        ]
+
+    @staticmethod
+    def _match(
+        union: UnionPattern | None,
+        text: str,
+        exact: list[bool],
+        recheck: Callable[[int, int], bool],
+    ) -> list[bool]:
+        hits = [False] * len(exact)
+        if union is None:
+            return hits
+
+        first_start = None
+        for match in union.finditer(text):
+            if first_start is None:
+                first_start = match.start()
+            rule = int(match.lastgroup[1:])  # type: ignore[index]
+            hits[rule] = exact[rule]
+
+        if first_start is not None:
+            for i in range(len(hits)):
+                if not hits[i]:
+                    hits[i] = recheck(i, first_start)
+
+        return hits
@@ -0,0 +1,183 @@
+"""Literal trigger index that rules out most benign messages before any regex runs.
+
+Every built-in rule contains literal text that any match must include: a
+keyword is its own text, and ``\\b(?:have\\s+a\\s+plan|...)\\b`` cannot match
+unless the content contains ``plan`` (or a literal from one of the other
+alternatives). ``required_literals`` derives such a set for each rule from
+its parsed syntax tree, and ``TriggerIndex`` checks the union of those sets
+against the lowercased content. When none of them occurs, no rule and no
+keyword can match, so the scan can be skipped altogether.
+"""
+
+import re
+import string
+import sys
+from typing import Any, Iterable, Sequence
+
+# The top-level modules are deprecated aliases of these from Python 3.11
+if sys.version_info >= (3, 11):
+    from re import _constants as sre_constants  # type: ignore[attr-defined]
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+else:  # pragma: no cover - Python 3.10
+    import sre_constants
+    import sre_parse
+
+from therapeutic_agent.safety.backends import CompiledPattern
+
+# Words common enough in ordinary conversation that a trigger made of one of
+# them would send most messages to the full scan. They remain valid triggers;
+# another required literal is preferred when one exists.
+COMMON_WORDS = frozenset(
+    "a an and be can do end for go have how i in is it me my no of on should "
+    "t take the to want we what you".split()
+)
+
+_REPEATS = {
+    sre_constants.MAX_REPEAT,
+    sre_constants.MIN_REPEAT,
+    getattr(sre_constants, "POSSESSIVE_REPEAT", sre_constants.MAX_REPEAT),
+}
+_WORD_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+
+# A required literal and whether every match places it at the start of a word
+Trigger = tuple[str, bool]
+
+
+def _score(triggers: frozenset[Trigger]) -> tuple[int, int]:
+    """Rank alternative requirements; higher means rarer in benign text."""
+    weakest = min(0 if text in COMMON_WORDS else len(text) for text, _ in triggers)
+    return weakest, -len(triggers)
+
+
+def _is_whitespace(body: Any) -> bool:
+    """Whether a parsed sequence is exactly ``\\s``."""
+    return (
+        len(body) == 1
+        and body[0][0] is sre_constants.IN
+        and list(body[0][1]) == [(sre_constants.CATEGORY, sre_constants.CATEGORY_SPACE)]
+    )
+
+
+def _required(
+    items: Iterable[tuple[Any, Any]], at_word_start: bool = False
+) -> frozenset[Trigger] | None:
+    """Literals one of which occurs in every match of a parsed sequence.
+
+    Each element of a sequence is required, so any element's requirement is
+    a valid requirement for the whole sequence and the rarest one is kept.
+    Runs of consecutive literal characters form a single required string,
+    which is known to start a word when it follows ``\\b`` or ``\\s+``. An
+    alternation requires one literal from each branch, and a repeat only
+    requires its body when it must match at least once. Anything else (a
+    character class, a lookaround, a backreference) requires nothing.
+    """
+    candidates: list[frozenset[Trigger]] = []
+    run: list[str] = []
+    run_at_word_start = False
+
+    def flush() -> None:
+        if run:
+            text = "".join(run)
+            word_start = run_at_word_start and set(text) <= _WORD_CHARS
+            candidates.append(frozenset({(text, word_start)}))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL and chr(av).isascii():
+            if not run:
+                run_at_word_start = at_word_start
+            run.append(chr(av).lower())
+            at_word_start = False
+            continue
+        flush()
+
+        requirement: frozenset[Trigger] | None = None
+        next_at_word_start = False
+        if op is sre_constants.AT:
+            next_at_word_start = av is sre_constants.AT_BOUNDARY or at_word_start
+        elif op is sre_constants.SUBPATTERN:
+            requirement = _required(av[-1], at_word_start)
+        elif op is sre_constants.BRANCH:
+            branches = [_required(branch, at_word_start) for branch in av[1]]
+            if all(branch is not None for branch in branches):
+                requirement = frozenset().union(*branches)  # type: ignore[arg-type]
+        elif op in _REPEATS and av[0] >= 1:
+            requirement = _required(av[2], at_word_start)
+            next_at_word_start = _is_whitespace(av[2])
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            requirement = _required(av, at_word_start)
+
+        if requirement:
+            candidates.append(requirement)
+        at_word_start = next_at_word_start
+    flush()
+
+    return max(candidates, key=_score, default=None)
+
+
+def required_literals(source: str) -> frozenset[Trigger] | None:
+    """Lowercase literals one of which every match of ``source`` contains.
+
+    Each literal is paired with whether the match always places it at the
+    start of a word. Returns None when the rule has no such literal, in
+    which case it cannot be prefiltered.
+    """
+    return _required(sre_parse.parse(source).data)
+
+
+class TriggerIndex:
+    """The union of every rule's required literals and every keyword.
+
+    A message can only match if one of the triggers occurs in its lowercased
+    text, at the start of a word for triggers that the rule places there.
+    Substring search rejects most messages outright; the word-start check
+    only runs for the few triggers that were found.
+
+    The check is sound for ASCII content: lowercasing it leaves each
+    character in place and maps every case variant that ``re.IGNORECASE``
+    accepts for an ASCII literal onto that literal. Non-ASCII content is
+    always sent to the full scan, since case folding outside ASCII (the
+    Kelvin sign matching ``k``, for example) does not line up with
+    ``str.lower``.
+    """
+
+    def __init__(
+        self, patterns: Sequence[CompiledPattern], keywords: Iterable[str]
+    ) -> None:
+        triggers: set[Trigger] = {(keyword.lower(), False) for keyword in keywords}
+        self.complete = True
+        for pattern in patterns:
+            literals = required_literals(pattern.source)
+            if literals is None:
+                self.complete = False
+                break
+            triggers |= literals
+
+        # A trigger is redundant if a looser one must occur whenever it does
+        self.triggers = sorted(
+            (text, word_start)
+            for text, word_start in triggers
+            if not any(
+                (other, other_start) != (text, word_start)
+                and (
+                    (not other_start and other in text)
+                    or (other_start and word_start and text.startswith(other))
+                )
+                for other, other_start in triggers
+            )
+        )
+        self._checks = [
+            (text, re.compile(r"\b" + re.escape(text)) if word_start else None)
+            for text, word_start in self.triggers
+        ]
+
+    def may_match(self, content: str) -> bool:
+        """False only if no rule or keyword can match ``content``."""
+        if not self.complete or not content.isascii():
+            return True
+        lowered = content.lower()
+        return any(
+            text in lowered
+            and (word_start is None or word_start.search(lowered) is not None)
+            for text, word_start in self._checks
+        )
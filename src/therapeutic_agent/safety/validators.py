@@ -1,6 +1,5 @@
 """Content safety validation rules and processors."""
 
-import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
@@ -8,6 +7,12 @@ from typing import Any
 
 from pydantic import BaseModel
 
+from therapeutic_agent.safety.backends import (
+    CompiledPattern,
+    RegexBackend,
+    get_backend,
+)
+
 
 class SafetyLevel(str, Enum):
     """Safety assessment levels."""
@@ -42,6 +47,14 @@ class SafetyResult:
     suggested_response: str | None = None
 
 
+@dataclass(frozen=True)
+class ScanHits:
+    """Raw rule hits for one validator, before any scoring is applied."""
+
+    pattern_matches: int = 0
+    keywords: frozenset[str] = frozenset()
+
+
 class SafetyPattern(BaseModel):
     """Pattern-based safety rule configuration."""
 
@@ -53,14 +66,55 @@ class SafetyPattern(BaseModel):
 
 
 class BaseValidator(ABC):
-    """Abstract base class for safety validators."""
+    """Abstract base class for safety validators.
+
+    Validators split matching from scoring: ``patterns`` and ``keywords``
+    describe what to look for, and ``assess`` turns the resulting hits into a
+    ``SafetyResult``. This lets the engine scan a message once for every
+    validator instead of once per validator. Patterns are compiled by a
+    ``RegexBackend``, which defaults to the safest one available.
+
+    Validators whose ``assess`` reads the context must set ``uses_context``;
+    otherwise the engine may reuse one assessment for messages with the same
+    hits.
+    """
+
+    uses_context: bool = False
+
+    @property
+    def patterns(self) -> list[CompiledPattern]:
+        """Compiled patterns; each one that matches counts once."""
+        return []
+
+    @property
+    def keywords(self) -> frozenset[str]:
+        """Lowercase substrings looked up in the lowercased content."""
+        return frozenset()
+
+    def scan(self, content: str) -> ScanHits:
+        """Match this validator's rules against content on its own."""
+        content_lower = content.lower()
+        return ScanHits(
+            pattern_matches=sum(
+                1 for pattern in self.patterns if pattern.search(content)
+            ),
+            keywords=frozenset(
+                keyword for keyword in self.keywords if keyword in content_lower
+            ),
+        )
 
     @abstractmethod
+    def assess(
+        self, hits: ScanHits, context: dict[str, Any] | None = None
+    ) -> SafetyResult:
+        """Score rule hits for this validator."""
+        pass
+
     async def validate(
         self, content: str, context: dict[str, Any] | None = None
     ) -> SafetyResult:
         """Validate content for safety concerns."""
-        pass
+        return self.assess(self.scan(content), context)
 
 
 class CrisisValidator(BaseValidator):
@@ -89,25 +143,24 @@ class CrisisValidator(BaseValidator):
         "cut myself",
     }
 
-    def __init__(self) -> None:
-        self._compiled_patterns = [
-            re.compile(pattern, re.IGNORECASE) for pattern in self.CRISIS_PATTERNS
-        ]
+    def __init__(self, backend: RegexBackend | None = None) -> None:
+        backend = backend or get_backend()
+        self._compiled_patterns = backend.compile_many(self.CRISIS_PATTERNS)
+        self._keywords = frozenset(self.CRISIS_KEYWORDS)
 
-    async def validate(
-        self, content: str, context: dict[str, Any] | None = None
-    ) -> SafetyResult:
-        """Validate for crisis indicators."""
-        content_lower = content.lower()
+    @property
+    def patterns(self) -> list[CompiledPattern]:
+        return self._compiled_patterns
 
-        pattern_matches = sum(
-            1 for pattern in self._compiled_patterns if pattern.search(content)
-        )
-        keyword_matches = sum(
-            1 for keyword in self.CRISIS_KEYWORDS if keyword in content_lower
-        )
+    @property
+    def keywords(self) -> frozenset[str]:
+        return self._keywords
 
-        total_indicators = pattern_matches + keyword_matches
+    def assess(
+        self, hits: ScanHits, context: dict[str, Any] | None = None
+    ) -> SafetyResult:
+        """Assess crisis indicators."""
+        total_indicators = hits.pattern_matches + len(hits.keywords)
 
         if total_indicators >= 2:
             return SafetyResult(
@@ -162,31 +215,35 @@ class SelfHarmValidator(BaseValidator):
         r"\b(?:hurt\s+myself|inflict\s+pain)\b",
     ]
 
-    def __init__(self) -> None:
-        self._compiled_patterns = [
-            re.compile(pattern, re.IGNORECASE) for pattern in self.SELF_HARM_PATTERNS
-        ]
+    # Mentions that suggest accidental/non-intentional injury
+    ACCIDENTAL_KEYWORDS = {
+        "accidentally",
+        "accident",
+        "cooking",
+        "shaving",
+        "working",
+    }
 
-    async def validate(
-        self, content: str, context: dict[str, Any] | None = None
+    def __init__(self, backend: RegexBackend | None = None) -> None:
+        backend = backend or get_backend()
+        self._compiled_patterns = backend.compile_many(self.SELF_HARM_PATTERNS)
+        self._keywords = frozenset(self.ACCIDENTAL_KEYWORDS)
+
+    @property
+    def patterns(self) -> list[CompiledPattern]:
+        return self._compiled_patterns
+
+    @property
+    def keywords(self) -> frozenset[str]:
+        return self._keywords
+
+    def assess(
+        self, hits: ScanHits, context: dict[str, Any] | None = None
     ) -> SafetyResult:
-        """Validate for self-harm indicators."""
-        # Check for accidental/non-intentional mentions
-        content_lower = content.lower()
-        accidental_keywords = [
-            "accidentally",
-            "accident",
-            "cooking",
-            "shaving",
-            "working",
-        ]
-        is_accidental = any(keyword in content_lower for keyword in accidental_keywords)
-
-        matches = sum(
-            1 for pattern in self._compiled_patterns if pattern.search(content)
-        )
+        """Assess self-harm indicators."""
+        is_accidental = bool(hits.keywords)
 
-        if matches >= 1 and not is_accidental:
+        if hits.pattern_matches >= 1 and not is_accidental:
             return SafetyResult(
                 is_safe=False,
                 level=SafetyLevel.WARNING,
@@ -223,20 +280,19 @@ class MedicalAdviceValidator(BaseValidator):
         r"\b(?:treatment\s+for|cure\s+for|how\s+to\s+treat)\b",
     ]
 
-    def __init__(self) -> None:
-        self._compiled_patterns = [
-            re.compile(pattern, re.IGNORECASE) for pattern in self.MEDICAL_PATTERNS
-        ]
+    def __init__(self, backend: RegexBackend | None = None) -> None:
+        backend = backend or get_backend()
+        self._compiled_patterns = backend.compile_many(self.MEDICAL_PATTERNS)
 
-    async def validate(
-        self, content: str, context: dict[str, Any] | None = None
-    ) -> SafetyResult:
-        """Validate for inappropriate medical advice requests."""
-        matches = sum(
-            1 for pattern in self._compiled_patterns if pattern.search(content)
-        )
+    @property
+    def patterns(self) -> list[CompiledPattern]:
+        return self._compiled_patterns
 
-        if matches >= 1:
+    def assess(
+        self, hits: ScanHits, context: dict[str, Any] | None = None
+    ) -> SafetyResult:
+        """Assess inappropriate medical advice requests."""
+        if hits.pattern_matches >= 1:
             return SafetyResult(
                 is_safe=False,
                 level=SafetyLevel.CAUTION,
@@ -271,20 +327,19 @@ class TherapeuticBoundaryValidator(BaseValidator):
         r"\b(?:date|romantic|sexual|intimate)\b.*\b(?:relationship|feelings)\b",
     ]
 
-    def __init__(self) -> None:
-        self._compiled_patterns = [
-            re.compile(pattern, re.IGNORECASE) for pattern in self.BOUNDARY_PATTERNS
-        ]
+    def __init__(self, backend: RegexBackend | None = None) -> None:
+        backend = backend or get_backend()
+        self._compiled_patterns = backend.compile_many(self.BOUNDARY_PATTERNS)
 
-    async def validate(
-        self, content: str, context: dict[str, Any] | None = None
-    ) -> SafetyResult:
-        """Validate therapeutic boundary maintenance."""
-        matches = sum(
-            1 for pattern in self._compiled_patterns if pattern.search(content)
-        )
+    @property
+    def patterns(self) -> list[CompiledPattern]:
+        return self._compiled_patterns
 
-        if matches >= 1:
+    def assess(
+        self, hits: ScanHits, context: dict[str, Any] | None = None
+    ) -> SafetyResult:
+        """Assess therapeutic boundary maintenance."""
+        if hits.pattern_matches >= 1:
             return SafetyResult(
                 is_safe=False,
                 level=SafetyLevel.CAUTION,
@@ -1,7 +1,7 @@
 """Database connection and session management."""
 
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable
 
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -13,6 +13,19 @@ from sqlalchemy.ext.asyncio import (
 from therapeutic_agent.core.config import get_settings
 from therapeutic_agent.storage.models import Base
 
+AFTER_COMMIT = "after_commit"
+
+
+def after_commit(
+    session: AsyncSession, callback: Callable[[], Awaitable[None]]
+) -> None:
+    """Run ``callback`` once the session's transaction has committed.
+
+    Callbacks run in the order they were added, when the session was opened
+    with ``DatabaseManager.get_session``; they are dropped on rollback.
+    """
+    session.info.setdefault(AFTER_COMMIT, []).append(callback)
+
 
 class DatabaseManager:
     """Manages database connections and sessions."""
@@ -22,7 +35,11 @@ class DatabaseManager:
         self._session_factory: async_sessionmaker[AsyncSession] | None = None
 
     async def initialize(self) -> None:
-        """Initialize database connection and create tables."""
+        """Initialize database connection and create tables.
+
+        Table creation is skipped when ``auto_create_schema`` is disabled, in
+        which case the schema is expected to be managed by Alembic migrations.
+        """
         settings = get_settings()
 
         self._engine = create_async_engine(
@@ -39,8 +56,9 @@ class DatabaseManager:
             expire_on_commit=False,
         )
 
-        async with self._engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        if settings.database.auto_create_schema:
+            async with self._engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
 
     async def close(self) -> None:
         """Close database connections."""
@@ -57,7 +75,10 @@ class DatabaseManager:
             try:
                 yield session
                 await session.commit()
+                for callback in session.info.pop(AFTER_COMMIT, ()):
+                    await callback()
             except Exception:
+                session.info.pop(AFTER_COMMIT, None)
                 await session.rollback()
                 raise
             finally:
@@ -5,7 +5,17 @@ from enum import Enum
 from typing import Any
 from uuid import UUID, uuid4
 
-from sqlalchemy import JSON, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -51,19 +61,46 @@ class SafetyFlag(str, Enum):
     MEDICAL_ADVICE = "medical_advice"
 
 
+class JobStatus(str, Enum):
+    """Background job status enumeration."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobKind(str, Enum):
+    """Background job types."""
+
+    SESSION_SUMMARY = "session_summary"
+
+
 class TherapeuticSession(Base):
     """Core therapeutic session model."""
 
     __tablename__ = "therapeutic_sessions"
+    __table_args__ = (
+        # Active-session count per user
+        Index("ix_therapeutic_sessions_user_id_status", "user_id", "status"),
+        # Most recently active sessions per user
+        Index(
+            "ix_therapeutic_sessions_user_id_last_activity", "user_id", "last_activity"
+        ),
+    )
 
-    user_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    user_id: Mapped[str] = mapped_column(String(255), nullable=False)
     status: Mapped[SessionStatus] = mapped_column(
         String(50), default=SessionStatus.ACTIVE, index=True
     )
     title: Mapped[str | None] = mapped_column(String(255))
+    # Rolling summary of the first summarized_message_count messages
     summary: Mapped[str | None] = mapped_column(Text)
+    summarized_message_count: Mapped[int] = mapped_column(Integer, default=0)
     session_notes: Mapped[dict[str, Any] | None] = mapped_column(JSON)
     safety_score: Mapped[float] = mapped_column(Float, default=1.0)
+    # Serialized ConversationSafetyState carried between messages
+    safety_state: Mapped[dict[str, Any] | None] = mapped_column(JSON)
     message_count: Mapped[int] = mapped_column(Integer, default=0)
     last_activity: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
@@ -83,9 +120,19 @@ class ConversationMessage(Base):
     """Individual conversation message within a session."""
 
     __tablename__ = "conversation_messages"
+    __table_args__ = (
+        # History pages and tail reads are ordered by creation time, with the
+        # id breaking ties so that keyset cursors are total
+        Index(
+            "ix_conversation_messages_session_id_created_at_id",
+            "session_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     session_id: Mapped[UUID] = mapped_column(
-        ForeignKey("therapeutic_sessions.id", ondelete="CASCADE"), index=True
+        ForeignKey("therapeutic_sessions.id", ondelete="CASCADE")
     )
     role: Mapped[MessageRole] = mapped_column(String(50))
     content: Mapped[str] = mapped_column(Text)
@@ -96,6 +143,7 @@ class ConversationMessage(Base):
     safety_score: Mapped[float | None] = mapped_column(Float)
     token_count: Mapped[int | None] = mapped_column(Integer)
     processing_time_ms: Mapped[int | None] = mapped_column(Integer)
+    time_to_first_token_ms: Mapped[int | None] = mapped_column(Integer)
 
     session: Mapped[TherapeuticSession] = relationship(back_populates="messages")
 
@@ -118,3 +166,40 @@ class SafetyEvent(Base):
     resolved: Mapped[bool] = mapped_column(default=False)
 
     session: Mapped[TherapeuticSession] = relationship(back_populates="safety_events")
+
+
+class BackgroundJob(Base):
+    """Durable unit of background work, claimed and run by job workers."""
+
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        # Workers claim the oldest due job of a status
+        Index("ix_background_jobs_status_run_after", "status", "run_after"),
+    )
+
+    kind: Mapped[JobKind] = mapped_column(String(50))
+    session_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("therapeutic_sessions.id", ondelete="CASCADE"), index=True
+    )
+    status: Mapped[JobStatus] = mapped_column(String(50), default=JobStatus.PENDING)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer)
+    # Pending jobs run once due; running jobs are retried once the lease expires
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None] = mapped_column(Text)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+# Unresolved safety events per session, highest severity first. Declared after
+# the model so the partial predicate renders exactly like the repository query.
+Index(
+    "ix_safety_events_session_id_unresolved",
+    SafetyEvent.session_id,
+    SafetyEvent.severity_score,
+    postgresql_where=SafetyEvent.resolved.is_(False),
+    sqlite_where=SafetyEvent.resolved.is_(False),
+)
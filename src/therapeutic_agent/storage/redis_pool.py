@@ -0,0 +1,36 @@
+"""Process-wide Redis client."""
+
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from therapeutic_agent.core.config import get_settings
+
+_redis: Redis | None = None
+
+
+def get_redis() -> Redis:
+    """Get the process-wide client, creating its connection pool on first use.
+
+    The pool holds up to ``RedisConfig.max_connections`` connections; callers
+    beyond that wait up to ``socket_timeout`` for one to be returned.
+    """
+    global _redis
+    if _redis is None:
+        config = get_settings().redis
+        pool = BlockingConnectionPool.from_url(
+            config.url,
+            max_connections=config.max_connections,
+            timeout=config.socket_timeout,
+            socket_timeout=config.socket_timeout,
+            socket_connect_timeout=config.socket_timeout,
+            decode_responses=True,
+        )
+        _redis = Redis.from_pool(pool)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the process-wide client; the next ``get`` creates a new one."""
+    global _redis
+    client, _redis = _redis, None
+    if client is not None:
+        await client.aclose()
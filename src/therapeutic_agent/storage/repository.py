@@ -1,28 +1,61 @@
 """Repository layer for data access operations."""
 
-from datetime import datetime, timezone
-from typing import Any, Sequence
-from uuid import UUID
-
-from sqlalchemy import desc, func, select, update
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Collection, Sequence, cast
+from uuid import UUID, uuid4
+
+from sqlalchemy import (
+    Update,
+    and_,
+    case,
+    desc,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import class_mapper
 
+from therapeutic_agent.core.context import estimate_tokens
+from therapeutic_agent.storage.database import after_commit
 from therapeutic_agent.storage.models import (
+    BackgroundJob,
     ConversationMessage,
+    JobKind,
+    JobStatus,
     MessageRole,
     SafetyEvent,
     SafetyFlag,
     SessionStatus,
     TherapeuticSession,
 )
+from therapeutic_agent.storage.session_cache import (
+    CachedMessage,
+    CachedSession,
+    SessionStore,
+)
 
 
 class SessionRepository:
-    """Repository for therapeutic session operations."""
+    """Repository for therapeutic session operations.
 
-    def __init__(self, session: AsyncSession) -> None:
+    Given a session cache, recent-message reads are served from it where
+    possible and session writes are applied to it once they commit.
+    """
+
+    def __init__(
+        self, session: AsyncSession, cache: SessionStore | None = None
+    ) -> None:
         self._session = session
+        self._cache = cache
 
     async def create_session(
         self, user_id: str, title: str | None = None
@@ -33,18 +66,79 @@ class SessionRepository:
         )
         self._session.add(session)
         await self._session.flush()
+        if self._cache is not None:
+            after_commit(
+                self._session,
+                partial(self._cache.add, CachedSession.from_model(session)),
+            )
         return session
 
     async def get_session(self, session_id: UUID) -> TherapeuticSession | None:
-        """Get a session by ID with related messages."""
-        stmt = (
-            select(TherapeuticSession)
-            .options(selectinload(TherapeuticSession.messages))
-            .where(TherapeuticSession.id == session_id)
-        )
+        """Get a session by ID.
+
+        Its ``messages`` relationship is not loaded; read them a page at a
+        time with ``MessageRepository.get_message_page``.
+        """
+        stmt = select(TherapeuticSession).where(TherapeuticSession.id == session_id)
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_session_with_recent_messages(
+        self, session_id: UUID, limit: int
+    ) -> tuple[
+        TherapeuticSession | CachedSession | None,
+        list[ConversationMessage] | list[CachedMessage],
+    ]:
+        """Get a session header and only its last ``limit`` messages.
+
+        Messages are returned oldest first. The session's ``messages``
+        relationship is not loaded and must not be accessed. Results are
+        read-only: a cache hit returns ``CachedSession`` and
+        ``CachedMessage`` snapshots instead of ORM objects, and changes to
+        the header must be made with the ``update_*`` methods.
+
+        Must be the first read of the session in its transaction when the
+        repository has a cache, which is filled from what it reads.
+        """
+        if self._cache is None:
+            return await self._select_session_with_recent_messages(session_id, limit)
+
+        cached = await self._cache.get(session_id, limit)
+        if cached is not None:
+            return cached
+        async with self._cache.filling(session_id) as fill:
+            session, messages = await self._select_session_with_recent_messages(
+                session_id, limit
+            )
+            if session is not None:
+                await fill(
+                    CachedSession.from_model(session),
+                    [CachedMessage.from_model(message) for message in messages],
+                )
+        return session, messages
+
+    async def _select_session_with_recent_messages(
+        self, session_id: UUID, limit: int
+    ) -> tuple[TherapeuticSession | None, list[ConversationMessage]]:
+        result = await self._session.execute(
+            select(TherapeuticSession).where(TherapeuticSession.id == session_id)
+        )
+        session = result.scalar_one_or_none()
+        if session is None or limit <= 0:
+            return session, []
+
+        stmt = (
+            select(ConversationMessage)
+            .where(ConversationMessage.session_id == session_id)
+            .order_by(
+                desc(ConversationMessage.created_at), desc(ConversationMessage.id)
+            )
+            .limit(limit)
+        )
+        messages = list(await self._session.scalars(stmt))
+        messages.reverse()
+        return session, messages
+
     async def get_user_sessions(
         self, user_id: str, status: SessionStatus | None = None, limit: int = 50
     ) -> Sequence[TherapeuticSession]:
@@ -61,23 +155,73 @@ class SessionRepository:
 
     async def update_session_activity(self, session_id: UUID) -> None:
         """Update the last activity timestamp for a session."""
-        stmt = (
-            update(TherapeuticSession)
-            .where(TherapeuticSession.id == session_id)
-            .values(last_activity=datetime.now(timezone.utc))
-        )
-        await self._session.execute(stmt)
+        await self._update(session_id, last_activity=datetime.now(timezone.utc))
 
     async def update_session_status(
         self, session_id: UUID, status: SessionStatus
     ) -> None:
         """Update session status."""
+        await self._update(session_id, status=SessionStatus(status).value)
+
+    async def update_safety_state(
+        self, session_id: UUID, safety_state: dict[str, Any] | None
+    ) -> None:
+        """Store the conversation safety state carried between messages."""
+        await self._update(session_id, safety_state=safety_state)
+
+    async def _update(self, session_id: UUID, **values: Any) -> None:
         stmt = (
             update(TherapeuticSession)
             .where(TherapeuticSession.id == session_id)
-            .values(status=status)
+            .values(**values)
         )
         await self._session.execute(stmt)
+        if self._cache is not None:
+            after_commit(
+                self._session, partial(self._cache.update, session_id, **values)
+            )
+
+    async def update_session_summary(
+        self,
+        session_id: UUID,
+        summary: str,
+        summarized_message_count: int,
+        expected_message_count: int,
+    ) -> bool:
+        """Store a rolling summary covering the first messages of a session.
+
+        The update only applies while the stored summary still covers
+        ``expected_message_count`` messages, so a summary computed from a
+        stale read never overwrites a newer one. Returns whether it applied;
+        when it does not, the session is dropped from the cache so the next
+        read sees the stored summary.
+        """
+        stmt = (
+            update(TherapeuticSession)
+            .where(
+                TherapeuticSession.id == session_id,
+                TherapeuticSession.summarized_message_count == expected_message_count,
+            )
+            .values(summary=summary, summarized_message_count=summarized_message_count)
+            .execution_options(synchronize_session=False)
+        )
+        result = cast(CursorResult[Any], await self._session.execute(stmt))
+        if not result.rowcount:
+            # The caller read a stale count, possibly from the cache
+            if self._cache is not None:
+                after_commit(self._session, partial(self._cache.invalidate, session_id))
+            return False
+        if self._cache is not None:
+            after_commit(
+                self._session,
+                partial(
+                    self._cache.update,
+                    session_id,
+                    summary=summary,
+                    summarized_message_count=summarized_message_count,
+                ),
+            )
+        return True
 
     async def get_active_session_count(self, user_id: str) -> int:
         """Get count of active sessions for a user."""
@@ -89,11 +233,63 @@ class SessionRepository:
         return result.scalar() or 0
 
 
+@dataclass(frozen=True, slots=True)
+class MessageCursor:
+    """A position in a session's history, which is ordered by
+    ``(created_at, id)``.
+
+    Clients get cursors as opaque strings from ``encode``; the id breaks
+    ties between messages created at the same instant.
+    """
+
+    created_at: datetime
+    id: UUID
+
+    def __post_init__(self) -> None:
+        # Naive timestamps are UTC, as SQLite returns them
+        created_at = self.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        object.__setattr__(self, "created_at", created_at.astimezone(timezone.utc))
+
+    @classmethod
+    def of(cls, message: ConversationMessage) -> "MessageCursor":
+        """The position of ``message``."""
+        return cls(message.created_at, message.id)
+
+    @classmethod
+    def since(cls, timestamp: datetime) -> "MessageCursor":
+        """The position after every message created at or before ``timestamp``."""
+        return cls(timestamp, UUID(int=(1 << 128) - 1))
+
+    def encode(self) -> str:
+        """This cursor as an opaque, URL-safe string."""
+        raw = f"{self.created_at.isoformat()}|{self.id.hex}".encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    @classmethod
+    def decode(cls, token: str) -> "MessageCursor":
+        """Parse a string from ``encode``, raising ValueError if it is not one."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            created_at, id_hex = raw.decode().split("|")
+            return cls(datetime.fromisoformat(created_at), UUID(hex=id_hex))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+
+
 class MessageRepository:
-    """Repository for conversation message operations."""
+    """Repository for conversation message operations.
 
-    def __init__(self, session: AsyncSession) -> None:
+    Given a session cache, added messages are appended to it once they
+    commit.
+    """
+
+    def __init__(
+        self, session: AsyncSession, cache: SessionStore | None = None
+    ) -> None:
         self._session = session
+        self._cache = cache
 
     async def add_message(
         self,
@@ -104,16 +300,28 @@ class MessageRepository:
         safety_score: float | None = None,
         token_count: int | None = None,
         processing_time_ms: int | None = None,
+        time_to_first_token_ms: int | None = None,
     ) -> ConversationMessage:
-        """Add a new message to a session."""
+        """Add a new message to a session.
+
+        Without an exact ``token_count`` (as reported by the API for generated
+        replies), a local estimate is stored for context packing.
+        """
+        last_activity = datetime.now(timezone.utc)
         message = ConversationMessage(
             session_id=session_id,
             role=role,
             content=content,
             message_metadata=metadata,
             safety_score=safety_score,
-            token_count=token_count,
+            token_count=(
+                token_count if token_count is not None else estimate_tokens(content)
+            ),
             processing_time_ms=processing_time_ms,
+            time_to_first_token_ms=time_to_first_token_ms,
+            # Set here rather than by the database, whose clock may be
+            # coarser, so history cursors order messages exactly
+            created_at=last_activity,
         )
         self._session.add(message)
 
@@ -122,22 +330,33 @@ class MessageRepository:
             .where(TherapeuticSession.id == session_id)
             .values(
                 message_count=TherapeuticSession.message_count + 1,
-                last_activity=datetime.now(timezone.utc),
+                last_activity=last_activity,
             )
         )
         await self._session.execute(stmt)
 
         await self._session.flush()
+        if self._cache is not None:
+            after_commit(
+                self._session,
+                partial(
+                    self._cache.append,
+                    session_id,
+                    CachedMessage.from_model(message),
+                    last_activity,
+                ),
+            )
         return message
 
     async def get_session_messages(
-        self, session_id: UUID, limit: int | None = None
+        self, session_id: UUID, limit: int | None = None, offset: int = 0
     ) -> Sequence[ConversationMessage]:
-        """Get messages for a session, optionally limited."""
+        """Get messages for a session in history order, optionally a slice."""
         stmt = (
             select(ConversationMessage)
             .where(ConversationMessage.session_id == session_id)
-            .order_by(ConversationMessage.created_at)
+            .order_by(ConversationMessage.created_at, ConversationMessage.id)
+            .offset(offset)
         )
 
         if limit:
@@ -146,12 +365,58 @@ class MessageRepository:
         result = await self._session.execute(stmt)
         return result.scalars().all()
 
+    async def get_message_page(
+        self,
+        session_id: UUID,
+        limit: int,
+        after: MessageCursor | None = None,
+        before: MessageCursor | None = None,
+    ) -> tuple[list[ConversationMessage], bool]:
+        """Get up to ``limit`` messages of a session next to a cursor.
+
+        With ``after``, the messages following it; otherwise the messages
+        preceding ``before``, or the latest messages if neither is given.
+        Messages are returned oldest first, together with whether more
+        exist beyond the page in the direction read. Pages are keyset reads
+        of the (session_id, created_at, id) index, so their cost does not
+        grow with how far into the history they are.
+        """
+        position = tuple_(ConversationMessage.created_at, ConversationMessage.id)
+        stmt = select(ConversationMessage).where(
+            ConversationMessage.session_id == session_id
+        )
+        if after is not None:
+            stmt = stmt.where(position > tuple_(after.created_at, after.id)).order_by(
+                ConversationMessage.created_at, ConversationMessage.id
+            )
+        else:
+            if before is not None:
+                stmt = stmt.where(position < tuple_(before.created_at, before.id))
+            stmt = stmt.order_by(
+                desc(ConversationMessage.created_at), desc(ConversationMessage.id)
+            )
+
+        result = await self._session.execute(stmt.limit(limit + 1))
+        messages = list(result.scalars().all())
+        has_more = len(messages) > limit
+        del messages[limit:]
+        if after is None:
+            messages.reverse()
+        return messages, has_more
+
 
 class SafetyRepository:
-    """Repository for safety event operations."""
+    """Repository for safety event operations.
 
-    def __init__(self, session: AsyncSession) -> None:
+    Given a session cache, sessions whose safety score changes are
+    dropped from it once the change commits.
+    """
+
+    def __init__(
+        self, session: AsyncSession, cache: SessionStore | None = None
+    ) -> None:
         self._session = session
+        self._cache = cache
 
     async def create_safety_event(
         self,
@@ -183,6 +448,8 @@ class SafetyRepository:
         await self._session.execute(stmt)
 
         await self._session.flush()
+        if self._cache is not None:
+            after_commit(self._session, partial(self._cache.invalidate, session_id))
         return event
 
     async def get_unresolved_safety_events(
@@ -206,3 +473,338 @@ class SafetyRepository:
             update(SafetyEvent).where(SafetyEvent.id == event_id).values(resolved=True)
         )
         await self._session.execute(stmt)
+
+
+class JobRepository:
+    """Repository for background job operations.
+
+    A worker claims a job by setting it running under a lease and bumping
+    ``attempts``. The outcome is only recorded for the attempt that claimed
+    it, so a worker whose lease expired cannot overwrite a later attempt.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def enqueue(
+        self, kind: JobKind, max_attempts: int, session_id: UUID | None = None
+    ) -> BackgroundJob:
+        """Add a job that is due immediately."""
+        job = BackgroundJob(
+            kind=kind,
+            session_id=session_id,
+            status=JobStatus.PENDING,
+            attempts=0,
+            max_attempts=max_attempts,
+            run_after=datetime.now(timezone.utc),
+        )
+        self._session.add(job)
+        await self._session.flush()
+        return job
+
+    async def get_job(self, job_id: UUID) -> BackgroundJob | None:
+        """Get a job by ID."""
+        result = await self._session.execute(
+            select(BackgroundJob)
+            .where(BackgroundJob.id == job_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim_next(
+        self, kinds: Collection[str], lease_seconds: float
+    ) -> BackgroundJob | None:
+        """Claim the oldest due job of the given kinds, if any.
+
+        Due jobs are pending jobs whose ``run_after`` has passed and running
+        jobs whose lease expired, which happens when a worker died.
+        """
+        now = datetime.now(timezone.utc)
+        due = and_(
+            BackgroundJob.kind.in_(kinds),
+            or_(
+                and_(
+                    BackgroundJob.status == JobStatus.PENDING,
+                    BackgroundJob.run_after <= now,
+                ),
+                and_(
+                    BackgroundJob.status == JobStatus.RUNNING,
+                    BackgroundJob.locked_until <= now,
+                ),
+            ),
+        )
+        result = await self._session.execute(
+            select(BackgroundJob.id)
+            .where(due)
+            .order_by(BackgroundJob.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job_id = result.scalar_one_or_none()
+        if job_id is None:
+            return None
+
+        # Another worker may have claimed the job since it was selected
+        claim = (
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, due)
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=BackgroundJob.attempts + 1,
+                locked_until=now + timedelta(seconds=lease_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = cast(CursorResult[Any], await self._session.execute(claim))
+        if not result.rowcount:
+            return None
+        return await self.get_job(job_id)
+
+    async def complete(
+        self, job_id: UUID, attempt: int, result: dict[str, Any] | None
+    ) -> None:
+        """Record a successful attempt."""
+        await self._finish(
+            job_id,
+            attempt,
+            status=JobStatus.SUCCEEDED,
+            result=result,
+            last_error=None,
+            finished_at=datetime.now(timezone.utc),
+        )
+
+    async def retry(
+        self, job_id: UUID, attempt: int, error: str, delay_seconds: float
+    ) -> None:
+        """Record a failed attempt and make the job due again after a delay."""
+        await self._finish(
+            job_id,
+            attempt,
+            status=JobStatus.PENDING,
+            last_error=error,
+            run_after=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds),
+        )
+
+    async def fail(self, job_id: UUID, attempt: int, error: str) -> None:
+        """Record a failed attempt after which the job is given up."""
+        await self._finish(
+            job_id,
+            attempt,
+            status=JobStatus.FAILED,
+            last_error=error,
+            finished_at=datetime.now(timezone.utc),
+        )
+
+    async def _finish(self, job_id: UUID, attempt: int, **values: Any) -> None:
+        stmt = (
+            update(BackgroundJob)
+            .where(
+                BackgroundJob.id == job_id,
+                BackgroundJob.status == JobStatus.RUNNING,
+                BackgroundJob.attempts == attempt,
+            )
+            .values(locked_until=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.execute(stmt)
+
+
+@dataclass(slots=True)
+class SessionRowChange:
+    """What one or more turns change on a session row."""
+
+    messages: int = 0
+    last_activity: datetime | None = None
+    # The lowest severity of the new safety events
+    safety_score: float | None = None
+    safety_state: dict[str, Any] | None = None
+
+    def merge(self, other: "SessionRowChange") -> None:
+        """Fold in the changes of a later turn."""
+        self.messages += other.messages
+        if other.last_activity is not None and (
+            self.last_activity is None or other.last_activity > self.last_activity
+        ):
+            self.last_activity = other.last_activity
+        if other.safety_score is not None and (
+            self.safety_score is None or other.safety_score < self.safety_score
+        ):
+            self.safety_score = other.safety_score
+        if other.safety_state is not None:
+            self.safety_state = other.safety_state
+
+    def statement(self, session_id: UUID) -> Update | None:
+        """The UPDATE applying these changes, or None if there are none."""
+        values: dict[str, Any] = {}
+        if self.messages:
+            values["message_count"] = TherapeuticSession.message_count + self.messages
+            values["last_activity"] = self.last_activity
+        if self.safety_score is not None:
+            # The lower of the two, without LEAST, which SQLite lacks
+            values["safety_score"] = case(
+                (
+                    TherapeuticSession.safety_score > self.safety_score,
+                    self.safety_score,
+                ),
+                else_=TherapeuticSession.safety_score,
+            )
+        if self.safety_state is not None:
+            values["safety_state"] = self.safety_state
+        if not values:
+            return None
+        return (
+            update(TherapeuticSession)
+            .where(TherapeuticSession.id == session_id)
+            .values(**values)
+        )
+
+
+class TurnUnitOfWork:
+    """The writes of a turn, applied with one UPDATE per session row.
+
+    ``add_message`` and ``create_safety_event`` take the same arguments as
+    their ``MessageRepository`` and ``SafetyRepository`` counterparts but
+    only record the row; ids and creation times are assigned at once, so
+    the returned objects can be used straight away. ``apply`` then inserts
+    the rows and updates each session they belong to once (message count,
+    last activity, lowest safety score and safety state) rather than once
+    per write, so a turn takes the session row's lock a single time.
+    ``extend`` merges units so that several turns are applied together.
+    """
+
+    def __init__(self) -> None:
+        self.messages: list[ConversationMessage] = []
+        self.safety_events: list[SafetyEvent] = []
+        self.changes: dict[UUID, SessionRowChange] = {}
+
+    @property
+    def rows(self) -> int:
+        """How many rows ``apply`` inserts."""
+        return len(self.messages) + len(self.safety_events)
+
+    async def add_message(
+        self,
+        session_id: UUID,
+        role: MessageRole,
+        content: str,
+        metadata: dict[str, Any] | None = None,
+        safety_score: float | None = None,
+        token_count: int | None = None,
+        processing_time_ms: int | None = None,
+        time_to_first_token_ms: int | None = None,
+    ) -> ConversationMessage:
+        """Record a message added to a session."""
+        message = ConversationMessage(
+            id=uuid4(),
+            session_id=session_id,
+            role=role,
+            content=content,
+            message_metadata=metadata,
+            safety_score=safety_score,
+            token_count=(
+                token_count if token_count is not None else estimate_tokens(content)
+            ),
+            processing_time_ms=processing_time_ms,
+            time_to_first_token_ms=time_to_first_token_ms,
+            created_at=datetime.now(timezone.utc),
+        )
+        self.messages.append(message)
+        self._change(session_id).merge(
+            SessionRowChange(messages=1, last_activity=message.created_at)
+        )
+        return message
+
+    async def create_safety_event(
+        self,
+        session_id: UUID,
+        flag_type: SafetyFlag,
+        severity_score: float,
+        description: str,
+        triggered_by_message_id: UUID | None = None,
+        intervention_taken: str | None = None,
+    ) -> SafetyEvent:
+        """Record a safety event."""
+        event = SafetyEvent(
+            id=uuid4(),
+            session_id=session_id,
+            flag_type=flag_type,
+            severity_score=severity_score,
+            triggered_by_message_id=triggered_by_message_id,
+            description=description,
+            intervention_taken=intervention_taken,
+            resolved=False,
+            created_at=datetime.now(timezone.utc),
+        )
+        self.safety_events.append(event)
+        self._change(session_id).merge(SessionRowChange(safety_score=severity_score))
+        return event
+
+    def update_safety_state(
+        self, session_id: UUID, safety_state: dict[str, Any]
+    ) -> None:
+        """Record the conversation safety state carried between messages."""
+        self._change(session_id).safety_state = safety_state
+
+    def extend(self, other: "TurnUnitOfWork") -> None:
+        """Add the writes of a later turn."""
+        self.messages.extend(other.messages)
+        self.safety_events.extend(other.safety_events)
+        for session_id, change in other.changes.items():
+            self._change(session_id).merge(change)
+
+    async def apply(
+        self, session: AsyncSession, cache: SessionStore | None = None
+    ) -> None:
+        """Write everything recorded in ``session``'s transaction.
+
+        Given a session cache, the changes are applied to it once they
+        commit, as the repositories do.
+        """
+        # Messages first: safety events may reference them
+        if self.messages:
+            await session.execute(
+                insert(ConversationMessage), [_row(m) for m in self.messages]
+            )
+        if self.safety_events:
+            await session.execute(
+                insert(SafetyEvent), [_row(e) for e in self.safety_events]
+            )
+        for session_id, change in self.changes.items():
+            stmt = change.statement(session_id)
+            if stmt is not None:
+                await session.execute(stmt)
+        if cache is not None:
+            self._update_cache(session, cache)
+
+    def _change(self, session_id: UUID) -> SessionRowChange:
+        return self.changes.setdefault(session_id, SessionRowChange())
+
+    def _update_cache(self, session: AsyncSession, cache: SessionStore) -> None:
+        for message in self.messages:
+            after_commit(
+                session,
+                partial(
+                    cache.append,
+                    message.session_id,
+                    CachedMessage.from_model(message),
+                    message.created_at,
+                ),
+            )
+        for session_id, change in self.changes.items():
+            if change.safety_state is not None:
+                after_commit(
+                    session,
+                    partial(cache.update, session_id, safety_state=change.safety_state),
+                )
+            # The cache does not know the score the update lowered
+            if change.safety_score is not None:
+                after_commit(session, partial(cache.invalidate, session_id))
+
+
+def _row(model: ConversationMessage | SafetyEvent) -> dict[str, Any]:
+    # updated_at is left to its server default
+    return {
+        attr.key: getattr(model, attr.key)
+        for attr in class_mapper(type(model)).column_attrs
+        if attr.key != "updated_at"
+    }
@@ -0,0 +1,591 @@
+"""Write-through caches of active sessions and their recent messages.
+
+``SessionCache`` keeps sessions in process; ``RedisSessionCache`` shares
+them between workers through Redis.
+"""
+
+import json
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields, replace
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Mapping,
+    Protocol,
+)
+from uuid import UUID
+
+import structlog
+from prometheus_client import Counter
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, WatchError
+from redis.typing import EncodableT, FieldT
+
+from therapeutic_agent.core.config import Settings
+from therapeutic_agent.core.context import estimate_tokens
+from therapeutic_agent.storage.models import (
+    ConversationMessage,
+    SessionStatus,
+    TherapeuticSession,
+)
+from therapeutic_agent.storage.redis_pool import get_redis
+
+logger = structlog.get_logger()
+
+SESSION_CACHE_REQUESTS = Counter(
+    "therapeutic_session_cache_requests_total",
+    "Session cache lookups",
+    ["result"],
+)
+SESSION_CACHE_EVICTIONS = Counter(
+    "therapeutic_session_cache_evictions_total",
+    "Sessions dropped from the cache because it was full or they sat idle",
+    ["reason"],
+)
+SESSION_CACHE_ERRORS = Counter(
+    "therapeutic_session_cache_errors_total",
+    "Session cache operations that failed because Redis was unavailable",
+    ["operation"],
+)
+
+
+@dataclass(slots=True)
+class CachedMessage:
+    """The fields of a ``ConversationMessage`` that turns read."""
+
+    id: UUID
+    role: str
+    content: str
+    token_count: int | None
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, message: ConversationMessage) -> "CachedMessage":
+        return cls(
+            id=message.id,
+            role=message.role,
+            content=message.content,
+            token_count=(
+                message.token_count
+                if message.token_count is not None
+                else estimate_tokens(message.content)
+            ),
+            created_at=message.created_at,
+        )
+
+
+@dataclass(slots=True)
+class CachedSession:
+    """The header columns of a ``TherapeuticSession``."""
+
+    id: UUID
+    user_id: str
+    title: str | None
+    status: str
+    summary: str | None
+    summarized_message_count: int
+    safety_score: float
+    safety_state: dict[str, Any] | None
+    message_count: int
+    created_at: datetime
+    last_activity: datetime
+
+    @classmethod
+    def from_model(cls, session: TherapeuticSession) -> "CachedSession":
+        return cls(
+            id=session.id,
+            user_id=session.user_id,
+            title=session.title,
+            status=SessionStatus(session.status).value,
+            summary=session.summary,
+            summarized_message_count=session.summarized_message_count,
+            safety_score=session.safety_score,
+            safety_state=session.safety_state,
+            message_count=session.message_count,
+            created_at=session.created_at,
+            last_activity=session.last_activity,
+        )
+
+
+SESSION_FIELDS = tuple(field.name for field in fields(CachedSession))
+MESSAGE_FIELDS = tuple(field.name for field in fields(CachedMessage))
+
+Fill = Callable[[CachedSession, list[CachedMessage]], Awaitable[None]]
+
+
+class SessionStore(Protocol):
+    """What the repositories need from a session cache."""
+
+    async def get(
+        self, session_id: UUID, limit: int
+    ) -> tuple[CachedSession, list[CachedMessage]] | None: ...
+
+    def filling(self, session_id: UUID) -> AsyncContextManager[Fill]: ...
+
+    async def add(self, session: CachedSession) -> None: ...
+
+    async def append(
+        self, session_id: UUID, message: CachedMessage, last_activity: datetime
+    ) -> None: ...
+
+    async def update(self, session_id: UUID, **values: Any) -> None: ...
+
+    async def invalidate(self, session_id: UUID) -> None: ...
+
+
+@dataclass(slots=True)
+class _Entry:
+    session: CachedSession
+    messages: deque[CachedMessage]
+    touched: float = 0.0
+
+
+class SessionCache:
+    """LRU cache of session headers with the tail of their conversation.
+
+    Holds at most ``max_sessions`` sessions, each with up to
+    ``tail_messages`` of its latest messages, and drops sessions that have
+    not been read or written for ``idle_ttl_seconds``.
+
+    It is kept current by the repositories, which apply each write once its
+    transaction has committed, so a rolled back turn leaves it untouched.
+    Sessions are added when they are created or read from the database. A
+    read that races with a write to the same session is not cached, as it
+    may predate the write.
+
+    Only writes made through repositories given this cache are seen, so
+    the cache suits deployments where one process writes sessions, with no
+    separate job worker; elsewhere another process's writes, such as a
+    worker's summaries, are missed until the session is evicted. It is
+    therefore opt-in. Returned sessions are copies; messages are shared and
+    must not be modified.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        idle_ttl_seconds: float | None = 900.0,
+        tail_messages: int = 200,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.tail_messages = tail_messages
+        self._clock = clock
+        self._entries: OrderedDict[UUID, _Entry] = OrderedDict()
+        # Reads in progress; a write to the session withdraws its token
+        self._fills: dict[UUID, object] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(
+        self, session_id: UUID, limit: int
+    ) -> tuple[CachedSession, list[CachedMessage]] | None:
+        """The session and its last ``limit`` messages, oldest first.
+
+        Misses unless the cached tail holds all of those messages.
+        """
+        entry = self._live_entry(session_id)
+        if entry is None or len(entry.messages) < min(
+            limit, entry.session.message_count
+        ):
+            self.misses += 1
+            SESSION_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+
+        entry.touched = self._clock()
+        self._entries.move_to_end(session_id)
+        self.hits += 1
+        SESSION_CACHE_REQUESTS.labels(result="hit").inc()
+        messages = list(entry.messages)[-limit:] if limit > 0 else []
+        return replace(entry.session), messages
+
+    @asynccontextmanager
+    async def filling(self, session_id: UUID) -> AsyncIterator[Fill]:
+        """Wrap a database read of a session to cache what it returns.
+
+        Yields a function to call with the session and its latest messages,
+        which caches them unless the session was written to meanwhile.
+        """
+        token = object()
+        self._fills[session_id] = token
+
+        async def fill(session: CachedSession, messages: list[CachedMessage]) -> None:
+            if self._fills.get(session_id) is token:
+                self._store(session, messages)
+
+        try:
+            yield fill
+        finally:
+            if self._fills.get(session_id) is token:
+                del self._fills[session_id]
+
+    async def add(self, session: CachedSession) -> None:
+        """Cache a session that has just been created."""
+        self._store(session, [])
+
+    async def append(
+        self, session_id: UUID, message: CachedMessage, last_activity: datetime
+    ) -> None:
+        """Record a message added to a session."""
+        self._fills.pop(session_id, None)
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+        entry.messages.append(message)
+        entry.session.message_count += 1
+        entry.session.last_activity = last_activity
+        self._touch(session_id, entry)
+
+    async def update(self, session_id: UUID, **values: Any) -> None:
+        """Record new values of a session's header columns."""
+        self._fills.pop(session_id, None)
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return
+        for name, value in values.items():
+            setattr(entry.session, name, value)
+        self._touch(session_id, entry)
+
+    async def invalidate(self, session_id: UUID) -> None:
+        """Drop a session after a write the cache cannot apply."""
+        self._fills.pop(session_id, None)
+        self._entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._fills.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "sessions": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _live_entry(self, session_id: UUID) -> _Entry | None:
+        entry = self._entries.get(session_id)
+        if entry is not None and self._expired(entry):
+            del self._entries[session_id]
+            self._count_eviction("idle")
+            return None
+        return entry
+
+    def _store(self, session: CachedSession, messages: list[CachedMessage]) -> None:
+        entry = _Entry(
+            session=replace(session),
+            messages=deque(messages, maxlen=self.tail_messages),
+        )
+        self._touch(session.id, entry)
+        self._entries[session.id] = entry
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+            self._count_eviction("capacity")
+        # Least recently used sessions come first, so expired ones do too
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if not self._expired(oldest):
+                break
+            self._entries.popitem(last=False)
+            self._count_eviction("idle")
+
+    def _touch(self, session_id: UUID, entry: _Entry) -> None:
+        entry.touched = self._clock()
+        if session_id in self._entries:
+            self._entries.move_to_end(session_id)
+
+    def _expired(self, entry: _Entry) -> bool:
+        return (
+            self.idle_ttl_seconds is not None
+            and self._clock() - entry.touched > self.idle_ttl_seconds
+        )
+
+    def _count_eviction(self, reason: str) -> None:
+        self.evictions += 1
+        SESSION_CACHE_EVICTIONS.labels(reason=reason).inc()
+
+
+class RedisSessionCache:
+    """Session cache shared by every worker through Redis.
+
+    A session is a hash of its header columns and a list of up to
+    ``tail_messages`` of its latest messages. Both expire once the session
+    has been neither read nor written for ``idle_ttl_seconds``; memory is
+    otherwise bounded by Redis' own eviction policy rather than a session
+    count. Every read and write is one pipelined round trip.
+
+    Each write also bumps a per-session version, and a database read is
+    only cached if the version is unchanged since the read began (checked
+    with ``WATCH``), so a read that races with a write is not cached.
+    Writes to a session that is not cached leave partial keys behind,
+    which read as misses until the next read from the database replaces
+    them.
+
+    When Redis fails, reads miss and fall through to the database, and
+    Redis is left alone for ``retry_seconds``. Sessions whose writes could
+    not be applied are deleted from Redis with the next command that
+    reaches it, so other workers stop serving them.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        idle_ttl_seconds: float = 900.0,
+        tail_messages: int = 200,
+        retry_seconds: float = 5.0,
+        prefix: str = "therapeutic:session",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._redis = redis
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.tail_messages = tail_messages
+        self.retry_seconds = retry_seconds
+        self._prefix = prefix
+        self._clock = clock
+        self._ttl_ms = max(1, int(idle_ttl_seconds * 1000))
+        self._down_until = 0.0
+        # Sessions Redis may hold stale copies of
+        self._stale: set[UUID] = set()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(
+        self, session_id: UUID, limit: int
+    ) -> tuple[CachedSession, list[CachedMessage]] | None:
+        """The session and its last ``limit`` messages, oldest first.
+
+        Misses unless the cached tail holds all of those messages.
+        """
+        header_key, tail_key, version_key = self._keys(session_id)
+
+        def read(pipe: Pipeline) -> None:
+            pipe.hgetall(header_key)
+            # LRANGE -0 -1 would return the whole list
+            pipe.lrange(tail_key, -max(limit, 1), -1)
+            self._expire(pipe, header_key, tail_key, version_key)
+
+        results = await self._run("get", read)
+        session = _decode_session(results[0]) if results else None
+        tail = results[1] if results and limit > 0 else []
+        messages = [_decode_message(raw) for raw in tail]
+        if session is None or len(messages) < min(limit, session.message_count):
+            self.misses += 1
+            SESSION_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+
+        self.hits += 1
+        SESSION_CACHE_REQUESTS.labels(result="hit").inc()
+        return session, messages
+
+    @asynccontextmanager
+    async def filling(self, session_id: UUID) -> AsyncIterator[Fill]:
+        """Wrap a database read of a session to cache what it returns.
+
+        Yields a function to call with the session and its latest messages,
+        which caches them unless the session was written to meanwhile.
+        """
+        _, _, version_key = self._keys(session_id)
+        results = await self._run("fill", lambda pipe: pipe.get(version_key))
+
+        async def fill(session: CachedSession, messages: list[CachedMessage]) -> None:
+            if results is not None:
+                await self._fill(session, messages, expected_version=results[0])
+
+        yield fill
+
+    async def add(self, session: CachedSession) -> None:
+        """Cache a session that has just been created."""
+        header_key, tail_key, version_key = self._keys(session.id)
+
+        def write(pipe: Pipeline) -> None:
+            pipe.delete(tail_key)
+            pipe.hset(header_key, mapping=_encode_session(session))
+            pipe.incr(version_key)
+            self._expire(pipe, header_key, version_key)
+
+        await self._write("add", session.id, write)
+
+    async def append(
+        self, session_id: UUID, message: CachedMessage, last_activity: datetime
+    ) -> None:
+        """Record a message added to a session."""
+        header_key, tail_key, version_key = self._keys(session_id)
+
+        def write(pipe: Pipeline) -> None:
+            pipe.incr(version_key)
+            pipe.hincrby(header_key, "message_count", 1)
+            pipe.hset(header_key, "last_activity", _encode(last_activity))
+            pipe.rpush(tail_key, _encode_message(message))
+            pipe.ltrim(tail_key, -self.tail_messages, -1)
+            self._expire(pipe, header_key, tail_key, version_key)
+
+        await self._write("append", session_id, write)
+
+    async def update(self, session_id: UUID, **values: Any) -> None:
+        """Record new values of a session's header columns."""
+        header_key, tail_key, version_key = self._keys(session_id)
+        mapping: Mapping[FieldT, EncodableT] = {
+            name: _encode(value) for name, value in values.items()
+        }
+
+        def write(pipe: Pipeline) -> None:
+            pipe.incr(version_key)
+            pipe.hset(header_key, mapping=mapping)
+            self._expire(pipe, header_key, tail_key, version_key)
+
+        await self._write("update", session_id, write)
+
+    async def invalidate(self, session_id: UUID) -> None:
+        """Drop a session after a write the cache cannot apply."""
+        header_key, tail_key, version_key = self._keys(session_id)
+
+        def write(pipe: Pipeline) -> None:
+            pipe.delete(header_key, tail_key)
+            pipe.incr(version_key)
+            self._expire(pipe, version_key)
+
+        await self._write("invalidate", session_id, write)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "stale": len(self._stale),
+        }
+
+    def _keys(self, session_id: UUID) -> tuple[str, str, str]:
+        # The hash tag keeps a session's keys in one Redis Cluster slot
+        base = f"{self._prefix}:{{{session_id}}}"
+        return base, f"{base}:tail", f"{base}:version"
+
+    def _expire(self, pipe: Pipeline, *keys: str) -> None:
+        for key in keys:
+            pipe.pexpire(key, self._ttl_ms)
+
+    async def _write(
+        self, operation: str, session_id: UUID, write: Callable[[Pipeline], None]
+    ) -> None:
+        if await self._run(operation, write) is None:
+            self._stale.add(session_id)
+
+    async def _run(
+        self, operation: str, commands: Callable[[Pipeline], Any]
+    ) -> list[Any] | None:
+        """Send ``commands`` in one round trip; None if Redis is unavailable.
+
+        Sessions left stale by earlier failed writes are deleted first.
+        """
+        if self._clock() < self._down_until:
+            return None
+        stale = list(self._stale)
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for session_id in stale:
+                    pipe.delete(*self._keys(session_id)[:2])
+                commands(pipe)
+                results = await pipe.execute()
+        except RedisError as e:
+            self._failed(operation, e)
+            return None
+        self._stale.difference_update(stale)
+        return results[len(stale) :]
+
+    async def _fill(
+        self,
+        session: CachedSession,
+        messages: list[CachedMessage],
+        expected_version: str | None,
+    ) -> None:
+        if self._clock() < self._down_until:
+            return
+        header_key, tail_key, version_key = self._keys(session.id)
+        messages = messages[-self.tail_messages :]
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(version_key)
+                if await pipe.get(version_key) != expected_version:
+                    return
+                pipe.multi()
+                pipe.delete(header_key, tail_key)
+                pipe.hset(header_key, mapping=_encode_session(session))
+                if messages:
+                    pipe.rpush(tail_key, *map(_encode_message, messages))
+                self._expire(pipe, header_key, tail_key, version_key)
+                await pipe.execute()
+        except WatchError:
+            return
+        except RedisError as e:
+            self._failed("fill", e)
+
+    def _failed(self, operation: str, error: RedisError) -> None:
+        self.errors += 1
+        SESSION_CACHE_ERRORS.labels(operation=operation).inc()
+        self._down_until = self._clock() + self.retry_seconds
+        logger.warning(
+            "Session cache unavailable, using the database",
+            operation=operation,
+            error=str(error),
+            retry_seconds=self.retry_seconds,
+        )
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+def _encode_session(session: CachedSession) -> Mapping[FieldT, EncodableT]:
+    return {name: _encode(getattr(session, name)) for name in SESSION_FIELDS}
+
+
+def _decode_session(raw: dict[str, str]) -> CachedSession | None:
+    if not all(name in raw for name in SESSION_FIELDS):
+        return None
+    values = {name: json.loads(raw[name]) for name in SESSION_FIELDS}
+    values["id"] = UUID(values["id"])
+    values["created_at"] = datetime.fromisoformat(values["created_at"])
+    values["last_activity"] = datetime.fromisoformat(values["last_activity"])
+    return CachedSession(**values)
+
+
+def _encode_message(message: CachedMessage) -> str:
+    return _encode({name: getattr(message, name) for name in MESSAGE_FIELDS})
+
+
+def _decode_message(raw: str) -> CachedMessage:
+    values = json.loads(raw)
+    values["id"] = UUID(values["id"])
+    values["created_at"] = datetime.fromisoformat(values["created_at"])
+    return CachedMessage(**values)
+
+
+def create_session_cache(settings: Settings) -> SessionStore | None:
+    """The session cache ``settings`` configure, or None when it is disabled."""
+    config = settings.session_cache
+    if config.backend == "off" or config.max_sessions <= 0:
+        return None
+    if config.backend == "redis":
+        return RedisSessionCache(
+            get_redis(),
+            idle_ttl_seconds=config.idle_ttl_seconds,
+            tail_messages=settings.therapy.context_max_messages,
+            retry_seconds=config.redis_retry_seconds,
+        )
+    return SessionCache(
+        max_sessions=config.max_sessions,
+        idle_ttl_seconds=config.idle_ttl_seconds,
+        tail_messages=settings.therapy.context_max_messages,
+    )
@@ -0,0 +1,191 @@
+"""Write-behind batching of turns' message and safety event writes."""
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from uuid import UUID
+
+import structlog
+from prometheus_client import Counter, Histogram
+
+from therapeutic_agent.core.config import Durability
+from therapeutic_agent.storage.database import DatabaseManager
+from therapeutic_agent.storage.repository import TurnUnitOfWork
+from therapeutic_agent.storage.session_cache import SessionStore
+
+logger = structlog.get_logger()
+
+WRITE_BEHIND_ROWS = Counter(
+    "therapeutic_write_behind_rows_total",
+    "Rows written by write-behind flushes",
+    ["outcome"],
+)
+WRITE_BEHIND_BATCH_ROWS = Histogram(
+    "therapeutic_write_behind_batch_rows",
+    "Rows per write-behind flush",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+
+
+@dataclass(slots=True)
+class _Submission:
+    turn: TurnUnitOfWork
+    # Set to the error that lost the writes, or None once they are committed
+    done: asyncio.Future[BaseException | None]
+
+
+class WriteBehindQueue:
+    """Buffers turns' writes and applies them in batches.
+
+    A single flusher takes everything queued, up to ``batch_rows`` rows, at
+    most ``flush_interval_ms`` after the first of them arrived (sooner once
+    ``batch_rows`` are waiting), merges the turns and applies them in one
+    transaction: one multi-row INSERT per table, then one UPDATE per
+    session row. While a batch is written the next one fills up. If a
+    batch fails, its turns are retried one transaction each, so one bad
+    turn does not lose the others.
+
+    With ``durability="flush"``, ``submit`` returns once the turn's rows are
+    committed and raises if they could not be. With ``"enqueue"`` it
+    returns as soon as they are queued; rows still queued are lost if the
+    process dies, and failures are only logged. Either way ``wait`` lets a
+    reader see every write submitted to a session so far.
+
+    Committed changes are applied to ``cache`` as the repositories do.
+    """
+
+    def __init__(
+        self,
+        database: Callable[[], Awaitable[DatabaseManager]],
+        cache: SessionStore | None = None,
+        durability: Durability = "flush",
+        flush_interval_ms: float = 5.0,
+        batch_rows: int = 200,
+        max_pending: int = 10_000,
+    ) -> None:
+        self._database = database
+        self._cache = cache
+        self.durability = durability
+        self._interval = flush_interval_ms / 1000
+        self._batch_rows = batch_rows
+        self._queue: asyncio.Queue[_Submission] = asyncio.Queue(maxsize=max_pending)
+        self._queued_rows = 0
+        self._batch_full = asyncio.Event()
+        # Each session's latest submission; earlier ones finish before it
+        self._latest: dict[UUID, _Submission] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    async def submit(self, turn: TurnUnitOfWork) -> None:
+        """Queue a turn's writes, waiting when ``max_pending`` turns are queued.
+
+        Raises the error that lost them under ``flush`` durability.
+        """
+        if not turn.changes:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="write-behind")
+        submission = _Submission(turn, asyncio.get_running_loop().create_future())
+        await self._queue.put(submission)
+        self._queued_rows += turn.rows
+        if self._queued_rows >= self._batch_rows:
+            self._batch_full.set()
+        for session_id in turn.changes:
+            self._latest[session_id] = submission
+
+        if self.durability == "flush":
+            # The rows are written even if the turn is cancelled meanwhile
+            error = await asyncio.shield(submission.done)
+            if error is not None:
+                raise error
+
+    async def wait(self, session_id: UUID) -> None:
+        """Wait until the writes submitted to a session so far are finished."""
+        submission = self._latest.get(session_id)
+        if submission is not None:
+            await asyncio.wait([submission.done])
+
+    async def close(self) -> None:
+        """Write everything queued and stop the flusher."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def cancel(self) -> None:
+        """Stop the flusher without writing what is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            rows = batch[0].turn.rows
+            self._queued_rows -= rows
+            if self._queued_rows + rows < self._batch_rows:
+                self._batch_full.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._batch_full.wait(), self._interval)
+
+            while rows < self._batch_rows and not self._queue.empty():
+                submission = self._queue.get_nowait()
+                self._queued_rows -= submission.turn.rows
+                batch.append(submission)
+                rows += submission.turn.rows
+
+            await self._flush(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _flush(self, batch: list[_Submission]) -> None:
+        WRITE_BEHIND_BATCH_ROWS.observe(sum(s.turn.rows for s in batch))
+        try:
+            await self._write([s.turn for s in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._finish(batch[0], e)
+                return
+            logger.warning(
+                "Write-behind batch failed, writing its turns one at a time",
+                turns=len(batch),
+                error=str(e),
+            )
+            for submission in batch:
+                try:
+                    await self._write([submission.turn])
+                except Exception as e:
+                    self._finish(submission, e)
+                else:
+                    self._finish(submission, None)
+        else:
+            for submission in batch:
+                self._finish(submission, None)
+
+    async def _write(self, batch: list[TurnUnitOfWork]) -> None:
+        merged = TurnUnitOfWork()
+        for turn in batch:
+            merged.extend(turn)
+        db_manager = await self._database()
+        async with db_manager.get_session() as db_session:
+            await merged.apply(db_session, self._cache)
+
+    def _finish(self, submission: _Submission, error: BaseException | None) -> None:
+        rows = submission.turn.rows
+        if error is None:
+            WRITE_BEHIND_ROWS.labels(outcome="written").inc(rows)
+        else:
+            WRITE_BEHIND_ROWS.labels(outcome="failed").inc(rows)
+            logger.error(
+                "Write-behind rows lost",
+                rows=rows,
+                sessions=[str(s) for s in submission.turn.changes],
+                error=str(error),
+            )
+        submission.done.set_result(error)
+        for session_id in submission.turn.changes:
+            if self._latest.get(session_id) is submission:
+                del self._latest[session_id]
@@ -6,12 +6,16 @@ from unittest.mock import AsyncMock
 from uuid import uuid4
 
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
-from therapeutic_agent.core.anthropic_client import AnthropicTherapeuticClient
+from therapeutic_agent.core.anthropic_client import (
+    AnthropicTherapeuticClient,
+    close_anthropic_client,
+)
 from therapeutic_agent.storage.database import DatabaseManager
 from therapeutic_agent.storage.models import Base
+from therapeutic_agent.storage.redis_pool import close_redis
 from therapeutic_agent.storage.repository import (
     MessageRepository,
     SafetyRepository,
@@ -27,6 +31,14 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+async def shared_clients() -> AsyncGenerator[None, None]:
+    """Give each test fresh process-wide Anthropic and Redis clients."""
+    yield
+    await close_anthropic_client()
+    await close_redis()
+
+
 @pytest.fixture
 async def test_db_manager() -> AsyncGenerator[DatabaseManager, None]:
     """Create test database manager with in-memory SQLite."""
@@ -42,7 +54,9 @@ async def test_db_manager() -> AsyncGenerator[DatabaseManager, None]:
 
     manager = DatabaseManager()
     manager._engine = engine
-    manager._session_factory = AsyncSession.bind(engine)
+    manager._session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
 
     yield manager
 
@@ -88,11 +102,9 @@ def mock_anthropic_client() -> AsyncMock:
         "processing_time_ms": 1200,
         "stop_reason": "end_turn",
     }
-    client.analyze_conversation_patterns.return_value = {
-        "analysis_type": "therapeutic_progress",
-        "analysis": "User showed good engagement and emotional awareness",
-        "conversation_length": 10,
-        "tokens_used": 300,
+    client.summarize_conversation.return_value = {
+        "summary": "User discussed work stress and practised breathing exercises",
+        "tokens_used": 200,
     }
     return client
 
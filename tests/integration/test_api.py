@@ -0,0 +1,329 @@
+"""Integration tests for the HTTP API."""
+
+import json
+from typing import Any, AsyncIterator
+from unittest.mock import AsyncMock, patch
+from uuid import UUID, uuid4
+
+import httpx
+import pytest
+
+from therapeutic_agent.api import main
+from therapeutic_agent.storage.database import DatabaseManager
+from therapeutic_agent.storage.models import JobKind
+from therapeutic_agent.storage.repository import JobRepository
+
+
+@pytest.fixture
+async def client(
+    monkeypatch: pytest.MonkeyPatch,
+    test_db_manager: DatabaseManager,
+    mock_anthropic_client: AsyncMock,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """A client for the app, backed by the test database and a mock model."""
+    monkeypatch.setattr(
+        main.session_manager, "_anthropic_client", mock_anthropic_client
+    )
+    with patch(
+        "therapeutic_agent.core.session_manager.get_database_manager",
+        return_value=test_db_manager,
+    ):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as http:
+            yield http
+
+
+async def create_session(client: httpx.AsyncClient, user_id: str) -> str:
+    response = await client.post("/sessions", json={"user_id": user_id})
+    assert response.status_code == 201
+    session_id: str = response.json()["session_id"]
+    return session_id
+
+
+def parse_sse(body: str) -> list[tuple[str, Any]]:
+    """The ``(event, data)`` pairs of a Server-Sent Events body."""
+    events = []
+    for frame in body.split("\n\n"):
+        if not frame:
+            continue
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestBatchValidateEndpoint:
+    """Test POST /safety/validate:batch."""
+
+    async def test_returns_one_result_per_text_in_order(
+        self, client: httpx.AsyncClient, safe_message: str, crisis_message: str
+    ) -> None:
+        response = await client.post(
+            "/safety/validate:batch", json={"texts": [safe_message, crisis_message]}
+        )
+
+        assert response.status_code == 200
+        safe, crisis = response.json()["results"]
+        assert safe["is_safe"] is True and safe["category"] is None
+        assert crisis["is_safe"] is False
+        assert crisis["level"] == "critical"
+        assert crisis["suggested_response"]
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"texts": []},
+            {"texts": ["x" * 4001]},
+            {"texts": ["a"] * 1001},
+        ],
+    )
+    async def test_rejects_invalid_batches(
+        self, client: httpx.AsyncClient, body: dict[str, list[str]]
+    ) -> None:
+        response = await client.post("/safety/validate:batch", json=body)
+        assert response.status_code == 422
+
+    async def test_rejects_contexts_of_another_length(
+        self, client: httpx.AsyncClient
+    ) -> None:
+        response = await client.post(
+            "/safety/validate:batch",
+            json={"texts": ["a", "b"], "contexts": [None]},
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "contexts must have one entry per text"
+
+
+class TestStreamEndpoint:
+    """Test POST /sessions/{id}/messages:stream."""
+
+    async def test_streams_text_events_then_done(
+        self,
+        client: httpx.AsyncClient,
+        mock_anthropic_client: AsyncMock,
+        sample_user_id: str,
+        safe_message: str,
+    ) -> None:
+        async def stream(**kwargs: Any) -> AsyncIterator[dict[str, Any]]:
+            for text in ["Thank you ", "for sharing."]:
+                yield {"type": "text", "text": text}
+            yield {
+                "type": "done",
+                "response": {
+                    "content": "Thank you for sharing.",
+                    "model": "claude-3-sonnet-20240229",
+                    "role": "assistant",
+                    "usage": {"input_tokens": 50, "output_tokens": 25},
+                    "processing_time_ms": 800,
+                    "time_to_first_token_ms": 120,
+                    "stop_reason": "end_turn",
+                },
+            }
+
+        mock_anthropic_client.stream_therapeutic_response = stream
+        session_id = await create_session(client, sample_user_id)
+
+        response = await client.post(
+            f"/sessions/{session_id}/messages:stream",
+            json={"message": safe_message, "user_id": sample_user_id},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        events = parse_sse(response.text)
+        assert events[:2] == [
+            ("text", {"text": "Thank you "}),
+            ("text", {"text": "for sharing."}),
+        ]
+        event, done = events[2]
+        assert (event, len(events)) == ("done", 3)
+        assert done["content"] == "Thank you for sharing."
+        assert done["role"] == "assistant"
+
+    async def test_crisis_messages_get_only_a_done_event(
+        self,
+        client: httpx.AsyncClient,
+        mock_anthropic_client: AsyncMock,
+        sample_user_id: str,
+        crisis_message: str,
+    ) -> None:
+        session_id = await create_session(client, sample_user_id)
+
+        response = await client.post(
+            f"/sessions/{session_id}/messages:stream",
+            json={"message": crisis_message, "user_id": sample_user_id},
+        )
+
+        ((event, done),) = parse_sse(response.text)
+        assert (event, done["safety_intervention"]) == ("done", True)
+        mock_anthropic_client.stream_therapeutic_response.assert_not_called()
+
+    async def test_unknown_sessions_are_not_found(
+        self, client: httpx.AsyncClient, safe_message: str
+    ) -> None:
+        response = await client.post(
+            f"/sessions/{uuid4()}/messages:stream", json={"message": safe_message}
+        )
+        assert response.status_code == 404
+
+    async def test_rejects_empty_messages(self, client: httpx.AsyncClient) -> None:
+        response = await client.post(
+            f"/sessions/{uuid4()}/messages:stream", json={"message": ""}
+        )
+        assert response.status_code == 422
+
+
+class TestJobEndpoint:
+    """Test GET /jobs/{job_id}."""
+
+    @staticmethod
+    async def enqueue_summary(db_manager: DatabaseManager, session_id: str) -> str:
+        async with db_manager.get_session() as db_session:
+            job = await JobRepository(db_session).enqueue(
+                JobKind.SESSION_SUMMARY, max_attempts=3, session_id=UUID(session_id)
+            )
+        return str(job.id)
+
+    async def test_returns_the_job_status(
+        self,
+        client: httpx.AsyncClient,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        session_id = await create_session(client, sample_user_id)
+        job_id = await self.enqueue_summary(test_db_manager, session_id)
+
+        response = await client.get(
+            f"/jobs/{job_id}", params={"user_id": sample_user_id}
+        )
+
+        assert response.status_code == 200
+        job = response.json()
+        assert (job["job_id"], job["session_id"]) == (job_id, session_id)
+        assert (job["kind"], job["status"]) == ("session_summary", "pending")
+        assert (job["attempts"], job["max_attempts"]) == (0, 3)
+
+    async def test_jobs_of_other_users_are_not_found(
+        self,
+        client: httpx.AsyncClient,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        session_id = await create_session(client, sample_user_id)
+        job_id = await self.enqueue_summary(test_db_manager, session_id)
+
+        response = await client.get(f"/jobs/{job_id}", params={"user_id": "other"})
+
+        assert response.status_code == 404
+        assert response.json()["type"] == "JobNotFoundError"
+
+    async def test_unknown_jobs_are_not_found(self, client: httpx.AsyncClient) -> None:
+        assert (await client.get(f"/jobs/{uuid4()}")).status_code == 404
+        assert (await client.get("/jobs/not-a-uuid")).status_code == 422
+
+
+class TestMessagesEndpoint:
+    """Test GET /sessions/{id}/messages and the latest page of GET /sessions/{id}."""
+
+    REPLY = "Thank you for sharing. How are you feeling about that?"
+
+    @staticmethod
+    async def session_with_turns(
+        client: httpx.AsyncClient, user_id: str, *texts: str
+    ) -> str:
+        session_id = await create_session(client, user_id)
+        for text in texts:
+            response = await client.post(
+                f"/sessions/{session_id}/messages",
+                json={"message": text, "user_id": user_id},
+            )
+            assert response.status_code == 200
+        return session_id
+
+    @staticmethod
+    def contents(page: dict[str, Any]) -> list[str]:
+        return [m["content"] for m in page["messages"]]
+
+    async def test_session_returns_the_latest_page_with_cursors(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        client: httpx.AsyncClient,
+        sample_user_id: str,
+    ) -> None:
+        monkeypatch.setattr(
+            main.session_manager._settings.therapy, "history_page_size", 3
+        )
+        session_id = await self.session_with_turns(
+            client, sample_user_id, "I feel tired.", "Work is a lot."
+        )
+
+        details = (
+            await client.get(
+                f"/sessions/{session_id}", params={"user_id": sample_user_id}
+            )
+        ).json()
+        assert self.contents(details) == [self.REPLY, "Work is a lot.", self.REPLY]
+        assert details["has_more"] is True
+
+        earlier = await client.get(
+            f"/sessions/{session_id}/messages",
+            params={"user_id": sample_user_id, "before": details["previous_cursor"]},
+        )
+        assert earlier.status_code == 200
+        assert self.contents(earlier.json()) == ["I feel tired."]
+        assert earlier.json()["has_more"] is False
+
+    async def test_pages_forward_from_since_then_after(
+        self, client: httpx.AsyncClient, sample_user_id: str
+    ) -> None:
+        session_id = await self.session_with_turns(
+            client, sample_user_id, "One.", "Two.", "Three."
+        )
+        url = f"/sessions/{session_id}/messages"
+
+        page = (
+            await client.get(url, params={"since": "2000-01-01T00:00:00Z", "limit": 4})
+        ).json()
+        assert self.contents(page) == ["One.", self.REPLY, "Two.", self.REPLY]
+        assert page["has_more"] is True
+
+        rest = (await client.get(url, params={"after": page["next_cursor"]})).json()
+        assert self.contents(rest) == ["Three.", self.REPLY]
+        idle = (await client.get(url, params={"after": rest["next_cursor"]})).json()
+        assert (self.contents(idle), idle["next_cursor"]) == ([], rest["next_cursor"])
+
+    @pytest.mark.parametrize("limit", [0, 201])
+    async def test_rejects_limits_out_of_range(
+        self, client: httpx.AsyncClient, limit: int
+    ) -> None:
+        response = await client.get(
+            f"/sessions/{uuid4()}/messages", params={"limit": limit}
+        )
+        assert response.status_code == 422
+
+    async def test_rejects_bad_cursors_and_combined_modes(
+        self, client: httpx.AsyncClient, sample_user_id: str
+    ) -> None:
+        session_id = await self.session_with_turns(client, sample_user_id, "Hello.")
+        url = f"/sessions/{session_id}/messages"
+        cursor = (await client.get(f"/sessions/{session_id}")).json()["next_cursor"]
+
+        bad = await client.get(url, params={"after": "not-a-cursor"})
+        both = await client.get(url, params={"after": cursor, "before": cursor})
+
+        assert (bad.status_code, both.status_code) == (400, 400)
+
+    async def test_unknown_sessions_are_not_found(
+        self, client: httpx.AsyncClient, sample_user_id: str
+    ) -> None:
+        session_id = await create_session(client, sample_user_id)
+
+        unknown = await client.get(f"/sessions/{uuid4()}/messages")
+        other = await client.get(
+            f"/sessions/{session_id}/messages", params={"user_id": "someone_else"}
+        )
+
+        assert (unknown.status_code, other.status_code) == (404, 404)
@@ -0,0 +1,64 @@
+"""Integration tests for the priority replies are generated at."""
+
+from typing import Any
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+
+from therapeutic_agent.core.limiter import Priority
+from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.storage.database import DatabaseManager
+
+
+@pytest.fixture
+def manager(test_db_manager: DatabaseManager, mock_anthropic_client: AsyncMock) -> Any:
+    with (
+        patch(
+            "therapeutic_agent.core.session_manager.get_database_manager",
+            return_value=test_db_manager,
+        ),
+    ):
+        manager = TherapeuticSessionManager()
+        manager._anthropic_client = mock_anthropic_client
+        yield manager
+        manager.close()
+
+
+def last_priority(mock_anthropic_client: AsyncMock) -> Priority:
+    call = mock_anthropic_client.generate_therapeutic_response.await_args
+    return call.kwargs["priority"]
+
+
+class TestGenerationPriority:
+    """Test that sessions with recent safety flags are served first."""
+
+    async def test_ordinary_turns_are_interactive(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        safe_message: str,
+        sample_user_id: str,
+    ) -> None:
+        session = await manager.create_session(sample_user_id)
+        await manager.send_message(
+            UUID(session["session_id"]), safe_message, sample_user_id
+        )
+        assert last_priority(mock_anthropic_client) == Priority.INTERACTIVE
+
+    async def test_turns_after_a_safety_flag_go_first(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        crisis_message: str,
+        safe_message: str,
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        response = await manager.send_message(
+            session_id, crisis_message, sample_user_id
+        )
+        assert response["safety_intervention"] is True
+
+        await manager.send_message(session_id, safe_message, sample_user_id)
+        assert last_priority(mock_anthropic_client) == Priority.SAFETY
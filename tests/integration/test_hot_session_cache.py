@@ -0,0 +1,193 @@
+"""Integration tests for serving turns from the hot-session cache."""
+
+from typing import Any, Iterator
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from sqlalchemy import event, update
+
+from therapeutic_agent.core.config import get_settings
+from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.storage.database import DatabaseManager
+from therapeutic_agent.storage.models import MessageRole, TherapeuticSession
+from therapeutic_agent.storage.repository import MessageRepository
+
+
+@pytest.fixture(params=["memory", "redis"])
+def manager(
+    request: pytest.FixtureRequest,
+    monkeypatch: pytest.MonkeyPatch,
+    test_db_manager: DatabaseManager,
+    mock_anthropic_client: AsyncMock,
+) -> Iterator[TherapeuticSessionManager]:
+    monkeypatch.setattr(get_settings().session_cache, "backend", request.param)
+    with (
+        patch(
+            "therapeutic_agent.storage.session_cache.get_redis",
+            return_value=FakeAsyncRedis(decode_responses=True),
+        ),
+        patch(
+            "therapeutic_agent.core.session_manager.get_database_manager",
+            return_value=test_db_manager,
+        ),
+    ):
+        manager = TherapeuticSessionManager()
+        manager._anthropic_client = mock_anthropic_client
+        yield manager
+        manager.close()
+
+
+@pytest.fixture
+def session_reads(test_db_manager: DatabaseManager) -> Iterator[list[str]]:
+    """SELECT statements sent to the database."""
+    statements: list[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = test_db_manager._engine.sync_engine  # type: ignore[union-attr]
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def history(mock_anthropic_client: AsyncMock) -> list[dict[str, str]]:
+    call = mock_anthropic_client.generate_therapeutic_response.await_args
+    return call.kwargs["conversation_history"]
+
+
+class TestHotSessionCache:
+    """Test that turns read sessions from the cache and keep it current."""
+
+    async def test_turns_skip_the_session_read(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        session_reads: list[str],
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        session_reads.clear()
+        for text in ["I feel tired.", "Work has been a lot."]:
+            await manager.send_message(session_id, text, sample_user_id)
+
+        assert not [s for s in session_reads if "therapeutic_sessions" in s]
+        assert [m["content"] for m in history(mock_anthropic_client)] == [
+            "I feel tired.",
+            "Thank you for sharing. How are you feeling about that?",
+        ]
+        assert manager._session_cache is not None
+        assert manager._session_cache.hits == 2
+
+    async def test_cached_history_matches_the_database(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        for i in range(3):
+            await manager.send_message(session_id, f"Message {i}", sample_user_id)
+
+        assert manager._session_cache is not None
+        await manager._session_cache.invalidate(session_id)
+        await manager.send_message(session_id, "Cold read", sample_user_id)
+        cold = history(mock_anthropic_client)
+        await manager.send_message(session_id, "Warm read", sample_user_id)
+        warm = history(mock_anthropic_client)
+
+        assert warm[: len(cold)] == cold
+        assert manager._session_cache.misses == 1
+
+    async def test_status_changes_reach_the_cache(
+        self,
+        manager: TherapeuticSessionManager,
+        session_reads: list[str],
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        await manager.end_session(session_id, sample_user_id)
+        session_reads.clear()
+
+        with pytest.raises(ValueError, match="completed"):
+            await manager.send_message(session_id, "Hello again", sample_user_id)
+        assert not [s for s in session_reads if "therapeutic_sessions" in s]
+
+    async def test_rolled_back_writes_do_not_reach_the_cache(
+        self,
+        manager: TherapeuticSessionManager,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        cache = manager._session_cache
+        assert cache is not None
+
+        with pytest.raises(RuntimeError):
+            async with test_db_manager.get_session() as db_session:
+                await MessageRepository(db_session, cache).add_message(
+                    session_id, MessageRole.USER, "Never committed"
+                )
+                raise RuntimeError("turn failed")
+
+        cached = await cache.get(session_id, 10)
+        assert cached is not None
+        assert cached[0].message_count == 0
+        assert cached[1] == []
+
+    async def test_summary_written_elsewhere_is_picked_up(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        manager._summary_interval = 100
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        for i in range(4):
+            await manager.send_message(session_id, f"Message {i}", sample_user_id)
+        # Another process summarizes the first two messages behind the cache
+        async with test_db_manager.get_session() as db_session:
+            await db_session.execute(
+                update(TherapeuticSession)
+                .where(TherapeuticSession.id == session_id)
+                .values(summary="Elsewhere", summarized_message_count=2)
+            )
+        manager._summary_interval = 2
+
+        assert await manager._update_summary(session_id) == 6
+        summarize = mock_anthropic_client.summarize_conversation
+        assert summarize.await_count == 2
+        previous_summary, new_messages = summarize.await_args.args
+        assert previous_summary == "Elsewhere"
+        assert [m["content"] for m in new_messages] == [
+            "Message 1",
+            "Thank you for sharing. How are you feeling about that?",
+            "Message 2",
+            "Thank you for sharing. How are you feeling about that?",
+        ]
+
+    async def test_summary_conflicts_are_bounded(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        sample_user_id: str,
+    ) -> None:
+        manager._summary_interval = 100
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        for i in range(4):
+            await manager.send_message(session_id, f"Message {i}", sample_user_id)
+        manager._summary_interval = 2
+
+        with patch(
+            "therapeutic_agent.core.session_manager.SessionRepository"
+            ".update_session_summary",
+            AsyncMock(return_value=False),
+        ):
+            assert await manager._update_summary(session_id) == 0
+
+        summarize = mock_anthropic_client.summarize_conversation
+        assert summarize.await_count == manager.SUMMARY_MAX_CONFLICTS
@@ -0,0 +1,166 @@
+"""Integration tests for the background job queue against SQLite."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+from sqlalchemy import update
+
+from therapeutic_agent.core.config import JobsConfig
+from therapeutic_agent.core.jobs import JobWorkerPool
+from therapeutic_agent.storage.database import DatabaseManager
+from therapeutic_agent.storage.models import BackgroundJob, JobKind, JobStatus
+from therapeutic_agent.storage.repository import JobRepository
+
+CONFIG = JobsConfig(
+    workers=2, poll_interval_seconds=0.01, backoff_base_seconds=60, lease_seconds=30
+)
+
+
+@pytest.fixture(autouse=True)
+def patched_database(test_db_manager: DatabaseManager) -> Iterator[None]:
+    with patch(
+        "therapeutic_agent.core.jobs.get_database_manager",
+        return_value=test_db_manager,
+    ):
+        yield
+
+
+async def enqueue(test_db_manager: DatabaseManager, max_attempts: int = 3) -> UUID:
+    async with test_db_manager.get_session() as db_session:
+        job = await JobRepository(db_session).enqueue(
+            JobKind.SESSION_SUMMARY, max_attempts=max_attempts
+        )
+        return job.id
+
+
+async def load(test_db_manager: DatabaseManager, job_id: UUID) -> BackgroundJob:
+    async with test_db_manager.get_session() as db_session:
+        job = await JobRepository(db_session).get_job(job_id)
+        assert job is not None
+        return job
+
+
+async def make_due(test_db_manager: DatabaseManager, job_id: UUID) -> None:
+    """Move a job's retry time and lease into the past."""
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    async with test_db_manager.get_session() as db_session:
+        await db_session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id)
+            .values(run_after=past, locked_until=past)
+        )
+
+
+def pool(handler: Any) -> JobWorkerPool:
+    return JobWorkerPool({JobKind.SESSION_SUMMARY: handler}, CONFIG)
+
+
+class TestJobWorkerPool:
+    """Test claiming, running and retrying jobs."""
+
+    async def test_successful_job_stores_result(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        job_id = await enqueue(test_db_manager)
+        handler = AsyncMock(return_value={"summarized_message_count": 12})
+        workers = pool(handler)
+
+        assert await workers.run_once()
+        assert not await workers.run_once()
+
+        job = await load(test_db_manager, job_id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.attempts == 1
+        assert job.result == {"summarized_message_count": 12}
+        assert job.finished_at is not None
+        assert handler.await_args.args[0].id == job_id
+
+    async def test_failures_are_retried_with_backoff(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        job_id = await enqueue(test_db_manager, max_attempts=2)
+        workers = pool(AsyncMock(side_effect=RuntimeError("overloaded")))
+
+        assert await workers.run_once()
+        job = await load(test_db_manager, job_id)
+        assert job.status == JobStatus.PENDING
+        assert job.last_error == "RuntimeError: overloaded"
+        # Not due again until the backoff has passed
+        assert not await workers.run_once()
+
+        await make_due(test_db_manager, job_id)
+        assert await workers.run_once()
+        job = await load(test_db_manager, job_id)
+        assert job.status == JobStatus.FAILED
+        assert job.attempts == 2
+
+    async def test_expired_lease_is_claimed_again(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        job_id = await enqueue(test_db_manager)
+        async with test_db_manager.get_session() as db_session:
+            stalled = await JobRepository(db_session).claim_next(
+                [JobKind.SESSION_SUMMARY], CONFIG.lease_seconds
+            )
+        assert stalled is not None and stalled.attempts == 1
+
+        workers = pool(AsyncMock(return_value=None))
+        assert not await workers.run_once()
+        await make_due(test_db_manager, job_id)
+        assert await workers.run_once()
+
+        # The stalled attempt finishing late does not overwrite the retry
+        async with test_db_manager.get_session() as db_session:
+            await JobRepository(db_session).fail(job_id, 1, "too late")
+        job = await load(test_db_manager, job_id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.attempts == 2
+
+    async def test_lease_expiring_on_last_attempt_fails_the_job(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        job_id = await enqueue(test_db_manager, max_attempts=1)
+        async with test_db_manager.get_session() as db_session:
+            await JobRepository(db_session).claim_next(
+                [JobKind.SESSION_SUMMARY], CONFIG.lease_seconds
+            )
+        await make_due(test_db_manager, job_id)
+
+        handler = AsyncMock()
+        assert await pool(handler).run_once()
+
+        handler.assert_not_called()
+        assert (await load(test_db_manager, job_id)).status == JobStatus.FAILED
+
+    async def test_started_workers_drain_the_queue(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        job_ids = [await enqueue(test_db_manager) for _ in range(5)]
+        done = asyncio.Event()
+        ran = []
+
+        async def handler(job: BackgroundJob) -> None:
+            ran.append(job.id)
+            if len(ran) == len(job_ids):
+                done.set()
+
+        workers = pool(handler)
+        workers.start()
+        await asyncio.wait_for(done.wait(), timeout=5)
+        await workers.stop()
+
+        assert sorted(ran) == sorted(job_ids)
+        for job_id in job_ids:
+            assert (await load(test_db_manager, job_id)).status == JobStatus.SUCCEEDED
+
+    def test_backoff_grows_with_jitter_up_to_the_cap(self) -> None:
+        workers = JobWorkerPool(
+            {}, JobsConfig(backoff_base_seconds=2, backoff_max_seconds=30)
+        )
+        for attempts, ceiling in [(1, 2), (2, 4), (3, 8), (10, 30)]:
+            delays = [workers.backoff_seconds(attempts) for _ in range(50)]
+            assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
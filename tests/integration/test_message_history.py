@@ -0,0 +1,109 @@
+"""Integration tests for paging through session history."""
+
+from datetime import datetime, timezone
+from typing import Any, Iterator
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+
+from therapeutic_agent.core.config import get_settings
+from therapeutic_agent.core.exceptions import SessionNotFoundError
+from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.storage.database import DatabaseManager
+
+
+@pytest.fixture
+def manager(
+    monkeypatch: pytest.MonkeyPatch,
+    test_db_manager: DatabaseManager,
+    mock_anthropic_client: AsyncMock,
+) -> Iterator[TherapeuticSessionManager]:
+    monkeypatch.setattr(get_settings().therapy, "history_page_size", 3)
+    with patch(
+        "therapeutic_agent.core.session_manager.get_database_manager",
+        return_value=test_db_manager,
+    ):
+        manager = TherapeuticSessionManager()
+        manager._anthropic_client = mock_anthropic_client
+        yield manager
+        manager.close()
+
+
+async def session_with_turns(
+    manager: TherapeuticSessionManager, user_id: str, *texts: str
+) -> UUID:
+    session_id = UUID((await manager.create_session(user_id))["session_id"])
+    for text in texts:
+        await manager.send_message(session_id, text, user_id)
+    return session_id
+
+
+def contents(page: dict[str, Any]) -> list[str]:
+    return [m["content"] for m in page["messages"]]
+
+
+REPLY = "Thank you for sharing. How are you feeling about that?"
+
+
+class TestMessageHistory:
+    """Test the latest page, cursors in both directions and polling."""
+
+    async def test_session_returns_the_latest_page(
+        self, manager: TherapeuticSessionManager, sample_user_id: str
+    ) -> None:
+        session_id = await session_with_turns(
+            manager, sample_user_id, "I feel tired.", "Work is a lot."
+        )
+
+        details = await manager.get_session(session_id, sample_user_id)
+        assert details["message_count"] == 4
+        assert contents(details) == [REPLY, "Work is a lot.", REPLY]
+        assert details["has_more"] is True
+
+        earlier = await manager.get_messages(
+            session_id, sample_user_id, before=details["previous_cursor"]
+        )
+        assert contents(earlier) == ["I feel tired."]
+        assert earlier["has_more"] is False
+
+    async def test_polling_returns_only_new_messages(
+        self, manager: TherapeuticSessionManager, sample_user_id: str
+    ) -> None:
+        session_id = await session_with_turns(manager, sample_user_id, "Hello.")
+        cursor = (await manager.get_session(session_id))["next_cursor"]
+
+        idle = await manager.get_messages(session_id, after=cursor)
+        assert (contents(idle), idle["next_cursor"]) == ([], cursor)
+
+        await manager.send_message(session_id, "Still here.", sample_user_id)
+        new = await manager.get_messages(session_id, after=cursor)
+        assert contents(new) == ["Still here.", REPLY]
+
+    async def test_since_pages_from_a_time(
+        self, manager: TherapeuticSessionManager, sample_user_id: str
+    ) -> None:
+        session_id = await session_with_turns(
+            manager, sample_user_id, "One.", "Two.", "Three."
+        )
+
+        page = await manager.get_messages(
+            session_id, since=datetime(2000, 1, 1, tzinfo=timezone.utc), limit=4
+        )
+        assert contents(page) == ["One.", REPLY, "Two.", REPLY]
+        assert page["has_more"] is True
+        rest = await manager.get_messages(session_id, after=page["next_cursor"])
+        assert contents(rest) == ["Three.", REPLY]
+
+    async def test_rejects_bad_cursors_and_other_users(
+        self, manager: TherapeuticSessionManager, sample_user_id: str
+    ) -> None:
+        session_id = await session_with_turns(manager, sample_user_id, "Hello.")
+        cursor = (await manager.get_session(session_id))["next_cursor"]
+
+        with pytest.raises(ValueError):
+            await manager.get_messages(session_id, after="not-a-cursor")
+        with pytest.raises(ValueError):
+            await manager.get_messages(session_id, after=cursor, before=cursor)
+        with pytest.raises(SessionNotFoundError):
+            await manager.get_messages(session_id, user_id="someone_else")
@@ -0,0 +1,33 @@
+"""Integration tests for the Alembic migration tree."""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+from therapeutic_agent.storage.models import Base
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_head_matches_model_indexes(tmp_path: Path) -> None:
+    """Upgrading to head yields the same tables and indexes as the models."""
+    db_path = tmp_path / "migrations.db"
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{db_path}")
+    config.attributes["configure_logger"] = False
+
+    command.upgrade(config, "head")
+
+    inspector = inspect(create_engine(f"sqlite:///{db_path}"))
+    for table in Base.metadata.sorted_tables:
+        migrated = {index["name"] for index in inspector.get_indexes(table.name)}
+        expected = {index.name for index in table.indexes}
+        assert migrated == expected, table.name
+
+    command.downgrade(config, "base")
+    assert set(inspect(create_engine(f"sqlite:///{db_path}")).get_table_names()) <= {
+        "alembic_version"
+    }
@@ -0,0 +1,153 @@
+"""Integration tests for the client and session flow against the mock API."""
+
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from unittest.mock import patch
+from uuid import UUID
+
+import httpx
+import pytest
+
+from therapeutic_agent.core.anthropic_client import (
+    AnthropicTherapeuticClient,
+    is_retryable,
+)
+from therapeutic_agent.core.config import get_settings
+from therapeutic_agent.core.exceptions import AnthropicAPIError
+from therapeutic_agent.core.resilience import RetryPolicy
+from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.mock import MOCK_PROFILES, MockProfile, serve_mock
+from therapeutic_agent.storage.database import DatabaseManager
+
+INSTANT = MOCK_PROFILES["instant"]
+
+
+@asynccontextmanager
+async def mock_api(
+    monkeypatch: pytest.MonkeyPatch, profile: MockProfile = INSTANT
+) -> AsyncIterator[tuple[AnthropicTherapeuticClient, str]]:
+    """A client pointed at a mock server running ``profile``."""
+    async with serve_mock(profile) as url:
+        monkeypatch.setattr(get_settings().anthropic, "base_url", url)
+        client = AnthropicTherapeuticClient()
+        client._retry = RetryPolicy(is_retryable, max_attempts=3, base_seconds=0.001)
+        try:
+            yield client, url
+        finally:
+            await client.close()
+
+
+async def mock_stats(url: str) -> dict:
+    async with httpx.AsyncClient() as http:
+        return (await http.get(f"{url}/mock/stats")).json()
+
+
+class TestMockAnthropicServer:
+    """Test that the SDK talks to the mock as it would to the real API."""
+
+    async def test_generates_replies(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        async with mock_api(monkeypatch) as (client, url):
+            response = await client.generate_therapeutic_response("hello")
+            stats = await mock_stats(url)
+
+        assert response["content"].startswith("Thank you for sharing")
+        assert response["usage"]["output_tokens"] == INSTANT.output_tokens
+        assert response["usage"]["input_tokens"] > 0
+        assert response["stop_reason"] == "end_turn"
+        assert stats["outcomes"] == {"completed": 1}
+
+    async def test_streams_replies(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        async with mock_api(monkeypatch) as (client, _):
+            events = [
+                event async for event in client.stream_therapeutic_response("hello")
+            ]
+
+        texts = [event["text"] for event in events[:-1]]
+        response = events[-1]["response"]
+        assert len(texts) == INSTANT.output_tokens
+        assert "".join(texts) == response["content"]
+        assert response["usage"]["output_tokens"] == INSTANT.output_tokens
+
+    async def test_replies_are_cut_at_max_tokens(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        profile = INSTANT.model_copy(update={"output_tokens": 5000})
+        async with mock_api(monkeypatch, profile) as (client, _):
+            response = await client.generate_therapeutic_response("hello")
+
+        assert response["stop_reason"] == "max_tokens"
+        assert response["usage"]["output_tokens"] == client._max_tokens
+
+    async def test_injected_overloads_are_retried_then_raised(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        profile = INSTANT.model_copy(update={"overload_ratio": 1.0})
+        async with mock_api(monkeypatch, profile) as (client, url):
+            with pytest.raises(AnthropicAPIError):
+                await client.generate_therapeutic_response("hello")
+            stats = await mock_stats(url)
+
+        assert stats["outcomes"] == {"overloaded": 3}
+
+    async def test_rate_limits_send_retry_after(self) -> None:
+        profile = INSTANT.model_copy(
+            update={"rate_limit_ratio": 1.0, "retry_after_seconds": 7}
+        )
+        async with serve_mock(profile) as url, httpx.AsyncClient() as http:
+            response = await http.post(
+                f"{url}/v1/messages", json={"messages": [], "max_tokens": 10}
+            )
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "7"
+        assert response.json()["error"]["type"] == "rate_limit_error"
+
+    async def test_slow_streams_use_the_slow_token_rate(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        profile = INSTANT.model_copy(
+            update={
+                "output_tokens": 4,
+                "slow_stream_ratio": 1.0,
+                "slow_token_interval_ms": 50,
+            }
+        )
+        async with mock_api(monkeypatch, profile) as (client, url):
+            start = time.monotonic()
+            async for _ in client.stream_therapeutic_response("hello"):
+                pass
+            elapsed = time.monotonic() - start
+            stats = await mock_stats(url)
+
+        assert elapsed >= 0.15
+        assert stats["outcomes"] == {"slow_stream": 1, "streamed": 1}
+
+
+class TestSessionFlowAgainstMock:
+    """Test a whole turn through the session manager and the mock API."""
+
+    async def test_send_message(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        test_db_manager: DatabaseManager,
+        safe_message: str,
+        sample_user_id: str,
+    ) -> None:
+        async with mock_api(monkeypatch) as (client, _):
+            with (
+                patch(
+                    "therapeutic_agent.core.session_manager.get_database_manager",
+                    return_value=test_db_manager,
+                ),
+            ):
+                manager = TherapeuticSessionManager()
+                manager._anthropic_client = client
+                session = await manager.create_session(sample_user_id)
+                reply = await manager.send_message(
+                    UUID(session["session_id"]), safe_message, sample_user_id
+                )
+                manager.close()
+
+        assert "error" not in reply
+        assert reply["content"].startswith("Thank you for sharing")
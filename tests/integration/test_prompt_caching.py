@@ -0,0 +1,186 @@
+"""Prompt caching against a local stand-in for the Messages API."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+from unittest.mock import patch
+from uuid import UUID
+
+import pytest
+from anthropic import AsyncAnthropic
+from sqlalchemy import select
+
+from therapeutic_agent.core.context import ContextWindow
+from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.storage.database import DatabaseManager
+from therapeutic_agent.storage.models import ConversationMessage, MessageRole
+
+REPLY = "Thank you for telling me more. What felt hardest about it?"
+
+
+class MessagesHandler(BaseHTTPRequestHandler):
+    """Records each request body and answers with a fixed reply."""
+
+    server: "MockMessagesServer"
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        turn = len(self.server.requests)
+        payload = json.dumps(
+            {
+                "id": f"msg_{turn}",
+                "type": "message",
+                "role": "assistant",
+                "model": body["model"],
+                "content": [{"type": "text", "text": REPLY}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {
+                    "input_tokens": 40,
+                    "output_tokens": 15,
+                    "cache_read_input_tokens": 300 if turn > 1 else 0,
+                    "cache_creation_input_tokens": 60,
+                },
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class MockMessagesServer(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), MessagesHandler)
+        self.requests: list[dict[str, Any]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@pytest.fixture
+def messages_server() -> Iterator[MockMessagesServer]:
+    server = MockMessagesServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def cached_prefix(request: dict[str, Any]) -> tuple[str, list[dict[str, Any]]]:
+    """The system prompt and the messages up to the last cache breakpoint."""
+    messages = request["messages"]
+    end = max(
+        (
+            i + 1
+            for i, message in enumerate(messages)
+            if isinstance(message["content"], list)
+            and any("cache_control" in block for block in message["content"])
+        ),
+        default=0,
+    )
+    return json.dumps(request["system"]), messages[:end]
+
+
+def without_cache_control(messages: list[dict[str, Any]]) -> str:
+    """Messages as sent, with breakpoint markers removed and text unwrapped."""
+    plain = []
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, list) and len(content) == 1:
+            content = content[0]["text"]
+        plain.append({"role": message["role"], "content": content})
+    return json.dumps(plain)
+
+
+class TestPromptCaching:
+    """The cacheable prefix stays byte-identical across turns."""
+
+    async def test_prefix_is_stable_between_turns(
+        self,
+        messages_server: MockMessagesServer,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        turns = 12
+        with patch(
+            "therapeutic_agent.core.session_manager.get_database_manager",
+            return_value=test_db_manager,
+        ):
+            manager = TherapeuticSessionManager()
+            manager._anthropic_client._client = AsyncAnthropic(
+                api_key="test-key", base_url=messages_server.url
+            )
+            manager._context_window = ContextWindow(200, block_messages=10)
+            # No summary updates, so the history alone decides the prefix
+            manager._summary_interval = turns
+            session = await manager.create_session(sample_user_id)
+            for turn in range(turns):
+                response = await manager.send_message(
+                    UUID(session["session_id"]),
+                    f"Work was stressful again on day {turn}.",
+                    sample_user_id,
+                )
+                assert response["content"] == REPLY
+
+        requests = messages_server.requests
+        assert len(requests) == turns
+        assert all(
+            request["system"][0]["cache_control"] == {"type": "ephemeral"}
+            for request in requests
+        )
+        assert all("Session context" not in json.dumps(r["system"]) for r in requests)
+
+        rebuilt = []
+        for turn in range(1, turns):
+            system, prefix = cached_prefix(requests[turn - 1])
+            assert json.dumps(requests[turn]["system"]) == system
+            following = requests[turn]["messages"][: len(prefix)]
+            if without_cache_control(following) != without_cache_control(prefix):
+                rebuilt.append(turn)
+        # The last twelve messages fit the budget, so history starts at the
+        # session's first message until turn 7 and at its tenth from turn 8.
+        # Aligning at turn 7 would keep only four of the twelve, so that turn
+        # keeps them all unaligned instead
+        assert rebuilt == [7, 8]
+
+    async def test_cache_usage_is_recorded(
+        self,
+        messages_server: MockMessagesServer,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        with patch(
+            "therapeutic_agent.core.session_manager.get_database_manager",
+            return_value=test_db_manager,
+        ):
+            manager = TherapeuticSessionManager()
+            manager._anthropic_client._client = AsyncAnthropic(
+                api_key="test-key", base_url=messages_server.url
+            )
+            session = await manager.create_session(sample_user_id)
+            for _ in range(2):
+                await manager.send_message(
+                    UUID(session["session_id"]), "I slept badly.", sample_user_id
+                )
+
+        async with test_db_manager.get_session() as db_session:
+            replies = (
+                await db_session.execute(
+                    select(ConversationMessage)
+                    .where(ConversationMessage.role == MessageRole.ASSISTANT)
+                    .order_by(ConversationMessage.created_at)
+                )
+            ).scalars()
+            metadata = [reply.message_metadata for reply in replies]
+
+        assert [m["cache_read_input_tokens"] for m in metadata] == [0, 300]
+        assert [m["cache_creation_input_tokens"] for m in metadata] == [60, 60]
@@ -0,0 +1,308 @@
+"""Integration tests for repository queries against SQLite."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from therapeutic_agent.core.context import ContextWindow, estimate_tokens
+from therapeutic_agent.storage.models import (
+    ConversationMessage,
+    MessageRole,
+    SafetyFlag,
+)
+from therapeutic_agent.storage.repository import (
+    MessageCursor,
+    MessageRepository,
+    SessionRepository,
+    TurnUnitOfWork,
+)
+
+
+class TestRecentMessages:
+    """Test the windowed conversation-tail loader."""
+
+    async def test_returns_only_latest_messages_in_order(
+        self,
+        db_session: AsyncSession,
+        session_repo: SessionRepository,
+        message_repo: MessageRepository,
+        sample_user_id: str,
+    ) -> None:
+        """Only the last N messages are loaded, oldest first."""
+        session = await session_repo.create_session(sample_user_id)
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        for i in range(30):
+            message = await message_repo.add_message(
+                session_id=session.id,
+                role=MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT,
+                content=f"message {i}",
+            )
+            await db_session.execute(
+                update(ConversationMessage)
+                .where(ConversationMessage.id == message.id)
+                .values(created_at=base + timedelta(seconds=i))
+            )
+
+        header, messages = await session_repo.get_session_with_recent_messages(
+            session.id, 5
+        )
+
+        assert header is not None
+        assert header.id == session.id
+        assert [m.content for m in messages] == [f"message {i}" for i in range(25, 30)]
+
+    async def test_missing_session(self, session_repo: SessionRepository) -> None:
+        """Unknown sessions return no header and no messages."""
+        header, messages = await session_repo.get_session_with_recent_messages(
+            uuid4(), 5
+        )
+
+        assert header is None
+        assert messages == []
+
+
+class TestTokenCounts:
+    """Test the token counts used for context packing."""
+
+    async def test_messages_store_an_estimate_unless_given(
+        self,
+        session_repo: SessionRepository,
+        message_repo: MessageRepository,
+        sample_user_id: str,
+    ) -> None:
+        session = await session_repo.create_session(sample_user_id)
+
+        user = await message_repo.add_message(
+            session_id=session.id, role=MessageRole.USER, content="I slept badly."
+        )
+        reply = await message_repo.add_message(
+            session_id=session.id,
+            role=MessageRole.ASSISTANT,
+            content="I'm sorry to hear that.",
+            token_count=9,
+        )
+
+        assert user.token_count == estimate_tokens("I slept badly.")
+        assert reply.token_count == 9
+
+    async def test_backfilled_estimates_are_saved(
+        self,
+        db_session: AsyncSession,
+        session_repo: SessionRepository,
+        message_repo: MessageRepository,
+        sample_user_id: str,
+    ) -> None:
+        session_id = (await session_repo.create_session(sample_user_id)).id
+        message = await message_repo.add_message(
+            session_id=session_id, role=MessageRole.USER, content="older message"
+        )
+        await db_session.execute(
+            update(ConversationMessage)
+            .where(ConversationMessage.id == message.id)
+            .values(token_count=None)
+        )
+        db_session.expire_all()
+
+        _, messages = await session_repo.get_session_with_recent_messages(session_id, 5)
+        assert messages[0].token_count is None
+        ContextWindow(100).select(messages)
+        await db_session.flush()
+        db_session.expire_all()
+
+        _, messages = await session_repo.get_session_with_recent_messages(session_id, 5)
+        assert messages[0].token_count == estimate_tokens("older message")
+
+
+class TestSessionSummary:
+    """Test storing the rolling session summary."""
+
+    async def test_stale_summary_is_not_stored(
+        self,
+        db_session: AsyncSession,
+        session_repo: SessionRepository,
+        sample_user_id: str,
+    ) -> None:
+        session_id = (await session_repo.create_session(sample_user_id)).id
+
+        assert await session_repo.update_session_summary(
+            session_id, "first", summarized_message_count=10, expected_message_count=0
+        )
+        assert not await session_repo.update_session_summary(
+            session_id, "stale", summarized_message_count=8, expected_message_count=0
+        )
+
+        db_session.expire_all()
+        session, _ = await session_repo.get_session_with_recent_messages(session_id, 0)
+        assert session is not None
+        assert (session.summary, session.summarized_message_count) == ("first", 10)
+
+
+class TestTurnUnitOfWork:
+    """Test applying a turn's writes with one session-row update."""
+
+    async def test_a_turn_updates_the_session_row_once(
+        self,
+        db_session: AsyncSession,
+        session_repo: SessionRepository,
+        sample_user_id: str,
+    ) -> None:
+        session_id = (await session_repo.create_session(sample_user_id)).id
+        turn = TurnUnitOfWork()
+        turn.update_safety_state(session_id, {"matches": []})
+        message = await turn.add_message(session_id, MessageRole.USER, "Hello")
+        for severity in (0.6, 0.2, 0.4):
+            await turn.create_safety_event(
+                session_id,
+                SafetyFlag.CRISIS,
+                severity,
+                "Crisis language",
+                triggered_by_message_id=message.id,
+            )
+        reply = await turn.add_message(session_id, MessageRole.ASSISTANT, "I hear you")
+
+        updates: list[str] = []
+
+        def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+            if statement.lstrip().upper().startswith("UPDATE"):
+                updates.append(statement)
+
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            await turn.apply(db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(updates) == 1
+        db_session.expire_all()
+        session, messages = await session_repo.get_session_with_recent_messages(
+            session_id, 10
+        )
+        assert session is not None
+        assert session.message_count == 2
+        assert session.safety_score == 0.2
+        assert session.safety_state == {"matches": []}
+        assert session.last_activity.replace(tzinfo=timezone.utc) == reply.created_at
+        assert [m.content for m in messages] == ["Hello", "I hear you"]
+
+    async def test_turns_merge(self, session_repo: SessionRepository) -> None:
+        first, second = TurnUnitOfWork(), TurnUnitOfWork()
+        session_id = uuid4()
+        await first.create_safety_event(session_id, SafetyFlag.CRISIS, 0.3, "a")
+        await first.add_message(session_id, MessageRole.USER, "a")
+        await second.add_message(session_id, MessageRole.USER, "b")
+        await second.create_safety_event(session_id, SafetyFlag.CRISIS, 0.5, "b")
+        first.extend(second)
+
+        change = first.changes[session_id]
+        assert (first.rows, change.messages, change.safety_score) == (4, 2, 0.3)
+        assert change.last_activity == second.messages[0].created_at
+
+
+class TestMessagePages:
+    """Test keyset pages of a session's history."""
+
+    @staticmethod
+    async def add_messages(
+        db_session: AsyncSession,
+        message_repo: MessageRepository,
+        session_id: UUID,
+        count: int,
+    ) -> list[UUID]:
+        """Add messages, all created at the same instant, in history order."""
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        ids = []
+        for i in range(count):
+            message = await message_repo.add_message(
+                session_id, MessageRole.USER, f"message {i}"
+            )
+            ids.append(message.id)
+        await db_session.execute(
+            update(ConversationMessage)
+            .where(ConversationMessage.session_id == session_id)
+            .values(created_at=created_at)
+        )
+        db_session.expire_all()
+        return sorted(ids)
+
+    async def test_pages_forward_through_tied_timestamps(
+        self,
+        db_session: AsyncSession,
+        session_repo: SessionRepository,
+        message_repo: MessageRepository,
+        sample_user_id: str,
+    ) -> None:
+        session_id = (await session_repo.create_session(sample_user_id)).id
+        ids = await self.add_messages(db_session, message_repo, session_id, 7)
+
+        seen: list[UUID] = []
+        after, has_more = MessageCursor.since(datetime(1970, 1, 1)), True
+        while has_more:
+            page, has_more = await message_repo.get_message_page(
+                session_id, 3, after=after
+            )
+            seen += [m.id for m in page]
+            after = MessageCursor.of(page[-1])
+
+        assert seen == ids
+
+    async def test_pages_back_from_the_latest(
+        self,
+        db_session: AsyncSession,
+        session_repo: SessionRepository,
+        message_repo: MessageRepository,
+        sample_user_id: str,
+    ) -> None:
+        session_id = (await session_repo.create_session(sample_user_id)).id
+        ids = await self.add_messages(db_session, message_repo, session_id, 5)
+
+        latest, has_more = await message_repo.get_message_page(session_id, 3)
+        assert ([m.id for m in latest], has_more) == (ids[2:], True)
+        earlier, has_more = await message_repo.get_message_page(
+            session_id, 3, before=MessageCursor.of(latest[0])
+        )
+        assert ([m.id for m in earlier], has_more) == (ids[:2], False)
+
+    async def test_recent_messages_break_ties_like_pages(
+        self,
+        db_session: AsyncSession,
+        session_repo: SessionRepository,
+        message_repo: MessageRepository,
+        sample_user_id: str,
+    ) -> None:
+        session_id = (await session_repo.create_session(sample_user_id)).id
+        ids = await self.add_messages(db_session, message_repo, session_id, 7)
+
+        _, recent = await session_repo.get_session_with_recent_messages(session_id, 4)
+        latest, _ = await message_repo.get_message_page(session_id, 4)
+
+        assert [m.id for m in recent] == [m.id for m in latest] == ids[3:]
+
+    async def test_since_excludes_messages_at_the_timestamp(
+        self,
+        db_session: AsyncSession,
+        session_repo: SessionRepository,
+        message_repo: MessageRepository,
+        sample_user_id: str,
+    ) -> None:
+        session_id = (await session_repo.create_session(sample_user_id)).id
+        await self.add_messages(db_session, message_repo, session_id, 2)
+        newer = await message_repo.add_message(session_id, MessageRole.USER, "new")
+
+        since = MessageCursor.since(datetime(2024, 1, 1))
+        page, has_more = await message_repo.get_message_page(session_id, 10, since)
+
+        assert ([m.id for m in page], has_more) == ([newer.id], False)
+
+    def test_cursors_round_trip(self) -> None:
+        cursor = MessageCursor(datetime(2024, 1, 1, 12, 30, 0, 250), uuid4())
+
+        assert MessageCursor.decode(cursor.encode()) == cursor
+        assert cursor.created_at.tzinfo is timezone.utc
+        with pytest.raises(ValueError):
+            MessageCursor.decode("not a cursor")
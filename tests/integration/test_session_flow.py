@@ -1,5 +1,7 @@
 """Integration tests for complete therapeutic session flows."""
 
+import asyncio
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -8,6 +10,7 @@ from uuid import UUID
 import pytest
 
 from therapeutic_agent.core.exceptions import (
+    AnthropicAPIError,
     SessionLimitExceededError,
     SessionNotFoundError,
 )
@@ -31,6 +34,27 @@ def create_mock_db_manager():
     return mock_db_manager, mock_session
 
 
+def create_pooled_db_manager(pool_size: int, pool_timeout: float):
+    """Create a mock database manager that enforces a bounded connection pool."""
+    mock_db_manager = AsyncMock()
+    pool = asyncio.Semaphore(pool_size)
+    stats = {"checked_out": 0, "peak": 0}
+
+    @asynccontextmanager
+    async def mock_get_session():
+        await asyncio.wait_for(pool.acquire(), timeout=pool_timeout)
+        stats["checked_out"] += 1
+        stats["peak"] = max(stats["peak"], stats["checked_out"])
+        try:
+            yield AsyncMock()
+        finally:
+            stats["checked_out"] -= 1
+            pool.release()
+
+    mock_db_manager.get_session = mock_get_session
+    return mock_db_manager, stats
+
+
 class TestSessionCreationFlow:
     """Test complete session creation and management flow."""
 
@@ -119,23 +143,22 @@ class TestMessageFlow:
             mock_db_manager, mock_session = create_mock_db_manager()
             mock_get_db.return_value = mock_db_manager
 
-            # Mock repositories
+            # Mock repositories and the turn's writes
             mock_session_repo = MagicMock()
-            mock_message_repo = MagicMock()
-            mock_safety_repo = MagicMock()
+            mock_turn = MagicMock()
 
             # Mock session
             mock_therapeutic_session = MagicMock(spec=TherapeuticSession)
             mock_therapeutic_session.id = session_id
             mock_therapeutic_session.user_id = sample_user_id
             mock_therapeutic_session.status = SessionStatus.ACTIVE
-            mock_therapeutic_session.messages = []
             mock_therapeutic_session.message_count = 0
+            mock_therapeutic_session.summarized_message_count = 0
             mock_therapeutic_session.safety_score = 1.0
             mock_therapeutic_session.last_activity = datetime.now(timezone.utc)
 
-            mock_session_repo.get_session = AsyncMock(
-                return_value=mock_therapeutic_session
+            mock_session_repo.get_session_with_recent_messages = AsyncMock(
+                return_value=(mock_therapeutic_session, [])
             )
             mock_session_repo.update_session_activity = AsyncMock()
 
@@ -143,7 +166,9 @@ class TestMessageFlow:
             mock_message = MagicMock()
             mock_message.id = UUID("22222222-2222-2222-2222-222222222222")
             mock_message.created_at = datetime.now(timezone.utc)
-            mock_message_repo.add_message = AsyncMock(return_value=mock_message)
+            mock_turn.add_message = AsyncMock(return_value=mock_message)
+            mock_turn.create_safety_event = AsyncMock()
+            mock_turn.apply = AsyncMock()
 
             with (
                 patch(
@@ -151,12 +176,8 @@ class TestMessageFlow:
                     return_value=mock_session_repo,
                 ),
                 patch(
-                    "therapeutic_agent.core.session_manager.MessageRepository",
-                    return_value=mock_message_repo,
-                ),
-                patch(
-                    "therapeutic_agent.core.session_manager.SafetyRepository",
-                    return_value=mock_safety_repo,
+                    "therapeutic_agent.core.session_manager.TurnUnitOfWork",
+                    return_value=mock_turn,
                 ),
             ):
                 manager = TherapeuticSessionManager()
@@ -170,14 +191,16 @@ class TestMessageFlow:
                         SafetyResult,
                     )
 
-                    mock_safety.validate_content = AsyncMock(
-                        return_value=SafetyResult(
-                            is_safe=True,
-                            level=SafetyLevel.SAFE,
-                            category=None,
-                            confidence=0.9,
-                            explanation="Content is safe",
-                        )
+                    safe_result = SafetyResult(
+                        is_safe=True,
+                        level=SafetyLevel.SAFE,
+                        category=None,
+                        confidence=0.9,
+                        explanation="Content is safe",
+                    )
+                    mock_safety.validate_content = AsyncMock(return_value=safe_result)
+                    mock_safety.validate_conversation_turn = AsyncMock(
+                        return_value=safe_result
                     )
                     mock_ai.generate_therapeutic_response = AsyncMock(
                         return_value={
@@ -212,28 +235,29 @@ class TestMessageFlow:
             mock_db_manager, mock_session = create_mock_db_manager()
             mock_get_db.return_value = mock_db_manager
 
-            # Mock repositories
+            # Mock repositories and the turn's writes
             mock_session_repo = MagicMock()
-            mock_message_repo = MagicMock()
-            mock_safety_repo = MagicMock()
-            mock_safety_repo.create_safety_event = AsyncMock()
+            mock_turn = MagicMock()
 
             # Mock session
             mock_therapeutic_session = MagicMock(spec=TherapeuticSession)
             mock_therapeutic_session.id = session_id
             mock_therapeutic_session.user_id = sample_user_id
             mock_therapeutic_session.status = SessionStatus.ACTIVE
-            mock_therapeutic_session.messages = []
+            mock_therapeutic_session.message_count = 0
+            mock_therapeutic_session.summarized_message_count = 0
 
-            mock_session_repo.get_session = AsyncMock(
-                return_value=mock_therapeutic_session
+            mock_session_repo.get_session_with_recent_messages = AsyncMock(
+                return_value=(mock_therapeutic_session, [])
             )
 
             # Mock message creation
             mock_message = MagicMock()
             mock_message.id = UUID("22222222-2222-2222-2222-222222222222")
             mock_message.created_at = datetime.now(timezone.utc)
-            mock_message_repo.add_message = AsyncMock(return_value=mock_message)
+            mock_turn.add_message = AsyncMock(return_value=mock_message)
+            mock_turn.create_safety_event = AsyncMock()
+            mock_turn.apply = AsyncMock()
 
             with (
                 patch(
@@ -241,12 +265,8 @@ class TestMessageFlow:
                     return_value=mock_session_repo,
                 ),
                 patch(
-                    "therapeutic_agent.core.session_manager.MessageRepository",
-                    return_value=mock_message_repo,
-                ),
-                patch(
-                    "therapeutic_agent.core.session_manager.SafetyRepository",
-                    return_value=mock_safety_repo,
+                    "therapeutic_agent.core.session_manager.TurnUnitOfWork",
+                    return_value=mock_turn,
                 ),
             ):
                 manager = TherapeuticSessionManager()
@@ -268,6 +288,15 @@ class TestMessageFlow:
                             suggested_response="Please call 988 immediately",
                         )
                     )
+                    mock_safety.validate_conversation_turn = AsyncMock(
+                        return_value=SafetyResult(
+                            is_safe=True,
+                            level=SafetyLevel.SAFE,
+                            category=None,
+                            confidence=0.9,
+                            explanation="Content is safe",
+                        )
+                    )
 
                     response = await manager.send_message(
                         session_id, crisis_message, sample_user_id
@@ -291,8 +320,8 @@ class TestMessageFlow:
             mock_get_db.return_value = mock_db_manager
 
             mock_session_repo = MagicMock()
-            mock_session_repo.get_session = AsyncMock(
-                return_value=None
+            mock_session_repo.get_session_with_recent_messages = AsyncMock(
+                return_value=(None, [])
             )  # Session not found
 
             with patch(
@@ -305,11 +334,102 @@ class TestMessageFlow:
                     await manager.send_message(session_id, "Hello", sample_user_id)
 
 
+class TestConnectionUsage:
+    """Test that message processing does not pin pooled connections."""
+
+    async def test_llm_call_does_not_hold_connection(
+        self, sample_user_id: str, safe_message: str
+    ) -> None:
+        """Concurrent turns are not capped by pool size while the LLM runs."""
+        pool_size = 2
+        concurrent_turns = 20
+        llm_latency = 0.1
+
+        mock_db_manager, stats = create_pooled_db_manager(
+            pool_size=pool_size, pool_timeout=llm_latency * 3
+        )
+
+        mock_therapeutic_session = MagicMock(spec=TherapeuticSession)
+        mock_therapeutic_session.user_id = sample_user_id
+        mock_therapeutic_session.status = SessionStatus.ACTIVE
+        mock_therapeutic_session.message_count = 0
+        mock_therapeutic_session.summarized_message_count = 0
+        mock_therapeutic_session.safety_score = 1.0
+        mock_therapeutic_session.last_activity = datetime.now(timezone.utc)
+
+        mock_session_repo = MagicMock()
+        mock_session_repo.get_session_with_recent_messages = AsyncMock(
+            return_value=(mock_therapeutic_session, [])
+        )
+        mock_session_repo.update_session_activity = AsyncMock()
+
+        mock_message = MagicMock()
+        mock_message.id = UUID("22222222-2222-2222-2222-222222222222")
+        mock_message.created_at = datetime.now(timezone.utc)
+        mock_turn = MagicMock()
+        mock_turn.add_message = AsyncMock(return_value=mock_message)
+        mock_turn.create_safety_event = AsyncMock()
+        mock_turn.apply = AsyncMock()
+
+        connections_held_during_llm = []
+
+        async def slow_generate(**kwargs):
+            connections_held_during_llm.append(stats["checked_out"])
+            await asyncio.sleep(llm_latency)
+            return {
+                "content": "Thank you for sharing that with me.",
+                "model": "claude-3-sonnet-20240229",
+                "role": "assistant",
+                "usage": {"input_tokens": 50, "output_tokens": 25},
+                "processing_time_ms": int(llm_latency * 1000),
+                "stop_reason": "end_turn",
+            }
+
+        with (
+            patch(
+                "therapeutic_agent.core.session_manager.get_database_manager",
+                new_callable=AsyncMock,
+                return_value=mock_db_manager,
+            ),
+            patch(
+                "therapeutic_agent.core.session_manager.SessionRepository",
+                return_value=mock_session_repo,
+            ),
+            patch(
+                "therapeutic_agent.core.session_manager.TurnUnitOfWork",
+                return_value=mock_turn,
+            ),
+        ):
+            manager = TherapeuticSessionManager()
+
+            with patch.object(manager, "_anthropic_client") as mock_ai:
+                mock_ai.generate_therapeutic_response = slow_generate
+
+                started = time.perf_counter()
+                responses = await asyncio.gather(
+                    *[
+                        manager.send_message(
+                            UUID(int=i + 1), safe_message, sample_user_id
+                        )
+                        for i in range(concurrent_turns)
+                    ]
+                )
+                elapsed = time.perf_counter() - started
+
+        assert all(r["safety_intervention"] is False for r in responses)
+        assert all("error" not in r for r in responses)
+        assert stats["peak"] <= pool_size
+        assert max(connections_held_during_llm) < pool_size
+        # Holding a connection through the LLM call would need
+        # concurrent_turns / pool_size sequential rounds of llm_latency.
+        assert elapsed < llm_latency * concurrent_turns / pool_size / 2
+
+
 class TestSessionCompletion:
     """Test session ending and summarization flow."""
 
     async def test_end_session_with_summary(self, sample_user_id: str) -> None:
-        """Test ending session with automatic summary generation."""
+        """Test ending a session returns the rolling summary without a model call."""
         session_id = UUID("12345678-1234-1234-1234-123456789012")
 
         with patch(
@@ -327,11 +447,11 @@ class TestSessionCompletion:
             mock_therapeutic_session.user_id = sample_user_id
             mock_therapeutic_session.status = SessionStatus.ACTIVE
             mock_therapeutic_session.message_count = 10
-            mock_therapeutic_session.messages = []
-            mock_therapeutic_session.summary = None
+            mock_therapeutic_session.summarized_message_count = 10
+            mock_therapeutic_session.summary = "User is practising breathing exercises"
 
-            mock_session_repo.get_session = AsyncMock(
-                return_value=mock_therapeutic_session
+            mock_session_repo.get_session_with_recent_messages = AsyncMock(
+                return_value=(mock_therapeutic_session, [])
             )
             mock_session_repo.update_session_status = AsyncMock()
 
@@ -342,19 +462,13 @@ class TestSessionCompletion:
                 manager = TherapeuticSessionManager()
 
                 with patch.object(manager, "_anthropic_client") as mock_ai:
-                    mock_ai.analyze_conversation_patterns = AsyncMock(
-                        return_value={
-                            "analysis": (
-                                "User showed good progress in " "emotional regulation"
-                            )
-                        }
-                    )
-
                     result = await manager.end_session(session_id, sample_user_id)
 
                     assert result["status"] == SessionStatus.COMPLETED
                     assert "ended_at" in result
-                    assert "summary" in result
+                    assert result["summary"] == "User is practising breathing exercises"
+                    assert not mock_ai.method_calls
+                    assert not manager._summary_tasks
 
     async def test_end_session_error_handling(self, sample_user_id: str) -> None:
         """Test error handling during session ending."""
@@ -368,8 +482,8 @@ class TestSessionCompletion:
             mock_get_db.return_value = mock_db_manager
 
             mock_session_repo = MagicMock()
-            mock_session_repo.get_session = AsyncMock(
-                return_value=None
+            mock_session_repo.get_session_with_recent_messages = AsyncMock(
+                return_value=(None, [])
             )  # Session not found
 
             with patch(
@@ -380,3 +494,144 @@ class TestSessionCompletion:
 
                 with pytest.raises(SessionNotFoundError):
                     await manager.end_session(session_id, sample_user_id)
+
+
+class TestStreamingFlow:
+    """Test streamed responses."""
+
+    @staticmethod
+    def patched_manager(sample_user_id: str, mock_turn: MagicMock):
+        mock_db_manager, _ = create_mock_db_manager()
+
+        mock_therapeutic_session = MagicMock(spec=TherapeuticSession)
+        mock_therapeutic_session.user_id = sample_user_id
+        mock_therapeutic_session.status = SessionStatus.ACTIVE
+        mock_therapeutic_session.message_count = 0
+        mock_therapeutic_session.summarized_message_count = 0
+        mock_therapeutic_session.safety_score = 1.0
+        mock_therapeutic_session.safety_state = None
+        mock_therapeutic_session.last_activity = datetime.now(timezone.utc)
+
+        mock_session_repo = MagicMock()
+        mock_session_repo.get_session_with_recent_messages = AsyncMock(
+            return_value=(mock_therapeutic_session, [])
+        )
+        mock_session_repo.update_session_activity = AsyncMock()
+
+        mock_message = MagicMock()
+        mock_message.id = UUID("22222222-2222-2222-2222-222222222222")
+        mock_message.created_at = datetime.now(timezone.utc)
+        mock_turn.add_message = AsyncMock(return_value=mock_message)
+        mock_turn.create_safety_event = AsyncMock()
+        mock_turn.apply = AsyncMock()
+
+        return (
+            patch(
+                "therapeutic_agent.core.session_manager.get_database_manager",
+                new_callable=AsyncMock,
+                return_value=mock_db_manager,
+            ),
+            patch(
+                "therapeutic_agent.core.session_manager.SessionRepository",
+                return_value=mock_session_repo,
+            ),
+            patch(
+                "therapeutic_agent.core.session_manager.TurnUnitOfWork",
+                return_value=mock_turn,
+            ),
+        )
+
+    async def test_reply_is_persisted_after_stream_completes(
+        self, sample_user_id: str, safe_message: str
+    ) -> None:
+        """Deltas are forwarded as they arrive and the reply saved at the end."""
+        mock_turn = MagicMock()
+        patches = self.patched_manager(sample_user_id, mock_turn)
+        saved_while_streaming = []
+
+        async def fake_stream(**kwargs):
+            for text in ["Thank you ", "for sharing."]:
+                saved_while_streaming.append(mock_turn.add_message.call_count)
+                yield {"type": "text", "text": text}
+            yield {
+                "type": "done",
+                "response": {
+                    "content": "Thank you for sharing.",
+                    "model": "claude-3-sonnet-20240229",
+                    "role": "assistant",
+                    "usage": {"input_tokens": 50, "output_tokens": 25},
+                    "processing_time_ms": 800,
+                    "time_to_first_token_ms": 120,
+                    "stop_reason": "end_turn",
+                },
+            }
+
+        with patches[0], patches[1], patches[2]:
+            manager = TherapeuticSessionManager()
+            with patch.object(manager, "_anthropic_client") as mock_ai:
+                mock_ai.stream_therapeutic_response = fake_stream
+                events = [
+                    event
+                    async for event in await manager.stream_message(
+                        UUID(int=1), safe_message, sample_user_id
+                    )
+                ]
+
+        assert [e["text"] for e in events[:-1]] == ["Thank you ", "for sharing."]
+        done = events[-1]
+        assert done["type"] == "done"
+        assert done["response"]["content"] == "Thank you for sharing."
+        assert done["response"]["metadata"]["time_to_first_token_ms"] == 120
+
+        # Only the user message was saved until the stream finished
+        assert saved_while_streaming == [1, 1]
+        reply = mock_turn.add_message.call_args_list[-1].kwargs
+        assert reply["content"] == "Thank you for sharing."
+        assert reply["processing_time_ms"] == 800
+        assert reply["time_to_first_token_ms"] == 120
+
+    async def test_failure_mid_stream_ends_with_fallback(
+        self, sample_user_id: str, safe_message: str
+    ) -> None:
+        mock_turn = MagicMock()
+        patches = self.patched_manager(sample_user_id, mock_turn)
+
+        async def failing_stream(**kwargs):
+            yield {"type": "text", "text": "Thank"}
+            raise AnthropicAPIError("Failed to stream therapeutic response")
+
+        with patches[0], patches[1], patches[2]:
+            manager = TherapeuticSessionManager()
+            with patch.object(manager, "_anthropic_client") as mock_ai:
+                mock_ai.stream_therapeutic_response = failing_stream
+                events = [
+                    event
+                    async for event in await manager.stream_message(
+                        UUID(int=1), safe_message, sample_user_id
+                    )
+                ]
+
+        assert events[0] == {"type": "text", "text": "Thank"}
+        assert events[-1]["response"]["error"] == "AI response generation failed"
+        reply = mock_turn.add_message.call_args_list[-1].kwargs
+        assert reply["metadata"]["fallback_response"] is True
+
+    async def test_crisis_message_is_not_streamed(
+        self, sample_user_id: str, crisis_message: str
+    ) -> None:
+        mock_turn = MagicMock()
+        patches = self.patched_manager(sample_user_id, mock_turn)
+
+        with patches[0], patches[1], patches[2]:
+            manager = TherapeuticSessionManager()
+            with patch.object(manager, "_anthropic_client") as mock_ai:
+                events = [
+                    event
+                    async for event in await manager.stream_message(
+                        UUID(int=1), crisis_message, sample_user_id
+                    )
+                ]
+                mock_ai.stream_therapeutic_response.assert_not_called()
+
+        assert len(events) == 1
+        assert events[0]["response"]["safety_intervention"] is True
@@ -0,0 +1,207 @@
+"""Integration tests for rolling session summaries."""
+
+from typing import Any
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+from sqlalchemy import select
+
+from therapeutic_agent.core.exceptions import JobNotFoundError
+from therapeutic_agent.core.jobs import JobWorkerPool
+from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.storage.database import DatabaseManager
+from therapeutic_agent.storage.models import SessionStatus, TherapeuticSession
+
+INTERVAL = 5
+
+
+@pytest.fixture
+def manager(test_db_manager: DatabaseManager, mock_anthropic_client: AsyncMock) -> Any:
+    with patch(
+        "therapeutic_agent.core.session_manager.get_database_manager",
+        return_value=test_db_manager,
+    ):
+        manager = TherapeuticSessionManager()
+        manager._anthropic_client = mock_anthropic_client
+        manager._summary_interval = INTERVAL
+        yield manager
+        manager.close()
+
+
+@pytest.fixture
+def job_workers(
+    test_db_manager: DatabaseManager, manager: TherapeuticSessionManager
+) -> Any:
+    with patch(
+        "therapeutic_agent.core.jobs.get_database_manager",
+        return_value=test_db_manager,
+    ):
+        yield JobWorkerPool(manager.job_handlers())
+
+
+async def send_turns(
+    manager: TherapeuticSessionManager, session_id: UUID, user_id: str, turns: int
+) -> None:
+    for turn in range(turns):
+        await manager.send_message(session_id, f"Work was busy on day {turn}.", user_id)
+        await manager.wait_for_summaries()
+
+
+async def stored_session(
+    test_db_manager: DatabaseManager, session_id: UUID
+) -> TherapeuticSession:
+    async with test_db_manager.get_session() as db_session:
+        result = await db_session.execute(
+            select(TherapeuticSession).where(TherapeuticSession.id == session_id)
+        )
+        return result.scalar_one()
+
+
+class TestRollingSummary:
+    """Test keeping the session summary up to date during a conversation."""
+
+    async def test_summary_follows_the_conversation(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+
+        await send_turns(manager, session_id, sample_user_id, INTERVAL - 1)
+        mock_anthropic_client.summarize_conversation.assert_not_called()
+
+        # Two intervals of messages are waiting when the next turn starts
+        await send_turns(manager, session_id, sample_user_id, 2)
+        summarize = mock_anthropic_client.summarize_conversation
+        summarize.assert_awaited_once()
+        previous_summary, new_messages = summarize.await_args.args
+        assert previous_summary is None
+
+        session = await stored_session(test_db_manager, session_id)
+        assert session.summarized_message_count == len(new_messages)
+        assert (
+            session.message_count - 2 * INTERVAL
+            <= session.summarized_message_count
+            <= session.message_count - INTERVAL
+        )
+        assert session.summary == (
+            "User discussed work stress and practised breathing exercises"
+        )
+
+    async def test_prompt_is_summary_and_tail(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        await send_turns(manager, session_id, sample_user_id, 8 * INTERVAL)
+
+        calls = mock_anthropic_client.generate_therapeutic_response.await_args_list
+        for call in calls:
+            assert len(call.kwargs["conversation_history"]) <= 2 * INTERVAL
+        assert calls[-1].kwargs["session_summary"]
+        # Each update folds in about one interval of messages
+        assert mock_anthropic_client.summarize_conversation.await_count >= 12
+
+    async def test_failed_update_is_retried_by_a_later_turn(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        mock_anthropic_client.summarize_conversation.side_effect = [
+            RuntimeError("overloaded"),
+            {"summary": "Caught up", "tokens_used": 10},
+        ]
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        await send_turns(manager, session_id, sample_user_id, INTERVAL + 2)
+
+        session = await stored_session(test_db_manager, session_id)
+        assert session.summary == "Caught up"
+        assert session.summarized_message_count >= session.message_count - 2 * INTERVAL
+
+
+class TestEndSession:
+    """Test ending a session with a rolling summary."""
+
+    async def test_end_session_makes_no_model_call(
+        self,
+        manager: TherapeuticSessionManager,
+        job_workers: JobWorkerPool,
+        mock_anthropic_client: AsyncMock,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        await send_turns(manager, session_id, sample_user_id, INTERVAL + 1)
+        mock_anthropic_client.summarize_conversation.reset_mock()
+
+        result = await manager.end_session(session_id, sample_user_id)
+
+        assert result["status"] == SessionStatus.COMPLETED
+        assert result["summary"] == (
+            "User discussed work stress and practised breathing exercises"
+        )
+        mock_anthropic_client.summarize_conversation.assert_not_called()
+        job_id = UUID(result["summary_job"]["job_id"])
+        assert result["summary_job"]["status"] == "pending"
+
+        # A job worker folds in the remaining messages
+        assert await job_workers.run_once()
+        mock_anthropic_client.summarize_conversation.assert_awaited_once()
+        session = await stored_session(test_db_manager, session_id)
+        assert session.summarized_message_count == session.message_count
+
+        job = await manager.get_job(job_id, sample_user_id)
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"summarized_message_count": session.message_count}
+        with pytest.raises(JobNotFoundError):
+            await manager.get_job(job_id, "another_user")
+
+    async def test_final_summary_covers_every_message(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        manager: TherapeuticSessionManager,
+        job_workers: JobWorkerPool,
+        mock_anthropic_client: AsyncMock,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        # More unsummarized messages than one read of the history returns
+        monkeypatch.setattr(manager._settings.therapy, "context_max_messages", 4)
+        manager._summary_interval = 100
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        await send_turns(manager, session_id, sample_user_id, 5)
+
+        await manager.end_session(session_id, sample_user_id)
+        assert await job_workers.run_once()
+
+        summarized = [
+            message["content"]
+            for call in mock_anthropic_client.summarize_conversation.await_args_list
+            for message in call.args[1]
+        ]
+        history = await manager.get_messages(session_id, limit=10)
+        assert summarized == [message["content"] for message in history["messages"]]
+        session = await stored_session(test_db_manager, session_id)
+        assert session.summarized_message_count == session.message_count == 10
+
+    async def test_short_sessions_are_not_summarized(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        await send_turns(manager, session_id, sample_user_id, 2)
+
+        result = await manager.end_session(session_id, sample_user_id)
+
+        assert result["summary"] is None
+        assert result["summary_job"] is None
+        mock_anthropic_client.summarize_conversation.assert_not_called()
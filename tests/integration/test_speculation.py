@@ -0,0 +1,226 @@
+"""Integration tests for speculative generation during safety validation."""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator
+from unittest.mock import patch
+from uuid import UUID
+
+import pytest
+from sqlalchemy import select
+
+from therapeutic_agent.core.metrics import (
+    SPECULATIVE_GENERATIONS_TOTAL,
+    SPECULATIVE_WASTED_TOKENS_TOTAL,
+)
+from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.core.speculation import Speculation
+from therapeutic_agent.storage.database import DatabaseManager
+from therapeutic_agent.storage.models import ConversationMessage, MessageRole
+
+DRAFT = "Here is a speculative reply."
+GENERATION_SECONDS = 0.2
+VALIDATION_SECONDS = 0.2
+
+
+class SlowClient:
+    """Generates a fixed reply slowly and records when and how it ran."""
+
+    def __init__(self) -> None:
+        self.started: list[float] = []
+        self.cancelled = 0
+
+    def response(self) -> dict[str, Any]:
+        return {
+            "content": DRAFT,
+            "model": "claude-3-sonnet-20240229",
+            "role": "assistant",
+            "usage": {"input_tokens": 120, "output_tokens": 30},
+            "processing_time_ms": int(GENERATION_SECONDS * 1000),
+            "stop_reason": "end_turn",
+        }
+
+    async def generate_therapeutic_response(self, **kwargs: Any) -> dict[str, Any]:
+        self.started.append(time.perf_counter())
+        try:
+            await asyncio.sleep(GENERATION_SECONDS)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self.response()
+
+    async def stream_therapeutic_response(
+        self, **kwargs: Any
+    ) -> AsyncIterator[dict[str, Any]]:
+        self.started.append(time.perf_counter())
+        try:
+            for word in DRAFT.split(" "):
+                await asyncio.sleep(GENERATION_SECONDS / 5)
+                yield {"type": "text", "text": f"{word} "}
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        yield {"type": "done", "response": self.response()}
+
+
+@pytest.fixture
+def client() -> SlowClient:
+    return SlowClient()
+
+
+@pytest.fixture
+def manager(test_db_manager: DatabaseManager, client: SlowClient) -> Iterator[Any]:
+    with (
+        patch(
+            "therapeutic_agent.core.session_manager.get_database_manager",
+            return_value=test_db_manager,
+        ),
+    ):
+        manager = TherapeuticSessionManager()
+        manager._anthropic_client = client  # type: ignore[assignment]
+        manager._speculative = True
+
+        validate_content = manager._safety_engine.validate_content
+        manager.validated_at: list[float] = []  # type: ignore[attr-defined]
+
+        async def slow_validate(*args: Any, **kwargs: Any) -> Any:
+            await asyncio.sleep(VALIDATION_SECONDS)
+            manager.validated_at.append(time.perf_counter())  # type: ignore
+            return await validate_content(*args, **kwargs)
+
+        manager._safety_engine.validate_content = slow_validate  # type: ignore
+        yield manager
+        manager.close()
+
+
+def counter(metric: Any, **labels: str) -> float:
+    return metric.labels(**labels)._value.get()
+
+
+async def assistant_messages(test_db_manager: DatabaseManager) -> list[str]:
+    async with test_db_manager.get_session() as db_session:
+        result = await db_session.execute(
+            select(ConversationMessage.content).where(
+                ConversationMessage.role == MessageRole.ASSISTANT
+            )
+        )
+        return list(result.scalars())
+
+
+class TestSpeculativeGeneration:
+    """Test generating replies while messages are validated."""
+
+    async def test_safe_message_overlaps_validation_and_generation(
+        self,
+        manager: Any,
+        client: SlowClient,
+        safe_message: str,
+        sample_user_id: str,
+    ) -> None:
+        session = await manager.create_session(sample_user_id)
+        used = counter(SPECULATIVE_GENERATIONS_TOTAL, outcome="used")
+
+        started = time.perf_counter()
+        response = await manager.send_message(
+            UUID(session["session_id"]), safe_message, sample_user_id
+        )
+        elapsed = time.perf_counter() - started
+
+        assert response["content"] == DRAFT
+        assert client.started[0] < manager.validated_at[0]
+        assert elapsed < GENERATION_SECONDS + VALIDATION_SECONDS * 0.75
+        assert counter(SPECULATIVE_GENERATIONS_TOTAL, outcome="used") == used + 1
+
+    async def test_unsafe_message_cancels_the_draft(
+        self,
+        manager: Any,
+        client: SlowClient,
+        test_db_manager: DatabaseManager,
+        crisis_message: str,
+        sample_user_id: str,
+    ) -> None:
+        session = await manager.create_session(sample_user_id)
+        discarded = counter(SPECULATIVE_GENERATIONS_TOTAL, outcome="discarded")
+        wasted = counter(SPECULATIVE_WASTED_TOKENS_TOTAL, kind="input")
+
+        response = await manager.send_message(
+            UUID(session["session_id"]), crisis_message, sample_user_id
+        )
+        await asyncio.sleep(0)
+
+        assert response["safety_intervention"] is True
+        assert client.cancelled == 1
+        assert DRAFT not in await assistant_messages(test_db_manager)
+        assert counter(SPECULATIVE_GENERATIONS_TOTAL, outcome="discarded") == (
+            discarded + 1
+        )
+        assert counter(SPECULATIVE_WASTED_TOKENS_TOTAL, kind="input") > wasted
+
+    async def test_stream_yields_buffered_deltas_after_validation(
+        self,
+        manager: Any,
+        client: SlowClient,
+        safe_message: str,
+        sample_user_id: str,
+    ) -> None:
+        session = await manager.create_session(sample_user_id)
+
+        events = await manager.stream_message(
+            UUID(session["session_id"]), safe_message, sample_user_id
+        )
+        received = [event async for event in events]
+
+        assert client.started[0] < manager.validated_at[0]
+        text = "".join(e["text"] for e in received if e["type"] == "text")
+        assert text.strip() == DRAFT
+        assert received[-1]["response"]["content"] == DRAFT
+
+    async def test_unsafe_stream_never_yields_the_draft(
+        self,
+        manager: Any,
+        client: SlowClient,
+        crisis_message: str,
+        sample_user_id: str,
+    ) -> None:
+        session = await manager.create_session(sample_user_id)
+
+        events = await manager.stream_message(
+            UUID(session["session_id"]), crisis_message, sample_user_id
+        )
+        received = [event async for event in events]
+        await asyncio.sleep(0)
+
+        assert [event["type"] for event in received] == ["done"]
+        assert received[0]["response"]["safety_intervention"] is True
+        assert client.cancelled == 1
+
+    async def test_empty_speculation_falls_back_to_generation(
+        self,
+        manager: Any,
+        client: SlowClient,
+        safe_message: str,
+        sample_user_id: str,
+    ) -> None:
+        async def nothing(speculation: Speculation) -> None:
+            return None
+
+        manager._speculate_response = lambda *args: Speculation(nothing, 0)
+        session = await manager.create_session(sample_user_id)
+
+        response = await manager.send_message(
+            UUID(session["session_id"]), safe_message, sample_user_id
+        )
+
+        assert response["content"] == DRAFT
+        assert len(client.started) == 1
+
+    async def test_disabled_by_default(
+        self, test_db_manager: DatabaseManager, client: SlowClient
+    ) -> None:
+        with patch(
+            "therapeutic_agent.core.session_manager.get_database_manager",
+            return_value=test_db_manager,
+        ):
+            manager = TherapeuticSessionManager()
+        assert manager._speculative is False
+        manager.close()
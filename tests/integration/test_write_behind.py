@@ -0,0 +1,240 @@
+"""Integration tests for write-behind batching of turn writes."""
+
+import asyncio
+from typing import Any, Iterator
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+
+from therapeutic_agent.core.config import get_settings
+from therapeutic_agent.core.session_manager import TherapeuticSessionManager
+from therapeutic_agent.storage.database import DatabaseManager
+from therapeutic_agent.storage.models import (
+    ConversationMessage,
+    MessageRole,
+    SafetyFlag,
+    TherapeuticSession,
+)
+from therapeutic_agent.storage.repository import SessionRepository, TurnUnitOfWork
+from therapeutic_agent.storage.session_cache import SessionCache
+from therapeutic_agent.storage.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def statements(test_db_manager: DatabaseManager) -> Iterator[list[str]]:
+    """INSERT and UPDATE statements sent to the database."""
+    sent: list[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if statement.lstrip().upper().startswith(("INSERT", "UPDATE")):
+            sent.append(statement)
+
+    engine = test_db_manager._engine.sync_engine  # type: ignore[union-attr]
+    event.listen(engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def write_behind(
+    db_manager: DatabaseManager, *args: Any, **kwargs: Any
+) -> WriteBehindQueue:
+    async def database() -> DatabaseManager:
+        return db_manager
+
+    return WriteBehindQueue(database, *args, **kwargs)
+
+
+async def create_sessions(db_manager: DatabaseManager, count: int) -> list[UUID]:
+    async with db_manager.get_session() as db_session:
+        repo = SessionRepository(db_session)
+        return [(await repo.create_session(f"user_{i}")).id for i in range(count)]
+
+
+async def turn(session_id: UUID, *contents: str) -> TurnUnitOfWork:
+    writes = TurnUnitOfWork()
+    for content in contents:
+        await writes.add_message(session_id, MessageRole.USER, content)
+    return writes
+
+
+async def stored(
+    db_manager: DatabaseManager, session_id: UUID
+) -> tuple[TherapeuticSession, list[str]]:
+    async with db_manager.get_session() as db_session:
+        session = await db_session.get(TherapeuticSession, session_id)
+        assert session is not None
+        result = await db_session.execute(
+            select(ConversationMessage.content)
+            .where(ConversationMessage.session_id == session_id)
+            .order_by(ConversationMessage.created_at)
+        )
+        return session, list(result.scalars())
+
+
+class TestWriteBehindQueue:
+    """Test batching, durability modes and per-turn retries."""
+
+    async def test_concurrent_turns_share_one_flush(
+        self, test_db_manager: DatabaseManager, statements: list[str]
+    ) -> None:
+        first, second = await create_sessions(test_db_manager, 2)
+        queue = write_behind(test_db_manager)
+        statements.clear()
+
+        await asyncio.gather(
+            queue.submit(await turn(first, "a", "b")),
+            queue.submit(await turn(second, "c")),
+            queue.submit(await turn(first, "d")),
+        )
+        await queue.close()
+
+        inserts = [s for s in statements if s.startswith("INSERT")]
+        updates = [s for s in statements if s.startswith("UPDATE")]
+        assert len(inserts) == 1 and "conversation_messages" in inserts[0]
+        assert len(updates) == 2
+        session, contents = await stored(test_db_manager, first)
+        assert (session.message_count, contents) == (3, ["a", "b", "d"])
+        assert (await stored(test_db_manager, second))[1] == ["c"]
+
+    async def test_flushes_once_batch_rows_are_queued(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        (session_id,) = await create_sessions(test_db_manager, 1)
+        queue = write_behind(
+            test_db_manager,
+            flush_interval_ms=60_000,
+            batch_rows=2,
+        )
+
+        await asyncio.wait_for(queue.submit(await turn(session_id, "a", "b")), 5)
+        await queue.close()
+
+    async def test_enqueue_durability_acknowledges_before_writing(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        (session_id,) = await create_sessions(test_db_manager, 1)
+        queue = write_behind(
+            test_db_manager,
+            durability="enqueue",
+            flush_interval_ms=50,
+        )
+
+        await queue.submit(await turn(session_id, "a"))
+        assert (await stored(test_db_manager, session_id))[1] == []
+        await queue.wait(session_id)
+        assert (await stored(test_db_manager, session_id))[1] == ["a"]
+        await queue.close()
+
+    async def test_a_failing_turn_does_not_lose_the_others(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        (session_id,) = await create_sessions(test_db_manager, 1)
+        queue = write_behind(test_db_manager)
+        written = await turn(session_id, "a")
+        await queue.submit(written)
+        duplicate = await turn(session_id, "b")
+        duplicate.messages[0].id = written.messages[0].id
+
+        results = await asyncio.gather(
+            queue.submit(duplicate),
+            queue.submit(await turn(session_id, "c")),
+            return_exceptions=True,
+        )
+        await queue.close()
+
+        assert isinstance(results[0], IntegrityError) and results[1] is None
+        session, contents = await stored(test_db_manager, session_id)
+        assert (session.message_count, contents) == (2, ["a", "c"])
+
+    async def test_safety_events_lower_the_score_and_drop_the_cache(
+        self, test_db_manager: DatabaseManager
+    ) -> None:
+        cache = SessionCache()
+        async with test_db_manager.get_session() as db_session:
+            created = await SessionRepository(db_session, cache).create_session("u")
+        queue = write_behind(test_db_manager, cache)
+
+        writes = await turn(created.id, "a")
+        for severity in (0.6, 0.3):
+            await writes.create_safety_event(
+                created.id, SafetyFlag.CRISIS, severity, "Crisis language"
+            )
+        await queue.submit(writes)
+        await queue.close()
+
+        session, _ = await stored(test_db_manager, created.id)
+        assert session.safety_score == 0.3
+        assert await cache.get(created.id, 10) is None
+
+
+class TestSessionFlowWithWriteBehind:
+    """Test whole turns with write-behind enabled."""
+
+    @pytest.fixture(params=["flush", "enqueue"])
+    def manager(
+        self,
+        request: pytest.FixtureRequest,
+        monkeypatch: pytest.MonkeyPatch,
+        test_db_manager: DatabaseManager,
+        mock_anthropic_client: AsyncMock,
+    ) -> Iterator[TherapeuticSessionManager]:
+        config = get_settings().write_behind
+        monkeypatch.setattr(config, "enabled", True)
+        monkeypatch.setattr(config, "durability", request.param)
+        with patch(
+            "therapeutic_agent.core.session_manager.get_database_manager",
+            return_value=test_db_manager,
+        ):
+            manager = TherapeuticSessionManager()
+            manager._anthropic_client = mock_anthropic_client
+            yield manager
+            manager.close()
+
+    async def test_turns_read_back_their_writes(
+        self,
+        manager: TherapeuticSessionManager,
+        mock_anthropic_client: AsyncMock,
+        sample_user_id: str,
+        crisis_message: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        await manager.send_message(session_id, "I feel tired.", sample_user_id)
+        await manager.send_message(session_id, "Work is a lot.", sample_user_id)
+        intervention = await manager.send_message(
+            session_id, crisis_message, sample_user_id
+        )
+        details = await manager.get_session(session_id, sample_user_id)
+        await manager.flush_writes()
+
+        history = mock_anthropic_client.generate_therapeutic_response.await_args
+        assert [m["content"] for m in history.kwargs["conversation_history"]] == [
+            "I feel tired.",
+            "Thank you for sharing. How are you feeling about that?",
+        ]
+        assert intervention["safety_intervention"] is True
+        assert details["message_count"] == 6
+        assert [m["content"] for m in details["messages"]][:3] == [
+            "I feel tired.",
+            "Thank you for sharing. How are you feeling about that?",
+            "Work is a lot.",
+        ]
+        assert details["safety_score"] < 1.0
+
+    async def test_end_session_counts_queued_messages(
+        self,
+        manager: TherapeuticSessionManager,
+        test_db_manager: DatabaseManager,
+        sample_user_id: str,
+    ) -> None:
+        session_id = UUID((await manager.create_session(sample_user_id))["session_id"])
+        for text in ["I feel tired.", "Work is a lot.", "I can't sleep."]:
+            await manager.send_message(session_id, text, sample_user_id)
+
+        ended = await manager.end_session(session_id, sample_user_id)
+
+        session, _ = await stored(test_db_manager, session_id)
+        assert ended["message_count"] == session.message_count == 6
+        assert ended["summary_job"] is not None
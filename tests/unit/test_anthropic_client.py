@@ -0,0 +1,279 @@
+"""Tests for streamed generation and summaries in the Anthropic client."""
+
+from typing import Any, AsyncIterator
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from anthropic import APIStatusError
+from anthropic.types import Message, TextBlock, Usage
+
+from therapeutic_agent.core.anthropic_client import (
+    AnthropicTherapeuticClient,
+    TherapeuticPromptBuilder,
+    close_anthropic_client,
+    get_anthropic_client,
+    is_retryable,
+)
+from therapeutic_agent.core.exceptions import AnthropicAPIError, CircuitOpenError
+from therapeutic_agent.core.metrics import LLM_RETRIES_TOTAL
+from therapeutic_agent.core.resilience import (
+    CircuitBreaker,
+    CircuitState,
+    RetryPolicy,
+)
+
+FINAL_MESSAGE = Message(
+    id="msg_1",
+    type="message",
+    role="assistant",
+    model="claude-3-sonnet-20240229",
+    content=[TextBlock(type="text", text="Thank you for sharing.")],
+    stop_reason="end_turn",
+    stop_sequence=None,
+    usage=Usage(input_tokens=50, output_tokens=25),
+)
+
+
+def api_error(status_code: int) -> APIStatusError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status_code, request=request)
+    return APIStatusError("error", response=response, body=None)
+
+
+class FakeStream:
+    """Stands in for the SDK's ``messages.stream`` context manager."""
+
+    def __init__(self, chunks: list[str], error: Exception | None = None) -> None:
+        self.chunks = chunks
+        self.error = error
+        self.kwargs: dict[str, Any] = {}
+
+    def __call__(self, **kwargs: Any) -> "FakeStream":
+        self.kwargs = kwargs
+        return self
+
+    async def __aenter__(self) -> "FakeStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+    @property
+    async def text_stream(self) -> AsyncIterator[str]:
+        for chunk in self.chunks:
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+    async def get_final_message(self) -> Message:
+        return FINAL_MESSAGE
+
+
+@pytest.fixture
+def client() -> AnthropicTherapeuticClient:
+    return AnthropicTherapeuticClient()
+
+
+class TestStreamTherapeuticResponse:
+    """Test the streaming variant of response generation."""
+
+    async def test_yields_deltas_then_final_response(
+        self, client: AnthropicTherapeuticClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        stream = FakeStream(["Thank you ", "for sharing."])
+        monkeypatch.setattr(client._client.messages, "stream", stream)
+
+        events = [
+            event
+            async for event in client.stream_therapeutic_response(
+                "I had a hard week", conversation_history=[]
+            )
+        ]
+
+        assert events[:2] == [
+            {"type": "text", "text": "Thank you "},
+            {"type": "text", "text": "for sharing."},
+        ]
+        response = events[-1]["response"]
+        assert events[-1]["type"] == "done"
+        assert response["content"] == "Thank you for sharing."
+        assert response["usage"] == {
+            "input_tokens": 50,
+            "output_tokens": 25,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+        }
+        assert 0 <= response["time_to_first_token_ms"] <= response["processing_time_ms"]
+        assert stream.kwargs["messages"][-1] == {
+            "role": "user",
+            "content": "I had a hard week",
+        }
+
+    async def test_errors_are_wrapped(
+        self, client: AnthropicTherapeuticClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        stream = FakeStream(["Thank"], error=ConnectionError("reset"))
+        monkeypatch.setattr(client._client.messages, "stream", stream)
+
+        events = []
+        with pytest.raises(AnthropicAPIError) as excinfo:
+            async for event in client.stream_therapeutic_response("hello"):
+                events.append(event)
+
+        assert events == [{"type": "text", "text": "Thank"}]
+        assert excinfo.value.details["original_error"] == "reset"
+
+
+class TestSessionSummary:
+    """Test summarizing and sending the rolling session summary."""
+
+    async def test_summary_folds_in_new_messages(
+        self, client: AnthropicTherapeuticClient
+    ) -> None:
+        create = AsyncMock(return_value=FINAL_MESSAGE)
+        client._client.messages.create = create  # type: ignore[method-assign]
+
+        result = await client.summarize_conversation(
+            "Client is anxious about work.",
+            [{"role": "user", "content": "My manager praised my report."}],
+        )
+
+        assert result == {"summary": "Thank you for sharing.", "tokens_used": 75}
+        content = create.await_args.kwargs["messages"][0]["content"]
+        assert "Client is anxious about work." in content
+        assert "user: My manager praised my report." in content
+
+    async def test_summary_errors_are_wrapped(
+        self, client: AnthropicTherapeuticClient
+    ) -> None:
+        client._client.messages.create = AsyncMock(  # type: ignore[method-assign]
+            side_effect=RuntimeError("overloaded")
+        )
+
+        with pytest.raises(AnthropicAPIError):
+            await client.summarize_conversation(None, [])
+
+    def test_summary_follows_the_cached_system_prompt(self) -> None:
+        prompt = TherapeuticPromptBuilder.build_conversation_prompt(
+            "Hello again", session_summary="Client is anxious about work."
+        )
+
+        cached, summary = prompt["system"]
+        assert cached["cache_control"] == TherapeuticPromptBuilder.CACHE_CONTROL
+        assert "cache_control" not in summary
+        assert summary["text"].endswith("Client is anxious about work.")
+
+
+@pytest.fixture
+def retrying_client() -> AnthropicTherapeuticClient:
+    client = AnthropicTherapeuticClient()
+    client._retry = RetryPolicy(is_retryable, max_attempts=3, base_seconds=0.001)
+    client._breaker = CircuitBreaker(is_retryable, failure_threshold=2)
+    return client
+
+
+class TestClientRetries:
+    """Test retries and the breaker around real client calls."""
+
+    async def test_transient_errors_are_retried(
+        self, retrying_client: AnthropicTherapeuticClient
+    ) -> None:
+        retries = LLM_RETRIES_TOTAL.labels(error="529")._value.get()
+        create = AsyncMock(side_effect=[api_error(529), FINAL_MESSAGE])
+        retrying_client._client.messages.create = create  # type: ignore[method-assign]
+
+        response = await retrying_client.generate_therapeutic_response("hello")
+
+        assert response["content"] == "Thank you for sharing."
+        assert create.await_count == 2
+        assert 0 < create.await_args.kwargs["timeout"].read <= 60
+        assert LLM_RETRIES_TOTAL.labels(error="529")._value.get() == retries + 1
+
+    async def test_invalid_requests_are_not_retried(
+        self, retrying_client: AnthropicTherapeuticClient
+    ) -> None:
+        create = AsyncMock(side_effect=api_error(400))
+        retrying_client._client.messages.create = create  # type: ignore[method-assign]
+
+        with pytest.raises(AnthropicAPIError):
+            await retrying_client.generate_therapeutic_response("hello")
+        assert create.await_count == 1
+
+    async def test_circuit_opens_after_threshold_failed_calls(
+        self, retrying_client: AnthropicTherapeuticClient
+    ) -> None:
+        create = AsyncMock(side_effect=api_error(503))
+        retrying_client._client.messages.create = create  # type: ignore[method-assign]
+        # Each call makes all three attempts; the threshold counts calls
+        for calls in (1, 2):
+            with pytest.raises(AnthropicAPIError):
+                await retrying_client.generate_therapeutic_response("hello")
+            assert create.await_count == 3 * calls
+
+        with pytest.raises(CircuitOpenError):
+            await retrying_client.generate_therapeutic_response("hello")
+        assert create.await_count == 6
+
+    async def test_calls_that_recover_on_retry_are_not_failures(
+        self, retrying_client: AnthropicTherapeuticClient
+    ) -> None:
+        create = AsyncMock(
+            side_effect=[api_error(529), api_error(529), FINAL_MESSAGE] * 2
+        )
+        retrying_client._client.messages.create = create  # type: ignore[method-assign]
+
+        for _ in range(2):
+            await retrying_client.generate_therapeutic_response("hello")
+
+        assert retrying_client._breaker.state == CircuitState.CLOSED
+
+    async def test_stream_is_retried_before_its_first_token(
+        self,
+        retrying_client: AnthropicTherapeuticClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        failed = FakeStream([], error=api_error(529))
+        streams = iter([failed, FakeStream(["Thank you ", "for sharing."])])
+        monkeypatch.setattr(
+            retrying_client._client.messages, "stream", lambda **kwargs: next(streams)
+        )
+
+        events = [
+            event
+            async for event in retrying_client.stream_therapeutic_response("hello")
+        ]
+
+        assert [e["text"] for e in events[:-1]] == ["Thank you ", "for sharing."]
+        assert events[-1]["response"]["content"] == "Thank you for sharing."
+
+
+class TestSharedClient:
+    """Test the process-wide client and its connection pool."""
+
+    async def test_one_client_per_process(self) -> None:
+        shared = get_anthropic_client()
+        assert get_anthropic_client() is shared
+
+        await close_anthropic_client()
+        assert shared._http.is_closed
+        assert get_anthropic_client() is not shared
+
+    async def test_warm_opens_connections_to_the_api(
+        self, client: AnthropicTherapeuticClient
+    ) -> None:
+        head = AsyncMock()
+        client._http.head = head  # type: ignore[method-assign]
+
+        assert await client.warm(3) == 3
+        assert head.await_count == 3
+        assert head.await_args.args[0] == str(client._client.base_url)
+
+    async def test_warm_failures_are_not_fatal(
+        self, client: AnthropicTherapeuticClient
+    ) -> None:
+        client._http.head = AsyncMock(  # type: ignore[method-assign]
+            side_effect=[None, ConnectionError("unreachable")]
+        )
+        assert await client.warm(2) == 1
+        assert await client.warm(0) == 0
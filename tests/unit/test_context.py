@@ -0,0 +1,95 @@
+"""Tests for token-budgeted history selection."""
+
+from dataclasses import dataclass
+
+from therapeutic_agent.core.context import (
+    MESSAGE_OVERHEAD_TOKENS,
+    ContextWindow,
+    estimate_tokens,
+)
+
+
+@dataclass
+class Message:
+    role: str
+    content: str
+    token_count: int | None = None
+
+
+def conversation(count: int, tokens: int = 10) -> list[Message]:
+    return [
+        Message("user" if i % 2 == 0 else "assistant", f"message {i}", tokens)
+        for i in range(count)
+    ]
+
+
+class TestEstimateTokens:
+    """Test the local token estimate."""
+
+    def test_prose_is_about_four_characters_per_token(self) -> None:
+        text = "I have been feeling anxious about the presentation at work. " * 10
+        assert 120 <= estimate_tokens(text) <= 160
+
+    def test_short_words_and_punctuation_count_at_least_once(self) -> None:
+        assert estimate_tokens("I... ok, I am.") == 9
+        assert estimate_tokens("") == 0
+
+
+class TestContextWindow:
+    """Test packing history into a token budget."""
+
+    def test_keeps_newest_messages_that_fit(self) -> None:
+        messages = conversation(10)
+        per_message = 10 + MESSAGE_OVERHEAD_TOKENS
+
+        selected = ContextWindow(per_message * 4 + 5).select(messages)
+
+        assert selected == messages[-4:]
+
+    def test_short_messages_fill_more_of_the_budget(self) -> None:
+        window = ContextWindow(200)
+        assert len(window.select(conversation(50, tokens=6))) == 20
+        assert len(window.select(conversation(50, tokens=46))) == 4
+
+    def test_missing_counts_are_estimated_once_and_stored(self) -> None:
+        messages = [Message("user", "I slept badly again last night.")]
+
+        ContextWindow(100).select(messages)
+
+        assert messages[0].token_count == estimate_tokens(messages[0].content)
+        messages[0].token_count = 97
+        assert ContextWindow(100).select(messages) == []
+
+    def test_block_start_is_stable_as_the_conversation_grows(self) -> None:
+        window = ContextWindow(14 * 20, block_messages=10)
+        starts = []
+        for total in range(10, 60, 2):
+            # The caller reads the last 30 messages of a session of `total`
+            session = conversation(total)
+            recent = session[-30:]
+            selected = window.select(recent, offset=total - len(recent))
+            assert 10 <= len(selected) <= 20
+            starts.append(session.index(selected[0]) if selected else total)
+
+        assert all(start % 10 == 0 for start in starts)
+        assert starts == sorted(starts)
+        changes = sum(a != b for a, b in zip(starts, starts[1:]))
+        assert changes < len(starts) // 3
+
+    def test_block_alignment_never_drops_the_newest_messages(self) -> None:
+        window = ContextWindow(3000, block_messages=10)
+        for offset in range(10):
+            messages = conversation(20, tokens=1000)
+
+            selected = window.select(messages, offset=offset)
+
+            assert selected == messages[-2:]
+
+    def test_take_keeps_oldest_messages_that_fit(self) -> None:
+        messages = conversation(6)
+        per_message = 10 + MESSAGE_OVERHEAD_TOKENS
+
+        assert ContextWindow(per_message * 4).take(messages) == messages[:4]
+        # A single message over the budget is still taken so progress is made
+        assert ContextWindow(1).take(messages) == messages[:1]
+        assert ContextWindow(1).take([]) == []
@@ -0,0 +1,210 @@
+"""Tests for the adaptive concurrency limiter on model calls."""
+
+import asyncio
+
+import httpx
+import pytest
+from anthropic import APIStatusError, BadRequestError, RateLimitError
+
+from therapeutic_agent.core.anthropic_client import is_overload
+from therapeutic_agent.core.exceptions import RateLimitExceededError
+from therapeutic_agent.core.limiter import AdaptiveLimiter, Priority
+from therapeutic_agent.core.metrics import LLM_QUEUE_REJECTIONS_TOTAL
+
+
+class Overloaded(Exception):
+    pass
+
+
+def limiter(**kwargs: float) -> AdaptiveLimiter:
+    return AdaptiveLimiter(lambda e: isinstance(e, Overloaded), **kwargs)
+
+
+def api_error(cls: type[APIStatusError], status_code: int) -> APIStatusError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status_code, request=request)
+    return cls("error", response=response, body=None)
+
+
+def rejections(priority: str, reason: str) -> float:
+    return LLM_QUEUE_REJECTIONS_TOTAL.labels(
+        priority=priority, reason=reason
+    )._value.get()
+
+
+async def hold(
+    limits: AdaptiveLimiter,
+    priority: Priority,
+    release: asyncio.Event,
+    order: list[Priority] | None = None,
+) -> None:
+    async with limits.slot(priority):
+        if order is not None:
+            order.append(priority)
+        await release.wait()
+
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAdaptiveLimiter:
+    """Test the AIMD limit and the priority queue."""
+
+    async def test_calls_over_the_limit_wait(self) -> None:
+        limits = limiter(initial_limit=2)
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(limits, Priority.INTERACTIVE, release))
+            for _ in range(4)
+        ]
+        await settle()
+
+        assert limits.in_flight == 2
+        assert limits.queue_depth(Priority.INTERACTIVE) == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert limits.in_flight == 0
+        assert limits.queue_depth() == 0
+
+    async def test_queue_is_served_by_priority(self) -> None:
+        limits = limiter(initial_limit=1, max_limit=1)
+        release = asyncio.Event()
+        order: list[Priority] = []
+        blocker = asyncio.create_task(hold(limits, Priority.BACKGROUND, release))
+        await settle()
+
+        waiting = []
+        for priority in [Priority.BACKGROUND, Priority.INTERACTIVE, Priority.SAFETY]:
+            waiting.append(asyncio.create_task(hold(limits, priority, release, order)))
+            await settle()
+
+        release.set()
+        await asyncio.gather(blocker, *waiting)
+        assert order == [Priority.SAFETY, Priority.INTERACTIVE, Priority.BACKGROUND]
+
+    async def test_successes_raise_the_limit_additively(self) -> None:
+        limits = limiter(initial_limit=4, max_limit=5)
+        for _ in range(4):
+            async with limits.slot():
+                pass
+        assert 4.9 < limits.limit <= 5
+
+        for _ in range(10):
+            async with limits.slot():
+                pass
+        assert limits.limit == 5
+
+    async def test_overload_burst_cuts_the_limit_once(self) -> None:
+        limits = limiter(initial_limit=8, min_limit=2)
+        started = asyncio.Event()
+
+        async def overloaded() -> None:
+            async with limits.slot():
+                await started.wait()
+                raise Overloaded()
+
+        tasks = [asyncio.create_task(overloaded()) for _ in range(4)]
+        await settle()
+        started.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert limits.limit == 4
+
+        # Calls started after the cut may cut it again, down to the minimum
+        for _ in range(3):
+            with pytest.raises(Overloaded):
+                async with limits.slot():
+                    raise Overloaded()
+        assert limits.limit == 2
+
+    async def test_other_errors_leave_the_limit_alone(self) -> None:
+        limits = limiter(initial_limit=4)
+        with pytest.raises(ValueError):
+            async with limits.slot():
+                raise ValueError("bad request")
+        assert limits.limit == 4
+        assert limits.in_flight == 0
+
+    async def test_full_queue_rejects_the_newcomer(self) -> None:
+        limits = limiter(initial_limit=1, max_queue=1)
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(limits, Priority.INTERACTIVE, release))
+            for _ in range(2)
+        ]
+        await settle()
+        before = rejections("interactive", "queue_full")
+
+        with pytest.raises(RateLimitExceededError):
+            async with limits.slot(Priority.INTERACTIVE):
+                pass
+
+        assert rejections("interactive", "queue_full") == before + 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_full_queue_evicts_lower_priority_work(self) -> None:
+        limits = limiter(initial_limit=1, max_queue=1)
+        release = asyncio.Event()
+        blocker = asyncio.create_task(hold(limits, Priority.INTERACTIVE, release))
+        await settle()
+        background = asyncio.create_task(hold(limits, Priority.BACKGROUND, release))
+        await settle()
+        before = rejections("background", "evicted")
+
+        safety = asyncio.create_task(hold(limits, Priority.SAFETY, release))
+        await settle()
+
+        with pytest.raises(RateLimitExceededError):
+            await background
+        assert rejections("background", "evicted") == before + 1
+        release.set()
+        await asyncio.gather(blocker, safety)
+        assert limits.in_flight == 0
+
+    async def test_waiting_too_long_is_rejected(self) -> None:
+        limits = limiter(initial_limit=1, queue_timeout=0.05)
+        release = asyncio.Event()
+        blocker = asyncio.create_task(hold(limits, Priority.INTERACTIVE, release))
+        await settle()
+
+        with pytest.raises(RateLimitExceededError):
+            async with limits.slot(Priority.BACKGROUND):
+                pass
+
+        assert limits.queue_depth() == 0
+        release.set()
+        await blocker
+        assert limits.in_flight == 0
+
+    async def test_cancelled_waiter_gives_up_its_place(self) -> None:
+        limits = limiter(initial_limit=1)
+        release = asyncio.Event()
+        blocker = asyncio.create_task(hold(limits, Priority.INTERACTIVE, release))
+        await settle()
+        waiter = asyncio.create_task(hold(limits, Priority.INTERACTIVE, release))
+        await settle()
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        release.set()
+        await blocker
+
+        assert limits.queue_depth() == 0
+        assert limits.in_flight == 0
+
+
+class TestOverloadClassification:
+    """Test which API errors shrink the limit."""
+
+    def test_rate_limits_and_overloads(self) -> None:
+        assert is_overload(api_error(RateLimitError, 429))
+        assert is_overload(api_error(APIStatusError, 529))
+        assert is_overload(api_error(APIStatusError, 503))
+
+    def test_other_errors(self) -> None:
+        assert not is_overload(api_error(BadRequestError, 400))
+        assert not is_overload(api_error(APIStatusError, 500))
+        assert not is_overload(asyncio.CancelledError())
@@ -0,0 +1,143 @@
+"""Tests for retries and the circuit breaker on model calls."""
+
+import asyncio
+
+import httpx
+import pytest
+from anthropic import APIStatusError, APITimeoutError, BadRequestError
+from prometheus_client import REGISTRY
+
+from therapeutic_agent.core.anthropic_client import is_retryable, retry_after_seconds
+from therapeutic_agent.core.exceptions import CircuitOpenError
+from therapeutic_agent.core.resilience import (
+    CircuitBreaker,
+    CircuitState,
+    RetryPolicy,
+)
+
+REQUEST = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
+
+class Transient(Exception):
+    pass
+
+
+def api_error(
+    status_code: int, headers: dict[str, str] | None = None
+) -> APIStatusError:
+    response = httpx.Response(status_code, request=REQUEST, headers=headers)
+    cls = BadRequestError if status_code == 400 else APIStatusError
+    return cls("error", response=response, body=None)
+
+
+def breaker(**kwargs: float) -> CircuitBreaker:
+    return CircuitBreaker(lambda e: isinstance(e, Transient), **kwargs)
+
+
+async def fail(circuit: CircuitBreaker, error: Exception) -> None:
+    with pytest.raises(type(error)):
+        async with circuit.guard():
+            raise error
+
+
+async def succeed(circuit: CircuitBreaker) -> None:
+    async with circuit.guard():
+        pass
+
+
+class TestRetryPolicy:
+    """Test when and after how long calls are retried."""
+
+    def test_backoff_grows_with_jitter_up_to_the_cap(self) -> None:
+        policy = RetryPolicy(lambda e: True, max_attempts=10, max_seconds=4)
+        for attempts, ceiling in [(1, 0.5), (2, 1), (3, 2), (6, 4)]:
+            delays = [
+                policy.delay(Transient(), attempts, remaining=60) for _ in range(50)
+            ]
+            assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+
+    def test_gives_up_after_max_attempts(self) -> None:
+        policy = RetryPolicy(lambda e: True, max_attempts=3)
+        assert policy.delay(Transient(), 2, remaining=60) is not None
+        assert policy.delay(Transient(), 3, remaining=60) is None
+
+    def test_only_retryable_errors_are_retried(self) -> None:
+        policy = RetryPolicy(lambda e: isinstance(e, Transient))
+        assert policy.delay(ValueError(), 1, remaining=60) is None
+
+    def test_deadline_bounds_the_delay(self) -> None:
+        policy = RetryPolicy(lambda e: True)
+        assert policy.delay(Transient(), 1, remaining=0.2) is None
+        assert policy.delay(Transient(), 1, remaining=60, retry_after=40) is None
+
+    def test_retry_after_is_respected(self) -> None:
+        policy = RetryPolicy(lambda e: True)
+        assert policy.delay(Transient(), 1, remaining=60, retry_after=5) == 5
+
+    def test_classifies_api_errors(self) -> None:
+        assert is_retryable(api_error(529))
+        assert is_retryable(api_error(500))
+        assert is_retryable(APITimeoutError(REQUEST))
+        assert not is_retryable(api_error(400))
+        assert not is_retryable(RuntimeError("bug"))
+        assert retry_after_seconds(api_error(429, {"retry-after": "3"})) == 3
+        assert retry_after_seconds(api_error(429)) is None
+
+
+class TestCircuitBreaker:
+    """Test opening, failing fast and half-open probes."""
+
+    async def test_opens_after_consecutive_failures(self) -> None:
+        circuit = breaker(failure_threshold=3)
+        await fail(circuit, Transient())
+        await fail(circuit, Transient())
+        await succeed(circuit)
+        for _ in range(3):
+            await fail(circuit, Transient())
+
+        assert circuit.state == CircuitState.OPEN
+        assert REGISTRY.get_sample_value("therapeutic_llm_circuit_state") == 2
+        with pytest.raises(CircuitOpenError):
+            await succeed(circuit)
+
+    async def test_other_errors_do_not_count(self) -> None:
+        circuit = breaker(failure_threshold=1)
+        await fail(circuit, ValueError("bad request"))
+        assert circuit.state == CircuitState.CLOSED
+
+    async def test_successful_probe_closes_the_circuit(self) -> None:
+        circuit = breaker(failure_threshold=1, reset_seconds=0.02)
+        await fail(circuit, Transient())
+        await asyncio.sleep(0.03)
+        assert circuit.state == CircuitState.HALF_OPEN
+
+        await succeed(circuit)
+        assert circuit.state == CircuitState.CLOSED
+
+    async def test_failed_probe_reopens_the_circuit(self) -> None:
+        circuit = breaker(failure_threshold=3, reset_seconds=0.02)
+        for _ in range(3):
+            await fail(circuit, Transient())
+        await asyncio.sleep(0.03)
+
+        await fail(circuit, Transient())
+        assert circuit.state == CircuitState.OPEN
+
+    async def test_half_open_admits_limited_probes(self) -> None:
+        circuit = breaker(failure_threshold=1, reset_seconds=0.02)
+        await fail(circuit, Transient())
+        await asyncio.sleep(0.03)
+        release = asyncio.Event()
+
+        async def probe() -> None:
+            async with circuit.guard():
+                await release.wait()
+
+        running = asyncio.create_task(probe())
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await succeed(circuit)
+
+        release.set()
+        await running
+        assert circuit.state == CircuitState.CLOSED
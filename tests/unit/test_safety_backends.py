@@ -0,0 +1,163 @@
+"""Tests for the regex backends used to compile safety rules."""
+
+import random
+import re
+import time
+
+import pytest
+
+from therapeutic_agent.core.config import SafetyConfig, Settings
+from therapeutic_agent.safety import backends
+from therapeutic_agent.safety.backends import (
+    SafeBackend,
+    StdlibBackend,
+    get_backend,
+    split_gap,
+)
+from therapeutic_agent.safety.engine import SafetyEngine
+from therapeutic_agent.safety.validators import (
+    CrisisValidator,
+    MedicalAdviceValidator,
+    SelfHarmValidator,
+    TherapeuticBoundaryValidator,
+)
+
+RULES = [
+    *CrisisValidator.CRISIS_PATTERNS,
+    *SelfHarmValidator.SELF_HARM_PATTERNS,
+    *MedicalAdviceValidator.MEDICAL_PATTERNS,
+    *TherapeuticBoundaryValidator.BOUNDARY_PATTERNS,
+]
+GAP_RULES = [rule for rule in RULES if split_gap(rule) is not None]
+
+WORDS = (
+    "date romantic sexual intimate relationship relationships feelings "
+    "diagnose diagnosis what do i what's wrong symptom symptoms condition "
+    "disease disorder kill myself end my life want to die self-harm "
+    "medication doctor advice can we meet phone number in person the"
+).split() + ["\n", "\n", ",", "dated", "Feelings"]
+
+LINEAR_BACKENDS = ["safe"] + (["re2"] if backends.re2_available() else [])
+
+
+def random_texts(size: int, seed: int = 99) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 30)))
+        for _ in range(size)
+    ]
+
+
+class TestSplitGap:
+    """Test detection of rules with an unbounded gap."""
+
+    def test_built_in_gap_rules_are_split(self) -> None:
+        """Both ``HEAD.*TAIL`` rules are rewritten and nothing else is."""
+        assert GAP_RULES == [
+            MedicalAdviceValidator.MEDICAL_PATTERNS[0],
+            TherapeuticBoundaryValidator.BOUNDARY_PATTERNS[3],
+        ]
+        assert split_gap(TherapeuticBoundaryValidator.BOUNDARY_PATTERNS[3]) == (
+            r"\b(?:date|romantic|sexual|intimate)\b",
+            r"\b(?:relationship|feelings)\b",
+        )
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            r"a|b.*c",
+            r"(a.*b)",
+            r"a.*b.*c",
+            r"a\.*b",
+            r"[.*]a",
+            r"(?s)a.*b",
+            r"a.*+b",
+            r".*a",
+            r"a.*",
+        ],
+    )
+    def test_other_shapes_are_left_alone(self, source: str) -> None:
+        assert split_gap(source) is None
+
+    def test_lazy_gap_is_split(self) -> None:
+        assert split_gap(r"a.*?b") == ("a", "b")
+
+
+class TestBackendEquivalence:
+    """Test that every backend agrees with ``re`` on every rule."""
+
+    @pytest.mark.parametrize("name", ["stdlib", *LINEAR_BACKENDS])
+    @pytest.mark.parametrize("rule", RULES)
+    def test_rule_matches_stdlib(self, name: str, rule: str) -> None:
+        pattern = get_backend(name).compile(rule)
+        reference = re.compile(rule, re.IGNORECASE)
+        for text in random_texts(400):
+            assert pattern.search(text) == (reference.search(text) is not None), text
+
+    @pytest.mark.parametrize("rule", GAP_RULES)
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "date and then\nfeelings",
+            "date\n\ndate feelings",
+            "feelings before a date",
+            "dated relationship",
+            "romantic relationship\n",
+            "line\nintimate, relationship",
+            "diagnose\nsymptoms diagnose symptoms",
+            "what do i do about these symptoms",
+        ],
+    )
+    def test_gap_rule_edge_cases(self, rule: str, text: str) -> None:
+        expected = re.compile(rule, re.IGNORECASE).search(text) is not None
+        assert SafeBackend().compile(rule).search(text) == expected
+
+    @pytest.mark.parametrize("name", LINEAR_BACKENDS)
+    async def test_engine_results_match_stdlib(self, name: str) -> None:
+        reference = SafetyEngine(StdlibBackend())
+        engine = SafetyEngine(get_backend(name))
+        for text in random_texts(200, seed=7):
+            assert await engine.validate_content(
+                text
+            ) == await reference.validate_content(text)
+
+
+class TestBackendPerformance:
+    """Test that linear backends are not stalled by adversarial input."""
+
+    @pytest.mark.parametrize("name", LINEAR_BACKENDS)
+    @pytest.mark.parametrize("rule", GAP_RULES)
+    def test_repeated_head_without_tail(self, name: str, rule: str) -> None:
+        """4000 characters of repeated heads is quadratic for a ``.*`` rule."""
+        head = split_gap(rule)[0]  # type: ignore[index]
+        word = re.search(r"[a-z]{4,}", head).group()  # type: ignore[union-attr]
+        text = (f"{word} " * 1000)[:4000]
+        pattern = get_backend(name).compile(rule)
+
+        started = time.perf_counter()
+        assert not pattern.search(text)
+        assert time.perf_counter() - started < 0.005
+
+
+class TestGetBackend:
+    """Test backend selection."""
+
+    def test_auto_falls_back_without_re2(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(backends, "re2", None)
+        assert get_backend("auto").name == "safe"
+
+    def test_re2_requires_package(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(backends, "re2", None)
+        with pytest.raises(ValueError, match="google-re2"):
+            get_backend("re2")
+
+    def test_unknown_backend(self) -> None:
+        with pytest.raises(ValueError, match="Unknown regex backend"):
+            get_backend("pcre")
+
+    def test_backend_from_settings(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        settings = Settings(safety=SafetyConfig(regex_backend="stdlib"))
+        monkeypatch.setattr(
+            "therapeutic_agent.safety.engine.get_settings", lambda: settings
+        )
+        assert SafetyEngine()._backend.name == "stdlib"
@@ -0,0 +1,131 @@
+"""Tests for the safety result cache."""
+
+import pytest
+
+from therapeutic_agent.safety.cache import SafetyResultCache, normalize
+from therapeutic_agent.safety.engine import SafetyEngine
+from therapeutic_agent.safety.validators import (
+    MedicalAdviceValidator,
+    SafetyLevel,
+    SafetyResult,
+)
+
+SAFE = SafetyResult(
+    is_safe=True,
+    level=SafetyLevel.SAFE,
+    category=None,
+    confidence=0.9,
+    explanation="ok",
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSafetyResultCache:
+    """Test LRU, TTL and key behaviour."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = SafetyResultCache(max_entries=2)
+        cache.set(b"a", SAFE)
+        cache.set(b"b", SAFE)
+        assert cache.get(b"a") is SAFE  # "b" is now least recently used
+        cache.set(b"c", SAFE)
+
+        assert cache.get(b"b") is None
+        assert cache.get(b"a") is SAFE
+        assert cache.stats() == {"entries": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+    def test_expired_entries_miss(self) -> None:
+        clock = FakeClock()
+        cache = SafetyResultCache(ttl_seconds=10, clock=clock)
+        cache.set(b"a", SAFE)
+
+        clock.now = 10
+        assert cache.get(b"a") is SAFE
+        clock.now = 10.5
+        assert cache.get(b"a") is None
+        assert len(cache) == 0
+        assert cache.evictions == 1
+
+    def test_key_normalizes_case_and_surrounding_whitespace(self) -> None:
+        assert SafetyResultCache.key(" Thank You\n", "v1") == SafetyResultCache.key(
+            "thank you", "v1"
+        )
+        assert SafetyResultCache.key("ok", "v1") != SafetyResultCache.key("ok", "v2")
+        assert SafetyResultCache.key("ok", "v1") != SafetyResultCache.key("o k", "v1")
+
+    def test_non_ascii_case_is_preserved(self) -> None:
+        assert normalize("İstanbul") == "İstanbul"
+        assert normalize(" OK ") == "ok"
+
+
+class TestEngineCache:
+    """Test caching inside the safety engine."""
+
+    @pytest.fixture
+    def engine(self) -> SafetyEngine:
+        return SafetyEngine(cache=SafetyResultCache(max_entries=100), prefilter=False)
+
+    async def test_repeated_messages_hit(self, engine: SafetyEngine) -> None:
+        first = await engine.validate_content("I feel anxious")
+        second = await engine.validate_content("  i feel ANXIOUS ")
+        unsafe = await engine.validate_content("I want to kill myself")
+
+        assert second is first
+        assert not unsafe.is_safe
+        assert engine.cache_stats() == {
+            "entries": 2,
+            "hits": 1,
+            "misses": 2,
+            "evictions": 0,
+        }
+
+    async def test_batch_uses_cache(self, engine: SafetyEngine) -> None:
+        await engine.validate_content("thank you")
+        results = await engine.validate_batch(["thank you", "ok", "ok"])
+
+        assert [result.is_safe for result in results] == [True, True, True]
+        assert engine.cache_stats()["hits"] == 1  # type: ignore[index]
+        assert await engine.validate_content("ok") is results[1]
+
+    async def test_bypassed_when_validator_uses_context(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(MedicalAdviceValidator, "uses_context", True)
+        engine = SafetyEngine(cache=SafetyResultCache(max_entries=100), prefilter=False)
+
+        await engine.validate_content("ok", context={"session_id": "s"})
+        await engine.validate_content("ok", context={"session_id": "s"})
+        assert engine.cache_stats()["entries"] == 0  # type: ignore[index]
+
+        await engine.validate_content("ok")
+        await engine.validate_content("ok")
+        assert engine.cache_stats()["hits"] == 1  # type: ignore[index]
+
+    async def test_reload_invalidates_on_rule_change(
+        self, engine: SafetyEngine, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        assert (await engine.validate_content("I feel anxious")).is_safe
+        version = engine._rule_set.version
+
+        monkeypatch.setattr(
+            MedicalAdviceValidator,
+            "MEDICAL_PATTERNS",
+            [*MedicalAdviceValidator.MEDICAL_PATTERNS, r"\banxious\b"],
+        )
+        engine.reload_rules()
+
+        assert engine._rule_set.version != version
+        assert engine.cache_stats()["entries"] == 0  # type: ignore[index]
+        assert not (await engine.validate_content("I feel anxious")).is_safe
+
+    async def test_disabled_with_zero_entries(self) -> None:
+        engine = SafetyEngine(cache=SafetyResultCache(max_entries=0), prefilter=False)
+        await engine.validate_content("ok")
+        assert engine.cache_stats() is None
@@ -0,0 +1,135 @@
+"""Tests for the incremental per-session conversation safety state."""
+
+import json
+import random
+
+import pytest
+from test_safety_matcher import CORPUS, random_corpus
+
+from therapeutic_agent.safety.conversation import (
+    TAIL_MAX_CHARS,
+    TAIL_TOKENS,
+    WINDOW_MESSAGES,
+    ConversationSafetyState,
+)
+from therapeutic_agent.safety.engine import SafetyEngine
+from therapeutic_agent.safety.matcher import RuleMatches
+from therapeutic_agent.safety.validators import (
+    MedicalAdviceValidator,
+    SafetyCategory,
+    SafetyLevel,
+)
+
+
+@pytest.fixture
+def engine() -> SafetyEngine:
+    return SafetyEngine()
+
+
+class TestConversationTurn:
+    """Test checking each message against the conversation state."""
+
+    async def test_detects_phrase_split_across_messages(
+        self, engine: SafetyEngine
+    ) -> None:
+        state = ConversationSafetyState()
+        first = await engine.validate_conversation_turn(
+            state, "I keep thinking of ending"
+        )
+        second = await engine.validate_conversation_turn(state, "my life")
+
+        assert (await engine.validate_content("I keep thinking of ending")).is_safe
+        assert (await engine.validate_content("my life")).is_safe
+        assert first.is_safe
+        assert not second.is_safe
+        assert second.category == SafetyCategory.CRISIS
+
+    async def test_reports_only_what_spans_the_boundary(
+        self, engine: SafetyEngine
+    ) -> None:
+        state = ConversationSafetyState()
+        own = await engine.validate_conversation_turn(state, "I want to kill myself")
+        later = await engine.validate_conversation_turn(state, "thanks for listening")
+
+        assert own.is_safe and later.is_safe
+        assert not engine.assess_conversation(state).is_safe
+        assert engine.assess_conversation(state).level == SafetyLevel.CRITICAL
+
+    async def test_window_forgets_old_messages(self, engine: SafetyEngine) -> None:
+        state = ConversationSafetyState()
+        await engine.validate_conversation_turn(state, "I want to kill myself")
+        for _ in range(WINDOW_MESSAGES):
+            await engine.validate_conversation_turn(state, "work was busy today")
+
+        assert len(state.window) == WINDOW_MESSAGES
+        assert engine.assess_conversation(state).is_safe
+
+    async def test_window_holds_every_message_and_adjacent_pair(
+        self, engine: SafetyEngine
+    ) -> None:
+        """The window matches at least what each message and pair matches."""
+        rng = random.Random(7)
+        rule_set = engine._rule_set
+        messages = CORPUS + random_corpus(200, seed=3)
+        for _ in range(100):
+            conversation = rng.sample(messages, 4)
+            state = ConversationSafetyState()
+            for message in conversation:
+                await engine.validate_conversation_turn(state, message)
+
+            expected = RuleMatches()
+            for previous, message in zip([""] + conversation, conversation):
+                expected |= rule_set.match(message)
+                if len(previous.split()) <= TAIL_TOKENS:
+                    expected |= rule_set.match(f"{previous} {message}".strip())
+            combined = state.matches()
+            assert expected.rules <= combined.rules, conversation
+            assert expected.keywords <= combined.keywords, conversation
+
+    async def test_tail_is_bounded(self, engine: SafetyEngine) -> None:
+        state = ConversationSafetyState()
+        await engine.validate_conversation_turn(state, "word " * 1000)
+        assert len(state.tail.split()) == TAIL_TOKENS
+
+        await engine.validate_conversation_turn(state, "x" * 1000)
+        assert len(state.tail) == TAIL_MAX_CHARS
+
+    async def test_rule_change_resets_matches(
+        self, engine: SafetyEngine, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        state = ConversationSafetyState()
+        await engine.validate_conversation_turn(state, "I want to kill myself")
+        assert not engine.assess_conversation(state).is_safe
+
+        monkeypatch.setattr(
+            MedicalAdviceValidator,
+            "MEDICAL_PATTERNS",
+            [*MedicalAdviceValidator.MEDICAL_PATTERNS, r"\bheadache\b"],
+        )
+        engine.reload_rules()
+        assert engine.assess_conversation(state).is_safe
+
+        await engine.validate_conversation_turn(state, "I have a headache")
+        assert state.rules_version == engine._rule_set.version
+        assert len(state.window) == 1
+
+
+class TestSerialization:
+    """Test storing the state alongside the session."""
+
+    async def test_round_trips_through_json(self, engine: SafetyEngine) -> None:
+        state = ConversationSafetyState()
+        for message in ["I keep thinking of ending", "my life", "and self-harm"]:
+            await engine.validate_conversation_turn(state, message)
+
+        restored = ConversationSafetyState.from_dict(
+            json.loads(json.dumps(state.to_dict()))
+        )
+        assert restored == state
+        assert engine.assess_conversation(restored) == engine.assess_conversation(state)
+
+    @pytest.mark.parametrize(
+        "data", [None, "state", {"window": [{"rules": ["x"]}]}, {"window": 3}]
+    )
+    def test_unrecognised_data_starts_fresh(self, data: object) -> None:
+        assert ConversationSafetyState.from_dict(data) == ConversationSafetyState()
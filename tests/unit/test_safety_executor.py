@@ -0,0 +1,114 @@
+"""Tests for scanning safety rules off the event loop."""
+
+import asyncio
+import threading
+import time
+from functools import partial
+
+import pytest
+from prometheus_client import generate_latest
+
+from therapeutic_agent.core.metrics import LoopLagMonitor
+from therapeutic_agent.safety.backends import get_backend
+from therapeutic_agent.safety.engine import SafetyEngine, build_rule_set
+from therapeutic_agent.safety.executor import ScanExecutor
+from therapeutic_agent.safety.validators import ScanHits
+
+MESSAGES = [
+    "I want to kill myself and end this pain",
+    "Can we meet outside of therapy and be friends?",
+    "thank you",
+    "I've been feeling anxious lately about work stress. " * 40,
+    "What medication should I take? " + "I keep thinking about it. " * 60,
+]
+
+
+def make_executor(mode: str) -> ScanExecutor:
+    return ScanExecutor(
+        mode=mode,
+        max_workers=2,
+        offload_min_chars=1000,
+        build_rule_set=partial(build_rule_set, get_backend().name),
+    )
+
+
+class TestScanExecutor:
+    """Test where scans run and that the results do not depend on it."""
+
+    def test_short_single_messages_stay_inline(self) -> None:
+        executor = make_executor("thread")
+        assert not executor.should_offload(["ok"])
+        assert executor.should_offload(["x" * 1000])
+        assert executor.should_offload(["ok", "thank you"])
+        assert not make_executor("inline").should_offload(["x" * 5000, "ok"])
+
+    def test_unknown_mode(self) -> None:
+        with pytest.raises(ValueError, match="Unknown scan executor mode"):
+            ScanExecutor(mode="gpu")
+
+    @pytest.mark.parametrize("mode", ["thread", "process"])
+    async def test_results_match_inline(self, mode: str) -> None:
+        inline = SafetyEngine(executor=make_executor("inline"))
+        engine = SafetyEngine(executor=make_executor(mode))
+        try:
+            for message in MESSAGES:
+                assert await engine.validate_content(
+                    message
+                ) == await inline.validate_content(message)
+
+            rule_set = engine._rule_set
+            batch = MESSAGES * 40
+            assert await engine._executor.scan(rule_set, batch) == [
+                rule_set.scan(message) for message in batch
+            ]
+        finally:
+            engine.shutdown()
+
+    async def test_long_message_scanned_on_worker_thread(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        engine = SafetyEngine(executor=make_executor("thread"), prefilter=False)
+        rule_set = engine._rule_set
+        threads: list[str] = []
+        original_scan = rule_set.scan
+
+        def recording_scan(content: str) -> list[ScanHits]:
+            threads.append(threading.current_thread().name)
+            return original_scan(content)
+
+        monkeypatch.setattr(rule_set, "scan", recording_scan)
+        try:
+            await engine.validate_content("ok")
+            await engine.validate_content(MESSAGES[-1])
+        finally:
+            engine.shutdown()
+
+        assert threads[0] == "MainThread"
+        assert threads[1].startswith("safety-scan")
+
+
+class TestLoopLagMonitor:
+    """Test event loop lag measurement."""
+
+    def test_percentiles(self) -> None:
+        monitor = LoopLagMonitor(window=100)
+        assert monitor.percentile(0.5) == 0.0
+        for i in range(1, 101):
+            monitor.record(i / 1000)
+        assert monitor.percentile(0.5) == pytest.approx(0.050)
+        assert monitor.percentile(0.99) == pytest.approx(0.099)
+
+    async def test_blocking_callback_shows_as_lag(self) -> None:
+        monitor = LoopLagMonitor(interval=0.005)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)  # Hold the loop as a CPU-bound scan would
+            await asyncio.sleep(0.02)
+        finally:
+            await monitor.stop()
+
+        assert monitor.percentile(0.99) >= 0.08
+        exposition = generate_latest().decode()
+        assert "therapeutic_event_loop_lag_p99_seconds" in exposition
+        assert "therapeutic_event_loop_lag_p50_seconds" in exposition
@@ -0,0 +1,132 @@
+"""Equivalence tests for the combined safety rule matcher."""
+
+import random
+
+import pytest
+
+from therapeutic_agent.safety.engine import SafetyEngine
+from therapeutic_agent.safety.matcher import CompiledRuleSet
+from therapeutic_agent.safety.validators import CrisisValidator, SafetyResult
+
+CORPUS = [
+    "I want to kill myself and end this pain",
+    "I have a plan to kill myself with pills",
+    "I'm feeling sad but want to work through this",
+    "I've been cutting myself with a razor",
+    "I accidentally cut myself while cooking",
+    "Can you diagnose what's wrong with me based on these symptoms?",
+    "What medication should I take for my depression?",
+    "Can we meet outside of therapy and be friends?",
+    "What's your phone number so we can talk outside sessions?",
+    "I want to kill myself and need you to tell me what medication to take",
+    "I can't take it anymore. I want to kill myself and end the pain.",
+    "I've been feeling anxious lately about work stress.",
+    "Can you diagnose what's wrong with me? "
+    "I have these symptoms and need medication recommendations.",
+    "I'm feeling really down I keep thinking about ending it all",
+    "ok",
+    "thank you",
+    "HURT MYSELF, hurt myself, harm myself",
+    "self-harm and self injury and selfharm",
+    "suicidal suicide overdose want to die wish I was dead",
+    "I cut myself shaving this morning",
+    "romantic feelings about our relationship",
+    "treatment for anxiety and a cure for insomnia",
+    "ending it\nall is what I think about",
+]
+
+WORDS = (
+    "i want to kill killing hurt harm myself me my life end ending it all "
+    "suicide suicidal die wish was dead better off overdose pills plan have "
+    "a can't cant go on take live no point in living cut cutting scratch "
+    "burn arm razor blade knife self-harm self injury inflict pain "
+    "accidentally cooking shaving diagnose what's wrong symptoms condition "
+    "should recommend medication doctor advice treatment for cure how treat "
+    "can we meet be friends personal contact outside of therapy real person "
+    "phone number address where do you date romantic relationship feelings "
+    "feeling sad work KILL Myself"
+).split() + ["\n", ",", "."]
+
+
+def legacy_validate(engine: SafetyEngine, content: str) -> SafetyResult:
+    """Run every validator separately, as the engine used to."""
+    results = [
+        validator.assess(validator.scan(content)) for validator in engine._validators
+    ]
+    return engine._aggregate_results(results)
+
+
+def random_corpus(size: int, seed: int = 1234) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 25)))
+        for _ in range(size)
+    ]
+
+
+class TestCompiledRuleSet:
+    """Test that the combined scan matches per-validator scanning exactly."""
+
+    @pytest.fixture
+    def engine(self) -> SafetyEngine:
+        return SafetyEngine()
+
+    @pytest.mark.parametrize("content", CORPUS)
+    async def test_matches_legacy_on_corpus(
+        self, engine: SafetyEngine, content: str
+    ) -> None:
+        """Engine output is identical to the per-validator path."""
+        assert await engine.validate_content(content) == legacy_validate(
+            engine, content
+        )
+
+    def test_hits_match_per_validator_scan(self, engine: SafetyEngine) -> None:
+        """Raw hits agree on overlapping and adjacent matches."""
+        rule_set = CompiledRuleSet(engine._validators)
+
+        for content in CORPUS + random_corpus(3000):
+            expected = [validator.scan(content) for validator in engine._validators]
+            assert rule_set.scan(content) == expected, content
+
+
+class TestValidateBatch:
+    """Test that batch validation matches validating one message at a time."""
+
+    @pytest.fixture
+    def engine(self) -> SafetyEngine:
+        return SafetyEngine()
+
+    async def test_matches_single_validation(self, engine: SafetyEngine) -> None:
+        texts = CORPUS + ["", "   "] + random_corpus(500)
+        results = await engine.validate_batch(texts)
+
+        assert len(results) == len(texts)
+        for text, result in zip(texts, results):
+            assert result == await engine.validate_content(text), text
+
+    @pytest.mark.parametrize("uses_context", [False, True])
+    async def test_context_aware_validators_see_each_context(
+        self, monkeypatch: pytest.MonkeyPatch, uses_context: bool
+    ) -> None:
+        monkeypatch.setattr(CrisisValidator, "uses_context", uses_context)
+        engine = SafetyEngine(prefilter=False)
+        validator = engine._validators[0]
+        seen = []
+        original_assess = validator.assess
+
+        def recording_assess(hits, context=None):  # type: ignore[no-untyped-def]
+            seen.append(context)
+            return original_assess(hits, context)
+
+        monkeypatch.setattr(validator, "assess", recording_assess)
+        contexts = [{"n": 1}, {"n": 2}, None]
+
+        await engine.validate_batch(["ok", "ok", "ok"], contexts)
+        if uses_context:
+            assert seen == [{"n": 1}, {"n": 2}, None]
+        else:
+            assert seen == [{"n": 1}]  # One assessment for the shared signature
+
+    async def test_rejects_mismatched_contexts(self, engine: SafetyEngine) -> None:
+        with pytest.raises(ValueError, match="one entry per text"):
+            await engine.validate_batch(["ok", "thank you"], [None])
@@ -0,0 +1,159 @@
+"""Soundness tests for the trigger-word prefilter.
+
+The prefilter may only skip the full scan when no rule or keyword can match,
+so the tests look for false negatives: content that some rule matches but
+``may_match`` rejects. Besides fixed and random corpora, every rule is
+checked against strings sampled from its own syntax tree, which exercises
+each alternative and repeat count of the rule rather than only the phrasings
+someone thought to write down.
+"""
+
+import random
+import re
+import string
+from typing import Any
+
+import pytest
+from test_safety_matcher import CORPUS, random_corpus
+
+from therapeutic_agent.safety.backends import StdlibBackend
+from therapeutic_agent.safety.engine import SafetyEngine
+from therapeutic_agent.safety.prefilter import (
+    TriggerIndex,
+    required_literals,
+    sre_constants,
+    sre_parse,
+)
+
+ENGINE = SafetyEngine(StdlibBackend())
+RULES = [
+    (f"{validator.__class__.__name__}[{index}]", pattern)
+    for validator in ENGINE._validators
+    for index, pattern in enumerate(validator.patterns)
+]
+KEYWORDS = sorted(
+    set().union(*(validator.keywords for validator in ENGINE._validators))
+)
+
+CATEGORY_CHARS = {
+    sre_constants.CATEGORY_SPACE: " \t\n",
+    sre_constants.CATEGORY_WORD: string.ascii_letters + string.digits + "_",
+    sre_constants.CATEGORY_DIGIT: string.digits,
+}
+FILLER = "i have been thinking about work and my week, really myself friend".split()
+
+
+def sample(items: Any, rng: random.Random) -> str:
+    """A random string matched by a parsed regex sequence (ignoring anchors)."""
+    parts = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            char = chr(av)
+            parts.append(char.upper() if rng.random() < 0.3 else char)
+        elif op is sre_constants.IN:
+            choices = ""
+            for item_op, item_av in av:
+                if item_op is sre_constants.LITERAL:
+                    choices += chr(item_av)
+                elif item_op is sre_constants.RANGE:
+                    choices += "".join(map(chr, range(item_av[0], item_av[1] + 1)))
+                elif item_op is sre_constants.CATEGORY:
+                    choices += CATEGORY_CHARS[item_av]
+            parts.append(rng.choice(choices))
+        elif op is sre_constants.ANY:
+            parts.append(rng.choice("    ,.'ab"))
+        elif op is sre_constants.BRANCH:
+            parts.append(sample(rng.choice(av[1]), rng))
+        elif op is sre_constants.SUBPATTERN:
+            parts.append(sample(av[-1], rng))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, body = av
+            count = rng.randint(low, min(high, low + 3))
+            parts.extend(sample(body, rng) for _ in range(count))
+        elif op is not sre_constants.AT:
+            raise AssertionError(f"Sampler does not support {op}")
+    return "".join(parts)
+
+
+def embed(text: str, rng: random.Random) -> str:
+    before = " ".join(rng.choice(FILLER) for _ in range(rng.randint(0, 4)))
+    after = " ".join(rng.choice(FILLER) for _ in range(rng.randint(0, 4)))
+    return f"{before} {text}{rng.choice(['', '.', '!', ' ', ','])} {after}"
+
+
+class TestRequiredLiterals:
+    """Test what the analysis derives from rule sources."""
+
+    def test_prefers_rare_literals(self) -> None:
+        assert required_literals(r"\b(?:plan\s+to\s+kill|have\s+a\s+plan)\b") == {
+            ("plan", True)
+        }
+
+    def test_gap_rule_uses_tail(self) -> None:
+        literals = required_literals(ENGINE._validators[2].patterns[0].source)
+        assert literals is not None
+        assert {text for text, _ in literals} == {
+            "symptom",
+            "condition",
+            "disease",
+            "disorder",
+        }
+
+    def test_literal_after_optional_group_is_not_word_start(self) -> None:
+        assert required_literals(r"\b(?:end(?:ing)?\s+(?:my\s+)?life)\b") == {
+            ("life", False)
+        }
+
+    @pytest.mark.parametrize("source", [r"\w+", r"(?:ab)?c?", r"[abc]+", r"a|\d"])
+    def test_rules_without_literals_disable_the_index(self, source: str) -> None:
+        assert required_literals(source) is None
+        index = TriggerIndex([StdlibBackend().compile(source)], [])
+        assert not index.complete
+        assert index.may_match("nothing to see")
+
+
+class TestNoFalseNegatives:
+    """Content that any rule matches always passes the prefilter."""
+
+    @pytest.mark.parametrize("name,pattern", RULES, ids=[name for name, _ in RULES])
+    def test_sampled_matches_pass_rule_triggers(self, name: str, pattern: Any) -> None:
+        """Each rule's own triggers cover every string sampled from the rule."""
+        rng = random.Random(name)
+        index = TriggerIndex([pattern], [])
+        reference = re.compile(pattern.source, re.IGNORECASE)
+        parsed = sre_parse.parse(pattern.source)
+
+        matched = 0
+        for _ in range(500):
+            text = embed(sample(parsed, rng), rng)
+            if reference.search(text):
+                matched += 1
+                assert index.may_match(text), text
+        assert matched >= 200  # Samples with an empty gap can miss a word boundary
+
+    @pytest.mark.parametrize("keyword", KEYWORDS)
+    def test_keywords_pass(self, keyword: str) -> None:
+        assert ENGINE._rule_set.may_match(f"so {keyword.upper()} today")
+
+    def test_rejected_content_has_no_hits(self) -> None:
+        rule_set = ENGINE._rule_set
+        no_hits = ENGINE._no_hits
+        rejected = 0
+        for text in CORPUS + random_corpus(3000) + random_corpus(500, seed=5):
+            for variant in (text, text.upper(), text.replace(" ", "\n")):
+                if not rule_set.may_match(variant):
+                    rejected += 1
+                    assert rule_set.scan(variant) == no_hits, variant
+        assert rejected > 0
+
+    def test_non_ascii_content_is_never_rejected(self) -> None:
+        assert ENGINE._rule_set.may_match("I feel anxious — thanks")
+        # KELVIN SIGN matches "k" under IGNORECASE
+        assert ENGINE._rule_set.may_match("Kill myself")
+
+    async def test_engine_results_unchanged(self) -> None:
+        unfiltered = SafetyEngine(StdlibBackend(), prefilter=False)
+        for text in CORPUS + random_corpus(1000, seed=11):
+            assert await ENGINE.validate_content(
+                text
+            ) == await unfiltered.validate_content(text), text
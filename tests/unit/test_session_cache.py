@@ -0,0 +1,253 @@
+"""Tests for the hot-session cache."""
+
+import os
+from datetime import datetime, timezone
+from typing import AsyncIterator
+from uuid import UUID, uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+from redis.asyncio import Redis
+
+from therapeutic_agent.core.config import SessionCacheConfig, Settings
+from therapeutic_agent.storage.session_cache import (
+    CachedMessage,
+    CachedSession,
+    RedisSessionCache,
+    SessionCache,
+    SessionStore,
+    create_session_cache,
+)
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def session(message_count: int = 0) -> CachedSession:
+    return CachedSession(
+        id=uuid4(),
+        user_id="user",
+        title=None,
+        status="active",
+        summary=None,
+        summarized_message_count=0,
+        safety_score=1.0,
+        safety_state=None,
+        message_count=message_count,
+        created_at=NOW,
+        last_activity=NOW,
+    )
+
+
+def message(content: str) -> CachedMessage:
+    return CachedMessage(
+        id=uuid4(),
+        role="user",
+        content=content,
+        token_count=len(content),
+        created_at=NOW,
+    )
+
+
+async def fill(cache: SessionStore, header: CachedSession, contents: list[str]) -> None:
+    async with cache.filling(header.id) as store:
+        await store(header, [message(content) for content in contents])
+
+
+async def contents(
+    cache: SessionStore, session_id: UUID, limit: int
+) -> list[str] | None:
+    cached = await cache.get(session_id, limit)
+    return None if cached is None else [m.content for m in cached[1]]
+
+
+class TestSessionCache:
+    """Test LRU, idle TTL, tail bounds and write-through updates."""
+
+    async def test_evicts_least_recently_used(self) -> None:
+        cache = SessionCache(max_sessions=2)
+        a, b, c = session(), session(), session()
+        await cache.add(a)
+        await cache.add(b)
+        assert await cache.get(a.id, 10) is not None  # b is now least recently used
+        await cache.add(c)
+
+        assert await cache.get(b.id, 10) is None
+        assert await cache.get(a.id, 10) is not None
+        assert cache.stats() == {"sessions": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+    async def test_idle_sessions_expire(self) -> None:
+        clock = FakeClock()
+        cache = SessionCache(idle_ttl_seconds=10, clock=clock)
+        header = session()
+        await cache.add(header)
+
+        clock.now = 8
+        await cache.update(header.id, status="paused")  # writes count as activity
+        clock.now = 18
+        assert await cache.get(header.id, 10) is not None
+        clock.now = 28.5
+        assert await cache.get(header.id, 10) is None
+        assert len(cache) == 0
+
+    async def test_misses_when_the_tail_is_too_short(self) -> None:
+        cache = SessionCache(tail_messages=3)
+        header = session(message_count=5)
+        await fill(cache, header, ["c", "d", "e"])
+
+        assert await contents(cache, header.id, 2) == ["d", "e"]
+        assert await contents(cache, header.id, 3) == ["c", "d", "e"]
+        assert await cache.get(header.id, 4) is None
+        assert await contents(cache, header.id, 0) == []
+
+    async def test_appends_keep_the_tail_bounded(self) -> None:
+        cache = SessionCache(tail_messages=2)
+        header = session()
+        await cache.add(header)
+        later = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        for content in ["a", "b", "c"]:
+            await cache.append(header.id, message(content), later)
+
+        cached = await cache.get(header.id, 2)
+        assert cached is not None
+        cached_session, messages = cached
+        assert [m.content for m in messages] == ["b", "c"]
+        assert cached_session.message_count == 3
+        assert cached_session.last_activity == later
+
+    async def test_returned_sessions_are_copies(self) -> None:
+        cache = SessionCache()
+        header = session()
+        await cache.add(header)
+        header.status = "completed"
+        cached = await cache.get(header.id, 0)
+        assert cached is not None
+        cached[0].status = "archived"
+
+        again = await cache.get(header.id, 0)
+        assert again is not None and again[0].status == "active"
+
+    async def test_read_racing_a_write_is_not_cached(self) -> None:
+        cache = SessionCache()
+        header = session()
+        async with cache.filling(header.id) as store:
+            # Committed after the read started, so the read may predate it
+            await cache.append(header.id, message("late"), NOW)
+            await store(header, [])
+
+        assert await cache.get(header.id, 10) is None
+
+    async def test_invalidate_drops_the_session(self) -> None:
+        cache = SessionCache()
+        header = session()
+        await cache.add(header)
+        await cache.invalidate(header.id)
+        assert await cache.get(header.id, 0) is None
+
+
+@pytest.fixture
+async def redis() -> AsyncIterator[Redis]:
+    """fakeredis, or the server at REDIS_TEST_URL when it is set."""
+    url = os.getenv("REDIS_TEST_URL")
+    client = (
+        Redis.from_url(url, decode_responses=True)
+        if url
+        else FakeAsyncRedis(decode_responses=True)
+    )
+    yield client
+    await client.flushdb()
+    await client.aclose()
+
+
+class TestRedisSessionCache:
+    """Test the Redis tier's encoding, write-through updates and fallback."""
+
+    async def test_round_trips_sessions_and_tails(self, redis: Redis) -> None:
+        cache = RedisSessionCache(redis)
+        header = session(message_count=2)
+        header.safety_state = {"risk": 0.2}
+        first, second = message("a"), message("b")
+        async with cache.filling(header.id) as store:
+            await store(header, [first, second])
+
+        assert await cache.get(header.id, 10) == (header, [first, second])
+        assert await redis.pttl(f"therapeutic:session:{{{header.id}}}") > 0
+
+    async def test_appends_and_updates_write_through(self, redis: Redis) -> None:
+        cache = RedisSessionCache(redis, tail_messages=2)
+        header = session()
+        await cache.add(header)
+        later = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        for content in ["a", "b", "c"]:
+            await cache.append(header.id, message(content), later)
+        await cache.update(header.id, status="paused", summary="So far")
+
+        cached = await cache.get(header.id, 2)
+        assert cached is not None
+        cached_session, messages = cached
+        assert [m.content for m in messages] == ["b", "c"]
+        assert cached_session.message_count == 3
+        assert cached_session.last_activity == later
+        assert (cached_session.status, cached_session.summary) == ("paused", "So far")
+        assert await cache.get(header.id, 3) is None
+
+    async def test_writes_to_uncached_sessions_read_as_misses(
+        self, redis: Redis
+    ) -> None:
+        cache = RedisSessionCache(redis)
+        session_id = uuid4()
+        await cache.append(session_id, message("a"), NOW)
+        await cache.update(session_id, status="paused")
+
+        assert await cache.get(session_id, 10) is None
+
+    async def test_read_racing_a_write_is_not_cached(self, redis: Redis) -> None:
+        cache = RedisSessionCache(redis)
+        header = session()
+        async with cache.filling(header.id) as store:
+            await cache.append(header.id, message("late"), NOW)
+            await store(header, [])
+
+        assert await cache.get(header.id, 10) is None
+
+    async def test_falls_back_while_redis_is_down(self) -> None:
+        server = FakeServer()
+        clock = FakeClock()
+        cache = RedisSessionCache(
+            FakeAsyncRedis(server=server, decode_responses=True),
+            retry_seconds=5,
+            clock=clock,
+        )
+        header = session()
+        await cache.add(header)
+
+        server.connected = False
+        await cache.update(header.id, status="completed")
+        assert await cache.get(header.id, 0) is None
+        assert cache.stats() == {"hits": 0, "misses": 1, "errors": 1, "stale": 1}
+
+        # The update never reached Redis, so its copy must not be served
+        server.connected = True
+        clock.now = 6
+        assert await cache.get(header.id, 0) is None
+        assert cache.stats()["stale"] == 0
+
+
+class TestCreateSessionCache:
+    """Test choosing the cache from settings."""
+
+    def test_caching_is_opt_in(self) -> None:
+        assert create_session_cache(Settings()) is None
+
+    def test_memory_backend(self) -> None:
+        settings = Settings(session_cache=SessionCacheConfig(backend="memory"))
+        assert isinstance(create_session_cache(settings), SessionCache)
+        settings.session_cache.max_sessions = 0
+        assert create_session_cache(settings) is None